@@ -0,0 +1,26 @@
+"""add content_hash to individuals and families
+
+Revision ID: record_content_hash
+Revises: era_gazetteer_debug
+Create Date: 2025-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'record_content_hash'
+down_revision = 'era_gazetteer_debug'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('individuals', sa.Column('content_hash', sa.String(length=32), nullable=True))
+    op.add_column('families', sa.Column('content_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('families', 'content_hash')
+    op.drop_column('individuals', 'content_hash')
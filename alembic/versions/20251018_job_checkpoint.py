@@ -0,0 +1,25 @@
+"""add checkpoint to jobs
+
+Revision ID: job_checkpoint
+Revises: record_content_hash
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'job_checkpoint'
+down_revision = 'record_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('checkpoint', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'checkpoint')
@@ -0,0 +1,23 @@
+"""index gazetteer_entries on (source, source_id)
+
+Revision ID: gazetteer_source_id
+Revises: job_checkpoint
+Create Date: 2025-10-20
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'gazetteer_source_id'
+down_revision = 'job_checkpoint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_gazetteer_source_id', 'gazetteer_entries', ['source', 'source_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_gazetteer_source_id', table_name='gazetteer_entries')
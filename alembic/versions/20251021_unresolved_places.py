@@ -0,0 +1,41 @@
+"""add unresolved_places
+
+Revision ID: unresolved_places
+Revises: gazetteer_source_id
+Create Date: 2025-10-21
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'unresolved_places'
+down_revision = 'gazetteer_source_id'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'unresolved_places',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('place_key', sa.String(), nullable=False),
+        sa.Column('reason', sa.String(), nullable=False),
+        sa.Column('raw_name', sa.String(), nullable=False),
+        sa.Column('tree_id', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('occurrences', sa.Integer(), nullable=False),
+        sa.Column('first_seen', sa.DateTime(), nullable=False),
+        sa.Column('last_seen', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('place_key', 'reason', name='uq_unresolved_place_reason'),
+    )
+    op.create_index('ix_unresolved_places_tree_id', 'unresolved_places', ['tree_id'])
+    op.create_index('ix_unresolved_places_last_seen', 'unresolved_places', ['last_seen'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_unresolved_places_last_seen', table_name='unresolved_places')
+    op.drop_index('ix_unresolved_places_tree_id', table_name='unresolved_places')
+    op.drop_table('unresolved_places')
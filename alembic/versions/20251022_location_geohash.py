@@ -0,0 +1,29 @@
+"""add locations.geohash
+
+Revision ID: location_geohash
+Revises: unresolved_places
+Create Date: 2025-10-22
+
+Existing rows are filled (together with any missing ``geom``) by the
+location geometry backfill job, not by this migration.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'location_geohash'
+down_revision = 'unresolved_places'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('locations', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index('ix_locations_geohash', 'locations', ['geohash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_locations_geohash', table_name='locations')
+    op.drop_column('locations', 'geohash')
@@ -0,0 +1,30 @@
+"""add retry backoff columns to unresolved_places
+
+Revision ID: unresolved_retry
+Revises: location_geohash
+Create Date: 2025-10-23
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'unresolved_retry'
+down_revision = 'location_geohash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('unresolved_places', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('unresolved_places', sa.Column('last_attempt_at', sa.DateTime(), nullable=True))
+    op.add_column('unresolved_places', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_unresolved_places_due', 'unresolved_places', ['status', 'next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_unresolved_places_due', table_name='unresolved_places')
+    op.drop_column('unresolved_places', 'next_attempt_at')
+    op.drop_column('unresolved_places', 'last_attempt_at')
+    op.drop_column('unresolved_places', 'attempts')
@@ -0,0 +1,23 @@
+"""index locations.updated_at for fuzzy index refreshes
+
+Revision ID: location_updated_at
+Revises: unresolved_retry
+Create Date: 2025-10-24
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'location_updated_at'
+down_revision = 'unresolved_retry'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_locations_updated_at', 'locations', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_locations_updated_at', table_name='locations')
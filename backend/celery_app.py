@@ -17,6 +17,14 @@ def make_celery() -> Celery:
     # 3) Copy Flask config into Celery for good measure
     celery.conf.update(flask_app.config)
 
+    # Periodic jobs (run `celery -A backend.celery_app beat` alongside the worker)
+    celery.conf.beat_schedule = {
+        "retry-unresolved-places": {
+            "task": "backend.tasks.geocode_tasks.retry_unresolved_task",
+            "schedule": float(os.getenv("UNRESOLVED_RETRY_INTERVAL", "900")),
+        },
+    }
+
     # 4) Ensure every task runs inside the Flask app context
     class ContextTask(Task):
         def __call__(self, *args, **kwargs):
@@ -21,6 +21,9 @@ logger.addHandler(file_handler)
 # Optional: Capture SQLAlchemy engine warnings too
 logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
 
+# Request bodies the debug hook may read and log.
+LOGGED_BODY_TYPES = {"application/json", "application/x-www-form-urlencoded", "text/plain"}
+
 # ─── Flask App Factory ──────────────────────────────────────────
 def create_app():
     engine = get_engine()  # Get the engine FIRST so we can inspect it/log it
@@ -50,8 +53,13 @@ def create_app():
     def log_request_info():
         logger.debug(f"➡️ {request.method} {request.path}")
         logger.debug(f"🔍 Headers: {dict(request.headers)}")
-        body = request.get_data(as_text=True)
-        logger.debug(f"🧠 Body: {body[:1000]}" if body else "🧠 Body: [Empty]")
+        # Only small text bodies: reading an upload here would buffer it in
+        # memory and leave nothing for streaming handlers (chunked uploads).
+        if request.mimetype in LOGGED_BODY_TYPES and (request.content_length or 0) <= 64 * 1024:
+            body = request.get_data(as_text=True)
+            logger.debug(f"🧠 Body: {body[:1000]}" if body else "🧠 Body: [Empty]")
+        else:
+            logger.debug(f"🧠 Body: [{request.mimetype or 'none'}, {request.content_length} bytes — not logged]")
 
     # ─── Teardown (Session Close Only) ───────────────────────────
     @app.teardown_appcontext
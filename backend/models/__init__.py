@@ -16,6 +16,7 @@ from .location_version   import LocationVersion  # 👈 this line ensures your v
 from .gazetteer_entry    import GazetteerEntry
 from .geocode_debug      import GeocodeAttempt
 from .job                import Job
+from .unresolved_place   import UnresolvedPlace
 
 import logging
 from backend.db import engine
@@ -37,6 +37,7 @@ class Family(Base, TimestampMixin, ReprMixin):
     family_type     = Column(SQLEnum(FamilyTypeEnum, name="family_type_enum"), nullable=True)
 
     notes           = Column(Text, nullable=True)
+    content_hash    = Column(String(32), nullable=True)  # digest of the GEDCOM record, for re-imports
 
     # Backref to version
     tree = relationship(
@@ -54,6 +54,8 @@ class GazetteerEntry(Base, UUIDMixin, TimestampMixin):
             "admin_norm",
             "era_bucket",
         ),
+        # Upsert key for bulk loads (backend.services.gazetteer_loader)
+        Index("ix_gazetteer_source_id", "source", "source_id"),
     )
 
 
@@ -50,6 +50,7 @@ class Individual(Base, TimestampMixin, ReprMixin, SerializeMixin):
     tags = Column(String, nullable=True, default="")  # comma-separated tags
     resolved_place_id = Column(GUID(), ForeignKey("locations.id", ondelete="SET NULL"), nullable=True)
     uncertainty_score = Column(String, nullable=True)
+    content_hash = Column(String(32), nullable=True)  # digest of the GEDCOM record, for re-imports
 
     tree = relationship(
         "TreeVersion",
@@ -39,6 +39,8 @@ class Job(Base):
     progress = Column(Integer, nullable=False, default=0)
     params = Column(JSON().with_variant(JSONB, "postgresql"))
     result = Column(JSON().with_variant(JSONB, "postgresql"))
+    # Resume point for staged jobs (see backend.services.staged_import).
+    checkpoint = Column(JSON().with_variant(JSONB, "postgresql"))
     error = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
@@ -26,6 +26,8 @@ class Location(Base, UUIDMixin):
     __table_args__ = (
         UniqueConstraint("normalized_name", name="uq_locations_normalized"),
         Index("ix_locations_normalized_name", "normalized_name"),
+        Index("ix_locations_geohash", "geohash"),
+        Index("ix_locations_updated_at", "updated_at"),
         CheckConstraint("latitude BETWEEN -90 AND 90", name="chk_lat_range"),
         CheckConstraint("longitude BETWEEN -180 AND 180", name="chk_lng_range"),
     )
@@ -45,6 +47,8 @@ class Location(Base, UUIDMixin):
 
     # PostGIS point geometry (WGS84)
     geom             = Column(Geometry(geometry_type="POINT", srid=4326), nullable=True)
+    # Geohash of (latitude, longitude); indexed near-duplicate lookups off PostGIS
+    geohash          = Column(String(12), nullable=True)
 
     alternate_names = relationship(
         "AlternateName",
@@ -0,0 +1,39 @@
+"""Places the geocoder could not resolve, one row per (place key, reason).
+
+Replaces ``unresolved_locations.json``: repeated failures bump
+``occurrences`` and ``last_seen`` instead of appending another entry.
+Written in batches by :mod:`backend.services.unresolved_log`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, UniqueConstraint
+
+from backend.models.base import Base
+
+
+class UnresolvedPlace(Base):
+    __tablename__ = "unresolved_places"
+
+    # Integer key so consumers can page with "id > last seen id"
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    place_key = Column(String, nullable=False)  # slug of the raw place (see unresolved_log.place_key_for)
+    reason = Column(String, nullable=False)
+    raw_name = Column(String, nullable=False)  # first spelling seen
+    tree_id = Column(String, nullable=True, index=True)  # tree of the latest occurrence
+    status = Column(String, nullable=False, default="manual_fix_pending")
+    occurrences = Column(Integer, nullable=False, default=1)
+    first_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Background retries (backend.services.unresolved_retry): per-place backoff
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_attempt_at = Column(DateTime, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)  # NULL = due now
+
+    __table_args__ = (
+        UniqueConstraint("place_key", "reason", name="uq_unresolved_place_reason"),
+        Index("ix_unresolved_places_last_seen", "last_seen"),
+        Index("ix_unresolved_places_due", "status", "next_attempt_at"),
+    )
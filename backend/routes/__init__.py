@@ -19,6 +19,7 @@ from .health               import health_routes
 from .heatmap              import heatmap_routes
 from .geocode_api          import bp as geocode_routes   # 🆕 Admin API
 from .geocode_dashboard    import geocode_dashboard      # 🆕 UI pages
+from .geocode_batch        import geocode_batch_routes
 from .analytics            import analytics_routes
 from .media                import media_routes
 from backend.routes import admin_geocode  # new import
@@ -58,6 +59,7 @@ def openapi_json():
                 "delete": {"summary": "Delete person"}
             },
             "/api/people/{uploaded_tree_id}/export": {"get": {"summary": "Export people CSV"}},
+            "/api/geocode/batch": {"post": {"summary": "Bulk geocode places (local hits now, misses as a job)"}},
             "/api/analytics/snapshot": {"get": {"summary": "System snapshot"}},
             "/api/analytics/surname-heatmap": {"get": {"summary": "Surname heatmap by era"}},
             "/api/analytics/cohort-flow": {"get": {"summary": "Sankey cohort flow"}},
@@ -114,6 +116,7 @@ def register_routes(app):
         analytics_routes,
         geocode_routes,        # 🧭 Admin geocode API endpoints
         geocode_dashboard,     # 📊 Geocode dashboard views
+        geocode_batch_routes,  # 📦 POST /api/geocode/batch
         admin_geocode.admin_geo,  # ✅ Manual fix route for unresolved
         admin_metrics_routes,
         jobs_routes,
@@ -3,9 +3,10 @@ from flask import Blueprint, jsonify, request, abort
 from sqlalchemy import func
 
 from backend.db import SessionLocal
-from backend.models import Location, event_participants, Event
-from sqlalchemy import text
+from backend.models import Location, event_participants, Event, Job
+from backend.services.location_geometry import create_backfill_job, point_fields
 from backend.services.suggestions import suggest_coordinates as suggest_for_location
+from backend.services.unresolved_log import PAGE_SIZE, list_unresolved, unresolved_to_dict
 
 admin_geo = Blueprint("admin_geo", __name__, url_prefix="/api/admin/geocode")
 
@@ -33,6 +34,22 @@ def unresolved_locations():
         return jsonify(data=[_location_to_dict(loc) for loc in locs])
 
 
+@admin_geo.get("/unresolved/log")
+def unresolved_log():
+    """Page through the unresolved_places log: ?after_id=&limit=&reason=&status=&tree_id="""
+    limit = min(max(request.args.get("limit", default=100, type=int), 1), PAGE_SIZE)
+    with SessionLocal() as session:
+        rows, next_cursor = list_unresolved(
+            session,
+            after_id=request.args.get("after_id", type=int),
+            limit=limit,
+            reason=request.args.get("reason") or None,
+            status=request.args.get("status") or None,
+            tree_id=request.args.get("tree_id") or None,
+        )
+        return jsonify(data=[unresolved_to_dict(r) for r in rows], next_cursor=next_cursor)
+
+
 @admin_geo.post("/fix")
 def fix_location():
     body = request.get_json(silent=True) or {}
@@ -48,18 +65,13 @@ def fix_location():
         if not loc:
             abort(404, f"Location {loc_id} not found")
 
-        # Use correct field names and set PostGIS geom
+        # Use correct field names and set PostGIS geom + geohash
         loc.latitude  = float(lat)
         loc.longitude = float(lng)
         loc.status    = "manual_override"
         loc.updated_at = datetime.utcnow()
-        try:
-            session.execute(
-                text("UPDATE locations SET geom = ST_SetSRID(ST_Point(:lng,:lat),4326) WHERE id=:id"),
-                {"lat": float(lat), "lng": float(lng), "id": loc_id}
-            )
-        except Exception:
-            pass
+        fields = point_fields(loc.latitude, loc.longitude)
+        loc.geom, loc.geohash = fields["geom"], fields["geohash"]
 
         print(f"[Fix] {loc_id=} {loc.latitude=} {loc.longitude=} status={loc.status}")
         session.commit()
@@ -67,6 +79,24 @@ def fix_location():
     return jsonify(success=True)
 
 
+@admin_geo.post("/backfill-geometry")
+def backfill_geometry():
+    """Queue the geom/geohash backfill for locations that only have lat/lng."""
+    with SessionLocal() as session:
+        job = create_backfill_job(session)
+        job_id, pending = job.id, job.params["pending"]
+        session.commit()
+
+    from backend.tasks.geocode_tasks import backfill_location_geometry_task
+
+    task_id = backfill_location_geometry_task.delay(str(job_id)).id
+    with SessionLocal.begin() as session:
+        job = session.get(Job, job_id)
+        if job:
+            job.task_id = task_id
+    return jsonify(job_id=str(job_id), task_id=task_id, pending=pending), 202
+
+
 @admin_geo.get("/suggest")
 def suggest_location():
     loc_id = request.args.get("id", type=int)
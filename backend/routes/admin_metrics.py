@@ -78,3 +78,14 @@ def db_health():
         db.close()
 
 
+
+
+@admin_metrics_routes.route("/geocode-cache", methods=["GET"])
+@debug_route
+def geocode_cache_stats():
+    from backend.services.geocode_shared_cache import get_shared_cache
+
+    cache = get_shared_cache()
+    if cache is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **cache.stats()}), 200
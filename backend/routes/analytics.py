@@ -8,6 +8,7 @@ from backend.utils.helpers import haversine_km, phonetic_keys
 from backend.models.enums import LocationStatusEnum
 from backend.utils.logger import get_file_logger
 from backend.utils.cache import ttl_cache_get, ttl_cache_set
+from backend.utils.tree_helpers import superseded_response
 
 log = get_file_logger("analytics")
 analytics_routes = Blueprint("analytics", __name__, url_prefix="/api/analytics")
@@ -111,6 +112,8 @@ def surname_heatmap():
         q = db.query(Event, Location)\
               .join(Location, Event.location_id == Location.id)
         if tree_id:
+            if (gone := superseded_response(db, tree_id)) is not None:
+                return gone
             q = q.filter(Event.tree_id == tree_id)
         if yr_min is not None:
             q = q.filter(extract("year", Event.date) >= yr_min)
@@ -175,6 +178,8 @@ def cohort_flow():
         # Pull core events per person
         q = db.query(Event).filter(Event.event_type.in_(["birth","marriage","death"]))
         if tree_id:
+            if (gone := superseded_response(db, tree_id)) is not None:
+                return gone
             q = q.filter(Event.tree_id == tree_id)
         if yr_min is not None:
             q = q.filter(extract("year", Event.date) >= yr_min)
@@ -256,6 +261,8 @@ def outliers():
         # Fetch all events for birth/death + residences sorted by person/date
         q = db.query(Event).join(Individual, Event.participants).filter(Event.event_type.in_(["birth","death","residence","marriage"]))
         if tree_id:
+            if (gone := superseded_response(db, tree_id)) is not None:
+                return gone
             q = q.filter(Event.tree_id == tree_id)
         events = q.order_by(Event.date.asc()).all()
 
@@ -8,6 +8,7 @@ from flask_cors import cross_origin
 from backend.db import get_db
 from sqlalchemy import text
 from backend.models import Event, TreeVersion
+from backend.utils.tree_helpers import superseded_response
 from backend.utils.debug_routes import debug_route
 
 event_routes = Blueprint("events", __name__, url_prefix="/api/events")
@@ -53,6 +54,8 @@ def get_events():
         # Respect strict versioning: require version_id
         if not version_id:
             return jsonify({"error": "version_id required"}), 400
+        if (gone := superseded_response(db, version_id)) is not None:
+            return gone
         q = db.query(Event).filter(Event.tree_id == version_id)
         logger.debug(f"🔍 Filtering on tree_id={version_id}")
         logger.debug(f"▶️ Filtering {q.count()} events total for version_id={version_id}")
@@ -0,0 +1,55 @@
+"""Bulk geocoding endpoint for data-cleaning tools and the admin dashboard."""
+
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+
+from backend.db import SessionLocal
+from backend.services.batch_geocode import BatchRequestError, parse_batch_items, resolve_batch_local
+from backend.services.geocode_fanout import create_fanout_job
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("geocode_batch_route")
+
+geocode_batch_routes = Blueprint("geocode_batch", __name__, url_prefix="/api/geocode")
+
+
+@geocode_batch_routes.post("/batch")
+def geocode_batch():
+    """Resolve many places at once.
+
+    Body: ``{"places": ["Drew, MS", {"place": "Ruleville", "year": 1910}, …],
+    "tree_id": optional}``.  Local hits come back in ``results`` (one row per
+    input, in order).  Rows with ``status == "pending"`` are resolved by the
+    ``geocode_fanout`` job ``job_id`` (202); poll ``/api/jobs/<job_id>``, whose
+    ``result.results`` is keyed by each row's ``key``.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        items = parse_batch_items(body.get("places"))
+    except BatchRequestError as e:
+        return jsonify({"error": str(e)}), 400
+    tree_id = body.get("tree_id")
+    tree_id = str(tree_id) if tree_id is not None else None
+
+    job_id, task_id, chunks = None, None, []
+    with SessionLocal() as session:
+        batch = resolve_batch_local(session, items, tree_id=tree_id)
+        if batch.pending:
+            job, chunks = create_fanout_job(session, batch.pending, source="geocode_batch", tree_id=tree_id)
+            job_id = str(job.id)
+        session.commit()
+
+    if job_id is not None:
+        from backend.tasks.geocode_tasks import dispatch_fanout
+
+        task_id = dispatch_fanout(job_id, chunks)
+        logger.info(
+            "📤 batch geocode queued %d misses in %d chunks (job=%s, task=%s)",
+            len(batch.pending), len(chunks), job_id, task_id,
+        )
+
+    return (
+        jsonify(results=batch.results, stats=batch.stats, job_id=job_id, task_id=task_id),
+        202 if job_id else 200,
+    )
@@ -13,6 +13,7 @@ from backend.models import Event, Location, Individual
 from backend.utils.helpers import phonetic_keys
 from backend.utils.debug_routes import debug_route
 from backend.utils.redaction import is_authorized
+from backend.utils.tree_helpers import superseded_response
 
 heatmap_routes = Blueprint("heatmap", __name__, url_prefix="/api/heatmap")
 
@@ -71,6 +72,8 @@ def get_heatmap():
         q = db.query(Event, Location).join(Location, Event.location_id == Location.id)
         if tree_ids:
             ids = [x.strip() for x in tree_ids.split(",") if x.strip()]
+            if (gone := superseded_response(db, *ids)) is not None:
+                return gone
             q = q.filter(Event.tree_id.in_(ids))
         if year:
             q = q.filter(func.extract("year", Event.date) == int(year))
@@ -163,6 +166,8 @@ def get_heatmap_events():
         loc_id = request.args.get("location_id")
         year   = request.args.get("year")
         tree_id = request.args.get("tree_id")
+        if tree_id and (gone := superseded_response(db, tree_id)) is not None:
+            return gone
 
         q = db.query(Event, Individual, Location) \
               .join(Individual, Event.individual_id == Individual.id) \
@@ -19,6 +19,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy import or_
 from backend.utils.redaction import should_redact_person, redact_name, is_authorized
 from backend.utils.uuid_utils import parse_uuid_arg_or_400
+from backend.utils.tree_helpers import superseded_response
 from backend.db import get_db
 from backend.models import Individual, TreeVersion, UploadedTree
 from backend.utils.debug_routes import debug_route
@@ -488,6 +489,8 @@ def get_people_by_version(version_id: str):
         except Exception:
             return jsonify({"error": "version_id must be a valid UUID"}), 400
         db = next(get_db())
+        if (gone := superseded_response(db, vid)) is not None:
+            return gone
         limit, offset = _validated_pagination()
         person_query = request.args.get("person", "").strip()
         sort = (request.args.get("sort") or "name_asc").lower()
@@ -6,6 +6,7 @@ from backend.db import get_db
 from backend.models import Event
 from backend.utils.logger import get_logger
 from backend.utils.debug_routes import debug_route
+from backend.utils.tree_helpers import superseded_response
 
 timeline_routes = Blueprint("timeline", __name__, url_prefix="/api/timeline")
 logger = get_logger(__name__)
@@ -19,6 +20,8 @@ def get_timeline(version_id: str):
     """
     db: Session = next(get_db())
     try:
+        if (gone := superseded_response(db, version_id)) is not None:
+            return gone
         event_type = request.args.get("event_type")
 
         query = (
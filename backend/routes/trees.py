@@ -19,7 +19,7 @@ from sqlalchemy import func
 
 from backend.db import get_db
 from backend.models import TreeVersion, UploadedTree, Event, Individual, Family
-from backend.utils.tree_helpers import get_latest_tree_version
+from backend.utils.tree_helpers import get_latest_tree_version, superseded_response
 from backend.services.filters import normalize_filters, from_query_args
 from backend.services.query_builders import build_event_query
 from backend.utils.debug_routes import debug_route
@@ -141,6 +141,8 @@ def basic_counts(tree_id: str):
     tv = db.query(TreeVersion).filter_by(id=parsed).first()
     if not tv:
         return jsonify({"error": "TreeVersion not found"}), 404
+    if (gone := superseded_response(db, tv.id)) is not None:
+        return gone
 
     people_count   = (
         db.query(Individual)
@@ -342,6 +344,8 @@ def diff_versions(version_id: str, other_id: str):
             v2 = _UUID(other_id)
         except Exception:
             return jsonify({"error": "version ids must be UUIDs"}), 400
+        if (gone := superseded_response(db, v1, v2)) is not None:
+            return gone
 
         a = db.query(Individual).filter(Individual.tree_id == v1).all()
         b = db.query(Individual).filter(Individual.tree_id == v2).all()
@@ -391,6 +395,8 @@ def diff_events(version_id: str, other_id: str):
             v2 = _UUID(other_id)
         except Exception:
             return jsonify({"error": "version ids must be UUIDs"}), 400
+        if (gone := superseded_response(db, v1, v2)) is not None:
+            return gone
 
         a = db.query(Event).filter(Event.tree_id == v1).all()
         b = db.query(Event).filter(Event.tree_id == v2).all()
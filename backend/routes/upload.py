@@ -1,12 +1,9 @@
 from __future__ import annotations
 
 import os
-import subprocess
-import sys
 import traceback
 import uuid
 from datetime import datetime
-from pathlib import Path
 from typing import Final, Tuple
 
 from celery.result import AsyncResult
@@ -14,15 +11,16 @@ from flask import Blueprint, jsonify, request
 
 from backend.db import SessionLocal
 from backend.models import TreeVersion, UploadedTree, Job
+from backend.services.chunked_upload import CHUNK_SIZE_HINT, ChunkedUploadError, ChunkedUploadStore
+from backend.services.incremental import previous_version
 from backend.services.location_service import LocationService
 from backend.services.parser import GEDCOMParser
 from backend.services.upload_service import (
     MAX_FILE_SIZE_MB,
     validate_upload,
-    save_file,
+    save_file_hashed,
     cleanup_temp,
 )
-from backend.utils.helpers import increment_upload_count
 from backend.utils.debug_routes import debug_route
 from backend.utils.logger import get_file_logger
 
@@ -74,6 +72,80 @@ def _check_duplicate_tree(db, tree_name: str) -> bool:
     return db.query(UploadedTree).filter_by(tree_name=tree_name).first() is not None
 
 
+def _resolve_target(request_id: str, tree_name, reimport_raw, simulate: bool = False):
+    """Validate the target tree of an upload.
+
+    Returns ``(tree_name, reimport_id, error_response)``; a re-import takes
+    the name of the existing tree, a new tree needs an unused name.
+    """
+    reimport_id = None
+    if reimport_raw:
+        try:
+            reimport_id = uuid.UUID(str(reimport_raw))
+        except ValueError:
+            return None, None, (jsonify({"error": "Invalid uploaded_tree_id"}), 400)
+    elif not tree_name:
+        return None, None, (jsonify({"error": "Missing tree_name"}), 400)
+
+    with SessionLocal.begin() as db:
+        if reimport_id:
+            existing_tree = db.get(UploadedTree, reimport_id)
+            if existing_tree is None:
+                return None, None, (jsonify({"error": "Uploaded tree not found"}), 404)
+            tree_name = existing_tree.tree_name
+            logger.info("🔁 [%s] Re-import into tree %s (%s)", request_id, reimport_id, tree_name)
+        elif not simulate and _check_duplicate_tree(db, tree_name):
+            return None, None, (jsonify({"error": "Tree name already exists"}), 400)
+    return tree_name, reimport_id, None
+
+
+def _queue_import(request_id: str, tree_name: str, reimport_id, temp_path: str, content_digest: str):
+    """Create the UploadedTree (unless re-importing) and Job, then queue the Celery ingest."""
+    with SessionLocal.begin() as db:
+        if reimport_id:
+            uploaded_tree = db.get(UploadedTree, reimport_id)
+        else:
+            uploaded_tree = UploadedTree(tree_name=tree_name)
+            db.add(uploaded_tree)
+            db.flush()
+        job = Job(
+            task_id="",
+            job_type="gedcom_import",
+            status="queued",
+            progress=0,
+            params={"tree_name": tree_name, "uploaded_tree_id": str(uploaded_tree.id)},
+        )
+        db.add(job)
+        db.flush()
+        tree_id, job_id = uploaded_tree.id, job.id
+
+    from backend.tasks.upload_tasks import process_gedcom_task
+
+    task = process_gedcom_task.delay(
+        temp_path, tree_name, str(tree_id), str(job_id), content_digest=content_digest
+    )
+    # store Celery task id
+    with SessionLocal.begin() as db:
+        j = db.get(Job, job_id)
+        if j:
+            j.task_id = task.id
+    logger.info(
+        "📤 [%s] GEDCOM queued async (task=%s, tree=%s)",
+        request_id,
+        task.id,
+        tree_id,
+    )
+    return (
+        jsonify(
+            status="queued",
+            uploaded_tree_id=str(tree_id),
+            task_id=task.id,
+            job_id=str(job_id),
+        ),
+        202,
+    )
+
+
 # ─────────────────────────────
 # Status endpoint (frontend polls)
 # ─────────────────────────────
@@ -120,69 +192,33 @@ def upload_tree():
             size_mb,
         )
 
-        # 2️⃣ Validate tree name (required)
-        tree_name = request.form.get("tree_name")
-        if not tree_name:
-            return jsonify({"error": "Missing tree_name"}), 400
-
         # Optional simulate-only flag (no DB writes)
         simulate = (request.form.get("simulate", "false").lower() == "true")
 
+        # 2️⃣ Validate tree name (required) — unless re-importing into an existing tree
         # 3️⃣ Fail-fast duplicate check **before** touching disk or Celery
-        with SessionLocal.begin() as db:
-            if not simulate and _check_duplicate_tree(db, tree_name):
-                return jsonify({"error": "Tree name already exists"}), 400
+        tree_name, reimport_id, error = _resolve_target(
+            request_id,
+            request.form.get("tree_name"),
+            request.form.get("uploaded_tree_id"),
+            simulate=simulate,
+        )
+        if error:
+            return error
 
-        # 4️⃣ Save GEDCOM to temp file
-        temp_path = save_file(file)
-        logger.info("[%s] Temp GEDCOM saved → %s", request_id, temp_path)
+        # 4️⃣ Save GEDCOM to temp file (hashed on the way for the parse cache)
+        temp_path, content_digest = save_file_hashed(file)
+        logger.info("[%s] Temp GEDCOM saved → %s (sha256=%s)", request_id, temp_path, content_digest[:12])
 
         # 5️⃣ Large files get queued to Celery
         if not simulate and size_mb > ASYNC_THRESHOLD_MB:
-            with SessionLocal.begin() as db:
-                uploaded_tree = UploadedTree(tree_name=tree_name)
-                db.add(uploaded_tree)
-                db.flush()
-                job = Job(
-                    task_id="",
-                    job_type="gedcom_import",
-                    status="queued",
-                    progress=0,
-                    params={"tree_name": tree_name, "uploaded_tree_id": str(uploaded_tree.id)},
-                )
-                db.add(job)
-                db.flush()
-
-            from backend.tasks.upload_tasks import process_gedcom_task
-
-            task = process_gedcom_task.delay(
-                temp_path, tree_name, str(uploaded_tree.id), str(job.id)
-            )
-            # store Celery task id
-            with SessionLocal.begin() as db:
-                j = db.get(Job, job.id)
-                if j:
-                    j.task_id = task.id
+            response = _queue_import(request_id, tree_name, reimport_id, temp_path, content_digest)
             async_queued = True
-            logger.info(
-                "📤 [%s] GEDCOM queued async (task=%s, tree=%s)",
-                request_id,
-                task.id,
-                uploaded_tree.id,
-            )
-            return (
-                jsonify(
-                    status="queued",
-                    uploaded_tree_id=str(uploaded_tree.id),
-                    task_id=task.id,
-                    job_id=str(job.id),
-                ),
-                202,
-            )
+            return response
 
         # 6️⃣ Parse GEDCOM synchronously
         location_service = _build_location_service()
-        parser = GEDCOMParser(temp_path, location_service)
+        parser = GEDCOMParser(temp_path, location_service, content_digest=content_digest)
         logger.info("🧬 [%s] Parsing GEDCOM for tree %s", request_id, tree_name)
         parsed = parser.parse_file()
         logger.info(
@@ -216,10 +252,13 @@ def upload_tree():
             )
 
         with SessionLocal.begin() as db:
-            # Insert UploadedTree + TreeVersion
-            uploaded_tree = UploadedTree(tree_name=tree_name)
-            db.add(uploaded_tree)
-            db.flush()
+            # Insert (or reuse) UploadedTree + new TreeVersion
+            if reimport_id:
+                uploaded_tree = db.get(UploadedTree, reimport_id)
+            else:
+                uploaded_tree = UploadedTree(tree_name=tree_name)
+                db.add(uploaded_tree)
+                db.flush()
 
             version = TreeVersion(
                 uploaded_tree_id=uploaded_tree.id,
@@ -228,13 +267,26 @@ def upload_tree():
             db.add(version)
             db.flush()
 
-            # Save parsed data
-            summary = parser.save_to_db(
-                session=db,
-                uploaded_tree_id=uploaded_tree.id,
-                tree_version_id=version.id,
-                dry_run=False,
-            )
+            previous = previous_version(db, uploaded_tree.id, version.version_number)
+            if previous is not None:
+                # Re-import: write only what changed since the previous version
+                summary = parser.save_to_db(
+                    session=db,
+                    uploaded_tree_id=uploaded_tree.id,
+                    tree_version_id=version.id,
+                    dry_run=False,
+                    previous_version_id=previous.id,
+                )
+            else:
+                # Resolve each distinct place once, then save parsed data
+                place_map = parser.resolve_places(db, uploaded_tree.id)
+                summary = parser.save_to_db(
+                    session=db,
+                    uploaded_tree_id=uploaded_tree.id,
+                    tree_version_id=version.id,
+                    dry_run=False,
+                    place_map=place_map,
+                )
             logger.info(
                 "🧾 [%s] Upload summary: %s people, %s events",
                 request_id,
@@ -242,19 +294,6 @@ def upload_tree():
                 summary.get("event_count", "NA"),
             )
 
-            # Update upload counter + trigger retry script every 5 uploads
-            count = increment_upload_count()
-            logger.debug("[%s] upload_count=%s", request_id, count)
-            if count % 5 == 0:
-                script = (
-                    Path(__file__).resolve().parents[2] / "scripts" / "retry_unresolved.py"
-                )
-                logger.info("[%s] Running unresolved retry batch", request_id)
-                try:
-                    subprocess.run([sys.executable, str(script)], check=True)
-                except Exception as exc:
-                    logger.warning("[%s] retry_unresolved.py failed: %s", request_id, exc)
-
             return (
                 jsonify(
                     status="success",
@@ -283,3 +322,126 @@ def upload_tree():
         # Clean up temp file when handled synchronously
         if temp_path and not async_queued:
             cleanup_temp(temp_path)
+
+
+# ─────────────────────────────
+# Chunked, resumable uploads (large files)
+#   POST   /chunked                 → open session {filename, total_size, tree_name | uploaded_tree_id}
+#   GET    /chunked/<id>            → current offset (resume point)
+#   PUT    /chunked/<id>?offset=N   → raw chunk body (optional X-Chunk-SHA256)
+#   POST   /chunked/<id>/complete   → validate + queue async ingest
+#   DELETE /chunked/<id>            → abort
+# ─────────────────────────────
+_chunked_store = ChunkedUploadStore()
+
+
+def _chunked_error(exc: ChunkedUploadError):
+    body = {"error": str(exc)}
+    if exc.offset is not None:
+        body["offset"] = exc.offset
+    return jsonify(body), exc.status
+
+
+def _session_view(manifest: dict) -> dict:
+    return {
+        "upload_id": manifest["upload_id"],
+        "filename": manifest["filename"],
+        "offset": manifest["offset"],
+        "total_size": manifest["total_size"],
+        "chunk_size": CHUNK_SIZE_HINT,
+    }
+
+
+@upload_routes.route("/chunked", methods=["POST"], strict_slashes=False)
+@debug_route
+def chunked_init():
+    request_id = uuid.uuid4().hex[:8]
+    payload = request.get_json(silent=True) or request.form
+    try:
+        total_size = int(payload.get("total_size", 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "total_size must be an integer"}), 400
+
+    tree_name, reimport_id, error = _resolve_target(
+        request_id, payload.get("tree_name"), payload.get("uploaded_tree_id")
+    )
+    if error:
+        return error
+    try:
+        manifest = _chunked_store.create(
+            payload.get("filename") or "",
+            total_size,
+            tree_name=tree_name,
+            uploaded_tree_id=str(reimport_id) if reimport_id else None,
+        )
+    except ChunkedUploadError as exc:
+        return _chunked_error(exc)
+    logger.info("🆕 [%s] Chunked upload %s opened for tree %s", request_id, manifest["upload_id"], tree_name)
+    return jsonify(_session_view(manifest)), 201
+
+
+@upload_routes.route("/chunked/<upload_id>", methods=["GET"], strict_slashes=False)
+@debug_route
+def chunked_status(upload_id: str):
+    try:
+        return jsonify(_session_view(_chunked_store.status(upload_id))), 200
+    except ChunkedUploadError as exc:
+        return _chunked_error(exc)
+
+
+@upload_routes.route("/chunked/<upload_id>", methods=["PUT", "PATCH"], strict_slashes=False)
+@debug_route
+def chunked_append(upload_id: str):
+    offset = request.args.get("offset", request.headers.get("Upload-Offset"))
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        return jsonify({"error": "offset query parameter required"}), 400
+    try:
+        manifest = _chunked_store.append(
+            upload_id,
+            offset,
+            request.stream,
+            length=request.content_length,
+            chunk_sha256=request.headers.get("X-Chunk-SHA256"),
+        )
+    except ChunkedUploadError as exc:
+        return _chunked_error(exc)
+    return jsonify(_session_view(manifest)), 200
+
+
+@upload_routes.route("/chunked/<upload_id>/complete", methods=["POST"], strict_slashes=False)
+@debug_route
+def chunked_complete(upload_id: str):
+    request_id = uuid.uuid4().hex[:8]
+    try:
+        manifest = _chunked_store.status(upload_id)
+        # Re-check the target: the name may have been taken while uploading.
+        tree_name, reimport_id, error = _resolve_target(
+            request_id, manifest.get("tree_name"), manifest.get("uploaded_tree_id")
+        )
+        if error:
+            return error
+        path, content_digest, manifest = _chunked_store.complete(upload_id)
+    except ChunkedUploadError as exc:
+        return _chunked_error(exc)
+
+    logger.info(
+        "➡️ [%s] chunked upload %s complete (%s) — %.2f MB",
+        request_id, upload_id, manifest["filename"], manifest["total_size"] / (1024 * 1024),
+    )
+    try:
+        return _queue_import(request_id, tree_name, reimport_id, path, content_digest)
+    except Exception:
+        cleanup_temp(path)
+        raise
+
+
+@upload_routes.route("/chunked/<upload_id>", methods=["DELETE"], strict_slashes=False)
+@debug_route
+def chunked_abort(upload_id: str):
+    try:
+        _chunked_store.abort(upload_id)
+    except ChunkedUploadError as exc:
+        return _chunked_error(exc)
+    return jsonify(status="aborted", upload_id=upload_id), 200
@@ -1,93 +1,63 @@
 from __future__ import annotations
 
-"""Hydrate gazetteer_entries from TSV or JSON sources (GeoNames/Wikidata).
+"""Hydrate gazetteer_entries from TSV, GeoNames or JSON sources (GeoNames/Wikidata).
 
 Usage:
   python -m backend.scripts.load_gazetteer geonames.tsv
+  python -m backend.scripts.load_gazetteer allCountries.zip --workers 8
+  python -m backend.scripts.load_gazetteer wikidata.jsonl.gz
   python -m backend.scripts.load_gazetteer data.json
+  python -m backend.scripts.load_gazetteer --index-only   # rebuild the mmapped index
+
+Sources are streamed, staged and merged by backend.services.gazetteer_loader;
+rerunning an interrupted load resumes where it stopped.  Every load ends by
+rebuilding the memory-mapped gazetteer index that GazetteerDBGeocoder reads.
 """
 
-import csv
-import json
-import sys
+import argparse
 from pathlib import Path
-from typing import Iterable
 
 from sqlalchemy.orm import sessionmaker
 
 from backend.db import engine
-from backend.models.gazetteer_entry import GazetteerEntry, compute_era_bucket
-from backend.utils.helpers import normalize_location
-
-
-def iter_rows(path: Path):
-    if path.suffix.lower() in {".tsv", ".txt"}:
-        with path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f, delimiter="\t")
-            for row in reader:
-                yield row
-    else:
-        data = json.loads(path.read_text())
-        if isinstance(data, list):
-            for row in data:
-                yield row
-        elif isinstance(data, dict):
-            for _, row in data.items():
-                yield row
+from backend.services.gazetteer_index import build_gazetteer_index
+from backend.services.gazetteer_loader import LOAD_BATCH_SIZE, load_gazetteer_file
 
 
 def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: python -m backend.scripts.load_gazetteer <file>")
-        return 2
-    path = Path(sys.argv[1])
-    if not path.exists():
-        print(f"File not found: {path}")
-        return 2
+    parser = argparse.ArgumentParser(description="Load a gazetteer dump into gazetteer_entries.")
+    parser.add_argument("file", nargs="?", help="TSV/GeoNames/JSON(L) file, optionally .zip or .gz")
+    parser.add_argument("--index-only", action="store_true", help="Only rebuild the mmapped gazetteer index")
+    parser.add_argument("--workers", type=int, default=None, help="Normalising processes (0 = in-process)")
+    parser.add_argument("--batch-size", type=int, default=LOAD_BATCH_SIZE, help="Rows per staged batch")
+    parser.add_argument("--keep-indexes", action="store_true", help="Do not drop indexes during the merge")
+    args = parser.parse_args()
 
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    created = 0
+    session = sessionmaker(bind=engine)()
     try:
-        for row in iter_rows(path):
-            name = normalize_location(row.get("name") or row.get("name_norm") or "")
-            if not name:
-                continue
-            admin = normalize_location(row.get("admin") or row.get("admin_norm") or "") or None
-            year = row.get("year")
-            try:
-                yeari = int(year) if year is not None else None
-            except Exception:
-                yeari = None
-            era = compute_era_bucket(yeari)
-            lat = row.get("lat") or row.get("latitude")
-            lng = row.get("lng") or row.get("longitude")
-            try:
-                latf = float(lat)
-                lngf = float(lng)
-            except Exception:
-                continue
-            entry = GazetteerEntry(
-                name_norm=name,
-                admin_norm=admin,
-                era_bucket=era,
-                latitude=latf,
-                longitude=lngf,
-                source=row.get("source") or "import",
-                source_id=row.get("source_id"),
-                country_code=row.get("country_code"),
-                admin1=row.get("admin1"),
-                admin2=row.get("admin2"),
-                alt_names=row.get("alt_names"),
-                meta=row.get("meta"),
-            )
-            session.add(entry)
-            created += 1
-            if created % 1000 == 0:
-                session.commit()
-                print(f"Committed {created}...")
-        session.commit()
-        print(f"✅ Loaded {created} gazetteer entries")
+        if args.index_only:
+            meta = build_gazetteer_index(session)
+            print(f"✅ Indexed {meta['entries']} gazetteer entries ({meta['keys']} keys)")
+            return 0
+        if not args.file:
+            parser.print_usage()
+            return 2
+        path = Path(args.file)
+        if not path.exists():
+            print(f"File not found: {path}")
+            return 2
+        result = load_gazetteer_file(
+            session,
+            path,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            rebuild_indexes=not args.keep_indexes,
+        )
+        print(
+            f"✅ Staged {result['staged']} rows ({result['read']} read in total): "
+            f"{result['inserted']} new, {result['updated']} updated in {result['seconds']}s"
+        )
+        print(f"✅ Indexed {result['index']['entries']} gazetteer entries ({result['index']['keys']} keys)")
         return 0
     finally:
         session.close()
@@ -95,5 +65,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
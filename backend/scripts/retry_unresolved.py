@@ -1,11 +1,19 @@
-import os
-import sys
+"""Run one unresolved-place retry pass by hand.
+
+The same pass runs on a schedule as the Celery beat task
+``retry_unresolved_task`` (see backend.services.unresolved_retry): due
+places in impact order, rate-aware batches, per-place backoff, fixes
+written to ``locations``.
+
+    python backend/scripts/retry_unresolved.py
+    python backend/scripts/retry_unresolved.py --max-places 200 --batch-size 20
+"""
+
+import argparse
 import json
 import logging
-from sqlalchemy.orm import sessionmaker
-from backend.db import get_engine
-from backend.models.location import Location
-from backend.services.geocode import Geocode
+import os
+import sys
 
 # ───────────────────────────────────────────────
 # Setup path + logging
@@ -13,86 +21,29 @@ from backend.services.geocode import Geocode
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 sys.path.append(PROJECT_ROOT)
 
-UNRESOLVED_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "unresolved_locations.json")
+from backend.services.unresolved_retry import run_unresolved_retry  # noqa: E402
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format="%(asctime)s | %(levelname)s | %(message)s",
     handlers=[logging.StreamHandler()]
 )
 log = logging.getLogger("retry_unresolved")
 
-# ───────────────────────────────────────────────
-# Load unresolved from JSON
-# ───────────────────────────────────────────────
-def load_unresolved_locations():
-    if not os.path.exists(UNRESOLVED_PATH):
-        log.error("❌ unresolved_locations.json not found.")
-        return []
-
-    with open(UNRESOLVED_PATH, "r") as f:
-        data = json.load(f)
-
-    log.info(f"📦 Loaded {len(data)} unresolved entries from JSON")
-    return data
 
-# ───────────────────────────────────────────────
-# Main Retry Script
-# ───────────────────────────────────────────────
 def main():
-    log.info("🚀 Starting unresolved location retry script")
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    unresolved = load_unresolved_locations()
-    if not unresolved:
-        log.warning("🟡 No unresolved entries found. Exiting early.")
-        return
-
-    geocoder = Geocode(api_key=os.getenv("GEOCODE_API_KEY"))
-    retried = 0
-    skipped = 0
-
-    for idx, entry in enumerate(unresolved, start=1):
-        raw = entry.get("raw_name") or entry.get("place")
-        if not raw:
-            log.warning(f"⚠️ Entry #{idx} missing 'raw_name'. Skipping: {entry}")
-            continue
-
-        log.info(f"\n🧩 ({idx}/{len(unresolved)}) Retrying: {raw}")
-        match = session.query(Location).filter_by(raw_name=raw).first()
-
-        if not match:
-            log.warning(f"🔍 No DB match found for raw_name='{raw}'")
-            skipped += 1
-            continue
-
-        log.debug(f"🔎 Existing DB location → ID: {match.id}, Lat: {match.latitude}, Lng: {match.longitude}, Status: {match.status}")
-
-        try:
-            result = geocoder.get_or_create_location(session, raw)
-        except Exception as e:
-            log.error(f"💥 Geocoder crashed for '{raw}': {e}")
-            skipped += 1
-            continue
-
-        if result and result.get("lat") is not None:
-            log.info(f"✅ Geocode success: {result['raw_name']} → ({result['lat']}, {result['lng']})")
-            match.latitude = result["lat"]
-            match.longitude = result["lng"]
-            match.status = result.get("status", "geocoded")
-            session.add(match)
-            retried += 1
-        else:
-            log.error(f"❌ Still unresolved: {raw}")
-            skipped += 1
+    parser = argparse.ArgumentParser(description="Retry due unresolved places once.")
+    parser.add_argument("--batch-size", type=int, help="Places per batch (default: rate-aware)")
+    parser.add_argument("--max-places", type=int, help="Stop after this many places")
+    parser.add_argument("--max-seconds", type=float, help="Start no batch after this long")
+    args = parser.parse_args()
+
+    log.info("🚀 Starting unresolved location retry pass")
+    metrics = run_unresolved_retry(
+        batch_size=args.batch_size, max_places=args.max_places, max_seconds=args.max_seconds
+    )
+    log.info("🏁 Finished: %s", json.dumps(metrics))
 
-    session.commit()
-    log.info("\n🏁 Finished retry process.")
-    log.info(f"🔄 Total retried + updated: {retried}")
-    log.info(f"⏭️  Skipped (missing or unresolved): {skipped}")
-    log.info(f"📊 Total attempted: {retried + skipped}")
 
 if __name__ == "__main__":
     main()
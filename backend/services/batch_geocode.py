@@ -0,0 +1,178 @@
+"""Bulk geocoding behind ``POST /api/geocode/batch``.
+
+A request carries up to ``GEOCODE_BATCH_MAX`` raw place strings, each with an
+optional year hint.  :func:`resolve_batch_local` normalises and dedupes them
+on ``(cache key, year)`` and answers everything the local tiers know in one
+pass: manual fixes, vague state/county centroids, historical names, the
+geocode caches and the gazetteer.  Places with a cached miss are reported as
+unresolved straight away.
+
+Only the remaining misses go to external providers, as the ``pending``
+items of a ``geocode_fanout`` :class:`Job` (see
+:mod:`backend.services.geocode_fanout`).  Its results are keyed by the
+``key`` that the synchronous response gave each pending place.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.services.geocode import Geocode, GeocodeError
+from backend.services.geocode_store import coerce_record
+from backend.services.location_processor import needs_geocoder, process_location
+from backend.services.unresolved_log import record_unresolved
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("batch_geocode")
+
+MAX_BATCH_PLACES: int = int(os.getenv("GEOCODE_BATCH_MAX", "10000"))
+
+
+class BatchRequestError(ValueError):
+    """The request body is not a usable list of places."""
+
+
+@dataclass
+class BatchResult:
+    """Outcome of the synchronous pass.
+
+    ``results`` holds one entry per input, in input order; ``pending`` the
+    distinct ``{"key", "place", "year"}`` places left for the background job.
+    """
+
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    pending: List[Dict[str, Any]] = field(default_factory=list)
+    unique: int = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        counts = {"total": len(self.results), "unique": self.unique, "pending": len(self.pending)}
+        for row in self.results:
+            if row["status"] != "pending":
+                bucket = "unresolved" if row["latitude"] is None else "resolved"
+                counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+
+def parse_batch_items(items: Any) -> List[Tuple[str, Optional[int]]]:
+    """``[(place, year)]`` from a list of strings or ``{"place", "year"}`` objects."""
+    if not isinstance(items, list):
+        raise BatchRequestError("places must be a list")
+    if len(items) > MAX_BATCH_PLACES:
+        raise BatchRequestError(f"at most {MAX_BATCH_PLACES} places per batch")
+    parsed: List[Tuple[str, Optional[int]]] = []
+    for i, item in enumerate(items):
+        year = None
+        if isinstance(item, dict):
+            place = item.get("place") or item.get("raw_name")
+            year = item.get("year", item.get("event_year"))
+        else:
+            place = item
+        if not isinstance(place, str):
+            raise BatchRequestError(f"places[{i}]: place must be a string")
+        if year is not None:
+            try:
+                year = int(year)
+            except (TypeError, ValueError):
+                raise BatchRequestError(f"places[{i}]: year must be an integer") from None
+        parsed.append((place, year))
+    return parsed
+
+
+def batch_key(place: str, year: Optional[int]) -> str:
+    """Dedupe key of a place: the geocode cache key plus the year hint."""
+    key = Geocode._normalize_key(place)
+    return key if year is None else f"{key}@{year}"
+
+
+def result_dict(out, *, place: str) -> Dict[str, Any]:
+    if out is None or isinstance(out, GeocodeError) or out.latitude is None or out.longitude is None:
+        return {
+            "normalized": getattr(out, "normalized_name", None) or None,
+            "latitude": None,
+            "longitude": None,
+            "confidence": 0.0,
+            "status": "unresolved",
+            "source": getattr(out, "source", None) or "geocoder",
+        }
+    return {
+        "normalized": out.normalized_name or place,
+        "latitude": out.latitude,
+        "longitude": out.longitude,
+        "confidence": float(out.confidence_score or 0.0),
+        "status": out.status,
+        "source": out.source,
+    }
+
+
+def _cached_miss(geocoder: Geocode, place: str) -> bool:
+    if not geocoder.cache_enabled:
+        return False
+    record = coerce_record(geocoder.cache.get(geocoder._normalize_key(place)))
+    return record is not None and record["latitude"] is None
+
+
+def resolve_batch_local(
+    session: Optional[Session],
+    items: List[Tuple[str, Optional[int]]],
+    *,
+    geocoder: Optional[Geocode] = None,
+    tree_id: Optional[str] = None,
+) -> BatchResult:
+    """Answer every place the local tiers can resolve; collect the rest as pending.
+
+    Parameters
+    ----------
+    session : Session | None
+        Used by the gazetteer tier (and its attempt log).
+    items : list of (place, year)
+        As returned by :func:`parse_batch_items`.
+    geocoder : Geocode, optional
+        Defaults to the shared ``location_processor.GEOCODER``.
+    tree_id : str, optional
+        Recorded with places that end up unresolved.
+    """
+    if geocoder is None:
+        from backend.services.location_processor import GEOCODER as geocoder
+    external = geocoder.external_plugin is not None and not geocoder.mock_mode
+
+    batch = BatchResult()
+    answers: Dict[str, Dict[str, Any]] = {}
+    for place, year in items:
+        raw = place.strip()
+        if not raw:
+            batch.results.append({"input": place, "key": None, **result_dict(None, place=place)})
+            continue
+        key = batch_key(raw, year)
+        if key not in answers:
+            answers[key] = _resolve_one(session, geocoder, raw, year, tree_id, external)
+            if answers[key]["status"] == "pending":
+                batch.pending.append({"key": key, "place": raw, "year": year})
+        batch.results.append({"input": place, "key": key, **answers[key]})
+    batch.unique = len(answers)
+    logger.info(
+        "📦 batch geocode: %d places, %d unique, %d pending",
+        len(items), batch.unique, len(batch.pending),
+    )
+    return batch
+
+
+def _resolve_one(session, geocoder: Geocode, raw: str, year, tree_id, external: bool) -> Dict[str, Any]:
+    if not needs_geocoder(raw):
+        # Empty, manual fix, vague centroid or historical name: no geocoder involved
+        out = process_location(raw, event_year=year, tree_id=tree_id, geocoder=geocoder)
+        return result_dict(out, place=raw)
+    out = geocoder.resolve_local(session, raw, event_year=year)
+    if out is not None:
+        return result_dict(out, place=raw)
+    if external and not _cached_miss(geocoder, raw):
+        return {
+            "normalized": None, "latitude": None, "longitude": None,
+            "confidence": 0.0, "status": "pending", "source": None,
+        }
+    record_unresolved(raw, "api_failed", tree_id)
+    return result_dict(None, place=raw)
@@ -0,0 +1,395 @@
+"""Set-based persistence for normalised GEDCOM data.
+
+:class:`BulkPersister` is the fast write path behind
+:py:meth:`GEDCOMParser.save_to_db`.  Instead of one ``SELECT``/``flush`` per
+person and per event it
+
+* preloads what already exists for the tree version in a handful of queries,
+* assigns primary keys client-side (``uuid4``) so no flush is needed to learn
+  an id,
+* and writes individuals, families, relationships, events and
+  ``event_participants`` as multi-row ``INSERT`` batches.
+
+Every stage is idempotent against rows that are already in the database, so a
+stage can safely be re-run on the same tree version.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.models import (
+    Event,
+    Family,
+    Individual,
+    Location,
+    TreeRelationship,
+    event_participants,
+)
+from backend.services.fuzzy_place_index import notify_locations
+from backend.services.gedcom_normalizer import parse_date_flexible, xref
+from backend.services.location_geometry import point_fields
+from backend.utils.helpers import split_full_name
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("bulk_persist")
+
+BULK_BATCH_SIZE: int = int(os.getenv("MAPEM_BULK_BATCH_SIZE", "5000"))
+
+# (event_type, date, location_id, participant ids)
+EventKey = Tuple[str, Any, Optional[UUID], frozenset]
+
+
+def _chunks(rows: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def upsert_locations(
+    session: Session,
+    resolved: Iterable[Any],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> Dict[str, UUID]:
+    """Insert missing :class:`Location` rows in batches; return ``normalized_name → id``.
+
+    ``resolved`` holds ``LocationOut``-like objects.  Rows that already exist
+    (or are inserted concurrently) keep their id; the first object seen for a
+    ``normalized_name`` wins.
+    """
+    by_name: Dict[str, Any] = {}
+    for out in resolved:
+        by_name.setdefault(out.normalized_name, out)
+    names = list(by_name)
+
+    ids: Dict[str, UUID] = {}
+    for batch in _chunks(names, batch_size):
+        ids.update(
+            session.execute(
+                select(Location.normalized_name, Location.id).where(Location.normalized_name.in_(batch))
+            ).all()
+        )
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "raw_name": out.raw_name,
+            "normalized_name": name,
+            "latitude": out.latitude,
+            "longitude": out.longitude,
+            "confidence_score": out.confidence_score,
+            "status": out.status,
+            "source": out.source,
+            **point_fields(out.latitude, out.longitude),
+        }
+        for name, out in by_name.items()
+        if name not in ids
+    ]
+    if rows:
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            module = postgresql if dialect == "postgresql" else sqlite
+            stmt = module.insert(Location).on_conflict_do_nothing(index_elements=["normalized_name"])
+        else:
+            stmt = insert(Location)
+        for batch in _chunks(rows, batch_size):
+            session.execute(stmt, list(batch))
+        # Re-read: a concurrent upload may have won the race for some names.
+        for batch in _chunks([r["normalized_name"] for r in rows], batch_size):
+            ids.update(
+                session.execute(
+                    select(Location.normalized_name, Location.id).where(Location.normalized_name.in_(batch))
+                ).all()
+            )
+        notify_locations(
+            session,
+            (
+                (r["id"], r["normalized_name"], r["latitude"], r["longitude"], r["confidence_score"])
+                for r in rows
+                if ids.get(r["normalized_name"]) == r["id"]
+            ),
+        )
+    logger.info("🗺️ Locations: %d distinct, %d inserted", len(names), len(rows))
+    return ids
+
+
+class BulkPersister:
+    """Write one parsed GEDCOM into one :class:`TreeVersion` with batched SQL.
+
+    Parameters
+    ----------
+    session : Session
+        Open database session (transaction handled by caller).
+    tree_version_id : UUID
+        Target :class:`TreeVersion`.
+    uploaded_tree_id : UUID | None
+        Owning :class:`UploadedTree`; relationships are keyed on it.
+    resolve_location : callable
+        ``resolve_location(evt) -> Location.id | None`` for a single event dict.
+    summary : dict
+        Summary dict shared with the caller; counters/warnings are appended.
+    batch_size : int
+        Rows per ``INSERT`` statement.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        tree_version_id: UUID,
+        uploaded_tree_id: Optional[UUID],
+        resolve_location: Callable[[Dict[str, Any]], Optional[UUID]],
+        summary: Dict[str, Any],
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> None:
+        self.session = session
+        self.tree_version_id = tree_version_id
+        self.uploaded_tree_id = uploaded_tree_id
+        self.resolve_location = resolve_location
+        self.summary = summary
+        self.batch_size = max(1, int(batch_size))
+
+        self.ged2db: Dict[str, UUID] = {}
+        self.fam2db: Dict[str, UUID] = {}
+        self._relationships: Set[Tuple[UUID, UUID, str]] = set()
+        self._event_keys: Set[EventKey] = set()
+        self._import_event_keys: Set[Tuple[Any, ...]] = set()
+        self._coords: Dict[UUID, Tuple[Optional[float], Optional[float]]] = {}
+        self._loaded = False
+
+    def bind(self, session: Session) -> "BulkPersister":
+        """Continue on another session, keeping preloaded state.
+
+        Used for chunked imports that commit between batches; everything
+        cached so far has been committed by the previous session.
+        """
+        self.session = session
+        return self
+
+    # ─── Preload ──────────────────────────────────────────────────
+    def load_existing(self) -> None:
+        """Read everything needed for dedupe in a fixed number of queries."""
+        if self._loaded:
+            return
+        s = self.session
+        tv = self.tree_version_id
+
+        self.ged2db = {
+            gid: pk
+            for gid, pk in s.execute(
+                select(Individual.gedcom_id, Individual.id).where(Individual.tree_id == tv)
+            )
+        }
+        self.fam2db = {
+            gid: pk
+            for gid, pk in s.execute(
+                select(Family.gedcom_id, Family.id).where(Family.tree_id == tv)
+            )
+            if gid
+        }
+        if self.uploaded_tree_id is not None:
+            self._relationships = {
+                (row.person_id, row.related_person_id, row.relationship_type)
+                for row in s.execute(
+                    select(
+                        TreeRelationship.person_id,
+                        TreeRelationship.related_person_id,
+                        TreeRelationship.relationship_type,
+                    ).where(TreeRelationship.tree_id == self.uploaded_tree_id)
+                )
+            }
+
+        participants: Dict[UUID, Set[UUID]] = {}
+        for event_id, individual_id in s.execute(
+            select(event_participants.c.event_id, event_participants.c.individual_id)
+            .join(Event.__table__, Event.__table__.c.id == event_participants.c.event_id)
+            .where(Event.__table__.c.tree_id == tv)
+        ):
+            participants.setdefault(event_id, set()).add(individual_id)
+        self._event_keys = {
+            (row.event_type, row.date, row.location_id, frozenset(participants.get(row.id, ())))
+            for row in s.execute(
+                select(Event.id, Event.event_type, Event.date, Event.location_id).where(Event.tree_id == tv)
+            )
+        }
+        self._loaded = True
+        logger.debug(
+            "📥 Preloaded version %s: %d individuals, %d families, %d events, %d relationships",
+            tv, len(self.ged2db), len(self.fam2db), len(self._event_keys), len(self._relationships),
+        )
+
+    # ─── Individuals ──────────────────────────────────────────────
+    def persist_individuals(self, individuals: Sequence[Dict[str, Any]]) -> None:
+        self.load_existing()
+        new_rows: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        for ind in individuals:
+            gedcom_id = ind.get("gedcom_id")
+            if not ind.get("name"):
+                warn = f"Missing name for {gedcom_id} — skipped"
+                logger.warning(warn)
+                self.summary["warnings"].append(warn)
+                continue
+            first_name, last_name = split_full_name(ind["name"])
+            values = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "occupation": ind.get("occupation") or None,
+                "content_hash": ind.get("content_hash"),
+            }
+            if (pk := self.ged2db.get(gedcom_id)) is not None:
+                updates.append({"id": pk, **values})
+                continue
+            pk = uuid.uuid4()
+            self.ged2db[gedcom_id] = pk
+            new_rows.append({"id": pk, "gedcom_id": gedcom_id, "tree_id": self.tree_version_id, **values})
+
+        self._insert(Individual, new_rows)
+        self._update(Individual, updates)
+        self.summary["people_count"] += len(new_rows)
+        logger.info("👥 Individuals: %d inserted, %d updated", len(new_rows), len(updates))
+
+    # ─── Families & relationships ─────────────────────────────────
+    def persist_families(self, families: Sequence[Dict[str, Any]]) -> None:
+        self.load_existing()
+        new_rows: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        relationships: List[Dict[str, Any]] = []
+        for fam in families:
+            fam_id = fam.get("gedcom_id")
+            h_id = self.ged2db.get(xref(fam.get("husband_id")))
+            w_id = self.ged2db.get(xref(fam.get("wife_id")))
+            values = {"husband_id": h_id, "wife_id": w_id, "content_hash": fam.get("content_hash")}
+            if fam_id and (pk := self.fam2db.get(fam_id)) is not None:
+                updates.append({"id": pk, **values})
+            else:
+                pk = uuid.uuid4()
+                if fam_id:
+                    self.fam2db[fam_id] = pk
+                new_rows.append({"id": pk, "gedcom_id": fam_id, "tree_id": self.tree_version_id, **values})
+            for child_ged in fam.get("children", []):
+                child_db_id = self.ged2db.get(xref(child_ged))
+                if not child_db_id:
+                    continue
+                for parent_id, rel_type in ((h_id, "father"), (w_id, "mother")):
+                    if not parent_id:
+                        continue
+                    key = (parent_id, child_db_id, rel_type)
+                    if key in self._relationships:
+                        continue
+                    self._relationships.add(key)
+                    relationships.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "tree_id": self.uploaded_tree_id,
+                            "person_id": parent_id,
+                            "related_person_id": child_db_id,
+                            "relationship_type": rel_type,
+                        }
+                    )
+
+        self._insert(Family, new_rows)
+        self._update(Family, updates)
+        self._insert(TreeRelationship, relationships)
+        logger.info(
+            "👪 Families: %d inserted, %d updated, %d relationships",
+            len(new_rows), len(updates), len(relationships),
+        )
+
+    # ─── Events ───────────────────────────────────────────────────
+    def persist_events(self, events: Sequence[Dict[str, Any]]) -> None:
+        self.load_existing()
+        prepared: List[Tuple[Dict[str, Any], Any, Optional[UUID]]] = []
+        for evt in events:
+            if not evt.get("event_type"):
+                warn = "⛔ Skipped event: Missing event_type"
+                self.summary["warnings"].append(warn)
+                logger.warning(warn)
+                continue
+            date_obj = None
+            if date_str := evt.get("date"):
+                date_obj = parse_date_flexible(date_str)
+                if not date_obj:
+                    warn = f"⛔ Skipped event: Bad date '{date_str}'"
+                    self.summary["warnings"].append(warn)
+                    logger.warning(warn)
+                    continue
+            prepared.append((evt, date_obj, self.resolve_location(evt)))
+
+        self._load_coords({loc_id for _, _, loc_id in prepared if loc_id})
+
+        # Dedupe against preloaded rows and against events inserted earlier in
+        # this import, like the ORM path: an event repeated inside one GEDCOM
+        # (same type, date, place, participants and GEDCOM individual) is
+        # written once.
+        event_rows: List[Dict[str, Any]] = []
+        participant_rows: List[Dict[str, Any]] = []
+        skipped = 0
+        for evt, date_obj, location_id in prepared:
+            participants = frozenset(
+                pk for pk in (self.ged2db.get(evt.get("individual_gedcom_id")),) if pk
+            )
+            key = (evt.get("event_type", "UNKNOWN"), date_obj, location_id, participants)
+            import_key = (*key, evt.get("individual_gedcom_id"))
+            if key in self._event_keys or import_key in self._import_event_keys:
+                skipped += 1
+                continue
+            self._import_event_keys.add(import_key)
+
+            event_id = uuid.uuid4()
+            geom = None
+            lat, lng = self._coords.get(location_id, (None, None)) if location_id else (None, None)
+            if lat is not None and lng is not None:
+                try:
+                    geom = from_shape(Point(lng, lat), srid=4326)
+                except Exception:
+                    geom = None
+            event_rows.append(
+                {
+                    "id": event_id,
+                    "tree_id": self.tree_version_id,
+                    "event_type": evt.get("event_type", "UNKNOWN"),
+                    "date": date_obj,
+                    "date_precision": evt.get("date_precision"),
+                    "notes": evt.get("notes"),
+                    "source_tag": evt.get("source_tag"),
+                    "category": evt.get("category", "unspecified"),
+                    "location_id": location_id,
+                    "geom": geom,
+                }
+            )
+            participant_rows.extend({"event_id": event_id, "individual_id": pk} for pk in participants)
+
+        self._insert(Event, event_rows)
+        if participant_rows:
+            for batch in _chunks(participant_rows, self.batch_size):
+                self.session.execute(insert(event_participants), list(batch))
+        self.summary["event_count"] += len(event_rows)
+        if skipped:
+            logger.info("↩️ %d duplicate events ignored", skipped)
+        logger.info("📅 Events: %d inserted, %d participant links", len(event_rows), len(participant_rows))
+
+    # ─── Internals ────────────────────────────────────────────────
+    def _load_coords(self, location_ids: Set[UUID]) -> None:
+        missing = [pk for pk in location_ids if pk not in self._coords]
+        for batch in _chunks(missing, self.batch_size):
+            for pk, lat, lng in self.session.execute(
+                select(Location.id, Location.latitude, Location.longitude).where(Location.id.in_(batch))
+            ):
+                self._coords[pk] = (lat, lng)
+
+    def _insert(self, model, rows: List[Dict[str, Any]]) -> None:
+        for batch in _chunks(rows, self.batch_size):
+            self.session.execute(insert(model), list(batch))
+
+    def _update(self, model, rows: List[Dict[str, Any]]) -> None:
+        for batch in _chunks(rows, self.batch_size):
+            self.session.execute(update(model), list(batch))
@@ -0,0 +1,271 @@
+"""Chunked, resumable uploads for large GEDCOM files.
+
+The single-request upload in :mod:`backend.routes.upload` spools the whole
+file through werkzeug and is capped at ``UPLOAD_MAX_FILE_SIZE_MB``.  This
+module backs the ``/api/upload/chunked`` endpoints instead:
+
+* ``create`` opens an upload session (a ``.part`` file plus a JSON manifest
+  under ``MAPEM_CHUNKED_UPLOAD_DIR``),
+* ``append`` streams one chunk from the request body straight to disk at an
+  explicit byte offset, so a client on a flaky link asks :func:`status` for
+  the offset and re-sends only what is missing,
+* ``complete`` checks the size and the ``0 TRLR`` trailer and returns the
+  finished file with its SHA-256 digest (the parse-cache key).
+
+The ``.part`` file size is the source of truth for the offset.  The
+``0 HEAD`` signature is checked on the first chunk and the trailer on the
+last bytes, so the file is never read back in full to validate it.  The
+digest is computed incrementally while chunks arrive; if chunks of one upload
+land on different worker processes, :func:`complete` falls back to hashing
+the finished file once.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import IO, Any, Dict, Optional, Tuple
+
+from backend.services.parse_cache import file_digest
+from backend.services.upload_service import ALLOWED_EXTENSIONS
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("chunked_upload")
+
+CHUNKED_UPLOAD_DIR = Path(os.getenv("MAPEM_CHUNKED_UPLOAD_DIR", "/tmp/mapem_uploads"))
+CHUNKED_MAX_FILE_SIZE_MB: int = int(os.getenv("CHUNKED_UPLOAD_MAX_FILE_SIZE_MB", "2048"))
+CHUNK_MAX_MB: int = int(os.getenv("CHUNKED_UPLOAD_CHUNK_MAX_MB", "16"))
+CHUNK_SIZE_HINT: int = 8 << 20
+UPLOAD_TTL_HOURS: int = int(os.getenv("CHUNKED_UPLOAD_TTL_HOURS", "24"))
+
+_COPY_BUFFER = 1 << 20
+_SIGNATURE_WINDOW = 1024
+_BOM = b"\xef\xbb\xbf"
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# upload_id → (bytes hashed so far, running SHA-256); per process.
+_hashers: Dict[str, Tuple[int, Any]] = {}
+_hashers_lock = threading.Lock()
+
+
+class ChunkedUploadError(ValueError):
+    """Client-side problem with a chunked upload; ``status`` is the HTTP code."""
+
+    def __init__(self, message: str, status: int = 400, offset: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class ChunkedUploadStore:
+    """Upload sessions on local disk.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Directory for ``<id>.part``/``<id>.json`` pairs; defaults to
+        ``MAPEM_CHUNKED_UPLOAD_DIR``.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root if root is not None else CHUNKED_UPLOAD_DIR)
+
+    # ─── Paths & manifest ─────────────────────────────────────────
+    def _paths(self, upload_id: str) -> Tuple[Path, Path]:
+        if not _UPLOAD_ID.match(upload_id or ""):
+            raise ChunkedUploadError("Unknown upload id", status=404)
+        return self.root / f"{upload_id}.part", self.root / f"{upload_id}.json"
+
+    def _manifest(self, upload_id: str) -> Dict[str, Any]:
+        part, meta = self._paths(upload_id)
+        try:
+            manifest = json.loads(meta.read_text())
+        except FileNotFoundError:
+            raise ChunkedUploadError("Unknown upload id", status=404) from None
+        manifest["offset"] = part.stat().st_size if part.exists() else 0
+        return manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        _, meta = self._paths(manifest["upload_id"])
+        tmp = meta.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({k: v for k, v in manifest.items() if k != "offset"}))
+        os.replace(tmp, meta)
+
+    # ─── Public API ───────────────────────────────────────────────
+    def create(self, filename: str, total_size: int, **meta: Any) -> Dict[str, Any]:
+        """Open a session for ``filename`` of ``total_size`` bytes; ``meta`` is kept verbatim."""
+        ext = Path(filename or "").suffix.lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            allowed = ", ".join(sorted(ALLOWED_EXTENSIONS))
+            raise ChunkedUploadError(f"Invalid extension: {ext or '(none)'}. Allowed types: {allowed}")
+        if total_size <= 0:
+            raise ChunkedUploadError("total_size must be a positive byte count")
+        if total_size > CHUNKED_MAX_FILE_SIZE_MB << 20:
+            raise ChunkedUploadError(
+                f"File is {total_size / (1 << 20):.1f} MB — maximum allowed is {CHUNKED_MAX_FILE_SIZE_MB} MB.",
+                status=413,
+            )
+        self.purge_stale()
+        self.root.mkdir(parents=True, exist_ok=True)
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        manifest = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "suffix": ext,
+            "total_size": int(total_size),
+            "created_at": now,
+            "updated_at": now,
+            **meta,
+        }
+        self._paths(upload_id)[0].touch()
+        self._write_manifest(manifest)
+        with _hashers_lock:
+            _hashers[upload_id] = (0, hashlib.sha256())
+        logger.info("🆕 Chunked upload %s: %s (%d bytes)", upload_id, filename, total_size)
+        return {**manifest, "offset": 0}
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        return self._manifest(upload_id)
+
+    def append(
+        self,
+        upload_id: str,
+        offset: int,
+        stream: IO[bytes],
+        length: Optional[int] = None,
+        chunk_sha256: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Write one chunk read from ``stream`` at ``offset``; return the updated session.
+
+        ``offset`` must equal the bytes already stored (409 otherwise, with the
+        current offset so the client can resume).  A chunk that fails its
+        ``chunk_sha256`` or the ``0 HEAD`` check is rolled back.
+        """
+        manifest = self._manifest(upload_id)
+        if length is not None and length > CHUNK_MAX_MB << 20:
+            raise ChunkedUploadError(f"Chunk larger than {CHUNK_MAX_MB} MB", status=413)
+        part, _ = self._paths(upload_id)
+        total = manifest["total_size"]
+
+        with open(part, "r+b") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)  # one writer per session across processes
+            try:
+                current = fh.seek(0, os.SEEK_END)
+                if offset != current:
+                    raise ChunkedUploadError(
+                        f"Offset {offset} does not match stored bytes {current}", status=409, offset=current
+                    )
+                with _hashers_lock:
+                    hashed, running = _hashers.get(upload_id, (-1, None))
+                whole = running.copy() if running is not None and hashed == offset else None
+                chunk_hash = hashlib.sha256()
+                head = b""
+                written = 0
+                while True:
+                    block = stream.read(_COPY_BUFFER)
+                    if not block:
+                        break
+                    written += len(block)
+                    if offset + written > total or written > CHUNK_MAX_MB << 20:
+                        self._rollback(fh, offset)
+                        raise ChunkedUploadError("Chunk exceeds declared size", status=413, offset=offset)
+                    if offset == 0 and len(head) < _SIGNATURE_WINDOW:
+                        head += block[:_SIGNATURE_WINDOW - len(head)]
+                    chunk_hash.update(block)
+                    if whole is not None:
+                        whole.update(block)
+                    fh.write(block)
+                if chunk_sha256 and chunk_hash.hexdigest() != chunk_sha256.lower():
+                    self._rollback(fh, offset)
+                    raise ChunkedUploadError("Chunk checksum mismatch", offset=offset)
+                if offset == 0 and written and b"0 HEAD" not in head.removeprefix(_BOM):
+                    self._rollback(fh, offset)
+                    raise ChunkedUploadError("GEDCOM signature not found (missing 0 HEAD).", offset=offset)
+                fh.flush()
+                os.fsync(fh.fileno())
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+        with _hashers_lock:
+            if whole is not None:
+                _hashers[upload_id] = (offset + written, whole)
+            else:
+                _hashers.pop(upload_id, None)  # gap in this process; rehash on complete
+        manifest["updated_at"] = time.time()
+        self._write_manifest(manifest)
+        manifest["offset"] = offset + written
+        logger.debug("📦 %s: +%d bytes → %d/%d", upload_id, written, offset + written, total)
+        return manifest
+
+    def complete(self, upload_id: str) -> Tuple[str, str, Dict[str, Any]]:
+        """Finish the upload; return ``(path, sha256, manifest)`` and close the session."""
+        manifest = self._manifest(upload_id)
+        part, meta = self._paths(upload_id)
+        if manifest["offset"] != manifest["total_size"]:
+            raise ChunkedUploadError(
+                f"Upload incomplete: {manifest['offset']}/{manifest['total_size']} bytes",
+                status=409,
+                offset=manifest["offset"],
+            )
+        with open(part, "rb") as fh:
+            fh.seek(max(0, manifest["total_size"] - _SIGNATURE_WINDOW))
+            if b"0 TRLR" not in fh.read():
+                raise ChunkedUploadError("GEDCOM signature not found (missing 0 TRLR).")
+
+        with _hashers_lock:
+            hashed, running = _hashers.pop(upload_id, (-1, None))
+        if running is not None and hashed == manifest["total_size"]:
+            digest = running.hexdigest()
+        else:
+            logger.info("🔁 %s: chunks arrived on several workers; hashing file", upload_id)
+            digest = file_digest(str(part))
+
+        final = part.with_suffix(manifest["suffix"])
+        os.replace(part, final)
+        meta.unlink(missing_ok=True)
+        logger.info("✅ Chunked upload %s complete → %s (sha256=%s)", upload_id, final, digest[:12])
+        return str(final), digest, manifest
+
+    def abort(self, upload_id: str) -> None:
+        part, meta = self._paths(upload_id)
+        if not meta.exists():
+            raise ChunkedUploadError("Unknown upload id", status=404)
+        part.unlink(missing_ok=True)
+        meta.unlink(missing_ok=True)
+        with _hashers_lock:
+            _hashers.pop(upload_id, None)
+        logger.info("🗑️ Chunked upload %s aborted", upload_id)
+
+    def purge_stale(self, max_age_hours: int = UPLOAD_TTL_HOURS) -> int:
+        """Delete sessions untouched for ``max_age_hours``; return how many."""
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - max_age_hours * 3600
+        removed = 0
+        for meta in self.root.glob("*.json"):
+            try:
+                if meta.stat().st_mtime >= cutoff:
+                    continue
+                meta.with_suffix(".part").unlink(missing_ok=True)
+                meta.unlink(missing_ok=True)
+                with _hashers_lock:
+                    _hashers.pop(meta.stem, None)
+                removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info("🧹 Purged %d stale chunked uploads", removed)
+        return removed
+
+    @staticmethod
+    def _rollback(fh, offset: int) -> None:
+        fh.truncate(offset)
+        fh.seek(offset)
@@ -0,0 +1,347 @@
+"""In-memory fuzzy index over known place names.
+
+:class:`FuzzyAliasGeocoder` used to load every :class:`Location` and score
+each one with ``calculate_name_similarity`` on every miss.  That is
+O(locations) per lookup and quadratic over an upload.  :class:`FuzzyPlaceIndex`
+keeps trigram postings instead:
+
+* every name (``Location.normalized_name`` or ``raw_name``, plus each
+  :class:`AlternateName`) is an *entry*, padded and split into trigrams;
+* a query keeps only the entries sharing enough trigrams with it, using the
+  edit-distance bound implied by ``min_score``, and a length filter;
+* the best ``max_candidates`` of those are scored in one batch with
+  RapidFuzz's ``fuzz.ratio``, the same 0–100 scale fuzzywuzzy used.
+
+Posting lists are append-only ``array('i')`` buffers viewed as NumPy arrays
+at query time, so adding a location is O(name length).  :func:`get_fuzzy_index`
+builds one index per process on first use and keeps it current with
+
+* rows committed by this process: ORM inserts through mapper events, and
+  Core writes (``upsert_locations``, ``apply_location_fix``) through
+  :func:`notify_locations`; both are applied once the transaction commits;
+* every ``FUZZY_INDEX_REFRESH_SECONDS``, rows other processes inserted or
+  updated.  The refresh reads by ``updated_at`` from the newest value seen,
+  minus ``FUZZY_INDEX_REFRESH_OVERLAP`` seconds: timestamps are taken when a
+  statement runs, not when its transaction commits, so a row from a long
+  import can commit with an ``updated_at`` older than the watermark.  Rows
+  read twice are recognised and cost nothing.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from backend.models import AlternateName, Location
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("fuzzy_place_index")
+
+FUZZY_INDEX_REFRESH_SECONDS: float = float(os.getenv("FUZZY_INDEX_REFRESH_SECONDS", "60"))
+FUZZY_INDEX_REFRESH_OVERLAP: float = float(os.getenv("FUZZY_INDEX_REFRESH_OVERLAP", "3600"))
+MAX_CANDIDATES = 256
+# Candidate generation reads the rarest trigram lists first and stops after
+# POSTING_BUDGET ids (but never before MIN_LISTS lists): common trigrams such as
+# state names say little about a match and dominate the cost.
+POSTING_BUDGET = 6000
+MIN_LISTS = 6
+
+
+class PlaceMatch(NamedTuple):
+    location_id: object
+    name: str
+    normalized_name: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    confidence_score: float
+    score: float
+
+
+def _key(name: str) -> str:
+    # Same comparison form calculate_name_similarity used (normalize_name)
+    return (name or "").strip().lower()
+
+
+def _trigrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class FuzzyPlaceIndex:
+    """Trigram postings plus batched RapidFuzz scoring.
+
+    Entries are appended with :meth:`add`; :meth:`search` returns the top
+    ``k`` entries scoring at least ``min_score`` (0–100) against a query.
+    """
+
+    def __init__(self) -> None:
+        self._keys: List[str] = []
+        self._lengths = array("i")
+        self._payload: List[Tuple[object, str, Optional[float], Optional[float], float]] = []
+        self._postings: Dict[str, array] = defaultdict(lambda: array("i"))
+        self._seen: set = set()  # (location_id, key), so refreshes do not duplicate entries
+        self._by_location: Dict[object, List[int]] = {}  # location_id → its entries
+        self._lock = threading.RLock()
+        self.watermark: Optional[datetime] = None  # newest updated_at loaded from the DB
+        self.refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(
+        self,
+        location_id,
+        name: str,
+        *,
+        normalized_name: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        confidence_score: Optional[float] = None,
+    ) -> bool:
+        """Index ``name`` for ``location_id``; return False if it was already there."""
+        key = _key(name)
+        if not key:
+            return False
+        with self._lock:
+            if (location_id, key) in self._seen:
+                return False
+            entry = len(self._keys)
+            self._seen.add((location_id, key))
+            self._keys.append(key)
+            self._lengths.append(len(key))
+            self._payload.append(
+                (location_id, normalized_name or name, latitude, longitude, float(confidence_score or 0.0))
+            )
+            self._by_location.setdefault(location_id, []).append(entry)
+            for gram in _trigrams(key):
+                self._postings[gram].append(entry)
+        return True
+
+    def set_location(
+        self,
+        location_id,
+        name: str,
+        *,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        confidence_score: Optional[float] = None,
+    ) -> bool:
+        """Index a location's name, or update the coordinates of all its entries.
+
+        Returns True if anything was added or changed.
+        """
+        payload = (location_id, name, latitude, longitude, float(confidence_score or 0.0))
+        with self._lock:
+            changed = False
+            for entry in self._by_location.get(location_id, ()):
+                if self._payload[entry] != payload:
+                    self._payload[entry] = payload
+                    changed = True
+            added = self.add(
+                location_id, name, normalized_name=name, latitude=latitude,
+                longitude=longitude, confidence_score=confidence_score,
+            )
+        return added or changed
+
+    def payload_for(self, location_id) -> Optional[Tuple[str, Optional[float], Optional[float], float]]:
+        """``(normalized_name, lat, lng, confidence)`` of an indexed location."""
+        entries = self._by_location.get(location_id)
+        return self._payload[entries[0]][1:] if entries else None
+
+    # ─── Query ────────────────────────────────────────────────────
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        min_score: float = 0.0,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> List[PlaceMatch]:
+        key = _key(query)
+        if not key or not self._keys:
+            return []
+        with self._lock:
+            grams = _trigrams(key)
+            lists = sorted((p for p in (self._postings.get(g) for g in grams) if p), key=len)
+            if not lists:
+                return []
+            # Required overlap: an indel costs the query at most 3 trigrams, and
+            # ratio >= r allows at most (1 - r) * (len_q + len_c) indels.
+            r = min(max(min_score, 0.0), 100.0) / 100.0
+            if r > 0:
+                max_len = len(key) * (2 - r) / r
+                max_indels = int((1 - r) * (len(key) + max_len))
+                need = max(1, len(grams) - 3 * max_indels)
+            else:
+                max_len, need = float("inf"), 1
+            # Count over the rarest lists only, up to a posting budget; every list
+            # left out lowers the overlap a candidate can be required to have.
+            kept, budget = [], 0
+            for p in lists:
+                if kept and budget + len(p) > POSTING_BUDGET and len(kept) >= MIN_LISTS:
+                    break
+                kept.append(np.frombuffer(p, dtype=np.int32))
+                budget += len(p)
+            need = max(1, need - (len(grams) - len(kept)))
+
+            ids, counts = np.unique(np.concatenate(kept), return_counts=True)
+            mask = counts >= need
+            ids, counts = ids[mask], counts[mask]
+            if len(ids) > max_candidates:
+                ids = ids[np.argpartition(-counts, max_candidates)[:max_candidates]]
+            if r > 0:
+                lengths = np.frombuffer(self._lengths, dtype=np.int32)[ids]
+                ids = ids[(lengths >= len(key) * r / (2 - r)) & (lengths <= max_len)]
+            ids = ids.tolist()
+            keys = self._keys
+            scored = process.extract(
+                key, [keys[i] for i in ids], scorer=fuzz.ratio, score_cutoff=min_score or None, limit=None
+            )
+
+            matches: List[PlaceMatch] = []
+            seen_locations = set()
+            for name, score, pos in sorted(scored, key=lambda m: -m[1]):
+                loc_id, normalized, lat, lng, conf = self._payload[ids[pos]]
+                if loc_id in seen_locations:
+                    continue
+                seen_locations.add(loc_id)
+                matches.append(PlaceMatch(loc_id, name, normalized, lat, lng, conf, float(score)))
+                if len(matches) >= k:
+                    break
+            return matches
+
+    # ─── Loading from the DB ──────────────────────────────────────
+    def load(self, session: Session, since: Optional[datetime] = None) -> int:
+        """Index locations (and their alternate names) inserted or updated since ``since``.
+
+        Returns the number of names added or locations changed.
+        """
+        q = session.query(
+            Location.id,
+            Location.normalized_name,
+            Location.raw_name,
+            Location.latitude,
+            Location.longitude,
+            Location.confidence_score,
+            Location.updated_at,
+        )
+        if since is not None:
+            q = q.filter(Location.updated_at >= since)
+        added = 0
+        for loc_id, norm, raw, lat, lng, conf, updated in q.yield_per(10_000):
+            added += self.set_location(loc_id, norm or raw, latitude=lat, longitude=lng, confidence_score=conf)
+            self._advance(updated)
+
+        aq = session.query(AlternateName.location_id, AlternateName.alternate_name, AlternateName.updated_at)
+        if since is not None:
+            aq = aq.filter(AlternateName.updated_at >= since)
+        for loc_id, alt, updated in aq.yield_per(10_000):
+            name, lat, lng, conf = self.payload_for(loc_id) or self._location_payload(session, loc_id)
+            added += self.add(loc_id, alt, normalized_name=name, latitude=lat, longitude=lng, confidence_score=conf)
+            self._advance(updated)
+        self.refreshed_at = time.monotonic()
+        return added
+
+    def refresh_cursor(self) -> Optional[datetime]:
+        """Where the next refresh starts: the watermark minus the late-commit overlap."""
+        if self.watermark is None:
+            return None
+        return self.watermark - timedelta(seconds=FUZZY_INDEX_REFRESH_OVERLAP)
+
+    def _advance(self, stamp: Optional[datetime]) -> None:
+        if stamp is not None and (self.watermark is None or stamp > self.watermark):
+            self.watermark = stamp
+
+    @staticmethod
+    def _location_payload(session: Session, loc_id) -> Tuple:
+        loc = session.get(Location, loc_id)
+        if loc is None:
+            return None, None, None, 0.0
+        return loc.normalized_name or loc.raw_name, loc.latitude, loc.longitude, loc.confidence_score
+
+
+# ─── Process-wide index ───────────────────────────────────────────
+_index: Optional[FuzzyPlaceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_fuzzy_index(session: Session) -> FuzzyPlaceIndex:
+    """The process index, built from ``session`` on first use and refreshed periodically."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            index = FuzzyPlaceIndex()
+            index.load(session)
+            _index = index
+            logger.info("🔎 Fuzzy place index built: %d names in %.2fs", len(index), time.perf_counter() - started)
+        elif time.monotonic() - _index.refreshed_at > FUZZY_INDEX_REFRESH_SECONDS:
+            added = _index.load(session, since=_index.refresh_cursor())
+            if added:
+                logger.info("🔎 Fuzzy place index refreshed: +%d names", added)
+        return _index
+
+
+def reset_fuzzy_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
+
+
+# Locations written by this process are indexed once their transaction commits.
+# Values are captured at write time: attributes are expired after the commit.
+_PENDING_KEY = "fuzzy_index_pending"
+
+
+def _queue(session: Optional[Session], item: Tuple) -> None:
+    if session is not None and _index is not None:
+        session.info.setdefault(_PENDING_KEY, []).append(item)
+
+
+def notify_locations(session: Session, rows) -> None:
+    """Index ``(id, name, lat, lng, confidence)`` rows written with Core statements on commit.
+
+    Mapper events only see ORM inserts; bulk inserts and ``UPDATE``s of
+    coordinates report here instead.
+    """
+    for loc_id, name, lat, lng, conf in rows:
+        _queue(session, (loc_id, name, name, lat, lng, conf))
+
+
+@event.listens_for(Location, "after_insert")
+def _location_inserted(mapper, connection, target) -> None:
+    name = target.normalized_name or target.raw_name
+    _queue(object_session(target), (target.id, name, name, target.latitude, target.longitude, target.confidence_score))
+
+
+@event.listens_for(AlternateName, "after_insert")
+def _alternate_name_inserted(mapper, connection, target) -> None:
+    _queue(object_session(target), (target.location_id, target.alternate_name, None, None, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _index_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or _index is None:
+        return
+    for loc_id, name, normalized, lat, lng, conf in pending:
+        if normalized is None:
+            # Alternate name: reuse the payload of its (already indexed) location
+            normalized, lat, lng, conf = _index.payload_for(loc_id) or (name, None, None, 0.0)
+            _index.add(loc_id, name, normalized_name=normalized, latitude=lat, longitude=lng, confidence_score=conf)
+        else:
+            _index.set_location(loc_id, normalized, latitude=lat, longitude=lng, confidence_score=conf)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,325 @@
+"""Read-only, memory-mapped snapshot of ``gazetteer_entries``.
+
+:class:`GazetteerDBGeocoder` used to query ``gazetteer_entries`` for every
+place and materialise up to 50 ORM rows.  With a full GeoNames dump loaded
+(tens of millions of rows) that round trip dominates ingest.
+:func:`build_gazetteer_index` writes the table once into a directory of
+``.npy`` arrays:
+
+* **keys** – every ``name_norm`` plus each folded-in ``alt_names`` entry,
+  stored as a blob and sorted by a 64-bit hash.  A lookup is one
+  ``np.searchsorted`` plus a byte comparison that guards against hash
+  collisions;
+* **entries** – parallel arrays of coordinates, era code, source code, id,
+  ``name_norm`` and ``admin_norm`` (offsets into string blobs).
+
+:class:`GazetteerIndex` opens the arrays with ``mmap_mode="r"``, so every
+Flask and Celery worker on a host shares the same page-cache pages and
+opening costs nothing.  :func:`get_gazetteer_index` returns the process
+index (or ``None`` when no index was built) and reopens it when a rebuild
+replaces the directory.
+
+The index is a snapshot: rebuild it after loading the gazetteer
+(``backend.scripts.load_gazetteer`` does so).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from backend.config import DATA_DIR
+from backend.models.gazetteer_entry import GazetteerEntry
+from backend.utils.logger import get_file_logger
+from backend.utils.place_parser import slug_parts
+
+logger = get_file_logger("gazetteer_index")
+
+GAZETTEER_INDEX_VERSION = 1
+GAZETTEER_INDEX_PATH = Path(os.getenv("GAZETTEER_INDEX_PATH", str(DATA_DIR / "gazetteer_index")))
+RECHECK_SECONDS = 30.0
+
+_ARRAYS = (
+    "key_hash", "key_entry", "key_start", "key_len", "key_blob",
+    "latitude", "longitude", "era", "source", "ids",
+    "name_offsets", "name_blob", "admin_offsets", "admin_blob",
+)
+
+
+class GazetteerHit(NamedTuple):
+    """One index entry, attribute-compatible with :class:`GazetteerEntry` for scoring."""
+
+    id: uuid.UUID
+    name_norm: str
+    admin_norm: Optional[str]
+    era_bucket: str
+    latitude: float
+    longitude: float
+    source: str
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def place_slug(value: str) -> str:
+    # The place parser's slug parts, without the two-part minimum.  Not
+    # interned: bulk loads would flush the place_parser table.
+    return "_".join(slug_parts(value))
+
+
+def place_key(name: str, admin_norm: Optional[str] = None) -> Optional[str]:
+    """Lookup key for a gazetteer name, in the form queries normalise to.
+
+    Multi-part names (``"Ruleville, Sunflower, MS"``) are normalised like
+    queries; a bare name is qualified with ``admin_norm``.  A bare name
+    without an admin part cannot match a query and gives ``None``.
+    """
+    if not name or not isinstance(name, str):
+        return None
+    slug = place_slug(name)
+    if not slug:
+        return None
+    if "," in name:
+        return slug
+    return f"{slug}_{admin_norm}" if admin_norm else None
+
+
+def alt_keys(entry_name: str, admin_norm: Optional[str], alt_names) -> List[str]:
+    """Lookup keys for ``alt_names`` (a list, or a GeoNames comma-separated string).
+
+    Keys are built with :func:`place_key`, the way the entry's own
+    ``name_norm`` is.
+    """
+    if not alt_names:
+        return []
+    names = alt_names.split(",") if isinstance(alt_names, str) else alt_names
+    keys = [place_key(alt, admin_norm) for alt in names if isinstance(alt, str)]
+    return list(dict.fromkeys(k for k in keys if k and k != entry_name))
+
+
+class _Strings:
+    """Append-only UTF-8 blob with offsets; ``None`` is stored as empty."""
+
+    def __init__(self) -> None:
+        self.blob = bytearray()
+        self.offsets = array("q", [0])
+
+    def append(self, value: Optional[str]) -> None:
+        self.blob += (value or "").encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+
+# ─── Build ────────────────────────────────────────────────────────
+def build_gazetteer_index(session: Session, path: Optional[Path] = None, *, batch_size: int = 50_000) -> Dict:
+    """Write the index for the current ``gazetteer_entries`` table to ``path``.
+
+    The new directory is written beside the old one and swapped in, so
+    readers never see a half-written index.  Returns the metadata written.
+
+    Parameters
+    ----------
+    session : Session
+        Session used to stream the table.
+    path : Path, optional
+        Index directory; defaults to ``GAZETTEER_INDEX_PATH``.
+    batch_size : int
+        Rows fetched per round trip.
+    """
+    path = Path(path or GAZETTEER_INDEX_PATH)
+    started = time.perf_counter()
+
+    hashes, key_entry, key_start, key_len = array("Q"), array("q"), array("q"), array("i")
+    key_blob = bytearray()
+    lat, lng, era, source = array("d"), array("d"), array("B"), array("H")
+    ids = bytearray()
+    names, admins = _Strings(), _Strings()
+    eras: Dict[str, int] = {}
+    sources: Dict[str, int] = {}
+
+    def add_key(key: str, entry: int) -> None:
+        raw = key.encode("utf-8")
+        hashes.append(key_hash(key))
+        key_entry.append(entry)
+        key_start.append(len(key_blob))
+        key_len.append(len(raw))
+        key_blob.extend(raw)
+
+    q = session.query(
+        GazetteerEntry.id,
+        GazetteerEntry.name_norm,
+        GazetteerEntry.admin_norm,
+        GazetteerEntry.era_bucket,
+        GazetteerEntry.latitude,
+        GazetteerEntry.longitude,
+        GazetteerEntry.source,
+        GazetteerEntry.alt_names,
+    ).order_by(GazetteerEntry.id)
+    for entry, (gid, name, admin, bucket, la, lo, src, alts) in enumerate(q.yield_per(batch_size)):
+        ids.extend(gid.bytes if isinstance(gid, uuid.UUID) else uuid.UUID(str(gid)).bytes)
+        names.append(name)
+        admins.append(admin)
+        lat.append(la)
+        lng.append(lo)
+        era.append(eras.setdefault(bucket or "unknown", len(eras)))
+        source.append(sources.setdefault(src or "unknown", len(sources)))
+        add_key(name, entry)
+        for alt in alt_keys(name, admin, alts):
+            add_key(alt, entry)
+
+    order = np.argsort(np.frombuffer(hashes, dtype=np.uint64), kind="stable")
+    arrays = {
+        "key_hash": np.frombuffer(hashes, dtype=np.uint64)[order],
+        "key_entry": np.frombuffer(key_entry, dtype=np.int64)[order],
+        "key_start": np.frombuffer(key_start, dtype=np.int64)[order],
+        "key_len": np.frombuffer(key_len, dtype=np.int32)[order],
+        "key_blob": np.frombuffer(bytes(key_blob), dtype=np.uint8),
+        "latitude": np.frombuffer(lat, dtype=np.float64),
+        "longitude": np.frombuffer(lng, dtype=np.float64),
+        "era": np.frombuffer(era, dtype=np.uint8),
+        "source": np.frombuffer(source, dtype=np.uint16),
+        "ids": np.frombuffer(bytes(ids), dtype=np.uint8).reshape(-1, 16),
+        "name_offsets": np.frombuffer(names.offsets, dtype=np.int64),
+        "name_blob": np.frombuffer(bytes(names.blob), dtype=np.uint8),
+        "admin_offsets": np.frombuffer(admins.offsets, dtype=np.int64),
+        "admin_blob": np.frombuffer(bytes(admins.blob), dtype=np.uint8),
+    }
+    meta = {
+        "version": GAZETTEER_INDEX_VERSION,
+        "built_at": datetime.utcnow().isoformat(),
+        "entries": len(lat),
+        "keys": len(hashes),
+        "eras": sorted(eras, key=eras.get),
+        "sources": sorted(sources, key=sources.get),
+    }
+
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, values in arrays.items():
+        np.save(tmp / f"{name}.npy", values)
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    old = path.with_name(f"{path.name}.old-{os.getpid()}")
+    if path.exists():
+        path.rename(old)  # open mmaps keep the old files alive until readers reopen
+    tmp.rename(path)
+    shutil.rmtree(old, ignore_errors=True)
+    logger.info(
+        "🗺️ Gazetteer index built: %d entries, %d keys in %.1fs → %s",
+        meta["entries"], meta["keys"], time.perf_counter() - started, path,
+    )
+    return meta
+
+
+# ─── Read ─────────────────────────────────────────────────────────
+class GazetteerIndex:
+    """Memory-mapped view of an index directory written by :func:`build_gazetteer_index`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        if self.meta.get("version") != GAZETTEER_INDEX_VERSION:
+            raise ValueError(f"Gazetteer index version {self.meta.get('version')} != {GAZETTEER_INDEX_VERSION}")
+        for name in _ARRAYS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+        self.eras: List[str] = self.meta["eras"]
+        self.sources: List[str] = self.meta["sources"]
+        self._era_codes = {bucket: code for code, bucket in enumerate(self.eras)}
+
+    def __len__(self) -> int:
+        return int(self.meta["entries"])
+
+    @staticmethod
+    def _string(blob, offsets, i: int) -> str:
+        return bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def entry(self, i: int) -> GazetteerHit:
+        admin = self._string(self.admin_blob, self.admin_offsets, i)
+        return GazetteerHit(
+            id=uuid.UUID(bytes=bytes(self.ids[i])),
+            name_norm=self._string(self.name_blob, self.name_offsets, i),
+            admin_norm=admin or None,
+            era_bucket=self.eras[self.era[i]],
+            latitude=float(self.latitude[i]),
+            longitude=float(self.longitude[i]),
+            source=self.sources[self.source[i]],
+        )
+
+    def lookup(self, key: str, eras: Optional[Iterable[str]] = None, limit: int = 50) -> List[GazetteerHit]:
+        """Entries whose name or alternate name normalises to ``key``, optionally in ``eras``."""
+        h = np.uint64(key_hash(key))
+        lo = int(np.searchsorted(self.key_hash, h, side="left"))
+        hi = int(np.searchsorted(self.key_hash, h, side="right"))
+        if lo == hi:
+            return []
+        raw = key.encode("utf-8")
+        codes = None if eras is None else {self._era_codes[e] for e in eras if e in self._era_codes}
+        hits: List[GazetteerHit] = []
+        seen = set()
+        for k in range(lo, hi):
+            start, length = int(self.key_start[k]), int(self.key_len[k])
+            if bytes(self.key_blob[start:start + length]) != raw:
+                continue  # hash collision
+            entry = int(self.key_entry[k])
+            if entry in seen or (codes is not None and int(self.era[entry]) not in codes):
+                continue
+            seen.add(entry)
+            hits.append(self.entry(entry))
+            if len(hits) >= limit:
+                break
+        return hits
+
+
+_index: Optional[GazetteerIndex] = None
+_index_stamp: Optional[tuple] = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_gazetteer_index() -> Optional[GazetteerIndex]:
+    """The process index, or ``None`` when ``GAZETTEER_INDEX_PATH`` holds no index.
+
+    The directory is re-checked every ``RECHECK_SECONDS`` and reopened after
+    a rebuild.
+    """
+    global _index, _index_stamp, _checked_at
+    with _index_lock:
+        now = time.monotonic()
+        if now - _checked_at < RECHECK_SECONDS and _checked_at:
+            return _index
+        _checked_at = now
+        meta = GAZETTEER_INDEX_PATH / "meta.json"
+        try:
+            st = meta.stat()
+        except OSError:
+            _index, _index_stamp = None, None
+            return None
+        stamp = (st.st_ino, st.st_mtime_ns)  # a rebuild writes a new meta.json
+        if stamp != _index_stamp:
+            try:
+                _index = GazetteerIndex(GAZETTEER_INDEX_PATH)
+                _index_stamp = stamp
+                logger.info("🗺️ Gazetteer index opened: %d entries (%s)", len(_index), GAZETTEER_INDEX_PATH)
+            except Exception:
+                logger.exception("❌ Could not open gazetteer index at %s", GAZETTEER_INDEX_PATH)
+                _index, _index_stamp = None, None
+        return _index
+
+
+def reset_gazetteer_index() -> None:
+    global _index, _index_stamp, _checked_at
+    with _index_lock:
+        _index, _index_stamp, _checked_at = None, None, 0.0
@@ -0,0 +1,465 @@
+"""Streaming bulk loader for full gazetteer dumps (GeoNames, Wikidata).
+
+The old ``load_gazetteer`` script built one ORM object per row and read JSON
+sources into memory, which does not scale to GeoNames ``allCountries``
+(12M+ rows).  :func:`load_gazetteer_file` instead
+
+1. **streams** the source: header TSV (``name``/``admin``/``year``/``lat``/
+   ``lng`` … columns), headerless GeoNames TSV (19 positional columns),
+   JSON lines, ``.json`` documents, and ``.zip``/``.gz`` archives of those;
+2. **normalises** batches of rows in a process pool;
+3. **stages** every batch into ``gazetteer_entries_staging`` (``COPY`` on
+   PostgreSQL, multi-row ``INSERT`` elsewhere) and records the source byte
+   offset the batch ended at in ``gazetteer_load_progress`` *in the same
+   transaction*, so a rerun after a crash resumes exactly after the last
+   staged batch;
+4. **merges** the staging table into ``gazetteer_entries`` in one
+   transaction: rows with a ``source_id`` update the existing
+   ``(source, source_id)`` row or are inserted, rows without one are always
+   inserted.  On PostgreSQL the secondary indexes are dropped before the
+   merge and rebuilt after it.
+
+Finally the memory-mapped gazetteer index is rebuilt.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    MetaData,
+    String,
+    Table,
+    delete,
+    insert,
+    literal,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from backend.models.gazetteer_entry import GazetteerEntry, compute_era_bucket
+from backend.models.types import GUID
+from backend.services.gazetteer_index import build_gazetteer_index, place_key, place_slug
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("gazetteer_loader")
+
+LOAD_BATCH_SIZE: int = int(os.getenv("GAZETTEER_LOAD_BATCH_SIZE", "20000"))
+
+# GeoNames "geoname" table columns (allCountries.txt, <CC>.txt), no header
+GEONAMES_COLUMNS = (
+    "geonameid", "name", "asciiname", "alternatenames", "latitude", "longitude",
+    "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code",
+    "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date",
+)
+
+ENTRY_COLUMNS = (
+    "id", "name_norm", "admin_norm", "era_bucket", "latitude", "longitude", "source",
+    "source_id", "country_code", "admin1", "admin2", "alt_names", "meta",
+)
+
+_meta = MetaData()
+
+staging_table = Table(
+    "gazetteer_entries_staging",
+    _meta,
+    Column("id", GUID(), nullable=False),
+    Column("name_norm", String, nullable=False),
+    Column("admin_norm", String),
+    Column("era_bucket", String, nullable=False),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("source", String, nullable=False),
+    Column("source_id", String),
+    Column("country_code", String),
+    Column("admin1", String),
+    Column("admin2", String),
+    Column("alt_names", JSON),
+    Column("meta", JSON),
+    Column("byte_offset", BigInteger, nullable=False),  # later rows win on duplicate source ids
+)
+
+progress_table = Table(
+    "gazetteer_load_progress",
+    _meta,
+    Column("source", String, primary_key=True),  # resolved path
+    Column("size", BigInteger, nullable=False),
+    Column("byte_offset", BigInteger, nullable=False),
+    Column("rows", BigInteger, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+# ─── Reading ──────────────────────────────────────────────────────
+def _open_binary(path: Path):
+    """Binary stream of ``path`` and the name of the data file; archives yield their largest member."""
+    suffix = path.suffix.lower()
+    if suffix == ".zip":
+        archive = zipfile.ZipFile(path)
+        members = [m for m in archive.infolist() if not m.is_dir()]
+        if not members:
+            raise ValueError(f"No data file in {path}")
+        member = max(members, key=lambda m: m.file_size)
+        return archive.open(member), member.filename
+    if suffix == ".gz":
+        return gzip.open(path, "rb"), path.stem
+    return path.open("rb"), path.name
+
+
+def _format_for(name: str, first_line: bytes) -> str:
+    lower = name.lower()
+    if lower.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lower.endswith(".json"):
+        return "json"
+    fields = first_line.rstrip(b"\r\n").split(b"\t")
+    if len(fields) == len(GEONAMES_COLUMNS) and fields[0].isdigit():
+        return "geonames"
+    return "tsv"
+
+
+def iter_source(path: Path, start: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield ``(row, end_offset)`` for every record of ``path`` from byte ``start``.
+
+    Offsets are positions in the (decompressed) data stream, so a load can
+    resume after the last staged record.  ``.json`` documents cannot resume
+    and report offset 0.
+    """
+    stream, name = _open_binary(path)
+    with stream:
+        first = stream.readline()
+        fmt = _format_for(name, first)
+        if fmt == "json":
+            stream.seek(0)
+            for row in _iter_json_document(stream):
+                yield row, 0
+            return
+        header: Optional[List[str]] = None
+        offset = start
+        if fmt == "tsv":
+            header = first.decode("utf-8-sig").rstrip("\r\n").split("\t")
+            offset = max(start, len(first))
+        stream.seek(offset)
+        for line in stream:
+            offset += len(line)
+            if not line.strip():
+                continue
+            if fmt == "jsonl":
+                yield json.loads(line), offset
+            else:
+                fields = line.decode("utf-8").rstrip("\r\n").split("\t")
+                yield dict(zip(header or GEONAMES_COLUMNS, fields)), offset
+
+
+def _iter_json_document(stream, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """Rows of a ``.json`` source: a list, decoded element by element, or a ``key → row`` dict."""
+    reader = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    decoder = json.JSONDecoder()
+    buf = reader.read(chunk_size).lstrip()
+    if buf.startswith("{"):
+        # Legacy dict-of-rows files are small; parse them whole
+        yield from json.loads(buf + reader.read()).values()
+        return
+    pos, eof = 1, False  # past the opening "["
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            row, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                if pos >= len(buf):
+                    return
+                raise
+            more = reader.read(chunk_size)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        yield row
+
+
+# ─── Normalising (runs in pool workers) ───────────────────────────
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map one source row to ``gazetteer_entries`` values; ``None`` drops it.
+
+    Names are keyed with :func:`place_key`, like the gazetteer index keys
+    alternate names.  GeoNames rows use ``admin1_code, country_code`` as
+    their admin part.
+    """
+    if "geonameid" in row:
+        name, admin = row.get("name"), ", ".join(p for p in (row.get("admin1_code"), row.get("country_code")) if p)
+        source, source_id, year = "geonames", row.get("geonameid"), None
+        lat, lng = _float(row.get("latitude")), _float(row.get("longitude"))
+        country, admin1, admin2 = row.get("country_code"), row.get("admin1_code"), row.get("admin2_code")
+        alt_names = row.get("alternatenames") or None
+        meta = {k: row[k] for k in ("feature_class", "feature_code", "population") if row.get(k)} or None
+    else:
+        name, admin = row.get("name") or row.get("name_norm"), row.get("admin") or row.get("admin_norm")
+        source, source_id, year = row.get("source") or "import", row.get("source_id"), row.get("year")
+        lat = _float(row["lat"] if row.get("lat") is not None else row.get("latitude"))
+        lng = _float(row["lng"] if row.get("lng") is not None else row.get("longitude"))
+        country, admin1, admin2 = row.get("country_code"), row.get("admin1"), row.get("admin2")
+        alt_names, meta = row.get("alt_names"), row.get("meta")
+    if lat is None or lng is None:
+        return None
+    admin_norm = place_slug(admin) or None if admin else None
+    name_norm = place_key(name, admin_norm)
+    if not name_norm:
+        return None
+    try:
+        yeari = int(year) if year not in (None, "") else None
+    except (TypeError, ValueError):
+        yeari = None
+    return {
+        "id": uuid.uuid4(),
+        "name_norm": name_norm,
+        "admin_norm": admin_norm,
+        "era_bucket": compute_era_bucket(yeari),
+        "latitude": lat,
+        "longitude": lng,
+        "source": source,
+        "source_id": str(source_id) if source_id not in (None, "") else None,
+        "country_code": country or None,
+        "admin1": admin1 or None,
+        "admin2": admin2 or None,
+        "alt_names": alt_names,
+        "meta": meta,
+    }
+
+
+def _normalize_batch(batch: List[Tuple[Dict[str, Any], int]]) -> Tuple[List[Dict[str, Any]], int, int]:
+    rows = []
+    for raw, offset in batch:
+        values = normalize_row(raw)
+        if values is not None:
+            values["byte_offset"] = offset
+            rows.append(values)
+    return rows, batch[-1][1], len(batch)
+
+
+def _quiet_worker() -> None:
+    # Workers only normalise; keep their import-time chatter out of the logs
+    logging.disable(logging.INFO)
+
+
+def _batches(records: Iterable[Tuple[Dict[str, Any], int]], size: int) -> Iterator[List[Tuple[Dict[str, Any], int]]]:
+    batch: List[Tuple[Dict[str, Any], int]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ordered_map(pool: Optional[ProcessPoolExecutor], fn, items: Iterable, window: int) -> Iterator:
+    """``pool.map`` with at most ``window`` items in flight.
+
+    ``Executor.map`` submits the whole iterable up front, which would read
+    the entire source into memory.
+    """
+    if pool is None:
+        yield from map(fn, items)
+        return
+    pending: deque = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# ─── Staging ──────────────────────────────────────────────────────
+def _copy_rows(session: Session, rows: List[Dict[str, Any]]) -> None:
+    columns = [c.name for c in staging_table.columns]
+    if session.get_bind().dialect.name == "postgresql":
+        raw = session.connection().connection  # psycopg 3 DBAPI connection
+        with raw.cursor() as cur:
+            with cur.copy(f"COPY {staging_table.name} ({', '.join(columns)}) FROM STDIN") as copy:
+                for r in rows:
+                    copy.write_row(
+                        [json.dumps(r[c]) if c in ("alt_names", "meta") and r[c] is not None else r[c] for c in columns]
+                    )
+    else:
+        session.execute(insert(staging_table), rows)
+
+
+def _save_progress(session: Session, source: str, size: int, offset: int, rows: int) -> None:
+    values = {"size": size, "byte_offset": offset, "rows": rows, "updated_at": datetime.utcnow()}
+    updated = session.execute(update(progress_table).where(progress_table.c.source == source).values(**values))
+    if not updated.rowcount:
+        session.execute(insert(progress_table).values(source=source, **values))
+
+
+# ─── Merging ──────────────────────────────────────────────────────
+def _secondary_indexes(session: Session) -> List[Tuple[str, str]]:
+    """``(name, CREATE INDEX …)`` for the PostgreSQL indexes not backing a constraint."""
+    rows = session.execute(
+        text(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = :t AND indexname NOT IN ("
+            "  SELECT conname FROM pg_constraint WHERE conrelid = CAST(:t AS regclass))"
+        ),
+        {"t": GazetteerEntry.__tablename__},
+    )
+    return [(name, ddl) for name, ddl in rows]
+
+
+def merge_staging(session: Session, *, rebuild_indexes: bool = True) -> Dict[str, int]:
+    """Upsert the staging table into ``gazetteer_entries`` and empty it.
+
+    Runs in the caller's transaction; commit afterwards.
+    """
+    s, g = staging_table.c, GazetteerEntry.__table__.c
+    started = time.perf_counter()
+    session.execute(
+        text(f"CREATE INDEX IF NOT EXISTS ix_gazetteer_staging_source ON {staging_table.name} (source, source_id)")
+    )
+    # Duplicate source ids within the load: keep the row read last
+    newer = staging_table.alias("newer")
+    session.execute(
+        delete(staging_table).where(
+            s.source_id.isnot(None),
+            select(newer.c.byte_offset)
+            .where(
+                newer.c.source == s.source,
+                newer.c.source_id == s.source_id,
+                newer.c.byte_offset > s.byte_offset,
+            )
+            .exists(),
+        )
+    )
+
+    postgres = session.get_bind().dialect.name == "postgresql"
+    dropped = _secondary_indexes(session) if postgres and rebuild_indexes else []
+    for name, _ in dropped:
+        session.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+
+    now = datetime.utcnow()
+    matched = (g.source == s.source) & (g.source_id == s.source_id)
+    updated = session.execute(
+        update(GazetteerEntry.__table__)
+        .where(s.source_id.isnot(None), matched)
+        .values({c: s[c] for c in ENTRY_COLUMNS if c != "id"} | {"updated_at": now})
+    ).rowcount
+    stamp = literal(now, DateTime)
+    fresh = select(*[s[c] for c in ENTRY_COLUMNS], stamp, stamp).where(
+        s.source_id.is_(None) | ~select(g.id).where(matched).exists()
+    )
+    inserted = session.execute(
+        insert(GazetteerEntry.__table__).from_select([*ENTRY_COLUMNS, "created_at", "updated_at"], fresh)
+    ).rowcount
+
+    for _, ddl in dropped:
+        session.execute(text(ddl))
+    if postgres:
+        session.execute(text(f"ANALYZE {GazetteerEntry.__tablename__}"))
+    session.execute(delete(staging_table))
+    logger.info(
+        "🗺️ Gazetteer merge: %d updated, %d inserted, %d indexes rebuilt in %.1fs",
+        updated, inserted, len(dropped), time.perf_counter() - started,
+    )
+    return {"updated": updated, "inserted": inserted}
+
+
+# ─── Driver ───────────────────────────────────────────────────────
+def load_gazetteer_file(
+    session: Session,
+    path: Path,
+    *,
+    workers: Optional[int] = None,
+    batch_size: int = LOAD_BATCH_SIZE,
+    rebuild_indexes: bool = True,
+    build_index: bool = True,
+) -> Dict[str, Any]:
+    """Stream ``path`` into ``gazetteer_entries``, resuming an interrupted load.
+
+    Parameters
+    ----------
+    session : Session
+        Session to load through; it is committed after every staged batch.
+    path : Path
+        TSV, GeoNames TSV, JSON lines or JSON file, optionally ``.zip``/``.gz``.
+    workers : int, optional
+        Normalising processes; defaults to the CPU count, ``0`` normalises
+        in this process.
+    batch_size : int
+        Source rows per staged batch (and checkpoint).
+    rebuild_indexes : bool
+        Drop and rebuild ``gazetteer_entries`` indexes around the merge
+        (PostgreSQL only).
+    build_index : bool
+        Rebuild the memory-mapped gazetteer index afterwards.
+    """
+    path = Path(path)
+    source = str(path.resolve())
+    size = path.stat().st_size
+    _meta.create_all(session.get_bind(), checkfirst=True)
+
+    progress = session.execute(select(progress_table).where(progress_table.c.source == source)).first()
+    if progress is not None and progress.size == size and progress.byte_offset > 0:
+        start, read = progress.byte_offset, progress.rows
+        logger.info("⏩ Resuming gazetteer load of %s at byte %d (%d rows read)", path.name, start, read)
+    else:
+        # New load, changed file or a source without offsets: restage from scratch
+        session.execute(delete(staging_table))
+        session.execute(delete(progress_table).where(progress_table.c.source == source))
+        session.commit()
+        start, read = 0, 0
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) if workers > 0 else None
+    staged = 0
+    started = time.perf_counter()
+    try:
+        batches = _batches(iter_source(path, start), batch_size)
+        for rows, offset, count in _ordered_map(pool, _normalize_batch, batches, window=2 * max(1, workers)):
+            if rows:
+                _copy_rows(session, rows)
+            read += count
+            staged += len(rows)
+            # Same transaction as the rows: a crash never loses or repeats a batch
+            _save_progress(session, source, size, offset, read)
+            session.commit()
+            logger.info("📥 Staged %d gazetteer rows (%d read, byte %d)", staged, read, offset)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    merged = merge_staging(session, rebuild_indexes=rebuild_indexes)
+    session.execute(delete(progress_table).where(progress_table.c.source == source))
+    session.commit()
+    result: Dict[str, Any] = {"read": read, "staged": staged, **merged, "seconds": round(time.perf_counter() - started, 1)}
+    if build_index:
+        result["index"] = build_gazetteer_index(session)
+    logger.info("✅ Gazetteer load of %s: %s", path.name, result)
+    return result
@@ -0,0 +1,224 @@
+"""GEDCOM date engine.
+
+:func:`parse_gedcom_date` turns a GEDCOM ``DATE`` value into a
+:class:`GedcomDate` ``(start, end, precision)``.  It understands the
+GEDCOM 5.5 grammar (``ABT``/``CAL``/``EST``/``BEF``/``AFT``/``INT``,
+``BET … AND …``, ``FROM … TO …``, dual years such as ``1750/51``) as well as
+the free-text forms real exports are full of: ``Abt. 1700``, ``c.1910``,
+``April 22, 1959``, ``04/26/2001``, ``2008-05-16``, ``02may2003``,
+``1766-1803``, ``1950's`` …  Both the raw text and ged4py's ``DateValue``
+string form (``ABOUT 1770``, ``(01 April 1846)``) are accepted.
+
+All patterns are compiled once and results are memoised: a tree repeats the
+same few thousand date strings across tens of thousands of events.
+
+``start``/``end`` span the stated granularity (``MAY 1910`` →
+1910-05-01 … 1910-05-31).  ``BEF x`` has no start and ``AFT x`` no end.
+"""
+
+from __future__ import annotations
+
+import calendar
+import re
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+DATE_CACHE_SIZE = 65536
+
+MONTHS = {
+    "JAN": 1, "JANUARY": 1,
+    "FEB": 2, "FEBRUARY": 2,
+    "MAR": 3, "MARCH": 3,
+    "APR": 4, "APRIL": 4,
+    "MAY": 5,
+    "JUN": 6, "JUNE": 6,
+    "JUL": 7, "JULY": 7,
+    "AUG": 8, "AUGUST": 8,
+    "SEP": 9, "SEPT": 9, "SEPTEMBER": 9,
+    "OCT": 10, "OCTOBER": 10,
+    "NOV": 11, "NOVEMBER": 11,
+    "DEC": 12, "DECEMBER": 12,
+}
+
+# Qualifier spelling → precision reported for the date it qualifies.
+QUALIFIERS = {
+    "ABT": "about", "ABOUT": "about", "CA": "about", "CIRCA": "about", "C": "about",
+    "EST": "estimated", "ESTIMATED": "estimated",
+    "CAL": "calculated", "CALCULATED": "calculated",
+    "INT": "interpreted", "INTERPRETED": "interpreted",
+    "BEF": "before", "BEFORE": "before", "PRIOR TO": "before",
+    "AFT": "after", "AFTER": "after",
+}
+
+
+class GedcomDate(NamedTuple):
+    """Parsed date: inclusive bounds (either may be ``None``) and precision.
+
+    ``precision`` is ``day``/``month``/``year``/``decade`` for plain dates,
+    otherwise the qualifier (``about``, ``before``, ``after``, ``estimated``,
+    ``calculated``, ``interpreted``) or ``range``/``period``.
+    """
+
+    start: Optional[date]
+    end: Optional[date]
+    precision: str
+
+    @property
+    def value(self) -> Optional[date]:
+        """Single representative date: the start, or the end for ``BEF``."""
+        return self.start if self.start is not None else self.end
+
+
+# ─── Compiled grammar ─────────────────────────────────────────────
+_RE_CALENDAR = re.compile(r"@#D[A-Z ]+@")
+_RE_TIME = re.compile(r"\s+\d{1,2}:\d{2}(?::\d{2})?\s*(?:AM|PM)?$")
+_RE_LETTER_DIGIT = re.compile(r"(?<=[A-Z])(?=\d)|(?<=\d)(?=[A-Z])")
+_RE_WORD_SLASH = re.compile(r"(?<=[A-Z])/|/(?=[A-Z])")
+_RE_PUNCT = re.compile(r"[,.?']")
+_RE_SPACES = re.compile(r"\s+")
+
+_QUALIFIER_ALT = "|".join(sorted((re.escape(q) for q in QUALIFIERS), key=len, reverse=True))
+_RE_QUALIFIED = re.compile(rf"^({_QUALIFIER_ALT})\s+(.+)$")
+_RE_BETWEEN = re.compile(r"^(?:BET|BETWEEN|BTW)\s+(.+?)\s+(?:AND|-)\s+(.+)$")
+_RE_FROM_TO = re.compile(r"^FROM\s+(.+?)\s+TO\s+(.+)$")
+_RE_FROM = re.compile(r"^FROM\s+(.+)$")
+_RE_TO = re.compile(r"^TO\s+(.+)$")
+_RE_DASH_RANGE = re.compile(r"^(.+?)\s*(?:-{1,2}|–)\s*(.+)$")
+
+_RE_ISO = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+_RE_NUMERIC = re.compile(r"^(\d{1,2})([/-])(\d{1,2})\2(\d{4})$")
+_RE_NUMERIC_MONTH = re.compile(r"^(\d{1,2})/(\d{4})$")
+_RE_DAY_MONTH_YEAR = re.compile(r"^(?:(\d{1,2})\s+)?([A-Z]{3,9})\s+(\d{3,4})(?:/(\d{1,2}))?$")
+_RE_MONTH_DAY_YEAR = re.compile(r"^([A-Z]{3,9})\s+(\d{1,2})\s+(\d{4})$")
+_RE_YEAR = re.compile(r"^(\d{3,4})(?:/(\d{1,2}))?$")
+_RE_DECADE = re.compile(r"^(\d{3})0 ?S$")
+
+
+def _normalise(text: str) -> str:
+    text = text.strip().upper()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]  # ged4py wraps unparseable text as a date phrase
+    elif "(" in text:
+        text = text.split("(", 1)[0]  # "INT 1900 (phrase)"
+    text = _RE_CALENDAR.sub(" ", text)
+    text = _RE_TIME.sub("", text)
+    text = _RE_WORD_SLASH.sub(" ", text)
+    text = _RE_LETTER_DIGIT.sub(" ", text)
+    text = _RE_PUNCT.sub(" ", text)
+    return _RE_SPACES.sub(" ", text).strip()
+
+
+def _full_year(year: int, short: Optional[str]) -> int:
+    """Dual year ``1750/51`` or short range end ``1895-6``: the later full year."""
+    if not short:
+        return year
+    scale = 10 ** len(short)
+    later = year - year % scale + int(short)
+    return later if later >= year else later + scale
+
+
+def _span(year: int, month: Optional[int] = None, day: Optional[int] = None) -> Optional[Tuple[date, date, str]]:
+    try:
+        if day is not None:
+            d = date(year, month, day)
+            return d, d, "day"
+        if month is not None:
+            return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1]), "month"
+        return date(year, 1, 1), date(year, 12, 31), "year"
+    except ValueError:
+        return None
+
+
+def _simple(text: str) -> Optional[Tuple[date, date, str]]:
+    """A single calendar date at day, month, year or decade granularity."""
+    if m := _RE_DAY_MONTH_YEAR.match(text):
+        day, mon, year, dual = m.groups()
+        month = MONTHS.get(mon)
+        if month is None:
+            return None
+        return _span(_full_year(int(year), dual), month, int(day) if day else None)
+    if m := _RE_YEAR.match(text):
+        return _span(_full_year(int(m.group(1)), m.group(2)))
+    if m := _RE_MONTH_DAY_YEAR.match(text):
+        month = MONTHS.get(m.group(1))
+        return _span(int(m.group(3)), month, int(m.group(2))) if month else None
+    if m := _RE_ISO.match(text):
+        return _span(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    if m := _RE_NUMERIC.match(text):
+        first, _, second, year = m.groups()
+        day, month = int(first), int(second)
+        if month > 12 >= day:
+            day, month = month, day  # only readable as month/day/year
+        return _span(int(year), month, day)
+    if m := _RE_NUMERIC_MONTH.match(text):
+        return _span(int(m.group(2)), int(m.group(1)))
+    if m := _RE_DECADE.match(text):
+        decade = int(m.group(1)) * 10
+        return date(decade, 1, 1), date(decade + 9, 12, 31), "decade"
+    return None
+
+
+def _range(first: str, second: str) -> Optional[Tuple[date, date]]:
+    a = _simple(first)
+    if a is None:
+        return None
+    # "1895-6": the second half borrows the century of the first.
+    if second.isdigit() and len(second) < 3 and a[2] == "year":
+        b = _span(_full_year(a[0].year, second))
+    else:
+        b = _simple(second)
+    if b is None or b[1] < a[0]:
+        return None
+    return a[0], b[1]
+
+
+def _parse(text: str) -> Optional[GedcomDate]:
+    if simple := _simple(text):
+        return GedcomDate(*simple)
+    if m := _RE_BETWEEN.match(text):
+        bounds = _range(m.group(1), m.group(2))
+        return GedcomDate(bounds[0], bounds[1], "range") if bounds else None
+    if m := _RE_FROM_TO.match(text):
+        bounds = _range(m.group(1), m.group(2))
+        return GedcomDate(bounds[0], bounds[1], "period") if bounds else None
+    if m := _RE_FROM.match(text):
+        start = _simple(m.group(1))
+        return GedcomDate(start[0], None, "period") if start else None
+    if m := _RE_TO.match(text):
+        end = _simple(m.group(1))
+        return GedcomDate(None, end[1], "period") if end else None
+    if m := _RE_QUALIFIED.match(text):
+        precision = QUALIFIERS[m.group(1)]
+        inner = _parse(m.group(2))
+        if inner is None:
+            return None
+        if precision == "before":
+            return GedcomDate(None, inner.start if inner.start is not None else inner.end, precision)
+        if precision == "after":
+            return GedcomDate(inner.end if inner.end is not None else inner.start, None, precision)
+        return GedcomDate(inner.start, inner.end, precision)
+    if m := _RE_DASH_RANGE.match(text):
+        bounds = _range(m.group(1), m.group(2))
+        return GedcomDate(bounds[0], bounds[1], "range") if bounds else None
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_cached(text: str) -> Optional[GedcomDate]:
+    return _parse(_normalise(text))
+
+
+def parse_gedcom_date(value) -> Optional[GedcomDate]:
+    """Parse a GEDCOM ``DATE`` value (``str`` or ged4py ``DateValue``).
+
+    Returns ``None`` for empty or unrecognised input.
+    """
+    if not value:
+        return None
+    return _parse_cached(str(value))
+
+
+def date_cache_info():
+    """``functools`` cache statistics, for benchmarks and debugging."""
+    return _parse_cached.cache_info()
@@ -1,24 +1,37 @@
 from datetime import datetime
+import hashlib
 import logging
 
+from backend.services.gedcom_dates import parse_gedcom_date
 from backend.utils.logger import get_file_logger
 
 logger = get_file_logger("gedcom_normalizer")
 
 def parse_date_flexible(date_str):
-    if not date_str:
-        return None
-    date_str = str(date_str).strip()
-    formats = [
-        "%d %b %Y", "%b %Y", "%Y", "%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y",
-        "%d %B %Y", "%B %Y", "%b. %d, %Y", "%B %d, %Y"
-    ]
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt).date()
-        except Exception:
-            continue
-    return None
+    """Representative ``date`` for a GEDCOM date value, or ``None``.
+
+    Thin wrapper over :func:`parse_gedcom_date`: qualified dates yield their
+    start (``ABT 1900`` → 1900-01-01) and ``BEF`` dates their bound.
+    """
+    parsed = parse_gedcom_date(date_str)
+    return parsed.value if parsed else None
+
+def record_content_hash(record):
+    """Stable digest of a raw GEDCOM record tree (tags, values, nesting).
+
+    Same result for ged4py and stream-engine records; used to detect which
+    records changed between two imports of the same tree.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    stack = [(0, record)]
+    while stack:
+        depth, rec = stack.pop()
+        value = rec.value
+        if isinstance(value, tuple):
+            value = "\x1f".join(value)
+        digest.update(f"{depth}\x1f{rec.tag}\x1f{'' if value is None else value}\x1e".encode("utf-8"))
+        stack.extend((depth + 1, sub) for sub in reversed(rec.sub_records))
+    return digest.hexdigest()
 
 def safe_strip(value):
     if isinstance(value, (list, tuple)):
@@ -43,6 +56,8 @@ EVENT_TAGS = {
     "OCCU": ("occupation",   "biography")
 }
 
+FAMILY_EVENT_TAGS = ("MARR", "DIV", "SEPR")
+
 def normalize_individual(raw_ind):
     name = ""
     if hasattr(raw_ind, "name") and raw_ind.name:
@@ -124,7 +139,28 @@ def normalize_individual(raw_ind):
 
     return person
 
+def _scan_event(record):
+    """Date, place and source lines of one event record, in one pass."""
+    date_raw = place_raw = None
+    sources = []
+    for ss in record.sub_records:
+        tag = ss.tag
+        if tag == "DATE":
+            if date_raw is None:
+                date_raw = ss.value
+        elif tag == "PLAC":
+            if place_raw is None:
+                place_raw = ss.value
+        elif tag in ("SOUR", "PAGE", "TITL"):
+            sources.append(f"{tag}: {safe_strip(ss.value)}")
+    return date_raw, place_raw, sources
+
 def extract_events_from_individual(individual_record, normalized_individual, counters=None):
+    """One event per occurrence of an ``EVENT_TAGS`` sub-record, in file order.
+
+    Repeatable tags (RESI, CENS, EVEN, ...) yield one event each; date, place
+    and sources come from that occurrence only.
+    """
     events = []
     gid = normalized_individual.get("gedcom_id")
 
@@ -132,20 +168,15 @@ def extract_events_from_individual(individual_record, normalized_individual, cou
         if counters is not None:
             counters[key] = counters.get(key, 0) + 1
 
-    for tag, (etype, category) in EVENT_TAGS.items():
-        date_raw = individual_record.sub_tag_value(f"{tag}/DATE")
-        place_raw = individual_record.sub_tag_value(f"{tag}/PLAC")
+    for sub in individual_record.sub_records:
+        tag = sub.tag
+        if tag not in EVENT_TAGS:
+            continue
+        etype, category = EVENT_TAGS[tag]
+        date_raw, place_raw, source_info = _scan_event(sub)
         date_obj = parse_date_flexible(str(date_raw)) if date_raw else None
         place = place_raw or None
 
-        # Collect source info
-        source_info = []
-        for sub in individual_record.sub_records:
-            if sub.tag == tag:
-                for ss in sub.sub_records:
-                    if ss.tag in ("SOUR", "PAGE", "TITL"):
-                        source_info.append(f"{ss.tag}: {safe_strip(ss.value)}")
-
         if date_obj or place:
             precision = (
                 "exact" if date_obj and place else
@@ -172,18 +203,28 @@ def extract_events_from_individual(individual_record, normalized_individual, cou
 
     return events
 
+def xref(pointer):
+    """``@I1@`` form of a HUSB/WIFE/CHIL pointer, as INDI records keep their ids."""
+    if pointer and not pointer.startswith("@"):
+        return f"@{pointer}@"
+    return pointer
+
 def normalize_family(family_record):
     fam_id = family_record.xref_id
     husb_id = wife_id = None
+    children = []
     for sub in family_record.sub_records:
         if sub.tag == "HUSB" and sub.value:
             husb_id = sub.value.strip('@')
         elif sub.tag == "WIFE" and sub.value:
             wife_id = sub.value.strip('@')
+        elif sub.tag == "CHIL" and sub.value:
+            children.append(sub.value.strip('@'))
     return {
         "gedcom_id": fam_id,
         "husband_id": husb_id,
         "wife_id": wife_id,
+        "children": children,
         "extra_details": {}
     }
 
@@ -197,42 +238,39 @@ def extract_events_from_family(family_record, normalized_family, counters=None):
         if counters is not None:
             counters[key] = counters.get(key, 0) + 1
 
-    def _get(tag):
-        raw_date = family_record.sub_tag_value(f"{tag}/DATE")
-        raw_place = family_record.sub_tag_value(f"{tag}/PLAC")
-        date_obj = parse_date_flexible(str(raw_date)) if raw_date else None
+    for sub in family_record.sub_records:
+        tag = sub.tag
+        if tag not in FAMILY_EVENT_TAGS:
+            continue
+        event_type, category = EVENT_TAGS[tag]
+        raw_date, raw_place, _ = _scan_event(sub)
+        date = parse_date_flexible(str(raw_date)) if raw_date else None
         place = raw_place or None
-        return date_obj, place
-
-    for tag in ["MARR", "DIV", "SEPR"]:
-        if tag in EVENT_TAGS:
-            event_type, category = EVENT_TAGS[tag]
-            date, place = _get(tag)
-            if date or place:
-                precision = (
-                    "exact" if date and place else
-                    "date_only" if date else
-                    "place_only"
-                )
-                _track(f"family_{event_type}_{precision}")
-                event = {
-                    "event_type": event_type,
-                    "family_gedcom_id": fam_id,
-                    "husband_gedcom_id": husb_id,
-                    "wife_gedcom_id": wife_id,
-                    "date": date.isoformat() if date else None,
-                    "date_precision": precision,
-                    "location": place,
-                    "source_tag": tag,
-                    "category": category,
-                    "notes": ""
-                }
-                events.append(event)
-
-                # LOG EVERY FAMILY EVENT
-                logger.info(
-                    f"👪 FAM {fam_id} → {event_type}@{event['date']} for husband={husb_id} wife={wife_id} (place='{place}')"
-                )
+        if date or place:
+            precision = (
+                "exact" if date and place else
+                "date_only" if date else
+                "place_only"
+            )
+            _track(f"family_{event_type}_{precision}")
+            event = {
+                "event_type": event_type,
+                "family_gedcom_id": fam_id,
+                "husband_gedcom_id": husb_id,
+                "wife_gedcom_id": wife_id,
+                "date": date.isoformat() if date else None,
+                "date_precision": precision,
+                "location": place,
+                "source_tag": tag,
+                "category": category,
+                "notes": ""
+            }
+            events.append(event)
+
+            # LOG EVERY FAMILY EVENT
+            logger.info(
+                f"👪 FAM {fam_id} → {event_type}@{event['date']} for husband={husb_id} wife={wife_id} (place='{place}')"
+            )
 
     # 🟧 If you later add fan-out logic for census/residence events attached to children, add logs there
     # Example:
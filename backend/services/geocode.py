@@ -3,21 +3,27 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
-from urllib.parse import urlencode
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import requests
 
 from backend.config import settings
 from backend.models.location_models import LocationOut
-from backend.services.geocode_brain import GazetteerDBGeocoder, GeoContext, RateLimiter
+from backend.services.geocode_async import AsyncGeocodeClient, provider_bucket
+from backend.services.fuzzy_place_index import get_fuzzy_index
+from backend.services.geocode_brain import GazetteerDBGeocoder, GeoContext
+from backend.services.geocode_replay import ProviderTransport, provider_transport_from_env
+from backend.services.geocode_shared_cache import SharedCacheGeocoder, SharedGeocodeCache, get_shared_cache
+from backend.services.spatial_context import SpatialContext
+from backend.services.geocode_store import LEGACY_CACHE_FILE, MISS_TTL_SECONDS, coerce_record, open_store
 from pydantic import BaseModel
-from backend.utils.helpers import calculate_name_similarity, normalize_location
+from backend.utils.helpers import normalize_location
+from backend.utils.place_parser import ParsedPlace, parse_place
 from backend.utils.logger import get_file_logger
 from backend import models
 
@@ -34,10 +40,9 @@ def extract_and_validate_coords(entry: dict[str, Any]) -> Tuple[float, float] |
 
 logger = get_file_logger("geocode")
 
-DEFAULT_CACHE_PATH = Path(
-    os.getenv("GEOCODE_CACHE_FILE", Path(__file__).resolve().parent / "geocode_cache.json")
-)
-FAIL_TTL_SECONDS = 3600  # 1 hour
+DEFAULT_CACHE_PATH = LEGACY_CACHE_FILE  # pre-SQLite JSON cache, imported once
+FAIL_TTL_SECONDS = MISS_TTL_SECONDS
+FUZZY_MIN_SCORE = 90
 
 
 class GeocodeError(BaseModel):
@@ -57,9 +62,10 @@ class ManualOverrideGeocoder:
             norm = normalize_location(key) or key
             self.fixes[norm.lower()] = val
 
-    def resolve(self, geocode: "Geocode", session, place: str) -> Optional[LocationOut]:
-        norm = normalize_location(place) or place
-        key = norm.lower()
+    def resolve(self, geocode: "Geocode", session, place: str | ParsedPlace) -> Optional[LocationOut]:
+        parsed = parse_place(place)
+        place = parsed.raw
+        key = (parsed.slug or place).lower()
         hit = self.fixes.get(key)
         if not hit:
             return None
@@ -84,55 +90,35 @@ class ManualOverrideGeocoder:
 class PermanentCacheGeocoder:
     """Retrieve previously resolved coordinates from the cache."""
 
-    def resolve(self, geocode: "Geocode", session, place: str) -> Optional[LocationOut]:
+    def resolve(self, geocode: "Geocode", session, place: str | ParsedPlace) -> Optional[LocationOut]:
         if not geocode.cache_enabled:
             return None
-        key = geocode._normalize_key(place)
-        now = time.time()
+        parsed = parse_place(place)
+        place, key = parsed.raw, parsed.key
         entry = geocode.cache.get(key)
         if not entry:
             logger.info("🟥 Cache miss for %s", place)
             return None
-        try:
-            if len(entry) == 4:
-                lat, lng, norm, conf = entry
-                src = "cache"
-                status = "ok"
-                label = src
-                ts = 0.0
-            elif len(entry) == 6 and isinstance(entry[5], (int, float)):
-                lat, lng, norm, conf, src, ts = entry
-                status = "ok"
-                label = src
-            elif len(entry) == 7:
-                lat, lng, norm, conf, src, status, ts = entry
-                label = src
-            elif len(entry) >= 8:
-                lat, lng, norm, conf, src, status, label, ts = entry[:8]
-            else:
-                raise ValueError("unexpected cache format")
-        except Exception:
+        record = coerce_record(entry)
+        if record is None:
             logger.warning("🧯 Cache entry malformed for '%s': %s", key, entry)
             del geocode.cache[key]
             return None
-        if lat is None and ts and (now - ts) > FAIL_TTL_SECONDS:
-            logger.info("⏰ Cache expired for '%s'", place)
-            del geocode.cache[key]
-            return None
-        if lat is None or lng is None:
+        if record["latitude"] is None:
+            # Misses are only served until they expire (the store hides them after that).
             logger.info("🟥 Cache hit without coords for '%s'", place)
             return None
         logger.info("🟦 Cache hit for %s", place)
         return LocationOut(
             raw_name=place,
-            normalized_name=norm,
-            latitude=lat,
-            longitude=lng,
-            confidence_score=float(conf or 0.0),
-            confidence_label=label,
-            status=status,
-            source=src,
-         )
+            normalized_name=record["normalized"] or place,
+            latitude=record["latitude"],
+            longitude=record["longitude"],
+            confidence_score=record["confidence"],
+            confidence_label=record["label"],
+            status=record["status"],
+            source=record["source"],
+        )
 
 
 class HistoricalGeocoder:
@@ -145,11 +131,10 @@ class HistoricalGeocoder:
             key = (norm if norm is not None else k).lower()
             self.data[key] = v
 
-    def resolve(self, geocode: "Geocode", session, place: str) -> Optional[LocationOut]:
-        key = normalize_location(place)
-        if key is None:
-            key = place
-        key = key.lower()
+    def resolve(self, geocode: "Geocode", session, place: str | ParsedPlace) -> Optional[LocationOut]:
+        parsed = parse_place(place)
+        place = parsed.raw
+        key = (parsed.slug if parsed.slug is not None else place).lower()
         hit = self.data.get(key)
         if not hit:
             return None
@@ -172,17 +157,21 @@ class HistoricalGeocoder:
 
 
 class FuzzyAliasGeocoder:
-    """Simple DB based fuzzy matcher."""
+    """DB exact match, then a fuzzy match over known location names."""
 
-    def resolve(self, geocode: "Geocode", session, place: str) -> Optional[LocationOut]:
+    def resolve(self, geocode: "Geocode", session, place: str | ParsedPlace) -> Optional[LocationOut]:
         if not session:
             return None
-        raw = place.strip()
+        raw = parse_place(place).raw.strip()
         try:
             existing = (
                 session.query(models.Location)
-                .filter(models.Location.raw_name == raw)
-                .one_or_none()
+                .filter(
+                    models.Location.raw_name == raw,
+                    models.Location.latitude.isnot(None),
+                    models.Location.longitude.isnot(None),
+                )
+                .first()
             )
             if existing:
                 logger.debug("🟢 DB exact match for %s", raw)
@@ -196,18 +185,16 @@ class FuzzyAliasGeocoder:
                     status="ok",
                     source="db",
                 )
-            db_locs = session.query(models.Location).all()
-            for loc in db_locs:
-                compare_to = loc.normalized_name or loc.raw_name
-                sim = calculate_name_similarity(compare_to, raw)
-                if sim >= 90 and loc.latitude and loc.longitude:
-                    logger.info("🟪 DB fuzzy match for '%s' ≈ '%s' (%.1f%%)", raw, compare_to, sim)
+            # Top candidates from the process-wide trigram index instead of scoring every row
+            for match in get_fuzzy_index(session).search(raw, k=5, min_score=FUZZY_MIN_SCORE):
+                if match.latitude and match.longitude:
+                    logger.info("🟪 DB fuzzy match for '%s' ≈ '%s' (%.1f%%)", raw, match.name, match.score)
                     return LocationOut(
                         raw_name=raw,
-                        normalized_name=loc.normalized_name or loc.raw_name,
-                        latitude=loc.latitude,
-                        longitude=loc.longitude,
-                        confidence_score=float(loc.confidence_score or 0.8),
+                        normalized_name=match.normalized_name,
+                        latitude=match.latitude,
+                        longitude=match.longitude,
+                        confidence_score=float(match.confidence_score or 0.8),
                         confidence_label="db-fuzzy",
                         status="ok",
                         source="db-fuzzy",
@@ -222,28 +209,25 @@ class ExternalAPIGeocoder:
 
     def __init__(self, api_key: Optional[str] = None) -> None:
         self.api_key = api_key
-        # Conservative provider limits (Nominatim: 1 rps per policy; Google generous default)
-        self._google_limiter = RateLimiter(5.0)
-        self._nominatim_limiter = RateLimiter(1.0)
 
-    def resolve(self, geocode: "Geocode", session, place: str) -> Optional[LocationOut]:
+    def resolve(self, geocode: "Geocode", session, place: str | ParsedPlace) -> Optional[LocationOut]:
+        place = parse_place(place).raw
         if geocode.mock_mode:
             logger.info("🛑 Mock mode active - skipping API call for '%s'", place)
             return None
         result = None
         # Google first if available
+        # Provider limits are shared by every process (Nominatim: 1 rps per policy)
         if self.api_key:
-            try:
-                self._google_limiter.sleep_if_needed()
-            except Exception:
-                pass
+            time.sleep(provider_bucket("google").reserve())
             result = geocode._google(place)
         if not result:
-            try:
-                self._nominatim_limiter.sleep_if_needed()
-            except Exception:
-                pass
+            time.sleep(provider_bucket("nominatim").reserve())
             result = geocode._nominatim_geocode(place)
+        return self.to_location(session, place, result)
+
+    def to_location(self, session, place: str, result) -> Optional[LocationOut]:
+        """Build the LocationOut for a provider tuple, recording the attempt."""
         if not result:
             logger.info("❌ External API miss for '%s'", place)
             return None
@@ -258,7 +242,7 @@ class ExternalAPIGeocoder:
             if session is not None:
                 attempt = GeocodeAttempt(
                     raw_place=place,
-                    name_norm=normalize_location(place) or place,
+                    name_norm=parse_place(place).slug or place,
                     provider=src,
                     chosen="yes",
                     latitude=float(lat),
@@ -284,6 +268,12 @@ class ExternalAPIGeocoder:
         )
 
 
+def _parsed_stripped(place: str | ParsedPlace) -> ParsedPlace:
+    """The parsed form of ``place`` with surrounding whitespace removed, as the chain expects."""
+    raw = place.raw if isinstance(place, ParsedPlace) else place
+    return parse_place(raw.strip())
+
+
 class Geocode:
     """Chain plugins to resolve a place string."""
 
@@ -296,15 +286,23 @@ class Geocode:
         historical_lookup: Optional[Dict[str, Any]] = None,
         unresolved_logger=None,
         mock_mode: bool | None = None,
+        shared_cache: Optional[SharedGeocodeCache] = None,
+        provider_transport: Optional[ProviderTransport] = None,
     ) -> None:
         self.api_key = api_key
-        self.cache_file = Path(cache_file or DEFAULT_CACHE_PATH)
+        self.cache_file = Path(cache_file) if cache_file else None
         self.cache_enabled = use_cache
-        self.cache: Dict[str, Any] = self._load_cache() if use_cache else {}
+        self.cache = self._open_cache() if use_cache else {}
+        # Cross-process tier (Redis + LRU); None unless MAPEM_GEOCODE_SHARED_CACHE=1
+        self.shared_cache = shared_cache if shared_cache is not None else (get_shared_cache() if use_cache else None)
         self.unresolved_logger = unresolved_logger
         self.mock_mode = bool(
             os.getenv("MAPEM_MOCK_GEOCODE", "0") == "1" if mock_mode is None else mock_mode
         )
+        # Record/replay stand-in for provider HTTP (MAPEM_GEOCODE_PROVIDER_MODE); None = live
+        self.provider_transport = (
+            provider_transport if provider_transport is not None else provider_transport_from_env()
+        )
         if not settings.ALLOW_GEOCODE_EXTERNAL:
             # If external geocoding is disabled, drop external plugin from chain
             pass
@@ -315,57 +313,45 @@ class Geocode:
         self.plugins = [
             ManualOverrideGeocoder(self.manual_fixes),
             HistoricalGeocoder(self.historical_lookup),
+            *([SharedCacheGeocoder(self.shared_cache)] if self.shared_cache is not None else []),
             PermanentCacheGeocoder(),
             # Prefer local Gazetteer before external calls
             GazetteerDBGeocoder(),
+            # Known location names, exact then fuzzy via the in-memory trigram index
+            FuzzyAliasGeocoder(),
         ]
-        if settings.ALLOW_GEOCODE_EXTERNAL:
+        # Replay never leaves the machine, so it runs even with external geocoding off
+        replaying = getattr(self.provider_transport, "mode", None) == "replay"
+        if settings.ALLOW_GEOCODE_EXTERNAL or replaying:
             self.plugins.append(ExternalAPIGeocoder(api_key))
 
     # ─── Cache helpers ─────────────────────────────────────────────
-    def _load_cache(self) -> Dict[str, Any]:
-        if self.cache_file.exists():
-            try:
-                cache = json.loads(self.cache_file.read_text())
-                self.cache = cache
-                self._prune_cache()
-                return cache
-            except json.JSONDecodeError:
-                logger.warning("⚠️ Cache corrupted — starting fresh.")
-        return {}
-
-    def _save_cache(self) -> None:
+    def _open_cache(self):
+        """Shared :class:`GeocodeStore`; a ``.json`` ``cache_file`` is migrated into a sibling database."""
+        if self.cache_file is None:
+            return open_store()
+        if self.cache_file.suffix == ".json":
+            return open_store(self.cache_file.with_suffix(".sqlite3"), legacy_json=self.cache_file)
+        return open_store(self.cache_file)
+
+    def flush_cache(self) -> None:
         if self.cache_enabled:
-            try:
-                self._prune_cache()
-                with self.cache_file.open("w") as f:
-                    json.dump(self.cache, f, indent=2)
-            except Exception as e:
-                logger.error("❌ Could not save cache: %s", e)
+            self.cache.flush()
 
     def _prune_cache(self) -> None:
-        if not self.cache_enabled:
-            return
-        now = time.time()
-        keys_to_delete = []
-        for k, entry in list(self.cache.items()):
-            try:
-                ts = entry[5] if len(entry) >= 6 and isinstance(entry[5], (int, float)) else entry[-1]
-                lat = entry[0]
-            except Exception:
-                logger.warning("⚠️ Removing malformed cache entry '%s': %s", k, entry)
-                keys_to_delete.append(k)
-                continue
-            if lat is None and isinstance(ts, (int, float)) and (now - ts) > FAIL_TTL_SECONDS:
-                keys_to_delete.append(k)
-        for k in keys_to_delete:
-            del self.cache[k]
+        if self.cache_enabled:
+            self.cache.purge_expired()
+
+    def _remember(self, key: str, record: Dict[str, Any]) -> None:
+        if self.cache_enabled:
+            self.cache[key] = record
+        if self.shared_cache is not None:
+            self.shared_cache.put(key, record)
 
     # ─── Normalization ────────────────────────────────────────────
     @staticmethod
-    def _normalize_key(place: str) -> str:
-        norm = normalize_location(place.strip())
-        return norm.lower() if norm else place.strip().lower()
+    def _normalize_key(place: str | ParsedPlace) -> str:
+        return parse_place(place).key
 
     # ─── Retry helper ─────────────────────────────────────────────
     def _retry(self, fn, *args, retries=2, backoff=1, **kwargs):
@@ -383,13 +369,17 @@ class Geocode:
         return None
 
     # ─── External providers ───────────────────────────────────────
+    def _http_get(self, url: str, **kwargs):
+        """``requests.get``, or the record/replay transport's ``get`` when one is set."""
+        transport = self.provider_transport
+        return (transport.get if transport is not None else requests.get)(url, **kwargs)
+
     def _google(self, place: str):
         if not self.api_key:
             return None
         logger.info("🌐 Google geocode query for '%s'", place)
         url = "https://maps.googleapis.com/maps/api/geocode/json"
-        q = urlencode({"address": place, "key": self.api_key})
-        resp = self._retry(requests.get, f"{url}?{q}", timeout=5)
+        resp = self._retry(self._http_get, url, params={"address": place, "key": self.api_key}, timeout=5)
         if not resp or resp.status_code != 200:
             return None
         data = resp.json()
@@ -405,7 +395,7 @@ class Geocode:
         params = {"q": place, "format": "json", "limit": 1}
         logger.info("🌐 Nominatim geocode query for '%s'", place)
         resp = self._retry(
-            requests.get,
+            self._http_get,
             url,
             params=params,
             headers={
@@ -425,9 +415,9 @@ class Geocode:
         return lat, lng, name, 0.8, "nominatim"
 
     # ─── Main entry ───────────────────────────────────────────────
-    def get_or_create_location(self, session, place: str, *, event_year: int | None = None, admin_hint: str | None = None, family_coords: list[tuple[float, float]] | None = None) -> Optional[LocationOut | GeocodeError]:
-        raw = place.strip()
-        key = self._normalize_key(raw)
+    def get_or_create_location(self, session, place: str, *, event_year: int | None = None, admin_hint: str | None = None, family_coords: list[tuple[float, float]] | None = None, spatial: SpatialContext | None = None) -> Optional[LocationOut | GeocodeError]:
+        parsed = _parsed_stripped(place)
+        raw, key = parsed.raw, parsed.key
         now = time.time()
         logger.debug("🔍 geocode chain for: %s", raw)
 
@@ -437,49 +427,146 @@ class Geocode:
             self._last_prune = now
 
         # Build shared context for era-aware scoring
-        context = GeoContext(event_year=event_year, admin_hint=admin_hint, family_coords=family_coords)
+        context = GeoContext(event_year=event_year, admin_hint=admin_hint, family_coords=family_coords, spatial=spatial)
+
+        result = self._run_chain(session, parsed, now, context, self.plugins)
+        if result is not None:
+            return result
+        return self._miss(raw, key, now)
 
-        # Try each geocoder plugin in sequence
-        for plugin in self.plugins:
+    def resolve_many(
+        self,
+        session,
+        places: Iterable[str],
+        *,
+        event_year: int | None = None,
+        admin_hint: str | None = None,
+        spatial: SpatialContext | None = None,
+    ) -> Dict[str, LocationOut | GeocodeError]:
+        """Resolve many places, sending the external API calls concurrently.
+
+        Every place first runs through the local plugins (overrides, caches,
+        gazetteer) one by one.  The remaining places go to
+        :class:`AsyncGeocodeClient` together; results are cached exactly as
+        :meth:`get_or_create_location` would cache them.
+        """
+        now = time.time()
+        external = self.external_plugin
+
+        results: Dict[str, LocationOut | GeocodeError] = {}
+        pending: Dict[str, str] = {}  # raw → cache key
+        for place in dict.fromkeys(p.strip() for p in places if p and p.strip()):
+            result = self.resolve_local(session, place, event_year=event_year, admin_hint=admin_hint, spatial=spatial)
+            if result is not None:
+                results[place] = result
+            else:
+                pending[place] = self._normalize_key(place)
+
+        if pending and external is not None and not self.mock_mode:
+            for place, located in self._fetch_external(session, external, list(pending)).items():
+                if located:
+                    results[place] = located
+                    self._remember(pending[place], self._record(located, now))
+        for place, key in pending.items():
+            if place not in results:
+                results[place] = self._miss(place, key, now)
+        logger.info(
+            "📍 resolve_many: %d places, %d sent to external providers",
+            len(results), len(pending),
+        )
+        return results
+
+    @property
+    def external_plugin(self) -> Optional["ExternalAPIGeocoder"]:
+        """The external provider plugin, or None when external geocoding is off."""
+        return next((p for p in self.plugins if isinstance(p, ExternalAPIGeocoder)), None)
+
+    def resolve_local(
+        self,
+        session,
+        place: str,
+        *,
+        event_year: int | None = None,
+        admin_hint: str | None = None,
+        spatial: SpatialContext | None = None,
+    ) -> Optional[LocationOut | GeocodeError]:
+        """Run only the local plugins (overrides, caches, gazetteer) for ``place``.
+
+        Returns None when nothing local knows the place; unlike
+        :meth:`get_or_create_location` this never calls a provider and never
+        caches a miss.
+        """
+        context = GeoContext(event_year=event_year, admin_hint=admin_hint, spatial=spatial)
+        local_plugins = [p for p in self.plugins if not isinstance(p, ExternalAPIGeocoder)]
+        return self._run_chain(session, _parsed_stripped(place), time.time(), context, local_plugins)
+
+    def _fetch_external(self, session, external: "ExternalAPIGeocoder", places: list[str]) -> Dict[str, Optional[LocationOut]]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            transport = self.provider_transport
+            client = AsyncGeocodeClient(
+                external.api_key,
+                normalize=self._normalize_key,
+                transport=transport.async_transport() if transport is not None else None,
+            )
+            fetched = asyncio.run(client.resolve_many(places))
+            return {place: external.to_location(session, place, fetched.get(place)) for place in places}
+        # Already inside an event loop (cannot nest asyncio.run): one at a time
+        return {place: external.resolve(self, session, place) for place in places}
+
+    def _run_chain(self, session, parsed: ParsedPlace, now: float, context: GeoContext, plugins) -> Optional[LocationOut | GeocodeError]:
+        # Try each geocoder plugin in sequence; they all get the parsed place
+        key = parsed.key
+        for plugin in plugins:
             # GazetteerDBGeocoder has different signature that uses context
             if isinstance(plugin, GazetteerDBGeocoder):
                 try:
-                    result = plugin.resolve(session, raw, context=context, debug=True)
+                    result = plugin.resolve(session, parsed, context=context, debug=True)
                 except Exception:
-                    logger.exception("❌ GazetteerDBGeocoder failed for '%s'", raw)
+                    logger.exception("❌ GazetteerDBGeocoder failed for '%s'", parsed.raw)
                     result = None
             else:
-                result = plugin.resolve(self, session, raw)
+                result = plugin.resolve(self, session, parsed)
+            if isinstance(result, GeocodeError):
+                # Shared negative hit: another worker just failed on this place
+                return result
             if result:
-                # Cache successful lookups (unless from PermanentCacheGeocoder)
-                if self.cache_enabled and not isinstance(plugin, PermanentCacheGeocoder):
-                    self.cache[key] = {
-                        "latitude": result.latitude,
-                        "longitude": result.longitude,
-                        "normalized": result.normalized_name,
-                        "confidence": float(getattr(result, "confidence_score", 0.0)),
-                        "source": getattr(result, "source", "unknown"),
-                        "status": getattr(result, "status", "ok"),
-                        "label": getattr(result, "confidence_label", getattr(result, "source", "unknown")),
-                        "timestamp": now,
-                    }
-                    self._save_cache()
+                # Cache successful lookups (unless they came from a cache)
+                if not isinstance(plugin, (PermanentCacheGeocoder, SharedCacheGeocoder)):
+                    self._remember(key, self._record(result, now))
+                elif isinstance(plugin, PermanentCacheGeocoder) and self.shared_cache is not None:
+                    # Promote local hits so other workers see them
+                    self.shared_cache.put(key, self.cache[key])
                 # Ensure model has expected fields (defensive; Pydantic validates already)
                 return result
+        return None
 
+    @staticmethod
+    def _record(result: LocationOut, now: float) -> Dict[str, Any]:
+        return {
+            "latitude": result.latitude,
+            "longitude": result.longitude,
+            "normalized": result.normalized_name,
+            "confidence": float(getattr(result, "confidence_score", 0.0)),
+            "source": getattr(result, "source", "unknown"),
+            "status": getattr(result, "status", "ok"),
+            "label": getattr(result, "confidence_label", getattr(result, "source", "unknown")),
+            "timestamp": now,
+        }
+
+    def _miss(self, raw: str, key: str, now: float) -> GeocodeError:
         # No geocoder plugin found a result — cache the miss
-        if self.cache_enabled:
-            self.cache[key] = {
-                "latitude": None,
-                "longitude": None,
-                "normalized": raw,
-                "confidence": 0.0,
-                "source": "geocoder",
-                "status": "unresolved",
-                "label": "geocoder",
-                "timestamp": now,
-            }
-            self._save_cache()
+        self._remember(key, {
+            "latitude": None,
+            "longitude": None,
+            "normalized": raw,
+            "confidence": 0.0,
+            "source": "geocoder",
+            "status": "unresolved",
+            "label": "geocoder",
+            "timestamp": now,
+        })
 
         if self.unresolved_logger:
             self.unresolved_logger(place=raw, reason="geocoder-miss", details={})
@@ -495,6 +582,7 @@ __all__ = [
     "GEOCODER",
     "ManualOverrideGeocoder",
     "PermanentCacheGeocoder",
+    "SharedCacheGeocoder",
     "HistoricalGeocoder",
     "ExternalAPIGeocoder",
     "LocationOut",
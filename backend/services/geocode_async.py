@@ -0,0 +1,295 @@
+"""Concurrent external geocoding over asyncio/httpx.
+
+:class:`ExternalAPIGeocoder` resolves one place at a time with blocking
+``requests`` calls, so a batch has a single request in flight.
+:class:`AsyncGeocodeClient` resolves many places concurrently on one pooled
+``httpx.AsyncClient``:
+
+* at most ``GEOCODE_CONCURRENCY`` requests are in flight;
+* concurrent requests for the same normalised place share one HTTP call
+  (singleflight);
+* every request first reserves a slot from its provider's
+  :func:`provider_bucket`.  The buckets live in Redis, so all Flask and
+  Celery processes together respect Nominatim's 1 request/second policy.
+  Without Redis a per-process bucket is used instead.
+
+Results use the provider tuple shape of :meth:`Geocode._google` and
+:meth:`Geocode._nominatim_geocode`: ``(lat, lng, name, confidence, source)``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from backend.services.geocode_shared_cache import GEOCODE_REDIS_URL, REDIS_NAMESPACE
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("geocode_async")
+
+ProviderResult = Tuple[float, float, str, float, str]
+
+GOOGLE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "MapEm/1.0 (contact: admin@mapem.app)"
+
+GEOCODE_CONCURRENCY: int = int(os.getenv("GEOCODE_CONCURRENCY", "8"))
+PROVIDER_RATES: Dict[str, float] = {
+    "google": float(os.getenv("GEOCODE_GOOGLE_RPS", "5")),
+    "nominatim": float(os.getenv("GEOCODE_NOMINATIM_RPS", "1")),
+}
+SHARED_RATE_LIMITS = os.getenv("MAPEM_GEOCODE_SHARED_LIMITS", "1") == "1"
+MAX_RETRIES = 2
+RETRY_BACKOFF = 1.0
+
+
+# ─── Token buckets ────────────────────────────────────────────────
+class LocalTokenBucket:
+    """GCRA limiter for one process: :meth:`reserve` books the next slot.
+
+    Parameters
+    ----------
+    rate : float
+        Sustained requests per second.
+    burst : int
+        Requests allowed back to back before spacing kicks in.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (max(1, burst) - 1)
+        self._tat = 0.0  # theoretical arrival time of the next request
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Book a request slot; return the seconds to wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat, now)
+            self._tat = tat + self.interval
+            return max(0.0, tat - self.tolerance - now)
+
+    async def areserve(self) -> float:
+        """:meth:`reserve` for the event loop (no I/O here, so it runs inline)."""
+        return self.reserve()
+
+
+# KEYS[1] = bucket key; ARGV = interval_ms, tolerance_ms.  Returns wait in ms.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local interval = tonumber(ARGV[1])
+redis.call('SET', KEYS[1], tat + interval, 'PX', math.ceil(tat + interval - now + 1000))
+local wait = tat - tonumber(ARGV[2]) - now
+if wait < 0 then wait = 0 end
+return wait
+"""
+
+
+class RedisTokenBucket(LocalTokenBucket):
+    """Same schedule as :class:`LocalTokenBucket`, kept in Redis for all processes.
+
+    Falls back to the local schedule while Redis is unreachable.
+    """
+
+    def __init__(self, client, key: str, rate: float, burst: int = 1) -> None:
+        super().__init__(rate, burst)
+        self.key = key
+        self._script = client.register_script(_GCRA_LUA)
+        self._down_until = 0.0
+
+    def reserve(self) -> float:
+        if time.monotonic() >= self._down_until:
+            try:
+                interval_ms = int(self.interval * 1000)
+                wait_ms = self._script(keys=[self.key], args=[interval_ms, int(self.tolerance * 1000)])
+                return int(wait_ms) / 1000.0
+            except Exception as e:
+                logger.warning("⚠️ Shared rate limit %s unavailable (%s); using local bucket", self.key, e)
+                self._down_until = time.monotonic() + 30
+        return super().reserve()
+
+    async def areserve(self) -> float:
+        # The blocking EVALSHA runs in a worker thread so it never stalls the
+        # other in-flight lookups on the loop.
+        return await asyncio.to_thread(self.reserve)
+
+
+_buckets: Dict[str, LocalTokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def provider_bucket(provider: str) -> LocalTokenBucket:
+    """Process-wide bucket for ``provider``, shared through Redis when reachable."""
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is not None:
+            return bucket
+        rate = PROVIDER_RATES.get(provider, 1.0)
+        bucket = None
+        if SHARED_RATE_LIMITS:
+            try:
+                import redis
+
+                client = redis.Redis.from_url(GEOCODE_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+                client.ping()
+                bucket = RedisTokenBucket(client, f"{REDIS_NAMESPACE}:ratelimit:{provider}", rate)
+            except Exception as e:
+                logger.warning("⚠️ No Redis for %s rate limit (%s); limiting per process", provider, e)
+        _buckets[provider] = bucket or LocalTokenBucket(rate)
+        return _buckets[provider]
+
+
+def rate_limited_batch_size(seconds: float, cap: int, *, api_key: Optional[str] = None) -> int:
+    """Places one worker can send in ``seconds`` at the binding provider rate, at most ``cap``.
+
+    Google is tried first when there is a key; otherwise every place costs a
+    Nominatim request.
+    """
+    rate = PROVIDER_RATES.get("google" if api_key else "nominatim", 1.0)
+    return max(1, min(int(cap), int(rate * seconds)))
+
+
+# ─── Singleflight ─────────────────────────────────────────────────
+class SingleFlight:
+    """Coalesce calls with the same key into one awaitable.
+
+    Created per batch, so a key resolved earlier in the batch is also
+    answered without another call.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(fn())
+        return await asyncio.shield(future)
+
+
+# ─── Client ───────────────────────────────────────────────────────
+class AsyncGeocodeClient:
+    """Google/Nominatim lookups for many places at once.
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Google key; without one only Nominatim is used.
+    concurrency : int, optional
+        Requests in flight; defaults to ``GEOCODE_CONCURRENCY``.
+    http : httpx.AsyncClient, optional
+        Client to use (tests pass one with a mock transport); by default a
+        pooled client is opened per :meth:`resolve_many` call.
+    normalize : callable, optional
+        Key function for coalescing; defaults to
+        :meth:`Geocode._normalize_key`.
+    transport : httpx.AsyncBaseTransport, optional
+        Transport for the pooled client (record/replay, see
+        :mod:`backend.services.geocode_replay`); ignored when ``http`` is given.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        *,
+        concurrency: Optional[int] = None,
+        http=None,
+        normalize: Optional[Callable[[str], str]] = None,
+        transport=None,
+    ) -> None:
+        self.api_key = api_key
+        self.concurrency = max(1, GEOCODE_CONCURRENCY if concurrency is None else int(concurrency))
+        self._http = http
+        self._transport = transport
+        if normalize is None:
+            from backend.services.geocode import Geocode
+
+            normalize = Geocode._normalize_key
+        self.normalize = normalize
+        self.http_calls = 0
+
+    async def resolve_many(self, places: Iterable[str]) -> Dict[str, Optional[ProviderResult]]:
+        """Resolve ``places`` concurrently; unresolved places map to ``None``."""
+        places = list(dict.fromkeys(p for p in places if p and p.strip()))
+        if not places:
+            return {}
+        import httpx
+
+        flight = SingleFlight()
+        gate = asyncio.Semaphore(self.concurrency)
+
+        async def one(http, place: str):
+            async def call():
+                async with gate:
+                    return await self._lookup(http, place)
+
+            try:
+                return place, await flight.do(self.normalize(place), call)
+            except Exception:
+                logger.exception("❌ Async geocode failed for '%s'", place)
+                return place, None
+
+        if self._http is not None:
+            results = await asyncio.gather(*(one(self._http, p) for p in places))
+        else:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            async with httpx.AsyncClient(
+                limits=limits,
+                timeout=10.0,
+                headers={"User-Agent": USER_AGENT, "Accept-Language": "en"},
+                transport=self._transport,
+            ) as http:
+                results = await asyncio.gather(*(one(http, p) for p in places))
+        resolved = dict(results)
+        logger.info(
+            "🌐 Async geocode: %d places, %d resolved, %d HTTP calls",
+            len(places), sum(1 for r in resolved.values() if r), self.http_calls,
+        )
+        return resolved
+
+    async def _lookup(self, http, place: str) -> Optional[ProviderResult]:
+        result = await self._google(http, place) if self.api_key else None
+        return result or await self._nominatim(http, place)
+
+    async def _get(self, http, provider: str, url: str, params: Dict[str, str]):
+        import httpx
+
+        # The first call per provider may connect to Redis: keep it off the loop too
+        bucket = _buckets.get(provider) or await asyncio.to_thread(provider_bucket, provider)
+        for attempt in range(MAX_RETRIES + 1):
+            await asyncio.sleep(await bucket.areserve())
+            self.http_calls += 1
+            try:
+                resp = await http.get(url, params=params)
+            except httpx.TransportError as e:
+                logger.warning("⚠️ %s request fail (%d/%d): %s", provider, attempt + 1, MAX_RETRIES + 1, e)
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                if resp.status_code not in (429, 500, 502, 503, 504):
+                    return None
+                logger.warning("⚠️ %s HTTP %s (%d/%d)", provider, resp.status_code, attempt + 1, MAX_RETRIES + 1)
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+        return None
+
+    async def _google(self, http, place: str) -> Optional[ProviderResult]:
+        data = await self._get(http, "google", GOOGLE_URL, {"address": place, "key": self.api_key})
+        if not data or data.get("status") != "OK" or not data.get("results"):
+            return None
+        res = data["results"][0]
+        loc = res["geometry"]["location"]
+        confidence = 1.0 if res["geometry"].get("location_type") == "ROOFTOP" else 0.75
+        return loc["lat"], loc["lng"], res.get("formatted_address", place), confidence, "google"
+
+    async def _nominatim(self, http, place: str) -> Optional[ProviderResult]:
+        items = await self._get(http, "nominatim", NOMINATIM_URL, {"q": place, "format": "json", "limit": "1"})
+        if not items:
+            return None
+        return float(items[0]["lat"]), float(items[0]["lon"]), items[0]["display_name"], 0.8, "nominatim"
@@ -4,22 +4,30 @@ from __future__ import annotations
 Era-aware geocoding brain that:
 - Queries local Gazetteer cache table first (name_norm, admin_norm, era_bucket)
 - Scores multiple candidates using text sim, admin match, era overlap,
-  and proximity to known family locations (if provided in context)
+  and proximity to known family locations (if provided in context);
+  score_candidates does the whole candidate set at once with NumPy, and a
+  per-tree SpatialContext adds the nearest-point distance and a regional prior
 - Persists GeocodeAttempt rows with provider I/O and debug scoring
 - Falls back to external providers with backoff and rate limiting
 """
 
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+from rapidfuzz.distance import Indel
+from rapidfuzz.process import cdist
 from sqlalchemy.orm import Session
 
 from backend.models.gazetteer_entry import GazetteerEntry, compute_era_bucket
 from backend.models.geocode_debug import GeocodeAttempt
 from backend.models.location_models import LocationOut
-from backend.utils.helpers import normalize_location, calculate_name_similarity
+from backend.services.gazetteer_index import GazetteerIndex, get_gazetteer_index
+from backend.services.spatial_context import SpatialContext
+from backend.utils.helpers import calculate_name_similarity
 from backend.utils.logger import get_file_logger
+from backend.utils.place_parser import ParsedPlace, parse_place
 
 logger = get_file_logger("geo_brain")
 
@@ -48,6 +56,8 @@ class GeoContext:
     event_year: Optional[int] = None
     admin_hint: Optional[str] = None
     family_coords: Optional[List[Tuple[float, float]]] = None
+    # Resolved points of the tree being ingested (see backend.services.spatial_context)
+    spatial: Optional[SpatialContext] = None
 
 
 def _distance_score(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
@@ -64,6 +74,11 @@ def _era_overlap_score(bucket: str, year: Optional[int]) -> float:
     return 1.0 if expected == bucket else 0.4
 
 
+SCORE_WEIGHTS = {"text": 0.5, "admin": 0.2, "era": 0.2, "prox": 0.1}
+# Added on top when a SpatialContext is available: favours the tree's home region
+REGIONAL_PRIOR_WEIGHT = 0.05
+
+
 def score_candidate(
     name_query: str,
     admin_hint: Optional[str],
@@ -87,26 +102,145 @@ def score_candidate(
         "era": candidate.era_bucket,
         "era_sim": round(era_sim, 3),
         "proximity": round(prox, 3),
-        "weights": {"text": 0.5, "admin": 0.2, "era": 0.2, "prox": 0.1},
+        "weights": dict(SCORE_WEIGHTS),
     }
     return score, detail
 
 
+@dataclass
+class CandidateBatch:
+    """A candidate set as parallel arrays (one slot per candidate)."""
+
+    name_norm: List[str]
+    admin_norm: List[Optional[str]]
+    era_bucket: np.ndarray  # object array of bucket names
+    latitude: np.ndarray
+    longitude: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any]) -> "CandidateBatch":
+        """From :class:`GazetteerEntry` rows or anything with the same attributes."""
+        return cls(
+            name_norm=[r.name_norm for r in rows],
+            admin_norm=[r.admin_norm for r in rows],
+            era_bucket=np.array([r.era_bucket for r in rows], dtype=object),
+            latitude=np.array([r.latitude for r in rows], dtype=np.float64),
+            longitude=np.array([r.longitude for r in rows], dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.name_norm)
+
+
+def _similarities(query: str, choices: List[Optional[str]]) -> np.ndarray:
+    """``calculate_name_similarity(query, c) / 100`` for every choice, in one call.
+
+    Same value as fuzzywuzzy's ``fuzz.ratio`` (python-Levenshtein backend):
+    the rounded indel ratio of the stripped, lower-cased strings.  Empty or
+    missing choices score 0.
+    """
+    query = query.strip().lower()
+    present = [i for i, c in enumerate(choices) if c and c.strip()]
+    sims = np.zeros(len(choices), dtype=np.float64)
+    if not query or not present:
+        return sims
+    ratios = cdist(
+        [query],
+        [choices[i].strip().lower() for i in present],
+        scorer=Indel.normalized_similarity,
+        dtype=np.float64,
+    )[0]
+    sims[present] = np.rint(100 * ratios) / 100.0
+    return sims
+
+
+def score_candidates(
+    name_query: str,
+    admin_hint: Optional[str],
+    family_coords: Optional[List[Tuple[float, float]]],
+    year: Optional[int],
+    batch: CandidateBatch,
+    *,
+    explain: bool = True,
+    spatial: Optional[SpatialContext] = None,
+) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """Vectorised :func:`score_candidate` over a :class:`CandidateBatch`.
+
+    Returns the score array and, when ``explain`` is true, the same per
+    candidate breakdown dicts :func:`score_candidate` builds.  With a
+    ``spatial`` context, proximity also counts its points and
+    ``REGIONAL_PRIOR_WEIGHT × regional prior`` is added to each score.
+    """
+    n = len(batch)
+    text_sim = _similarities(name_query, batch.name_norm)
+    admin_sim = _similarities(admin_hint, batch.admin_norm) if admin_hint else np.zeros(n)
+
+    known = batch.era_bucket != "unknown"
+    if year is None:
+        era_sim = np.where(known, 0.5, 0.3)
+    else:
+        era_sim = np.where(batch.era_bucket == compute_era_bucket(year), 1.0, 0.4)
+
+    prox = np.zeros(n)
+    if family_coords and n:
+        fam = np.asarray(family_coords, dtype=np.float64).reshape(-1, 2)
+        dx = fam[None, :, 0] - batch.latitude[:, None]
+        dy = (fam[None, :, 1] - batch.longitude[:, None]) * 0.6
+        # Nearest point wins: the score falls monotonically with d²
+        prox = np.clip(1.0 - (dx * dx + dy * dy).min(axis=1) / 100.0, 0.0, 1.0)
+    prior = None
+    if spatial is not None and spatial.total and n:
+        spatial_prox, prior = spatial.score(batch.latitude, batch.longitude)
+        prox = np.maximum(prox, spatial_prox)
+
+    scores = 0.5 * text_sim + 0.2 * admin_sim + 0.2 * era_sim + 0.1 * prox
+    if prior is not None:
+        scores = scores + REGIONAL_PRIOR_WEIGHT * prior
+    details: List[Dict[str, Any]] = []
+    if explain:
+        details = [
+            {
+                "text_sim": round(t, 3),
+                "admin_sim": round(a, 3),
+                "era": era,
+                "era_sim": round(e, 3),
+                "proximity": round(p, 3),
+                "weights": dict(SCORE_WEIGHTS),
+            }
+            for t, a, era, e, p in zip(
+                text_sim.tolist(), admin_sim.tolist(), batch.era_bucket.tolist(), era_sim.tolist(), prox.tolist()
+            )
+        ]
+        if prior is not None:
+            for detail, p in zip(details, prior.tolist()):
+                detail["regional_prior"] = round(p, 3)
+    return scores, details
+
+
 class GazetteerDBGeocoder:
-    def __init__(self) -> None:
+    """Local gazetteer lookup: the memory-mapped index when one was built, else SQL.
+
+    ``index`` pins a :class:`GazetteerIndex` (tests); by default the process
+    index from :func:`get_gazetteer_index` is used when present.
+    """
+
+    def __init__(self, index: Optional[GazetteerIndex] = None) -> None:
         self._nominatim_limiter = RateLimiter(1.0)
+        self.index = index
 
     def resolve(
         self,
         session: Optional[Session],
-        raw_place: str,
+        raw_place: str | ParsedPlace,
         *,
         context: Optional[GeoContext] = None,
         debug: bool = True,
     ) -> Optional[LocationOut]:
-        if session is None:
+        index = self.index if self.index is not None else get_gazetteer_index()
+        if session is None and index is None:
             return None
-        norm = normalize_location(raw_place)
+        parsed = parse_place(raw_place)
+        raw_place, norm = parsed.raw, parsed.slug
         if not norm:
             return None
         admin_hint = (context.admin_hint if context else None) or ""
@@ -114,43 +248,42 @@ class GazetteerDBGeocoder:
         era_candidates = {era_bucket}
         if era_bucket == "unknown":
             era_candidates |= {"1800_1890", "1890_1950", "pre_1800"}
-        q = (
-            session.query(GazetteerEntry)
-            .filter(GazetteerEntry.name_norm == norm)
-            .filter(GazetteerEntry.era_bucket.in_(list(era_candidates)))
-        )
-        rows: List[GazetteerEntry] = list(q.limit(50))
-        if not rows:
-            return None
-        best_score = -1.0
-        best = None
-        explanations: List[Dict[str, Any]] = []
-        for r in rows:
-            score, detail = score_candidate(
-                norm,
-                admin_hint,
-                (context.family_coords if context else None),
-                (context.event_year if context else None),
-                r,
-            )
-            explanations.append(
-                {
-                    "id": str(r.id),
-                    "src": r.source,
-                    "lat": r.latitude,
-                    "lng": r.longitude,
-                    "admin": r.admin_norm,
-                    "era": r.era_bucket,
-                    "score": round(score, 4),
-                    "detail": detail,
-                }
+        if index is not None:
+            rows = index.lookup(norm, era_candidates, limit=50)
+        else:
+            q = (
+                session.query(GazetteerEntry)
+                .filter(GazetteerEntry.name_norm == norm)
+                .filter(GazetteerEntry.era_bucket.in_(list(era_candidates)))
             )
-            if score > best_score:
-                best_score = score
-                best = r
-        if best is None:
+            rows = list(q.limit(50))
+        if not rows:
             return None
-        if debug:
+        scores, details = score_candidates(
+            norm,
+            admin_hint,
+            (context.family_coords if context else None),
+            (context.event_year if context else None),
+            CandidateBatch.from_rows(rows),
+            explain=debug,
+            spatial=(context.spatial if context else None),
+        )
+        best_i = int(np.argmax(scores))  # first maximum, like the old strict ">" scan
+        best, best_score = rows[best_i], float(scores[best_i])
+        explanations: List[Dict[str, Any]] = [
+            {
+                "id": str(r.id),
+                "src": r.source,
+                "lat": r.latitude,
+                "lng": r.longitude,
+                "admin": r.admin_norm,
+                "era": r.era_bucket,
+                "score": round(float(score), 4),
+                "detail": detail,
+            }
+            for r, score, detail in zip(rows, scores, details)
+        ]
+        if debug and session is not None:
             attempt = GeocodeAttempt(
                 raw_place=raw_place,
                 name_norm=norm,
@@ -0,0 +1,391 @@
+"""Fan-out/fan-in batch geocoding: rate-sized chunks as a Celery chord.
+
+``batch_geocode_task`` resolved its whole list inside one task, and
+``scripts/dispatch_unresolved_locations.py`` queued one
+``geocode_location_task`` per location, each with its own broker round trip
+and session.  Neither reported progress.  This module drives a
+``geocode_fanout`` :class:`Job` instead, for both of them and for the
+external misses of ``POST /api/geocode/batch``:
+
+1. :func:`create_fanout_job` deduplicates the places and splits them into
+   chunks of :func:`chunk_size_for` places.  That is about
+   ``GEOCODE_FANOUT_CHUNK_SECONDS`` of provider calls at the configured
+   rate, so each chunk has a predictable duration and the whole job takes
+   roughly ``chunks × chunk time / workers``.
+2. ``backend.tasks.geocode_tasks.dispatch_fanout`` sends the chunks as one
+   Celery ``chord``: a ``group`` of ``geocode_fanout_chunk_task`` followed by
+   ``geocode_fanout_done_task``.
+3. :func:`run_chunk` takes a short-lived in-flight lock per place
+   (:class:`InflightLocks`, ``GEOCODE_INFLIGHT_TTL``).  A place another
+   chunk or job is already resolving is deferred, not sent to the provider
+   twice.  The chunk resolves the rest with :meth:`Geocode.resolve_many`,
+   then writes hits to ``locations`` and merges its counts into the Job in
+   one transaction under the Job's row lock, so concurrent chunks never
+   lose an update and a retried chunk is neither counted nor written twice.
+4. :func:`finish_fanout` sends deferred places round again as one more
+   chunk (after ``GEOCODE_FANOUT_REQUEUE_DELAY`` seconds, at most
+   ``GEOCODE_FANOUT_DEFER_ROUNDS`` times) and marks the Job ``success``
+   once nothing is left.  A chunk that fails for good never reaches the
+   fan-in; :func:`fail_fanout` marks the Job ``failure`` instead.
+
+Per-place results are kept on the Job only up to
+``GEOCODE_FANOUT_RESULTS_MAX`` places; larger jobs keep counts only.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from backend.models import Job
+from backend.services.batch_geocode import result_dict
+from backend.services.geocode_async import rate_limited_batch_size
+from backend.services.geocode_shared_cache import GEOCODE_REDIS_URL, REDIS_NAMESPACE
+from backend.services.location_geometry import apply_location_fix
+from backend.services.unresolved_log import record_unresolved
+from backend.utils.logger import get_file_logger
+from backend.utils.place_parser import parse_place
+from backend.utils.uuid_utils import as_uuid
+
+logger = get_file_logger("geocode_fanout")
+
+CHUNK_SECONDS: float = float(os.getenv("GEOCODE_FANOUT_CHUNK_SECONDS", "60"))
+MAX_CHUNK: int = int(os.getenv("GEOCODE_FANOUT_MAX_CHUNK", "500"))
+INFLIGHT_TTL_SECONDS: int = int(os.getenv("GEOCODE_INFLIGHT_TTL", "300"))
+RESULTS_MAX: int = int(os.getenv("GEOCODE_FANOUT_RESULTS_MAX", "10000"))
+DEFER_ROUNDS: int = int(os.getenv("GEOCODE_FANOUT_DEFER_ROUNDS", "3"))
+REQUEUE_DELAY_SECONDS: int = int(os.getenv("GEOCODE_FANOUT_REQUEUE_DELAY", "30"))
+JOB_TYPE = "geocode_fanout"
+
+
+def chunk_size_for(api_key: Optional[str] = None) -> int:
+    """Places per chunk: ``CHUNK_SECONDS`` of provider calls, at most ``MAX_CHUNK``."""
+    return rate_limited_batch_size(CHUNK_SECONDS, MAX_CHUNK, api_key=api_key)
+
+
+# ─── In-flight locks ──────────────────────────────────────────────
+# Delete the key only if we still own it
+_RELEASE_LUA = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+
+class InflightLocks:
+    """Short-lived per-place locks, in Redis when reachable, else per process.
+
+    Parameters
+    ----------
+    ttl : int
+        Seconds a lock lives if its owner never releases it.
+    client : redis.Redis, optional
+        Client to use; by default one is opened on ``GEOCODE_REDIS_URL``.
+    local : bool
+        Lock per process only, without trying Redis.
+    """
+
+    def __init__(self, ttl: int = INFLIGHT_TTL_SECONDS, client=None, *, local: bool = False) -> None:
+        self.ttl = int(ttl)
+        self._client = client
+        self._local: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        if self._client is None and not local:
+            try:
+                import redis
+
+                client = redis.Redis.from_url(GEOCODE_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+                client.ping()
+                self._client = client
+            except Exception as e:
+                logger.warning("⚠️ No Redis for in-flight geocode locks (%s); locking per process", e)
+
+    @staticmethod
+    def _key(place_key: str) -> str:
+        return f"{REDIS_NAMESPACE}:inflight:{place_key}"
+
+    def acquire(self, place_key: str, token: str) -> bool:
+        if self._client is not None:
+            return bool(self._client.set(self._key(place_key), token, nx=True, ex=self.ttl))
+        now = time.monotonic()
+        with self._lock:
+            owner = self._local.get(place_key)
+            if owner is not None and owner[1] > now and owner[0] != token:
+                return False
+            self._local[place_key] = (token, now + self.ttl)
+            return True
+
+    def release(self, place_key: str, token: str) -> None:
+        if self._client is not None:
+            try:
+                self._client.eval(_RELEASE_LUA, 1, self._key(place_key), token)
+            except Exception:
+                logger.exception("⚠️ Could not release in-flight lock for '%s'", place_key)
+            return
+        with self._lock:
+            if self._local.get(place_key, (None,))[0] == token:
+                del self._local[place_key]
+
+
+_locks: Optional[InflightLocks] = None
+
+
+def get_inflight_locks() -> InflightLocks:
+    global _locks
+    if _locks is None:
+        _locks = InflightLocks()
+    return _locks
+
+
+# ─── Job ──────────────────────────────────────────────────────────
+def fanout_items(places: Iterable[Any]) -> List[Dict[str, Any]]:
+    """``{"place", "key"}`` items, one per distinct key, in first-seen order.
+
+    ``places`` holds raw strings (key: the parsed slug), ``(raw, key)`` pairs,
+    e.g. a Location's ``raw_name`` and ``normalized_name``, or the
+    ``{"place", "key", "year"}`` pending items of ``POST /api/geocode/batch``.
+    Items with a year hint keep it.
+    """
+    items: Dict[str, Dict[str, Any]] = {}
+    for entry in places:
+        year = None
+        if isinstance(entry, dict):
+            raw, key, year = entry.get("place"), entry.get("key"), entry.get("year")
+        elif isinstance(entry, str) or entry is None:
+            raw, key = entry, None
+        else:
+            raw, key = tuple(entry)
+        raw = (raw or "").strip()
+        if not raw:
+            continue
+        parsed = parse_place(raw)
+        key = key or parsed.slug or parsed.key
+        items.setdefault(key, {"place": raw, "key": key, **({"year": year} if year is not None else {})})
+    return list(items.values())
+
+
+def create_fanout_job(
+    session: Session,
+    places: Iterable[Any],
+    *,
+    chunk_size: Optional[int] = None,
+    api_key: Optional[str] = None,
+    source: str = "batch",
+    tree_id: Optional[str] = None,
+) -> tuple:
+    """Queue-ready ``geocode_fanout`` :class:`Job` and its chunks (``task_id`` set by the caller).
+
+    ``tree_id`` is recorded with the places that end up unresolved.
+    """
+    items = fanout_items(places)
+    size = max(1, chunk_size or chunk_size_for(api_key))
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    job = Job(
+        task_id="",
+        job_type=JOB_TYPE,
+        status="queued",
+        progress=0,
+        params={
+            "total": len(items), "chunks": len(chunks), "chunk_size": size, "source": source, "tree_id": tree_id,
+        },
+        result={
+            "done": 0, "resolved": 0, "unresolved": 0, "deferred": [], "chunks_done": [],
+            "locations_updated": 0, **({"results": {}} if len(items) <= RESULTS_MAX else {}),
+        },
+    )
+    session.add(job)
+    session.flush()
+    logger.info("🧮 fan-out job %s: %d places in %d chunks of %d", job.id, len(items), len(chunks), size)
+    return job, chunks
+
+
+def _locked_job(session: Session, job_id) -> Optional[Job]:
+    """The Job row, locked until the transaction ends (``FOR UPDATE`` where supported)."""
+    return session.get(Job, as_uuid(job_id), with_for_update=True, populate_existing=True)
+
+
+def run_chunk(
+    job_id,
+    index: int,
+    items: Sequence[Dict[str, str]],
+    *,
+    session_factory=None,
+    geocoder=None,
+    locks: Optional[InflightLocks] = None,
+) -> Dict[str, int]:
+    """Resolve one chunk and merge its outcome into the Job atomically.
+
+    The chunk is checked against ``chunks_done`` under the Job's row lock
+    before any provider call, and again when merging: location writes and
+    the merge share that second transaction, so a chunk merged meanwhile by a
+    concurrent retry rolls back.  Unresolved places are logged only once the
+    merge has committed.
+
+    Parameters
+    ----------
+    job_id : UUID | str
+        The :class:`Job` from :func:`create_fanout_job`.
+    index : int
+        Chunk number; a chunk already merged (task retry) is skipped.
+    items : sequence of dict
+        ``{"place", "key"}`` items of this chunk, each with an optional
+        ``year`` hint.  Year-hinted hits are returned but not written to
+        ``locations``.
+    session_factory : sessionmaker, optional
+        Defaults to ``backend.db.SessionLocal``.
+    geocoder : Geocode, optional
+        Defaults to the shared ``location_processor.GEOCODER``.
+    locks : InflightLocks, optional
+        Defaults to :func:`get_inflight_locks`.
+    """
+    if session_factory is None:
+        from backend.db import SessionLocal as session_factory
+    if geocoder is None:
+        from backend.services.location_processor import GEOCODER as geocoder
+    locks = locks or get_inflight_locks()
+
+    with session_factory.begin() as session:
+        job = _locked_job(session, job_id)
+        if job is None:
+            raise LookupError(f"Job {job_id} not found")
+        if index in (job.result or {}).get("chunks_done", []):
+            logger.info("⏭️ fan-out job %s: chunk %d already merged", job_id, index)
+            return {"skipped": 1}
+        tree_id = (job.params or {}).get("tree_id")
+
+    token = uuid.uuid4().hex
+    owned = [item for item in items if locks.acquire(item["key"], token)]
+    owned_keys = {item["key"] for item in owned}
+    deferred = [item for item in items if item["key"] not in owned_keys]
+    try:
+        found = _resolve_owned(session_factory, geocoder, owned) if owned else {}
+        outcome = {item["key"]: result_dict(found.get(item["key"]), place=item["place"]) for item in owned}
+        resolved = sum(1 for r in outcome.values() if r["latitude"] is not None)
+
+        with session_factory.begin() as session:
+            job = _locked_job(session, job_id)
+            result = dict(job.result or {})
+            if index in result.get("chunks_done", []):
+                raise _AlreadyMerged()
+            updated = 0
+            for item in owned:
+                row = outcome[item["key"]]
+                if row["latitude"] is not None and row["longitude"] is not None and item.get("year") is None:
+                    updated += apply_location_fix(
+                        session, found[item["key"]], normalized_name=item["key"],
+                        raw_name=item["place"], geocoded_by=JOB_TYPE,
+                    )
+            if "results" in result:
+                result["results"] = {**result["results"], **outcome}
+            result["chunks_done"] = [*result.get("chunks_done", []), index]
+            result["deferred"] = [*result.get("deferred", []), *deferred]
+            result["done"] = int(result.get("done", 0)) + len(owned)
+            result["resolved"] = int(result.get("resolved", 0)) + resolved
+            result["unresolved"] = int(result.get("unresolved", 0)) + len(owned) - resolved
+            result["locations_updated"] = int(result.get("locations_updated", 0)) + updated
+            total = int((job.params or {}).get("total") or 0)
+            job.result = result
+            job.progress = min(99, 100 * (result["done"] + len(result["deferred"])) // total) if total else 99
+            if job.status in ("queued", "started"):
+                job.status = "progress"
+    except _AlreadyMerged:
+        logger.info("⏭️ fan-out job %s: chunk %d merged by a concurrent retry", job_id, index)
+        return {"skipped": 1}
+    finally:
+        for item in owned:
+            locks.release(item["key"], token)
+
+    for item in owned:
+        if outcome[item["key"]]["latitude"] is None:
+            record_unresolved(item["place"], "api_failed", tree_id)
+    logger.info(
+        "📦 fan-out job %s chunk %d: %d resolved, %d unresolved, %d deferred",
+        job_id, index, resolved, len(owned) - resolved, len(deferred),
+    )
+    return {"resolved": resolved, "unresolved": len(owned) - resolved, "deferred": len(deferred)}
+
+
+def _resolve_owned(session_factory, geocoder, items) -> Dict[str, Any]:
+    """Provider results keyed by item key, one ``resolve_many`` per year hint."""
+    by_year: Dict[Optional[int], List[Dict[str, Any]]] = {}
+    for item in items:
+        by_year.setdefault(item.get("year"), []).append(item)
+    found: Dict[str, Any] = {}
+    with session_factory.begin() as session:
+        for year, group in by_year.items():
+            outs = geocoder.resolve_many(session, [item["place"] for item in group], event_year=year)
+            found.update({item["key"]: outs.get(item["place"]) for item in group})
+    return found
+
+
+class _AlreadyMerged(Exception):
+    """A concurrent retry merged this chunk first; roll back ours."""
+
+
+def finish_fanout(job_id, *, session_factory=None) -> Dict[str, Any]:
+    """Fan-in: re-queue deferred places as one more chunk, or mark the Job ``success``.
+
+    While places are deferred and fewer than ``GEOCODE_FANOUT_DEFER_ROUNDS``
+    extra rounds have run, the deferred items become chunk ``index`` of a new
+    round and the summary carries ``{"requeue": {"index", "items"}}`` for the
+    caller to dispatch.  By then the worker that held their in-flight lock
+    has usually filled the shared cache, so the round costs no provider call.
+    Places still deferred after the last round are counted as unresolved.
+    """
+    if session_factory is None:
+        from backend.db import SessionLocal as session_factory
+
+    with session_factory.begin() as session:
+        job = _locked_job(session, job_id)
+        if job is None:
+            raise LookupError(f"Job {job_id} not found")
+        result = dict(job.result or {})
+        requeued = result.get("requeued")
+        if requeued and requeued["index"] not in result.get("chunks_done", []):
+            # A retried fan-in whose round may never have been dispatched
+            return {**{k: v for k, v in result.items() if k != "results"}, "requeue": requeued}
+        deferred = list(result.get("deferred", []))
+        rounds = int(result.get("rounds", 0))
+        result["deferred"] = []
+        if deferred and rounds < DEFER_ROUNDS:
+            requeued = {"index": int((job.params or {}).get("chunks") or 0) + rounds, "items": deferred}
+            result["rounds"] = rounds + 1
+            result["requeued"] = requeued
+            job.result = result
+            logger.info(
+                "🔁 fan-out job %s: re-queuing %d deferred places as chunk %d", job_id, len(deferred), requeued["index"]
+            )
+            return {**{k: v for k, v in result.items() if k != "results"}, "requeue": requeued}
+        if "results" in result:
+            result["results"] = {
+                **result["results"], **{item["key"]: result_dict(None, place=item["place"]) for item in deferred}
+            }
+        result.pop("requeued", None)
+        result["done"] = int(result.get("done", 0)) + len(deferred)
+        result["unresolved"] = int(result.get("unresolved", 0)) + len(deferred)
+        job.result = result
+        job.status = "success"
+        job.progress = 100
+        job.error = None
+    if deferred:
+        logger.warning("⚠️ fan-out job %s: %d places still in flight elsewhere; left unresolved", job_id, len(deferred))
+    logger.info(
+        "✅ fan-out job %s: %d places, %d resolved, %d unresolved",
+        job_id, result["done"], result["resolved"], result["unresolved"],
+    )
+    return {k: v for k, v in result.items() if k != "results"}
+
+
+def fail_fanout(job_id, error: str, *, session_factory=None) -> None:
+    """Mark the Job ``failure``: a chunk gave up, so the chord's fan-in will never run."""
+    if session_factory is None:
+        from backend.db import SessionLocal as session_factory
+
+    with session_factory.begin() as session:
+        job = _locked_job(session, job_id)
+        if job is None or job.status in ("success", "failure"):
+            return
+        job.status = "failure"
+        job.error = error
+    logger.error("❌ fan-out job %s failed: %s", job_id, error)
@@ -0,0 +1,293 @@
+"""Record and replay external geocoding providers for offline runs.
+
+The external tier (:meth:`Geocode._google`, :meth:`Geocode._nominatim_geocode`
+and :class:`AsyncGeocodeClient`) talks to live HTTP endpoints, and
+``mock_mode`` just answers ``None``.  Neither allows benchmarking or
+regression-testing the full chain (manual → historical → cache → gazetteer
+→ external) on a box without network access.
+
+``MAPEM_GEOCODE_PROVIDER_MODE`` selects a :class:`ProviderTransport`:
+
+* ``live`` (default): no transport; providers are called directly;
+* ``record``: :class:`RecordingTransport` calls the providers and appends
+  every request/response pair, with its latency, to a :class:`FixtureStore`
+  (``GEOCODE_FIXTURES``, one JSON object per line);
+* ``replay``: :class:`ReplayTransport` answers from the fixture store and
+  never touches the network.  Latency (``GEOCODE_REPLAY_LATENCY``: ``0``,
+  ``120``, ``50-400`` ms or ``recorded``) and error injection
+  (``GEOCODE_REPLAY_ERROR_RATE`` of responses become
+  ``GEOCODE_REPLAY_ERROR_STATUS``, default 503) make the external tier
+  behave like a real provider under load.  ``GEOCODE_REPLAY_SEED`` makes
+  runs repeatable.  Requests with no fixture get the provider's empty
+  answer.
+
+Both transports serve the blocking path (:meth:`ProviderTransport.get`) and
+the concurrent one (:meth:`ProviderTransport.async_transport`, an httpx
+transport for :class:`AsyncGeocodeClient`).  Fixtures are keyed by provider
+and query parameters without the API key, so they can be shared.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from backend.config import DATA_DIR
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("geocode_replay")
+
+PROVIDER_MODE = os.getenv("MAPEM_GEOCODE_PROVIDER_MODE", "live").strip().lower()
+GEOCODE_FIXTURES = Path(os.getenv("GEOCODE_FIXTURES", str(DATA_DIR / "geocode_fixtures.jsonl")))
+
+_SECRET_PARAMS = frozenset({"key"})
+_ENCODING_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+_EMPTY_BODIES = {"google": {"status": "ZERO_RESULTS", "results": []}, "nominatim": []}
+
+FixtureKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def provider_of(url) -> str:
+    """``google``, ``nominatim`` or the bare host of a provider URL."""
+    host = httpx.URL(str(url)).host
+    if "googleapis" in host:
+        return "google"
+    if "nominatim" in host:
+        return "nominatim"
+    return host
+
+
+def fixture_key(provider: str, params: Dict[str, Any]) -> FixtureKey:
+    return provider, tuple(sorted((str(k), str(v)) for k, v in params.items() if k not in _SECRET_PARAMS))
+
+
+# ─── Fixture store ────────────────────────────────────────────────
+class FixtureStore:
+    """Recorded provider exchanges in a JSON-lines file; the last record per request wins."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[FixtureKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[fixture_key(entry["provider"], entry["params"])] = entry
+            logger.info("📼 Loaded %d geocode fixtures from %s", len(self._entries), self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self):
+        """Recorded exchanges, oldest request first."""
+        return list(self._entries.values())
+
+    def get(self, provider: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._entries.get(fixture_key(provider, params))
+
+    def put(self, provider: str, params: Dict[str, Any], status: int, body: Any, elapsed_ms: float) -> None:
+        entry = {
+            "provider": provider,
+            "params": {k: str(v) for k, v in params.items() if k not in _SECRET_PARAMS},
+            "status": int(status),
+            "body": body,
+            "elapsed_ms": round(float(elapsed_ms), 1),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._entries[fixture_key(provider, params)] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+
+# ─── Transports ───────────────────────────────────────────────────
+class ProviderTransport:
+    """Stands in for provider HTTP calls: ``get`` for blocking code, an httpx transport for async."""
+
+    mode = "live"
+
+    def __init__(self, store: FixtureStore) -> None:
+        self.store = store
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        raise NotImplementedError
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        raise NotImplementedError
+
+
+class RecordingTransport(ProviderTransport):
+    """Call the live providers and record every exchange."""
+
+    mode = "record"
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        import requests
+
+        started = time.perf_counter()
+        resp = requests.get(url, params=params, **kwargs)
+        self._record(url, params or {}, resp.status_code, resp.content, started)
+        return resp
+
+    def async_transport(self, inner: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncBaseTransport:
+        """Recording wrapper around ``inner`` (default: a live HTTP transport)."""
+        return _AsyncRecording(self, inner or httpx.AsyncHTTPTransport())
+
+    def _record(self, url, params: Dict[str, Any], status: int, content: bytes, started: float) -> None:
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        try:
+            body = json.loads(content) if content else None
+        except ValueError:
+            logger.warning("⚠️ Not recording non-JSON response from %s", url)
+            return
+        self.store.put(provider_of(url), params, status, body, elapsed_ms)
+
+
+class _AsyncRecording(httpx.AsyncBaseTransport):
+    def __init__(self, owner: RecordingTransport, inner: httpx.AsyncBaseTransport) -> None:
+        self.owner = owner
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        self.owner._record(request.url, dict(request.url.params), response.status_code, content, started)
+        # aread() already decoded the body: drop the encoding/length headers
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _ENCODING_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(ProviderTransport):
+    """Answer provider requests from a :class:`FixtureStore` with simulated latency and errors.
+
+    Parameters
+    ----------
+    store : FixtureStore
+        Recorded exchanges.
+    latency : str
+        ``"recorded"`` (each fixture's own latency), ``"<ms>"`` or ``"<lo>-<hi>"``
+        (uniform, milliseconds).
+    error_rate : float
+        Share (0–1) of requests answered with ``error_status`` instead.
+    error_status : int
+        Injected HTTP status (503 and 429 are retried by the async client).
+    seed : int, optional
+        Seed for latency and error draws.
+    """
+
+    mode = "replay"
+
+    def __init__(
+        self,
+        store: FixtureStore,
+        *,
+        latency: str = "0",
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(store)
+        self.latency = str(latency).strip().lower()
+        self._range = None if self.latency == "recorded" else _latency_range(self.latency)
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    def _answer(self, url, params: Dict[str, Any]) -> Tuple[float, int, Any]:
+        """``(delay seconds, status, body)`` for one request."""
+        provider = provider_of(url)
+        entry = self.store.get(provider, params)
+        with self._lock:
+            if self._range is None:
+                delay_ms = entry["elapsed_ms"] if entry else 0.0
+            else:
+                delay_ms = self._rng.uniform(*self._range)
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+            self.stats["errors" if failed else "hits" if entry else "misses"] += 1
+        if failed:
+            return delay_ms / 1000, self.error_status, None
+        if entry is None:
+            logger.debug("📼 No fixture for %s %s", provider, params)
+            return delay_ms / 1000, 200, _EMPTY_BODIES.get(provider)
+        return delay_ms / 1000, entry["status"], entry["body"]
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        delay, status, body = self._answer(url, params or {})
+        time.sleep(delay)
+        return _response(status, body, httpx.Request("GET", url, params=params))
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        return _AsyncReplay(self)
+
+
+class _AsyncReplay(httpx.AsyncBaseTransport):
+    def __init__(self, owner: ReplayTransport) -> None:
+        self.owner = owner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay, status, body = self.owner._answer(request.url, dict(request.url.params))
+        await asyncio.sleep(delay)
+        return _response(status, body, request)
+
+
+def _response(status: int, body: Any, request: httpx.Request) -> httpx.Response:
+    if body is None:
+        return httpx.Response(status, request=request)
+    return httpx.Response(status, json=body, request=request)
+
+
+def _latency_range(spec: str) -> Tuple[float, float]:
+    lo, _, hi = spec.partition("-")
+    lo_ms = float(lo or 0)
+    return lo_ms, float(hi) if hi else lo_ms
+
+
+# ─── Configuration ────────────────────────────────────────────────
+_stores: Dict[Path, FixtureStore] = {}
+_stores_lock = threading.Lock()
+
+
+def fixture_store(path: Optional[Path] = None) -> FixtureStore:
+    """Process-wide :class:`FixtureStore` for ``path`` (default ``GEOCODE_FIXTURES``)."""
+    path = Path(path or GEOCODE_FIXTURES)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = FixtureStore(path)
+        return _stores[path]
+
+
+def provider_transport_from_env(mode: Optional[str] = None) -> Optional[ProviderTransport]:
+    """Transport for ``mode`` (default ``MAPEM_GEOCODE_PROVIDER_MODE``); None when live."""
+    mode = (mode or PROVIDER_MODE).strip().lower()
+    if mode in ("", "live"):
+        return None
+    if mode == "record":
+        return RecordingTransport(fixture_store())
+    if mode == "replay":
+        seed = os.getenv("GEOCODE_REPLAY_SEED")
+        return ReplayTransport(
+            fixture_store(),
+            latency=os.getenv("GEOCODE_REPLAY_LATENCY", "0"),
+            error_rate=float(os.getenv("GEOCODE_REPLAY_ERROR_RATE", "0")),
+            error_status=int(os.getenv("GEOCODE_REPLAY_ERROR_STATUS", "503")),
+            seed=int(seed) if seed else None,
+        )
+    logger.warning("⚠️ Unknown MAPEM_GEOCODE_PROVIDER_MODE '%s'; calling providers live", mode)
+    return None
@@ -0,0 +1,271 @@
+"""Cross-process geocode cache: in-process LRU in front of a Redis hash.
+
+Each Flask worker, Celery worker and per-upload :class:`LocationService`
+keeps its own :class:`GeocodeStore` batch, so a place resolved in one
+process used to be resolved again (sometimes with a paid Google call) in
+another.  :class:`SharedGeocodeCache` adds a tier every process sees:
+
+* **L1** – a bounded LRU (``GEOCODE_LRU_SIZE`` entries) per process;
+* **L2** – Redis (the Celery broker by default, ``GEOCODE_REDIS_URL``):
+  resolved places live in one hash ``<namespace>:v1``; misses are stored as
+  separate ``<namespace>:v1:miss:<key>`` strings with a ``GEOCODE_MISS_TTL``
+  expiry, since hash fields cannot expire on their own.
+
+A negative hit stops the plugin chain, so every worker backs off from a
+place that just failed everywhere.  If Redis is unreachable the cache keeps
+working as a plain LRU and retries the connection after
+``REDIS_RETRY_SECONDS``.  :meth:`SharedGeocodeCache.stats` reports hit,
+miss and error counters.
+
+Enable it with ``MAPEM_GEOCODE_SHARED_CACHE=1``; :class:`Geocode` then
+inserts :class:`SharedCacheGeocoder` in its chain and writes results
+through to it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.models.location_models import LocationOut
+from backend.services.geocode_store import MISS_TTL_SECONDS, coerce_record
+from backend.utils.logger import get_file_logger
+from backend.utils.place_parser import parse_place
+
+logger = get_file_logger("geocode_shared_cache")
+
+SHARED_CACHE_ENABLED = os.getenv("MAPEM_GEOCODE_SHARED_CACHE", "0") == "1"
+GEOCODE_REDIS_URL = os.getenv("GEOCODE_REDIS_URL") or os.getenv("CELERY_BROKER", "redis://localhost:6379/0")
+GEOCODE_LRU_SIZE: int = int(os.getenv("GEOCODE_LRU_SIZE", "10000"))
+REDIS_NAMESPACE = os.getenv("GEOCODE_REDIS_NAMESPACE", "mapem:geocode")
+REDIS_RETRY_SECONDS = 30.0
+SHARED_CACHE_VERSION = 1
+
+
+class LRUCache:
+    """Thread-safe, size-bounded mapping of ``key → (record, expires_at)``."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._data: "OrderedDict[str, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            record, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return record
+
+    def put(self, key: str, record: Dict[str, Any], expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (record, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedGeocodeCache:
+    """Two-tier geocode cache shared between processes through Redis.
+
+    Parameters
+    ----------
+    client : redis.Redis, optional
+        Client with ``decode_responses=True``; built lazily from ``url`` when
+        omitted.  Any object with ``hget``/``hset``/``hdel``/``get``/``set``/
+        ``delete`` works (tests use a fake).
+    url : str, optional
+        Redis URL; defaults to ``GEOCODE_REDIS_URL``.
+    lru_size : int, optional
+        L1 capacity; defaults to ``GEOCODE_LRU_SIZE``.
+    miss_ttl : int, optional
+        Seconds a miss is remembered; defaults to ``GEOCODE_MISS_TTL``.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        url: Optional[str] = None,
+        namespace: str = REDIS_NAMESPACE,
+        lru_size: Optional[int] = None,
+        miss_ttl: Optional[int] = None,
+    ) -> None:
+        self._client = client
+        self.url = url or GEOCODE_REDIS_URL
+        self.hash_key = f"{namespace}:v{SHARED_CACHE_VERSION}"
+        self.miss_prefix = f"{self.hash_key}:miss:"
+        self.local = LRUCache(GEOCODE_LRU_SIZE if lru_size is None else lru_size)
+        self.miss_ttl = MISS_TTL_SECONDS if miss_ttl is None else int(miss_ttl)
+        self._down_until = 0.0
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("local_hits", "shared_hits", "negative_hits", "misses", "writes", "errors"), 0
+        )
+
+    # ─── Redis plumbing ───────────────────────────────────────────
+    def _redis(self):
+        if time.time() < self._down_until:
+            return None
+        if self._client is None:
+            try:
+                import redis  # Celery's broker dependency
+
+                self._client = redis.Redis.from_url(
+                    self.url, decode_responses=True, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+        return self._client
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self._count("errors")
+        if time.time() >= self._down_until:
+            logger.warning("⚠️ Shared geocode cache unavailable (%s); LRU only for %ds", exc, REDIS_RETRY_SECONDS)
+        self._down_until = time.time() + REDIS_RETRY_SECONDS
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    # ─── Public API ───────────────────────────────────────────────
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Record for ``key`` from L1, then Redis; misses come back with ``latitude=None``."""
+        record = self.local.get(key)
+        if record is not None:
+            self._count("negative_hits" if record["latitude"] is None else "local_hits")
+            return record
+
+        client = self._redis()
+        if client is None:
+            self._count("misses")
+            return None
+        try:
+            raw = client.hget(self.hash_key, key)
+            if raw is None:
+                raw = client.get(self.miss_prefix + key)
+        except Exception as e:
+            self._redis_failed(e)
+            self._count("misses")
+            return None
+        record = coerce_record(json.loads(raw)) if raw else None
+        if record is None:
+            self._count("misses")
+            return None
+        if record["latitude"] is None:
+            self._count("negative_hits")
+            self.local.put(key, record, (record["timestamp"] or time.time()) + self.miss_ttl)
+        else:
+            self._count("shared_hits")
+            self.local.put(key, record)
+        return record
+
+    def put(self, key: str, entry: Any) -> None:
+        """Store ``entry`` in both tiers; a miss only lives for ``miss_ttl``."""
+        record = coerce_record(entry)
+        if record is None:
+            raise ValueError(f"Unusable geocode cache entry for {key!r}: {entry!r}")
+        if not record["timestamp"]:
+            record["timestamp"] = time.time()
+        negative = record["latitude"] is None
+        self.local.put(key, record, record["timestamp"] + self.miss_ttl if negative else None)
+        self._count("writes")
+
+        client = self._redis()
+        if client is None:
+            return
+        payload = json.dumps(record, separators=(",", ":"))
+        try:
+            if negative:
+                client.set(self.miss_prefix + key, payload, ex=max(1, self.miss_ttl))
+            else:
+                client.hset(self.hash_key, key, payload)
+                client.delete(self.miss_prefix + key)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def delete(self, key: str) -> None:
+        self.local.pop(key)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.hdel(self.hash_key, key)
+            client.delete(self.miss_prefix + key)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["negative_hits"] + stats["misses"]
+        hits = stats["local_hits"] + stats["shared_hits"] + stats["negative_hits"]
+        stats.update(
+            lookups=lookups,
+            hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+            lru_size=len(self.local),
+            redis_available=time.time() >= self._down_until,
+        )
+        return stats
+
+
+class SharedCacheGeocoder:
+    """Geocode plugin that answers from a :class:`SharedGeocodeCache`."""
+
+    def __init__(self, cache: SharedGeocodeCache) -> None:
+        self.cache = cache
+
+    def resolve(self, geocode, session, place):
+        parsed = parse_place(place)
+        place, key = parsed.raw, parsed.key
+        record = self.cache.get(key)
+        if record is None:
+            return None
+        if record["latitude"] is None:
+            from backend.services.geocode import GeocodeError  # circular at import-time
+
+            logger.info("🟥 Shared negative hit for '%s'", place)
+            return GeocodeError(raw_name=place, message="unresolved", reason="cached-miss")
+        logger.info("🟦 Shared cache hit for %s", place)
+        return LocationOut(
+            raw_name=place,
+            normalized_name=record["normalized"] or place,
+            latitude=record["latitude"],
+            longitude=record["longitude"],
+            confidence_score=record["confidence"],
+            confidence_label=record["label"],
+            status=record["status"],
+            source=record["source"],
+        )
+
+
+_shared: Optional[SharedGeocodeCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedGeocodeCache]:
+    """The process-wide cache, or ``None`` unless ``MAPEM_GEOCODE_SHARED_CACHE=1``."""
+    global _shared
+    if not SHARED_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedGeocodeCache()
+        return _shared
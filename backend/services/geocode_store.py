@@ -0,0 +1,403 @@
+"""Persistent geocode cache in an embedded SQLite database.
+
+Replaces the ``geocode_cache.json`` file that :class:`Geocode` used to
+rewrite in full after every lookup.  :class:`GeocodeStore` keeps one row per
+normalised place key with a fixed, versioned column layout::
+
+    key | v | latitude | longitude | normalized | confidence | source
+        | status | label | updated_at | expires_at
+
+Writes are write-behind: :meth:`GeocodeStore.put` only records the entry in
+an in-memory pending batch (O(1)); the batch is upserted in one transaction
+when it reaches ``GEOCODE_CACHE_BATCH_SIZE`` entries, when a daemon timer
+fires ``GEOCODE_CACHE_FLUSH_SECONDS`` after the first pending write, and at
+interpreter exit.  Reads check the pending batch first, then the table.
+
+Misses are stored with an ``expires_at`` deadline (``GEOCODE_MISS_TTL``) and
+are invisible once it passes; :meth:`purge_expired` deletes them through the
+``expires_at`` index instead of scanning every entry.
+
+On first open the legacy JSON cache (``GEOCODE_CACHE_FILE``) is imported
+once, whatever mix of list- and dict-shaped entries it contains.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.config import DATA_DIR
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("geocode_store")
+
+GEOCODE_STORE_VERSION = 1
+GEOCODE_CACHE_DB = Path(os.getenv("GEOCODE_CACHE_DB", str(DATA_DIR / "geocode_cache.sqlite3")))
+LEGACY_CACHE_FILE = Path(
+    os.getenv("GEOCODE_CACHE_FILE", Path(__file__).resolve().parent / "geocode_cache.json")
+)
+MISS_TTL_SECONDS: int = int(os.getenv("GEOCODE_MISS_TTL", "3600"))
+FLUSH_BATCH_SIZE: int = int(os.getenv("GEOCODE_CACHE_BATCH_SIZE", "200"))
+FLUSH_INTERVAL_SECONDS: float = float(os.getenv("GEOCODE_CACHE_FLUSH_SECONDS", "5"))
+
+RECORD_FIELDS = ("latitude", "longitude", "normalized", "confidence", "source", "status", "label", "timestamp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    key        TEXT PRIMARY KEY,
+    v          INTEGER NOT NULL,
+    latitude   REAL,
+    longitude  REAL,
+    normalized TEXT,
+    confidence REAL NOT NULL DEFAULT 0,
+    source     TEXT,
+    status     TEXT,
+    label      TEXT,
+    updated_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_geocode_cache_expires_at
+    ON geocode_cache (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS geocode_cache_meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO geocode_cache
+    (key, v, latitude, longitude, normalized, confidence, source, status, label, updated_at, expires_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    v = excluded.v, latitude = excluded.latitude, longitude = excluded.longitude,
+    normalized = excluded.normalized, confidence = excluded.confidence,
+    source = excluded.source, status = excluded.status, label = excluded.label,
+    updated_at = excluded.updated_at, expires_at = excluded.expires_at
+"""
+
+_INSERT_IF_ABSENT = """
+INSERT OR IGNORE INTO geocode_cache
+    (key, v, latitude, longitude, normalized, confidence, source, status, label, updated_at, expires_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SELECT = (
+    "SELECT latitude, longitude, normalized, confidence, source, status, label, updated_at "
+    "FROM geocode_cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)"
+)
+
+_DELETED = object()  # pending tombstone
+
+
+def coerce_record(entry: Any) -> Optional[Dict[str, Any]]:
+    """Return ``entry`` in the current record shape, or ``None`` if unusable.
+
+    Accepts the dict entries written by :meth:`Geocode.get_or_create_location`
+    as well as the older list layouts
+    ``[lat, lng, norm, conf]``, ``[lat, lng, norm, conf, src, ts]``,
+    ``[lat, lng, norm, conf, src, status, ts]`` and
+    ``[lat, lng, norm, conf, src, status, label, ts]``.
+    """
+    try:
+        if isinstance(entry, dict):
+            lat = entry.get("latitude", entry.get("lat"))
+            lng = entry.get("longitude", entry.get("lng"))
+            src = entry.get("source") or "cache"
+            record = {
+                "latitude": lat,
+                "longitude": lng,
+                "normalized": entry.get("normalized") or entry.get("normalized_name"),
+                "confidence": entry.get("confidence", entry.get("confidence_score")),
+                "source": src,
+                "status": entry.get("status") or ("ok" if lat is not None else "unresolved"),
+                "label": entry.get("label") or src,
+                "timestamp": entry.get("timestamp") or 0.0,
+            }
+        elif isinstance(entry, (list, tuple)):
+            if len(entry) == 4:
+                lat, lng, norm, conf = entry
+                src, status, label, ts = "cache", "ok", "cache", 0.0
+            elif len(entry) == 6 and isinstance(entry[5], (int, float)):
+                lat, lng, norm, conf, src, ts = entry
+                status, label = "ok", src
+            elif len(entry) == 7:
+                lat, lng, norm, conf, src, status, ts = entry
+                label = src
+            elif len(entry) >= 8:
+                lat, lng, norm, conf, src, status, label, ts = entry[:8]
+            else:
+                return None
+            record = dict(zip(RECORD_FIELDS, (lat, lng, norm, conf, src, status, label, ts)))
+        else:
+            return None
+        for coord in ("latitude", "longitude"):
+            if record[coord] is not None:
+                record[coord] = float(record[coord])
+        if (record["latitude"] is None) != (record["longitude"] is None):
+            return None
+        record["confidence"] = float(record["confidence"] or 0.0)
+        record["timestamp"] = float(record["timestamp"] or 0.0)
+        return record
+    except (TypeError, ValueError):
+        return None
+
+
+class GeocodeStore:
+    """Keyed geocode results in SQLite with write-behind batching.
+
+    Parameters
+    ----------
+    path : Path, optional
+        Database file (created on first use); defaults to ``GEOCODE_CACHE_DB``.
+    legacy_json : Path, optional
+        JSON cache imported once into a new database; defaults to
+        ``GEOCODE_CACHE_FILE``.
+    miss_ttl : int, optional
+        Seconds a cached miss stays visible; defaults to ``GEOCODE_MISS_TTL``.
+    batch_size, flush_interval : optional
+        Pending-write thresholds for a flush.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        legacy_json: Optional[Path] = None,
+        miss_ttl: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self._path = Path(path) if path is not None else None
+        self._legacy_json = Path(legacy_json) if legacy_json is not None else None
+        self.miss_ttl = MISS_TTL_SECONDS if miss_ttl is None else int(miss_ttl)
+        self.batch_size = max(1, FLUSH_BATCH_SIZE if batch_size is None else int(batch_size))
+        self.flush_interval = FLUSH_INTERVAL_SECONDS if flush_interval is None else float(flush_interval)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Any] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    # ─── Connection ───────────────────────────────────────────────
+    @property
+    def path(self) -> Path:
+        # Resolved lazily so the module-level GEOCODER does not touch disk at import.
+        return self._path if self._path is not None else GEOCODE_CACHE_DB
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._migrate_legacy_json()
+        return self._conn
+
+    def _migrate_legacy_json(self) -> None:
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM geocode_cache_meta WHERE name = 'legacy_json_imported'").fetchone():
+            return
+        source = self._legacy_json if self._legacy_json is not None else LEGACY_CACHE_FILE
+        rows: List[tuple] = []
+        if source.exists():
+            try:
+                legacy = json.loads(source.read_text())
+            except (OSError, json.JSONDecodeError):
+                logger.warning("⚠️ Legacy geocode cache %s unreadable — skipping import", source)
+                legacy = {}
+            now = time.time()
+            for key, entry in (legacy or {}).items():
+                record = coerce_record(entry)
+                if record is None:
+                    logger.warning("⚠️ Skipping malformed legacy cache entry '%s': %s", key, entry)
+                    continue
+                row = self._row(key, record)
+                if row[-1] is None or row[-1] > now:
+                    rows.append(row)
+        with conn:
+            # INSERT OR IGNORE: rows written by a newer process win over the JSON.
+            conn.executemany(_INSERT_IF_ABSENT, rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache_meta (name, value) VALUES ('legacy_json_imported', ?)",
+                (str(source),),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache_meta (name, value) VALUES ('version', ?)",
+                (str(GEOCODE_STORE_VERSION),),
+            )
+        if rows:
+            logger.info("📦 Imported %d legacy geocode cache entries from %s", len(rows), source)
+
+    def _row(self, key: str, record: Dict[str, Any]) -> tuple:
+        ts = record["timestamp"] or time.time()
+        expires = ts + self.miss_ttl if record["latitude"] is None else None
+        return (
+            key,
+            GEOCODE_STORE_VERSION,
+            record["latitude"],
+            record["longitude"],
+            record["normalized"],
+            record["confidence"],
+            record["source"],
+            record["status"],
+            record["label"],
+            ts,
+            expires,
+        )
+
+    # ─── Mapping-style API (used by Geocode and its plugins) ──────
+    def get(self, key: str, default: Any = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is _DELETED:
+                return default
+            if pending is not None:
+                if pending["latitude"] is None and self._expired(pending):
+                    return default
+                return dict(pending)
+            row = self._db().execute(_SELECT, (key, time.time())).fetchone()
+        if row is None:
+            return default
+        return dict(zip(RECORD_FIELDS, row))
+
+    def put(self, key: str, entry: Any) -> None:
+        """Queue ``entry`` for ``key``; it is visible to :meth:`get` immediately."""
+        record = coerce_record(entry)
+        if record is None:
+            raise ValueError(f"Unusable geocode cache entry for {key!r}: {entry!r}")
+        if not record["timestamp"]:
+            record["timestamp"] = time.time()
+        with self._lock:
+            self._pending[key] = record
+            self._after_write()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pending[key] = _DELETED
+            self._after_write()
+
+    __setitem__ = put
+    __delitem__ = delete
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._lock:
+            (count,) = self._db().execute(
+                "SELECT COUNT(*) FROM geocode_cache WHERE expires_at IS NULL OR expires_at > ?",
+                (time.time(),),
+            ).fetchone()
+        return count
+
+    def keys(self) -> Iterator[str]:
+        self.flush()
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT key FROM geocode_cache WHERE expires_at IS NULL OR expires_at > ?",
+                (time.time(),),
+            ).fetchall()
+        return iter([key for (key,) in rows])
+
+    __iter__ = keys
+
+    # ─── Write-behind ─────────────────────────────────────────────
+    def _after_write(self) -> None:
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._timer is None and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> int:
+        """Write pending entries in one transaction; return how many."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            upserts = [self._row(k, rec) for k, rec in pending.items() if rec is not _DELETED]
+            deletes = [(k,) for k, rec in pending.items() if rec is _DELETED]
+            try:
+                conn = self._db()
+                with conn:
+                    if upserts:
+                        conn.executemany(_UPSERT, upserts)
+                    if deletes:
+                        conn.executemany("DELETE FROM geocode_cache WHERE key = ?", deletes)
+            except sqlite3.Error as e:
+                # Keep the batch (newer writes win) and try again on the next flush.
+                self._pending = {**pending, **self._pending}
+                logger.error("❌ Could not flush geocode cache: %s", e)
+                return 0
+        logger.debug("💾 Flushed %d geocode cache entries", len(pending))
+        return len(pending)
+
+    def purge_expired(self) -> int:
+        """Delete expired misses via the ``expires_at`` index; return how many."""
+        now = time.time()
+        with self._lock:
+            for key, rec in list(self._pending.items()):
+                if rec is not _DELETED and rec["latitude"] is None and self._expired(rec, now):
+                    del self._pending[key]
+            conn = self._db()
+            with conn:
+                removed = conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (now,)).rowcount
+        if removed:
+            logger.info("🧹 Purged %d expired geocode misses", removed)
+        return removed
+
+    def _expired(self, record: Dict[str, Any], now: Optional[float] = None) -> bool:
+        return (record["timestamp"] or 0.0) + self.miss_ttl <= (now or time.time())
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_stores: Dict[Optional[Path], GeocodeStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path: Optional[Path] = None, legacy_json: Optional[Path] = None) -> GeocodeStore:
+    """Process-wide :class:`GeocodeStore` for ``path`` (``None`` → ``GEOCODE_CACHE_DB``).
+
+    Every :class:`Geocode` built for the same file shares one connection and
+    one pending batch; all of them are flushed at interpreter exit.
+    """
+    key = Path(path).resolve() if path is not None else None
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = GeocodeStore(key, legacy_json=legacy_json)
+        return store
+
+
+@atexit.register
+def _close_stores() -> None:
+    for store in list(_stores.values()):
+        try:
+            store.close()
+        except Exception:  # pragma: no cover - best effort at shutdown
+            logger.exception("❌ Could not close geocode cache %s", store.path)
@@ -0,0 +1,328 @@
+"""Incremental re-import of an edited GEDCOM into a new :class:`TreeVersion`.
+
+Every individual and family carries the ``content_hash`` of its raw GEDCOM
+record (see :func:`record_content_hash`).  When the same
+:class:`UploadedTree` is uploaded again, :class:`IncrementalImport` compares
+the new hashes with the previous version and
+
+* **moves** unchanged individuals, families and their events to the new
+  version with a few ``UPDATE … SET tree_id`` statements, and
+* returns the subset of parsed data (added/changed records and their events)
+  that still has to be geocoded and written.
+
+An individual is rewritten when its own record changed or when a family it
+is a spouse in changed, because family events fan out to spouses.  A family
+is rewritten when its record changed or one of its spouses or children is
+rewritten (its foreign keys and parent/child relationships point at
+individual rows).  Events without participants cannot be attributed to a
+record and are always rewritten.
+
+``TreeRelationship`` rows belong to the :class:`UploadedTree`, not to a
+version: rows that involve an individual left behind are deleted and
+rebuilt with the rewritten families.
+
+Rows that are not carried forward stay on the previous version, which is
+marked ``superseded``.  That remainder is *not* a readable tree any more —
+the unchanged rows have moved away — so readers must go through
+:func:`replacement_version` and never serve a superseded version.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from backend.models import Event, Family, Individual, TreeRelationship, TreeVersion, event_participants
+from backend.services.bulk_persist import BULK_BATCH_SIZE, _chunks
+from backend.services.gedcom_normalizer import xref
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("incremental")
+
+SUPERSEDED_STATUS = "superseded"
+
+
+@dataclass
+class RecordDiff:
+    """GEDCOM ids of one record type, bucketed by how they changed."""
+
+    added: Set[str] = field(default_factory=set)
+    changed: Set[str] = field(default_factory=set)
+    unchanged: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "removed": len(self.removed),
+        }
+
+
+def diff_hashes(new: Dict[str, Optional[str]], old: Dict[str, Optional[str]]) -> RecordDiff:
+    """Compare ``gedcom_id → content_hash`` maps; a missing hash counts as changed."""
+    common = new.keys() & old.keys()
+    changed = {gid for gid in common if new[gid] is None or new[gid] != old[gid]}
+    return RecordDiff(
+        added=set(new.keys() - old.keys()),
+        changed=changed,
+        unchanged=common - changed,
+        removed=set(old.keys() - new.keys()),
+    )
+
+
+def previous_version(
+    session: Session, uploaded_tree_id: UUID, version_number: Optional[int] = None
+) -> Optional[TreeVersion]:
+    """Latest version of ``uploaded_tree_id`` (numbered below ``version_number`` if given)."""
+    query = session.query(TreeVersion).filter(TreeVersion.uploaded_tree_id == uploaded_tree_id)
+    if version_number is not None:
+        query = query.filter(TreeVersion.version_number < version_number)
+    return query.order_by(TreeVersion.version_number.desc()).first()
+
+
+def replacement_version(session: Session, version: TreeVersion) -> Optional[TreeVersion]:
+    """Latest version of the same tree when ``version`` is superseded, else None.
+
+    A superseded version lost its unchanged rows to its successor, so it
+    must not be read; callers answer with the replacement instead.
+    """
+    if version.status != SUPERSEDED_STATUS:
+        return None
+    return previous_version(session, version.uploaded_tree_id)
+
+
+def _members(fam: Dict[str, Any]) -> Set[Optional[str]]:
+    """INDI ids of a parsed family's spouses and children."""
+    pointers = [fam.get("husband_id"), fam.get("wife_id"), *fam.get("children", [])]
+    return {xref(p) for p in pointers}
+
+
+class IncrementalImport:
+    """Plan and carry out a re-import of ``data`` against ``previous_version_id``.
+
+    Parameters
+    ----------
+    session : Session
+        Open database session (transaction handled by caller).
+    data : dict
+        Output of :py:meth:`GEDCOMParser.parse_file`.
+    previous_version_id : UUID
+        Version the new upload is compared with.
+    tree_version_id : UUID
+        Freshly created version that receives the result.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        data: Dict[str, List[Dict[str, Any]]],
+        *,
+        previous_version_id: UUID,
+        tree_version_id: UUID,
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> None:
+        self.session = session
+        self.data = data
+        self.previous_version_id = previous_version_id
+        self.tree_version_id = tree_version_id
+        self.batch_size = max(1, int(batch_size))
+
+        self.individuals = RecordDiff()
+        self.families = RecordDiff()
+        self.dirty_individuals: Set[str] = set()
+        self.clean_families: Set[str] = set()
+        self._old_individuals: Dict[str, Tuple[UUID, Optional[str]]] = {}
+        self._old_families: Dict[str, Tuple[UUID, Optional[str], Optional[UUID], Optional[UUID]]] = {}
+        self.moved = {"individuals": 0, "families": 0, "events": 0}
+        self._counts: Optional[Dict[str, Any]] = None
+
+    # ─── Planning ─────────────────────────────────────────────────
+    def plan(self) -> "IncrementalImport":
+        s = self.session
+        prev = self.previous_version_id
+        self._old_individuals = {
+            gid: (pk, digest)
+            for gid, pk, digest in s.execute(
+                select(Individual.gedcom_id, Individual.id, Individual.content_hash).where(Individual.tree_id == prev)
+            )
+        }
+        self._old_families = {
+            gid: (pk, digest, husband_id, wife_id)
+            for gid, pk, digest, husband_id, wife_id in s.execute(
+                select(Family.gedcom_id, Family.id, Family.content_hash, Family.husband_id, Family.wife_id)
+                .where(Family.tree_id == prev)
+            )
+            if gid
+        }
+
+        new_individuals = {ind["gedcom_id"]: ind.get("content_hash") for ind in self.data.get("individuals", [])}
+        new_families = {
+            fam["gedcom_id"]: fam.get("content_hash") for fam in self.data.get("families", []) if fam.get("gedcom_id")
+        }
+        self.individuals = diff_hashes(new_individuals, {g: h for g, (_, h) in self._old_individuals.items()})
+        self.families = diff_hashes(new_families, {g: v[1] for g, v in self._old_families.items()})
+
+        # Spouses of families whose own record moved in any way.
+        touched = self.families.added | self.families.changed | self.families.removed
+        spouses: Set[str] = set()
+        for fam in self.data.get("families", []):
+            if not fam.get("gedcom_id") or fam["gedcom_id"] in touched:
+                spouses.update(xref(fam.get(key)) for key in ("husband_id", "wife_id"))
+        old_gid_by_pk = {pk: gid for gid, (pk, _) in self._old_individuals.items()}
+        for gid in self.families.changed | self.families.removed:
+            _, _, husband_id, wife_id = self._old_families[gid]
+            spouses.update(old_gid_by_pk.get(pk) for pk in (husband_id, wife_id))
+
+        self.dirty_individuals = (
+            self.individuals.added | self.individuals.changed | (spouses & new_individuals.keys())
+        )
+        families_by_gid = {fam.get("gedcom_id"): fam for fam in self.data.get("families", [])}
+        self.clean_families = {
+            gid
+            for gid in self.families.unchanged
+            if not _members(families_by_gid[gid]) & self.dirty_individuals
+        }
+        logger.info(
+            "🔀 Diff vs version %s — individuals %s (%d rewritten), families %s (%d rewritten)",
+            prev,
+            self.individuals.counts(),
+            len(self.dirty_individuals),
+            self.families.counts(),
+            len(self.data.get("families", [])) - len(self.clean_families),
+        )
+        return self
+
+    # ─── Carry forward ────────────────────────────────────────────
+    def carry_forward(self) -> None:
+        """Move unchanged rows (and events that only involve them) to the new version."""
+        s = self.session
+        clean_people = [
+            self._old_individuals[gid][0]
+            for gid in self.individuals.unchanged
+            if gid not in self.dirty_individuals
+        ]
+        clean_pks = set(clean_people)
+        clean_fams = [self._old_families[gid][0] for gid in self.clean_families]
+
+        participants: Dict[UUID, Set[UUID]] = {}
+        for event_id, individual_id in s.execute(
+            select(event_participants.c.event_id, event_participants.c.individual_id)
+            .join(Event.__table__, Event.__table__.c.id == event_participants.c.event_id)
+            .where(Event.__table__.c.tree_id == self.previous_version_id)
+        ):
+            participants.setdefault(event_id, set()).add(individual_id)
+        clean_events = [eid for eid, people in participants.items() if people <= clean_pks]
+
+        self._move(Individual, clean_people)
+        self._move(Family, clean_fams)
+        self._move(Event, clean_events)
+        left_behind = [pk for pk, _ in self._old_individuals.values() if pk not in clean_pks]
+        dropped = self._drop_relationships(left_behind)
+        self.moved = {"individuals": len(clean_people), "families": len(clean_fams), "events": len(clean_events)}
+        logger.info(
+            "📦 Carried forward %s to version %s (%d stale relationships dropped)",
+            self.moved, self.tree_version_id, dropped,
+        )
+
+    def _drop_relationships(self, individual_ids: List[UUID]) -> int:
+        """Delete the tree's relationships that involve ``individual_ids``; rewritten families rebuild them."""
+        uploaded_tree_id = self.session.scalar(
+            select(TreeVersion.uploaded_tree_id).where(TreeVersion.id == self.tree_version_id)
+        )
+        dropped = 0
+        for batch in _chunks(individual_ids, self.batch_size):
+            ids = list(batch)
+            dropped += self.session.execute(
+                delete(TreeRelationship)
+                .where(TreeRelationship.tree_id == uploaded_tree_id)
+                .where(or_(TreeRelationship.person_id.in_(ids), TreeRelationship.related_person_id.in_(ids)))
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
+        return dropped
+
+    def _move(self, model, ids: List[UUID]) -> None:
+        for batch in _chunks(ids, self.batch_size):
+            self.session.execute(
+                update(model)
+                .where(model.id.in_(list(batch)))
+                .values(tree_id=self.tree_version_id)
+                .execution_options(synchronize_session=False)
+            )
+
+    # ─── Resume ───────────────────────────────────────────────────
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-safe state needed to continue after :py:meth:`carry_forward`."""
+        return {
+            "dirty_individuals": sorted(self.dirty_individuals),
+            "clean_families": sorted(self.clean_families),
+            "counts": self.counts(),
+        }
+
+    @classmethod
+    def restore(
+        cls,
+        session: Session,
+        data: Dict[str, List[Dict[str, Any]]],
+        snapshot: Dict[str, Any],
+        *,
+        previous_version_id: UUID,
+        tree_version_id: UUID,
+    ) -> "IncrementalImport":
+        """Rebuild a planned import from :py:meth:`snapshot` without re-diffing.
+
+        After :py:meth:`carry_forward` has been committed the previous
+        version no longer holds the moved rows, so planning again would
+        see them as removed.
+        """
+        plan = cls(session, data, previous_version_id=previous_version_id, tree_version_id=tree_version_id)
+        plan.dirty_individuals = set(snapshot["dirty_individuals"])
+        plan.clean_families = set(snapshot["clean_families"])
+        plan._counts = dict(snapshot["counts"])
+        return plan
+
+    # ─── Results ──────────────────────────────────────────────────
+    def pending(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Parsed records (and their events) that still have to be written."""
+        all_people = {ind["gedcom_id"] for ind in self.data.get("individuals", [])}
+        dirty = self.dirty_individuals
+        return {
+            "individuals": [ind for ind in self.data.get("individuals", []) if ind["gedcom_id"] in dirty],
+            "families": [
+                fam for fam in self.data.get("families", []) if fam.get("gedcom_id") not in self.clean_families
+            ],
+            "events": [
+                evt
+                for evt in self.data.get("events", [])
+                if (gid := evt.get("individual_gedcom_id")) in dirty or gid not in all_people
+            ],
+        }
+
+    def counts(self) -> Dict[str, Any]:
+        if self._counts is not None:
+            return dict(self._counts)
+        ind, fam = self.individuals.counts(), self.families.counts()
+        return {
+            "previous_version_id": str(self.previous_version_id),
+            "individuals": ind,
+            "families": fam,
+            "carried_forward": dict(self.moved),
+            **{key: ind[key] + fam[key] for key in ("added", "changed", "unchanged", "removed")},
+        }
+
+    def finalize(self) -> Dict[str, Any]:
+        """Record the diff on the new version and retire the previous one."""
+        counts = self.counts()
+        new_version = self.session.get(TreeVersion, self.tree_version_id)
+        if new_version is not None:
+            new_version.diff_summary = json.dumps(counts)
+        old_version = self.session.get(TreeVersion, self.previous_version_id)
+        if old_version is not None:
+            old_version.status = SUPERSEDED_STATUS
+        return counts
@@ -0,0 +1,207 @@
+"""Point geometry of :class:`Location` rows: writing, near-duplicate lookup, backfill.
+
+:func:`apply_location_fix` writes a geocoder hit to every ``locations`` row of
+a name (coordinates, geometry, their events' ``geom``) for background jobs.
+
+``LocationService`` used to find coordinate duplicates with
+``abs(latitude - lat) < ε AND abs(longitude - lng) < ε``, which no index can
+serve, so every insert scanned ``locations``.  :func:`find_near_duplicate`
+instead uses
+
+* PostgreSQL: ``ST_DWithin(geom, point, ε)``, served by the GiST index
+  ``ix_locations_geom``;
+* other backends (SQLite in tests): ``geohash IN (...)`` over the cells the
+  tolerance box touches, served by ``ix_locations_geohash``, then the exact
+  float comparison on those few rows.
+
+Both columns are only as good as their coverage.  New rows get them from
+:func:`point_fields`; legacy rows with only latitude/longitude are filled by
+:func:`run_geometry_backfill`, a resumable ``location_geometry_backfill``
+:class:`Job`.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from backend.models import Event, Job
+from backend.models.location import Location
+from backend.services.fuzzy_place_index import notify_locations
+from backend.utils.geohash import covering, point_geohash
+from backend.utils.logger import get_file_logger
+from backend.utils.uuid_utils import as_uuid
+
+logger = get_file_logger("location_geometry")
+
+# tolerance for coordinate duplicates, in degrees (~1 meter)
+EPSILON = 1e-5
+BACKFILL_BATCH_SIZE: int = int(os.getenv("GEOM_BACKFILL_BATCH", "1000"))
+JOB_TYPE = "location_geometry_backfill"
+
+
+def point_fields(lat: Optional[float], lng: Optional[float]) -> Dict[str, Any]:
+    """``geom`` and ``geohash`` column values for a point (None without coordinates)."""
+    if lat is None or lng is None:
+        return {"geom": None, "geohash": None}
+    return {
+        "geom": from_shape(Point(float(lng), float(lat)), srid=4326),
+        "geohash": point_geohash(lat, lng),
+    }
+
+
+def find_near_duplicate(
+    session: Session,
+    lat: Optional[float],
+    lng: Optional[float],
+    *,
+    tolerance: float = EPSILON,
+) -> Optional[Location]:
+    """First :class:`Location` within ``tolerance`` degrees of a point, using an index."""
+    if lat is None or lng is None:
+        return None
+    query = session.query(Location)
+    if session.get_bind().dialect.name == "postgresql":
+        point = func.ST_SetSRID(func.ST_MakePoint(float(lng), float(lat)), 4326)
+        return query.filter(func.ST_DWithin(Location.geom, point, tolerance)).first()
+    return (
+        query.filter(
+            Location.geohash.in_(sorted(covering(float(lat), float(lng), tolerance))),
+            func.abs(Location.latitude - lat) < tolerance,
+            func.abs(Location.longitude - lng) < tolerance,
+        )
+        .first()
+    )
+
+
+def apply_location_fix(session: Session, out, *, normalized_name: str, raw_name: Optional[str] = None, geocoded_by: str) -> int:
+    """Write a resolved ``LocationOut`` to the ``locations`` rows named ``normalized_name``.
+
+    Their events' ``geom`` follows.  Without a row, one is inserted (needs
+    ``raw_name``).  Returns the number of location rows written.
+    """
+    fields = point_fields(out.latitude, out.longitude)
+    now = datetime.utcnow()
+    values = {
+        "latitude": out.latitude,
+        "longitude": out.longitude,
+        "confidence_score": float(out.confidence_score or 0.0),
+        "status": "ok",
+        "source": out.source or geocoded_by,
+        "geocoded_at": now,
+        "geocoded_by": geocoded_by,
+        "updated_at": now,
+        **fields,
+    }
+    ids = list(session.scalars(select(Location.id).where(Location.normalized_name == normalized_name)))
+    if ids:
+        session.execute(update(Location).where(Location.id.in_(ids)).values(**values))
+        session.execute(update(Event).where(Event.location_id.in_(ids)).values(geom=fields["geom"]))
+        notify_locations(
+            session, ((pk, normalized_name, out.latitude, out.longitude, values["confidence_score"]) for pk in ids)
+        )
+        return len(ids)
+    if not raw_name:
+        return 0
+    session.add(Location(raw_name=raw_name, normalized_name=normalized_name, **values))
+    return 1
+
+
+# ─── Backfill ─────────────────────────────────────────────────────
+def _missing_geometry():
+    return (
+        Location.latitude.isnot(None),
+        Location.longitude.isnot(None),
+        or_(Location.geom.is_(None), Location.geohash.is_(None)),
+    )
+
+
+def backfill_batch(session: Session, *, after_id=None, limit: int = BACKFILL_BATCH_SIZE):
+    """Fill ``geom``/``geohash`` for up to ``limit`` rows after ``after_id``.
+
+    Returns ``(rows updated, last id seen)``; the id is None once no rows remain.
+    """
+    stmt = select(Location.id, Location.latitude, Location.longitude).where(*_missing_geometry())
+    if after_id is not None:
+        stmt = stmt.where(Location.id > after_id)
+    rows = session.execute(stmt.order_by(Location.id).limit(limit)).all()
+    if not rows:
+        return 0, None
+    params = [{"b_id": loc_id, **point_fields(lat, lng)} for loc_id, lat, lng in rows]
+    session.execute(
+        update(Location.__table__)
+        .where(Location.__table__.c.id == bindparam("b_id"))
+        .values(geom=bindparam("geom"), geohash=bindparam("geohash")),
+        params,
+    )
+    return len(rows), rows[-1][0]
+
+
+def create_backfill_job(session: Session) -> Job:
+    """Queue-ready backfill :class:`Job` (``task_id`` set by the caller)."""
+    pending = session.scalar(select(func.count()).select_from(Location).where(*_missing_geometry()))
+    job = Job(task_id="", job_type=JOB_TYPE, status="queued", progress=0, params={"pending": int(pending or 0)})
+    session.add(job)
+    session.flush()
+    return job
+
+
+def run_geometry_backfill(job_id, *, session_factory=None, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Backfill legacy Location geometry for a job, committing per batch.
+
+    Parameters
+    ----------
+    job_id : UUID | str
+        The :class:`Job` created by :func:`create_backfill_job`.
+    session_factory : sessionmaker, optional
+        Defaults to ``backend.db.SessionLocal``.
+    batch_size : int, optional
+        Rows per committed batch (``GEOM_BACKFILL_BATCH``).
+    """
+    if session_factory is None:
+        from backend.db import SessionLocal as session_factory
+    size = max(1, batch_size or BACKFILL_BATCH_SIZE)
+    job_id = as_uuid(job_id)
+
+    with session_factory.begin() as session:
+        job = session.get(Job, job_id)
+        if job is None:
+            raise LookupError(f"Job {job_id} not found")
+        pending = int((job.params or {}).get("pending") or 0)
+        checkpoint = dict(job.checkpoint or {})
+        job.status = "started"
+    after_id = checkpoint.get("after_id")
+    updated = int(checkpoint.get("updated") or 0)
+    if after_id:
+        logger.info("🔁 geometry backfill %s: resuming after %s (%d done)", job_id, after_id, updated)
+
+    while True:
+        with session_factory.begin() as session:
+            count, last_id = backfill_batch(session, after_id=_id_value(after_id), limit=size)
+            if not count:
+                break
+            updated += count
+            after_id = str(last_id)
+            job = session.get(Job, job_id)
+            job.checkpoint = {"after_id": after_id, "updated": updated}
+            job.progress = min(99, 100 * updated // pending) if pending else 0
+            job.status = "progress"
+
+    with session_factory.begin() as session:
+        job = session.get(Job, job_id)
+        job.status = "success"
+        job.progress = 100
+        job.error = None
+        job.result = {"updated": updated}
+    logger.info("✅ geometry backfill %s: %d locations updated", job_id, updated)
+    return {"updated": updated}
+
+
+def _id_value(value):
+    return as_uuid(value) if value is not None else None
@@ -22,9 +22,12 @@ from typing import Dict, Optional, Any
 
 
 from backend.utils.helpers import normalize_location
+from backend.utils.place_parser import parse_place
 from backend.utils.logger import get_file_logger
 from backend.models.location_models import LocationOut
 from backend.services.geocode import Geocode
+from backend.services.spatial_context import SpatialContext
+from backend.services.unresolved_log import record_unresolved
 
 logger = get_file_logger("location_processor")
 
@@ -33,15 +36,13 @@ DATA_DIR = Path(DATA_DIR)
 DATA_DIR.mkdir(exist_ok=True, parents=True)
 
 MANUAL_FIXES_PATH   = DATA_DIR / "manual_place_fixes.json"
-UNRESOLVED_LOG_PATH = DATA_DIR / "unresolved_locations.json"
+UNRESOLVED_LOG_PATH = DATA_DIR / "unresolved_locations.json"  # legacy; see unresolved_log.import_legacy_json
 HISTORICAL_DIR      = DATA_DIR / "historical_places"
 HISTORICAL_DIR.mkdir(exist_ok=True, parents=True)
 
 GEOCODER = Geocode(api_key=settings.GEOCODE_API_KEY)
 logger.info("🧪 Using GEOCODE_API_KEY = %s", (settings.GEOCODE_API_KEY[:6] + "...") if settings.GEOCODE_API_KEY else "None")
 
-_SEEN_UNRESOLVED: set[str] = set()
-
 # ────── JSON helpers ──────
 
 def _safe_load_json(path: Path, default: Any) -> Any:
@@ -110,37 +111,25 @@ _load_historical_places()
 # ────── Unresolved logger helper ──────
 
 def _log_unresolved_once(raw: str, reason: str, tree_id: Optional[str]) -> None:
-    key = f"{raw}|{reason}|{tree_id}"
-    if key in _SEEN_UNRESOLVED:
-        return
-    _SEEN_UNRESOLVED.add(key)
-
-    entry = {
-        "raw_name": raw,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "reason": reason,
-        "status": "manual_fix_pending",
-        # stringify the UUID so json.dump won’t freak out
-        "tree_id": str(tree_id) if tree_id is not None else None,
-    }
+    """Count an unresolved place in the ``unresolved_places`` table (batched)."""
+    logger.warning("📝 unresolved: %s (%s, tree=%s)", raw, reason, tree_id)
     try:
-        data = []
-        if UNRESOLVED_LOG_PATH.exists():
-            with open(UNRESOLVED_LOG_PATH, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    logger.warning("⚠️ Corrupt unresolved log; starting fresh")
-                    data = []
-        data.append(entry)
-        with open(UNRESOLVED_LOG_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        logger.warning("📝 unresolved logged: %s", entry)
+        record_unresolved(raw, reason, tree_id)
     except Exception as e:
-        logger.error("❌ failed to write unresolved_location for '%s': %s", raw, e)
+        logger.error("❌ failed to log unresolved_location for '%s': %s", raw, e)
 
 # ────── Main processor ──────
 
+def needs_geocoder(raw_place: str) -> bool:
+    """True when :func:`process_location` would fall through to the geocoder chain."""
+    norm = parse_place(raw_place).slug
+    if not norm:
+        return False
+    return not (
+        norm in MANUAL_FIXES or norm in COUNTY_VAGUE or norm in STATE_VAGUE or norm in HISTORICAL_LOOKUP
+    )
+
+
 def process_location(
     raw_place: str,
     source_tag: str = "",
@@ -148,10 +137,15 @@ def process_location(
     tree_id: Optional[str] = None,
     db_session=None,
     geocoder: Optional[Geocode] = None,
+    spatial: Optional[SpatialContext] = None,
 ) -> LocationOut:
-    """Primary resolver used by parser & API."""
+    """Primary resolver used by parser & API.
+
+    ``spatial`` (the tree's :class:`SpatialContext`) lets the gazetteer tier
+    prefer candidates near places the family is already known at.
+    """
     now = datetime.now(timezone.utc).isoformat()
-    norm = normalize_location(raw_place)
+    norm = parse_place(raw_place).slug
     geo_service = geocoder or GEOCODER
 
     logger.info(
@@ -275,6 +269,7 @@ def process_location(
         event_year=event_year,
         admin_hint=None,
         family_coords=None,
+        **({"spatial": spatial} if spatial is not None else {}),
     )
     if geo and geo.latitude is not None and geo.longitude is not None:
         if geo.source == "cache":
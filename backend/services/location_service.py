@@ -5,24 +5,20 @@ from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional, Any, List
 
-from sqlalchemy import func
 from sqlalchemy.orm import Session
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point
 
 from backend.models.location_models import LocationOut
 from backend.models.location import Location
 from backend.services.geocode import Geocode
-from backend.services.location_processor import process_location
-from backend.utils.helpers import normalize_location
+from backend.services.location_geometry import EPSILON, find_near_duplicate, point_fields
+from backend.services.location_processor import needs_geocoder, process_location
+from backend.services.spatial_context import SpatialContext
+from backend.utils.place_parser import parse_place
 from backend.utils.logger import get_file_logger
 from backend.config import DATA_DIR
 
 logger = get_file_logger("loc_services")
 
-# tolerance for float comparisons (~1 meter)
-EPSILON = 1e-5
-
 
 class LocationResolutionError(Exception):
     """Raised when a location cannot be resolved or persisted."""
@@ -123,7 +119,7 @@ class LocationService:
 
     def _normalize_input(self, raw_place: str) -> str:
         """Normalize the raw_place string for lookup."""
-        return normalize_location(raw_place) or ""
+        return parse_place(raw_place).slug or ""
 
     def _lookup_existing(
         self,
@@ -134,7 +130,8 @@ class LocationService:
     ) -> Location | None:
         """
         Check for an existing Location by normalized name or by
-        close-enough latitude/longitude.
+        close-enough latitude/longitude (indexed, see
+        :func:`~backend.services.location_geometry.find_near_duplicate`).
         """
         if not normalized:
             return None
@@ -142,16 +139,7 @@ class LocationService:
         if loc := session.query(Location).filter_by(normalized_name=normalized).first():
             return loc
 
-        if lat is not None and lng is not None:
-            return (
-                session.query(Location)
-                .filter(
-                    func.abs(Location.latitude - lat) < EPSILON,
-                    func.abs(Location.longitude - lng) < EPSILON,
-                )
-                .first()
-            )
-        return None
+        return find_near_duplicate(session, lat, lng, tolerance=EPSILON)
 
     def _resolve(
         self,
@@ -159,6 +147,7 @@ class LocationService:
         event_year: Optional[int],
         source_tag: str,
         tree_id: Optional[str],
+        spatial: Optional[SpatialContext] = None,
     ) -> LocationOut:
         """Delegate to the existing process_location logic."""
         return process_location(
@@ -167,6 +156,7 @@ class LocationService:
             event_year=event_year,
             tree_id=tree_id,
             geocoder=self.geocoder,
+            **({"spatial": spatial} if spatial is not None else {}),
         )
 
     def _insert_location(
@@ -193,9 +183,11 @@ class LocationService:
                 confidence_score=loc_out.confidence_score,
                 status=loc_out.status,
                 source=loc_out.source,
+                **point_fields(loc_out.latitude, loc_out.longitude),
             )
-            # context-managed transaction
-            with session.begin():
+            # Savepoint: the duplicate lookup has already begun the caller's
+            # transaction; a failed insert rolls back only this row
+            with session.begin_nested():
                 session.add(loc)
 
             logger.info("📝 Location inserted '%s' (id=%s)", loc.normalized_name, loc.id)
@@ -218,8 +210,13 @@ class LocationService:
         tree_id: Optional[str] = None,
         db_session: Session | None = None,
         save: bool = False,
+        spatial: Optional[SpatialContext] = None,
     ) -> LocationOut:
-        """Resolve raw_place → LocationOut, optionally persisting to DB."""
+        """Resolve raw_place → LocationOut, optionally persisting to DB.
+
+        ``spatial`` is the tree's :class:`SpatialContext`; it only steers
+        gazetteer disambiguation and is not updated here.
+        """
         self._validate_inputs(raw_place, event_year, source_tag)
 
         if not raw_place or not raw_place.strip():
@@ -240,7 +237,7 @@ class LocationService:
                 logger.debug("🔎 Found existing location '%s'", normalized)
                 return LocationOut.model_validate(existing)
 
-        loc_out = self._resolve(raw_place, event_year, source_tag, tree_id)
+        loc_out = self._resolve(raw_place, event_year, source_tag, tree_id, spatial)
 
         if save and db_session is not None:
             if loc_out.status == self.STATUS_UNRESOLVED or not loc_out.normalized_name:
@@ -265,6 +262,7 @@ class LocationService:
         Batch-resolve a list of raw_place strings using a single geocoder
         instance and (optional) DB session.
         """
+        self.prefetch(raw_places, db_session=db_session, event_year=event_year)
         results: list[LocationOut] = []
         for place in raw_places:
             results.append(
@@ -279,6 +277,29 @@ class LocationService:
             )
         return results
 
+    def prefetch(
+        self,
+        raw_places: List[str],
+        *,
+        db_session: Session | None = None,
+        event_year: Optional[int] = None,
+    ) -> int:
+        """
+        Geocode, concurrently, every place that resolve_location would send
+        to the geocoder, so the per-place calls that follow are cache hits.
+        Returns how many places were sent.
+        """
+        todo = []
+        for raw in dict.fromkeys(p.strip() for p in raw_places if p and p.strip()):
+            if not needs_geocoder(raw):
+                continue
+            if db_session is not None and self._lookup_existing(db_session, self._normalize_input(raw)):
+                continue
+            todo.append(raw)
+        if todo:
+            self.geocoder.resolve_many(db_session, todo, event_year=event_year)
+        return len(todo)
+
 
 logger.debug(
     "✅ LocationService loaded with resolve_location=%s",
@@ -0,0 +1,157 @@
+"""Content-addressed cache of normalised GEDCOM parses.
+
+Uploads are hashed (SHA-256) while they are saved; :class:`ParseCache` keeps
+the output of :py:meth:`GEDCOMParser.parse_file` under that digest, so an
+identical file (a retry, a double submit, the same export uploaded to a
+second tree) skips reading and normalisation and goes straight to
+persistence.
+
+Entries are zlib-compressed compact JSON behind a small header and live in
+``DATA_DIR/parse_cache``.  Reads refresh an entry's mtime; after every write
+the oldest entries are evicted until the directory fits in
+``MAPEM_PARSE_CACHE_MAX_MB`` (``0`` disables the cache).
+
+Bump :data:`PARSE_CACHE_VERSION` whenever the normalised output changes
+shape or content, so stale entries are ignored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.config import DATA_DIR
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("parse_cache")
+
+PARSE_CACHE_VERSION = 2
+PARSE_CACHE_DIR = Path(os.getenv("MAPEM_PARSE_CACHE_DIR", str(DATA_DIR / "parse_cache")))
+PARSE_CACHE_MAX_MB: int = int(os.getenv("MAPEM_PARSE_CACHE_MAX_MB", "256"))
+
+_MAGIC = b"MAPEMPC"
+_HEADER = _MAGIC + bytes([PARSE_CACHE_VERSION])
+_SUFFIX = ".mpc"
+_CHUNK = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file on disk, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Directory of ``<sha256>.mpc`` entries, bounded by total size.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Cache directory (created on first write); defaults to ``PARSE_CACHE_DIR``.
+    max_bytes : int, optional
+        Size budget for all entries; ``0`` turns the cache off.  Defaults to
+        ``MAPEM_PARSE_CACHE_MAX_MB``.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root if root is not None else PARSE_CACHE_DIR)
+        self.max_bytes = max(0, int(PARSE_CACHE_MAX_MB << 20 if max_bytes is None else max_bytes))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, digest: str) -> Path:
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Not a SHA-256 hex digest: {digest!r}")
+        return self.root / f"{digest}{_SUFFIX}"
+
+    def get(self, digest: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Cached parse for ``digest`` or ``None`` (miss, stale or unreadable)."""
+        if not self.enabled:
+            return None
+        path = self._path(digest)
+        try:
+            blob = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("⚠️ Could not read parse cache %s: %s", path.name, exc)
+            return None
+        if not blob.startswith(_HEADER):
+            logger.info("♻️ Ignoring stale parse cache entry %s", path.name)
+            return None
+        try:
+            data = json.loads(zlib.decompress(blob[len(_HEADER):]))
+        except (zlib.error, ValueError) as exc:
+            logger.warning("⚠️ Corrupt parse cache entry %s: %s", path.name, exc)
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except OSError:
+            pass
+        logger.info("⚡ Parse cache hit %s (%d bytes)", digest[:12], len(blob))
+        return data
+
+    def put(self, digest: str, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Store ``data`` under ``digest`` and evict down to the size budget."""
+        if not self.enabled:
+            return
+        path = self._path(digest)
+        try:
+            payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as exc:
+            logger.warning("⚠️ Parse result not cacheable: %s", exc)
+            return
+        blob = _HEADER + zlib.compress(payload, 6)
+        if len(blob) > self.max_bytes:
+            logger.info("⏭️ Parse result %s (%d bytes) exceeds cache budget", digest[:12], len(blob))
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(blob)
+            os.replace(tmp, path)  # atomic: readers never see a partial entry
+        except OSError as exc:
+            logger.warning("⚠️ Could not write parse cache %s: %s", path.name, exc)
+            return
+        logger.info("💾 Cached parse %s (%d → %d bytes)", digest[:12], len(payload), len(blob))
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits; return count removed."""
+        entries = []
+        for entry in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._unlink(entry)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("🧹 Evicted %d parse cache entries (now %d bytes)", removed, total)
+        return removed
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -1,18 +1,23 @@
 #/Users/kingal/mapem/backend/services/parser.py
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from uuid import UUID
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from .gedcom_core import GedcomCoreParser
+from .gedcom_stream import GedcomStreamParser
 from .gedcom_normalizer import (
     normalize_individual,
     normalize_family,
     extract_events_from_individual,
     extract_events_from_family,
     parse_date_flexible,
+    record_content_hash,
+    xref,
 )
 from ..models import (
     Individual,
@@ -22,7 +27,12 @@ from ..models import (
     Location,
     TreeVersion,
 )
+from backend.services.bulk_persist import BulkPersister, upsert_locations
+from backend.services.incremental import IncrementalImport
+from backend.services.parse_cache import ParseCache
+from backend.services.location_geometry import point_fields
 from backend.services.location_service import LocationService
+from backend.services.spatial_context import SpatialContext
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
 from backend.utils.helpers import split_full_name
@@ -48,6 +58,33 @@ TAG_CATEGORY_MAP: Dict[str, str] = {
 
 FANOUT_TAGS = {"MARR", "DIV"}
 
+# Set-based writes are the default; MAPEM_BULK_PERSIST=0 falls back to the
+# original row-by-row ORM path.
+BULK_PERSIST: bool = os.getenv("MAPEM_BULK_PERSIST", "1") == "1"
+
+# "ged4py" builds the full record tree with ged4py first; "stream" uses the
+# memory-mapped single-pass tokenizer in gedcom_stream.
+GEDCOM_ENGINES = ("ged4py", "stream")
+GEDCOM_ENGINE: str = os.getenv("MAPEM_GEDCOM_ENGINE", "ged4py").lower()
+
+# Worker processes for normalisation (stream engine only); 0/1 keeps it serial.
+# Shards are cut on record boundaries, at least NORMALIZE_SHARD_BYTES each and
+# a few per worker so uneven shards still balance.
+NORMALIZE_WORKERS: int = int(os.getenv("MAPEM_NORMALIZE_WORKERS", "0"))
+NORMALIZE_SHARD_BYTES: int = int(os.getenv("MAPEM_NORMALIZE_SHARD_BYTES", str(1 << 20)))
+SHARDS_PER_WORKER = 4
+
+
+def _normalize_shard(file_path: str, start: int, end: int) -> Tuple[list, list, list, list]:
+    """Worker entry point: normalise the records in one byte range."""
+    individuals, families, ind_events, fam_events = [], [], [], []
+    for raw in GedcomStreamParser(file_path).iter_records(start, end):
+        if raw.tag == "INDI":
+            GEDCOMParser._normalize_individual(raw, individuals, ind_events)
+        elif raw.tag == "FAM":
+            GEDCOMParser._normalize_family(raw, families, fam_events)
+    return individuals, families, ind_events, fam_events
+
 
 class GEDCOMParser:
     """End‑to‑end pipeline: **read GEDCOM → normalise → persist**.
@@ -57,57 +94,64 @@ class GEDCOMParser:
     process multiple files.
     """
 
-    def __init__(self, file_path: str, location_service: LocationService):
+    def __init__(
+        self,
+        file_path: str,
+        location_service: LocationService,
+        engine: Optional[str] = None,
+        workers: Optional[int] = None,
+        content_digest: Optional[str] = None,
+        parse_cache: Optional[ParseCache] = None,
+    ):
         self.file_path = file_path
+        # SHA-256 of the file; when set, parse_file() goes through the parse cache.
+        self.content_digest = content_digest
+        self.parse_cache = parse_cache if parse_cache is not None else ParseCache()
         self.location_service = location_service
+        self.engine = (engine or GEDCOM_ENGINE).lower()
+        if self.engine not in GEDCOM_ENGINES:
+            raise ValueError(f"Unknown GEDCOM engine '{self.engine}' (expected one of {GEDCOM_ENGINES})")
+        self.workers = NORMALIZE_WORKERS if workers is None else workers
         self.data: Dict[str, List[Dict[str, Any]]] = {}
-        logger.debug("Initialized GEDCOMParser for %s", file_path)
+        logger.debug("Initialized GEDCOMParser for %s (engine=%s, workers=%s)", file_path, self.engine, self.workers)
 
     def parse_file(self) -> Dict[str, List[Dict[str, Any]]]:
         """Parse *once* and cache the result in :pyattr:`data`."""
         t0 = datetime.now()
-        logger.info("📂 Starting parse of %s", self.file_path)
-
-        core = GedcomCoreParser(self.file_path)
-        raw = core.parse()  # returns nested dicts/lists
-        logger.debug("Raw parse finished in %.2fs", (datetime.now() - t0).total_seconds())
-
-        individuals, families, events = [], [], []
-
-        # 1️⃣ Individuals -----------------------------------------------------------------
-        for raw_ind in raw.get("individuals", []):
-            norm = normalize_individual(raw_ind)
-            individuals.append(norm)
-
-            evts = extract_events_from_individual(raw_ind, norm)
-            for evt in evts:
-                tag = (evt.get("source_tag") or "").upper()
-                evt["category"] = TAG_CATEGORY_MAP.get(tag, "unspecified")
-            events.extend(evts)
-
-        # 2️⃣ Families --------------------------------------------------------------------
-        for raw_fam in raw.get("families", []):
-            fam_norm = normalize_family(raw_fam)
-            families.append(fam_norm)
-
-            fam_evts_all = extract_events_from_family(raw_fam, fam_norm)
-            fam_evts_keep = []
-            for evt in fam_evts_all:
-                tag = (evt.get("source_tag") or "").upper()
-                evt["category"] = TAG_CATEGORY_MAP.get(tag, "unspecified")
-
-                # fan‑out marriage/divorce to spouses
-                if tag in FANOUT_TAGS:
-                    for spouse in (fam_norm.get("husband_id"), fam_norm.get("wife_id")):
-                        if spouse:
-                            indiv_evt = evt.copy()
-                            indiv_evt["individual_gedcom_id"] = spouse
-                            events.append(indiv_evt)
-                            # 📝 Fan-out log
-                            logger.info(f"🔁 FAN-OUT {tag} → gedcom_id {spouse}")
-                    continue  # skip family‑level record
-                fam_evts_keep.append(evt)
-            events.extend(fam_evts_keep)
+        logger.info("📂 Starting parse of %s (engine=%s)", self.file_path, self.engine)
+
+        if self.content_digest:
+            cached = self.parse_cache.get(self.content_digest)
+            if cached is not None:
+                self.data = cached
+                logger.info(
+                    "⚡ parse_file served from cache: %d individuals, %d families, %d events",
+                    len(cached["individuals"]), len(cached["families"]), len(cached["events"]),
+                )
+                return self.data
+
+        individuals, families, ind_events, fam_events = [], [], [], []
+
+        shards = self._shard_spans()
+        if shards:
+            individuals, families, ind_events, fam_events = self._normalize_parallel(shards)
+        elif self.engine == "stream":
+            # Records are normalised as the tokenizer yields them.
+            for raw in GedcomStreamParser(self.file_path).iter_records():
+                if raw.tag == "INDI":
+                    self._normalize_individual(raw, individuals, ind_events)
+                elif raw.tag == "FAM":
+                    self._normalize_family(raw, families, fam_events)
+        else:
+            core = GedcomCoreParser(self.file_path)
+            raw = core.parse()  # returns nested dicts/lists
+            logger.debug("Raw parse finished in %.2fs", (datetime.now() - t0).total_seconds())
+            for raw_ind in raw.get("individuals", []):
+                self._normalize_individual(raw_ind, individuals, ind_events)
+            for raw_fam in raw.get("families", []):
+                self._normalize_family(raw_fam, families, fam_events)
+
+        events = ind_events + fam_events
 
         # 📝 Summary after parsing
         logger.info(
@@ -120,8 +164,84 @@ class GEDCOMParser:
             "events": events,
         }
         logger.debug("parse_file() complete in %.2fs", (datetime.now() - t0).total_seconds())
+        if self.content_digest:
+            self.parse_cache.put(self.content_digest, self.data)
         return self.data
 
+    # ── Parallel normalisation ----------------------------------------------------
+    def _shard_spans(self) -> List[Tuple[int, int]]:
+        """Byte ranges for the process pool, or ``[]`` to stay serial."""
+        if self.workers <= 1:
+            return []
+        if self.engine != "stream":
+            logger.warning("⚠️ workers=%d ignored: parallel normalisation needs engine='stream'", self.workers)
+            return []
+        size = os.path.getsize(self.file_path)
+        shards = min(self.workers * SHARDS_PER_WORKER, size // max(1, NORMALIZE_SHARD_BYTES))
+        if shards <= 1:
+            return []
+        spans = GedcomStreamParser(self.file_path).shard_spans(shards)
+        return spans if len(spans) > 1 else []
+
+    def _normalize_parallel(self, shards: List[Tuple[int, int]]) -> Tuple[list, list, list, list]:
+        """Normalise shards in a :class:`ProcessPoolExecutor`, merged in file order."""
+        logger.info("🧵 Normalising %d shards on %d workers", len(shards), self.workers)
+        individuals, families, ind_events, fam_events = [], [], [], []
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as pool:
+                futures = [pool.submit(_normalize_shard, self.file_path, start, end) for start, end in shards]
+                # Collect in submission order so the merge is deterministic.
+                for fut in futures:
+                    inds, fams, ievts, fevts = fut.result()
+                    individuals.extend(inds)
+                    families.extend(fams)
+                    ind_events.extend(ievts)
+                    fam_events.extend(fevts)
+        except (AssertionError, OSError, RuntimeError) as exc:
+            # e.g. daemonic Celery prefork workers may not spawn children.
+            logger.warning("⚠️ Process pool unavailable (%s); normalising serially", exc)
+            individuals, families, ind_events, fam_events = _normalize_shard(self.file_path, shards[0][0], shards[-1][1])
+        return individuals, families, ind_events, fam_events
+
+    # 1️⃣ Individuals -----------------------------------------------------------------
+    @staticmethod
+    def _normalize_individual(raw_ind, individuals: List[Dict[str, Any]], events: List[Dict[str, Any]]) -> None:
+        norm = normalize_individual(raw_ind)
+        norm["content_hash"] = record_content_hash(raw_ind)
+        individuals.append(norm)
+
+        evts = extract_events_from_individual(raw_ind, norm)
+        for evt in evts:
+            tag = (evt.get("source_tag") or "").upper()
+            evt["category"] = TAG_CATEGORY_MAP.get(tag, "unspecified")
+        events.extend(evts)
+
+    # 2️⃣ Families --------------------------------------------------------------------
+    @staticmethod
+    def _normalize_family(raw_fam, families: List[Dict[str, Any]], events: List[Dict[str, Any]]) -> None:
+        fam_norm = normalize_family(raw_fam)
+        fam_norm["content_hash"] = record_content_hash(raw_fam)
+        families.append(fam_norm)
+
+        fam_evts_all = extract_events_from_family(raw_fam, fam_norm)
+        fam_evts_keep = []
+        for evt in fam_evts_all:
+            tag = (evt.get("source_tag") or "").upper()
+            evt["category"] = TAG_CATEGORY_MAP.get(tag, "unspecified")
+
+            # fan‑out marriage/divorce to spouses
+            if tag in FANOUT_TAGS:
+                for spouse in (fam_norm.get("husband_id"), fam_norm.get("wife_id")):
+                    if spouse:
+                        indiv_evt = evt.copy()
+                        indiv_evt["individual_gedcom_id"] = spouse
+                        events.append(indiv_evt)
+                        # 📝 Fan-out log
+                        logger.info(f"🔁 FAN-OUT {tag} → gedcom_id {spouse}")
+                continue  # skip family‑level record
+            fam_evts_keep.append(evt)
+        events.extend(fam_evts_keep)
+
     def save_to_db(
         self,
         session: Session,
@@ -130,6 +250,9 @@ class GEDCOMParser:
         dry_run: bool = False,
         *,
         tree_id: Optional[UUID] = None,
+        bulk: Optional[bool] = None,
+        place_map: Optional[Dict[str, Optional[UUID]]] = None,
+        previous_version_id: Optional[UUID] = None,
     ) -> Dict[str, Any]:
         """Write normalised data.
 
@@ -147,6 +270,20 @@ class GEDCOMParser:
             Back-compat parameter. If this matches an existing TreeVersion.id,
             it will be treated as ``tree_version_id``. Otherwise it's treated
             as an ``uploaded_tree_id``.
+        bulk : bool | None
+            Use the set-based :class:`BulkPersister` (default, see
+            ``MAPEM_BULK_PERSIST``) or the legacy per-row ORM path.
+        place_map : dict | None
+            ``place → Location.id`` from :py:meth:`resolve_places`.  Places
+            in the map are not resolved again; anything missing falls back
+            to per-event resolution.
+        previous_version_id : UUID | None
+            Earlier version of the same upload.  When given, only records
+            whose content hash differs from that version are written;
+            unchanged rows are moved over (see :mod:`incremental`) and
+            ``summary["diff"]`` reports added/changed/unchanged counts.
+            Places are resolved here for the pending records only, so
+            ``place_map`` is ignored.
         """
         # Backwards compatibility: "tree_id" may refer to TreeVersion.id or UploadedTree.id
         if tree_id is not None:
@@ -193,6 +330,24 @@ class GEDCOMParser:
         else:
             logger.debug("Using existing TreeVersion %s", tree_version_id)
 
+        if previous_version_id is not None:
+            plan = IncrementalImport(
+                session,
+                self.data,
+                previous_version_id=previous_version_id,
+                tree_version_id=tree_version_id,
+            ).plan()
+            plan.carry_forward()
+            pending = plan.pending()
+            place_map = self.resolve_places(session, uploaded_tree_id, events=pending["events"])
+            self._save_bulk(session, summary, uploaded_tree_id, tree_version_id, place_map, data=pending)
+            summary["diff"] = plan.finalize()
+            return self._finish(session, summary, tree_version_id, dry_run)
+
+        if BULK_PERSIST if bulk is None else bulk:
+            self._save_bulk(session, summary, uploaded_tree_id, tree_version_id, place_map)
+            return self._finish(session, summary, tree_version_id, dry_run)
+
         # ── Individuals --------------------------------------------------
         individuals = self.data.get("individuals", [])
         logger.debug("Persisting %d individuals", len(individuals))
@@ -216,6 +371,7 @@ class GEDCOMParser:
                 existing.first_name = first_name
                 existing.last_name = last_name
                 existing.occupation = occupation
+                existing.content_hash = ind.get("content_hash")
                 logger.info(f"+Individual {existing.id} (gedcom {gedcom_id}) [UPDATED]")
             else:
                 new_ind = Individual(
@@ -223,6 +379,7 @@ class GEDCOMParser:
                     first_name=first_name,
                     last_name=last_name,
                     occupation=occupation,
+                    content_hash=ind.get("content_hash"),
                     tree_id=tree_version_id,
                 )
                 session.add(new_ind)
@@ -235,10 +392,16 @@ class GEDCOMParser:
         # ── Families & Relationships ------------------------------------
         families = self.data.get("families", [])
         logger.debug("Persisting %d families", len(families))
+        relationships = {
+            tuple(row)
+            for row in session.query(
+                TreeRelationship.person_id, TreeRelationship.related_person_id, TreeRelationship.relationship_type
+            ).filter(TreeRelationship.tree_id == uploaded_tree_id)
+        }
         for fam in families:
             fam_id = fam.get("gedcom_id")
-            h_id = ged2db.get(fam.get("husband_id"))
-            w_id = ged2db.get(fam.get("wife_id"))
+            h_id = ged2db.get(xref(fam.get("husband_id")))
+            w_id = ged2db.get(xref(fam.get("wife_id")))
 
             existing_fam = (
                 session.query(Family)
@@ -248,26 +411,38 @@ class GEDCOMParser:
             if existing_fam:
                 existing_fam.husband_id = h_id
                 existing_fam.wife_id = w_id
+                existing_fam.content_hash = fam.get("content_hash")
                 logger.info(f"+Family {existing_fam.id}")
             else:
-                new_fam = Family(gedcom_id=fam_id, husband_id=h_id, wife_id=w_id, tree_id=tree_version_id)
+                new_fam = Family(
+                    gedcom_id=fam_id,
+                    husband_id=h_id,
+                    wife_id=w_id,
+                    content_hash=fam.get("content_hash"),
+                    tree_id=tree_version_id,
+                )
                 session.add(new_fam)
                 session.flush()
                 logger.info(f"+Family {new_fam.id}")
-            # parent‑child edges
+            # parent‑child edges (once per pair, also when the file is saved again)
             for child_ged in fam.get("children", []):
-                child_db_id = ged2db.get(child_ged)
-                if child_db_id:
-                    if h_id:
-                        session.add(TreeRelationship(tree_id=uploaded_tree_id, person_id=h_id, related_person_id=child_db_id, relationship_type="father"))
-                    if w_id:
-                        session.add(TreeRelationship(tree_id=uploaded_tree_id, person_id=w_id, related_person_id=child_db_id, relationship_type="mother"))
+                child_db_id = ged2db.get(xref(child_ged))
+                if not child_db_id:
+                    continue
+                for parent_id, rel_type in ((h_id, "father"), (w_id, "mother")):
+                    if parent_id and (parent_id, child_db_id, rel_type) not in relationships:
+                        relationships.add((parent_id, child_db_id, rel_type))
+                        session.add(TreeRelationship(tree_id=uploaded_tree_id, person_id=parent_id, related_person_id=child_db_id, relationship_type=rel_type))
 
         self._flush(session, summary, "Families & Relationships")
 
         # ── Events & Locations ------------------------------------------
         events = self.data.get("events", [])
         logger.debug("Persisting %d events", len(events))
+        # Events added in this call are not visible to the duplicate query
+        # below (autoflush is off), so repeats within the GEDCOM are tracked
+        # here; the GEDCOM individual keeps fanned-out MARR/DIV copies apart.
+        added_keys = set()
         for evt in events:
             if not evt.get("event_type"):
                 warn = "⛔ Skipped event: Missing event_type"
@@ -286,7 +461,7 @@ class GEDCOMParser:
             if bad_date:
                 continue
 
-            location_id = self._resolve_location(session, evt, uploaded_tree_id)  # may be None
+            location_id = self._location_for(session, evt, uploaded_tree_id, place_map)  # may be None
             date_obj = parse_date_flexible(evt["date"]) if evt.get("date") else None
 
             ev = Event(
@@ -331,15 +506,59 @@ class GEDCOMParser:
                 if {p.id for p in cand.participants} == participants_ids:
                     duplicates.append(cand)
 
-            if duplicates:
+            key = (ev.event_type, ev.date, location_id, frozenset(participants_ids), evt.get("individual_gedcom_id"))
+            if duplicates or key in added_keys:
                 logger.info(
                     "↩️ Duplicate event ignored for participants %s", participants_ids
                 )
                 continue
 
+            added_keys.add(key)
             session.add(ev)
             summary["event_count"] += 1
 
+        return self._finish(session, summary, tree_version_id, dry_run)
+
+    def _save_bulk(
+        self,
+        session: Session,
+        summary: Dict[str, Any],
+        uploaded_tree_id: Optional[UUID],
+        tree_version_id: UUID,
+        place_map: Optional[Dict[str, Optional[UUID]]] = None,
+        data: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    ) -> None:
+        """Set-based write path: preload, then multi-row inserts per table."""
+        data = self.data if data is None else data
+        # _resolve_location only varies by place and event year.
+        resolved: Dict[tuple, Optional[UUID]] = {}
+
+        def resolve(evt: Dict[str, Any]) -> Optional[UUID]:
+            place = evt.get("location") or evt.get("place")
+            key = (place, (evt.get("date") or "")[:4])
+            if key not in resolved:
+                resolved[key] = self._location_for(session, evt, uploaded_tree_id, place_map)
+            return resolved[key]
+
+        writer = BulkPersister(
+            session,
+            tree_version_id=tree_version_id,
+            uploaded_tree_id=uploaded_tree_id,
+            resolve_location=resolve,
+            summary=summary,
+        )
+        writer.persist_individuals(data.get("individuals", []))
+        writer.persist_families(data.get("families", []))
+        self._flush(session, summary, "Families & Relationships")
+        writer.persist_events(data.get("events", []))
+
+    def _finish(
+        self,
+        session: Session,
+        summary: Dict[str, Any],
+        tree_version_id: UUID,
+        dry_run: bool,
+    ) -> Dict[str, Any]:
         logger.info(
             "📝 Finished preparing: %s people, %s events (TreeVersion %s)",
             summary["people_count"],
@@ -364,6 +583,93 @@ class GEDCOMParser:
             logger.exception(msg)
             raise
 
+    # ── Places ---------------------------------------------------------
+    def distinct_places(self, events: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Tuple[Optional[int], str]]:
+        """``place → (earliest event year, source_tag of that event)`` for parsed events."""
+        places: Dict[str, Tuple[Optional[int], str]] = {}
+        for evt in self.data.get("events", []) if events is None else events:
+            place = evt.get("location") or evt.get("place")
+            if not place:
+                continue
+            year: Optional[int] = None
+            if evt.get("date"):
+                if dt := parse_date_flexible(evt["date"]):
+                    year = dt.year
+            seen = places.get(place)
+            if seen is None or (year is not None and (seen[0] is None or year < seen[0])):
+                places[place] = (year, evt.get("source_tag", "") or "")
+        return places
+
+    def resolve_places(
+        self,
+        session: Session,
+        uploaded_tree_id: Optional[UUID] = None,
+        events: Optional[List[Dict[str, Any]]] = None,
+        places: Optional[Dict[str, Tuple[Optional[int], Optional[str]]]] = None,
+        spatial: Optional[SpatialContext] = None,
+    ) -> Dict[str, Optional[UUID]]:
+        """Resolve each distinct place once and upsert its :class:`Location` rows in one batch.
+
+        Runs between :py:meth:`parse_file` and :py:meth:`save_to_db`; the
+        returned ``place → Location.id`` map (``None`` for unresolved places)
+        is meant for ``save_to_db(place_map=...)``.  ``events`` restricts the
+        stage to a subset of the parsed events; ``places`` (a slice of
+        :py:meth:`distinct_places`) resolves exactly those places.
+
+        With a ``spatial`` context (the TreeVersion's) every place resolved
+        here is added to it, so later gazetteer lookups favour candidates
+        near the family's other places.  Vague centroids are not added.
+        """
+        if not self.data:
+            raise RuntimeError("parse_file() has to be called before resolve_places()")
+        t0 = datetime.now()
+        if places is None:
+            places = self.distinct_places(events)
+        logger.info("📍 Resolving %d distinct places", len(places))
+
+        resolved: Dict[str, Any] = {}
+        for place, (year, source_tag) in places.items():
+            loc_out = self.location_service.resolve_location(
+                raw_place=place,
+                event_year=year,
+                source_tag=source_tag,
+                tree_id=uploaded_tree_id,
+                **({"spatial": spatial} if spatial is not None else {}),
+            )
+            if not loc_out or loc_out.status == "unresolved" or not loc_out.normalized_name:
+                logger.warning(
+                    "⚠️ Location not resolved: '%s' (status=%s, year=%s)",
+                    place,
+                    getattr(loc_out, "status", "none") if loc_out else "none",
+                    year,
+                )
+                continue
+            resolved[place] = loc_out
+            if spatial is not None and loc_out.status != "vague":
+                spatial.add(loc_out.latitude, loc_out.longitude)
+
+        ids = upsert_locations(session, resolved.values())
+        place_map: Dict[str, Optional[UUID]] = dict.fromkeys(places)
+        for place, loc_out in resolved.items():
+            place_map[place] = ids.get(loc_out.normalized_name)
+        logger.info(
+            "✅ resolve_places done: %d/%d resolved in %.2fs",
+            len(resolved), len(places), (datetime.now() - t0).total_seconds(),
+        )
+        return place_map
+
+    def _location_for(
+        self,
+        session: Session,
+        evt: Dict[str, Any],
+        uploaded_tree_id: Optional[UUID],
+        place_map: Optional[Dict[str, Optional[UUID]]],
+    ) -> Optional[UUID]:
+        place = evt.get("location") or evt.get("place")
+        if place_map is not None and place in place_map:
+            return place_map[place]
+        return self._resolve_location(session, evt, uploaded_tree_id)
+
     def _resolve_location(self, session: Session, evt: Dict[str, Any], uploaded_tree_id: UUID) -> Optional[int]:
         """Return *Location.id* **or** ``None`` if the place cannot be resolved."""
         place = evt.get("location") or evt.get("place")
@@ -404,6 +710,7 @@ class GEDCOMParser:
                 confidence_score=loc_out.confidence_score,
                 status=loc_out.status,
                 source=loc_out.source,
+                **point_fields(loc_out.latitude, loc_out.longitude),
             )
             session.add(loc)
             session.flush()
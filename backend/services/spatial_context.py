@@ -0,0 +1,202 @@
+"""Per-tree spatial context for gazetteer disambiguation.
+
+``score_candidates`` rewards candidates close to places the family is already
+known at (``GeoContext.family_coords``), but nothing ever filled that list.
+Passing every resolved point of a tree for every lookup would also make the
+proximity term O(candidates × points).
+
+:class:`SpatialContext` accumulates the resolved coordinates of one
+:class:`TreeVersion` in a uniform grid, in the same scaled space
+``_distance_score`` measures in (``x = lat``, ``y = 0.6 · lng``, in degrees).
+Per candidate it returns:
+
+* **proximity**: ``1 - d²/100`` to the nearest family point (0 beyond 10
+  units), the same value the list-based term gives.  The grid is searched in
+  rings around the candidate's cell and stops once no closer point can exist.
+* **regional prior**: the share of the tree's place occurrences within
+  ``REGION_RADIUS`` units of the candidate (about 150 km), which tells a
+  family's home county apart from a namesake two states away.
+
+Contexts live in a small per-process LRU keyed by TreeVersion id
+(:func:`get_spatial_context`).  A new context is seeded from the version's
+events already in the database (re-imports carry unchanged events forward);
+ingest then adds each place as it resolves.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.models import Event, Location
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("spatial_context")
+
+CELL_UNITS = 2.0          # fine grid for nearest-point search
+PROXIMITY_HORIZON = 10.0  # proximity is 0 beyond this distance (d² = 100)
+REGION_RADIUS = 1.5       # regional prior counts occurrences this close
+MAX_CONTEXTS: int = int(os.getenv("SPATIAL_CONTEXT_CACHE_SIZE", "32"))
+
+Point = Tuple[float, float]
+
+
+def _xy(lat: float, lng: float) -> Point:
+    return float(lat), 0.6 * float(lng)
+
+
+class SpatialContext:
+    """Resolved family points of one tree, for proximity and regional priors."""
+
+    def __init__(self) -> None:
+        self._cells: Dict[Tuple[int, int], Dict[Point, int]] = defaultdict(dict)
+        self.total = 0  # occurrences added
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Distinct points."""
+        return sum(len(c) for c in self._cells.values())
+
+    @staticmethod
+    def _cell(x: float, y: float, size: float) -> Tuple[int, int]:
+        return math.floor(x / size), math.floor(y / size)
+
+    def add(self, lat: Optional[float], lng: Optional[float], count: int = 1) -> None:
+        """Record ``count`` occurrences of a resolved point (no-op without coordinates)."""
+        if lat is None or lng is None or count <= 0:
+            return
+        x, y = _xy(lat, lng)
+        with self._lock:
+            points = self._cells[self._cell(x, y, CELL_UNITS)]
+            points[(x, y)] = points.get((x, y), 0) + count
+            self.total += count
+
+    def add_many(self, coords: Iterable[Tuple[Optional[float], Optional[float]]]) -> None:
+        for lat, lng in coords:
+            self.add(lat, lng)
+
+    def nearest_d2(self, lat: float, lng: float) -> float:
+        """Squared scaled distance to the nearest point (``inf`` beyond the horizon)."""
+        x, y = _xy(lat, lng)
+        cx, cy = self._cell(x, y, CELL_UNITS)
+        best = math.inf
+        rings = int(math.ceil(PROXIMITY_HORIZON / CELL_UNITS))
+        for r in range(rings + 1):
+            # Any point in ring r is at least (r - 1) cells away
+            if best <= ((r - 1) * CELL_UNITS) ** 2:
+                break
+            for i in range(cx - r, cx + r + 1):
+                for j in range(cy - r, cy + r + 1):
+                    if r and cx - r < i < cx + r and cy - r < j < cy + r:
+                        continue  # inner cells were visited by earlier rings
+                    for px, py in self._cells.get((i, j), ()):
+                        d2 = (px - x) ** 2 + (py - y) ** 2
+                        if d2 < best:
+                            best = d2
+        return best if best < PROXIMITY_HORIZON ** 2 else math.inf
+
+    def regional_prior(self, lat: float, lng: float) -> float:
+        """Share (0–1) of the tree's occurrences in the region around a point."""
+        if not self.total:
+            return 0.0
+        x, y = _xy(lat, lng)
+        cx, cy = self._cell(x, y, CELL_UNITS)
+        reach = int(math.ceil(REGION_RADIUS / CELL_UNITS))
+        near = 0
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for (px, py), count in self._cells.get((i, j), {}).items():
+                    if (px - x) ** 2 + (py - y) ** 2 <= REGION_RADIUS ** 2:
+                        near += count
+        return near / self.total
+
+    def score(self, latitude: np.ndarray, longitude: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(proximity, regional prior)`` arrays for candidate coordinates."""
+        n = len(latitude)
+        prox, prior = np.zeros(n), np.zeros(n)
+        if not self.total:
+            return prox, prior
+        with self._lock:
+            for k, (lat, lng) in enumerate(zip(latitude.tolist(), longitude.tolist())):
+                prox[k] = max(0.0, 1.0 - self.nearest_d2(lat, lng) / 100.0)
+                prior[k] = self.regional_prior(lat, lng)
+        return prox, prior
+
+    def seed_locations(self, session: Session, location_ids: Iterable) -> int:
+        """Add the coordinates of known :class:`Location` ids; return how many had some."""
+        ids = [i for i in location_ids if i is not None]
+        added = 0
+        for start in range(0, len(ids), 1000):
+            rows = session.query(Location.latitude, Location.longitude).filter(
+                Location.id.in_(ids[start:start + 1000]),
+                Location.latitude.isnot(None),
+                Location.longitude.isnot(None),
+            )
+            for lat, lng in rows:
+                self.add(lat, lng)
+                added += 1
+        return added
+
+    def seed_tree_version(self, session: Session, tree_version_id) -> int:
+        """Add every located event of a TreeVersion, weighted by event count."""
+        rows = (
+            session.query(Location.latitude, Location.longitude, func.count(Event.id))
+            .join(Event, Event.location_id == Location.id)
+            .filter(Event.tree_id == tree_version_id)
+            .filter(Location.latitude.isnot(None), Location.longitude.isnot(None))
+            .group_by(Location.id, Location.latitude, Location.longitude)
+        )
+        added = 0
+        for lat, lng, count in rows:
+            self.add(lat, lng, count)
+            added += count
+        return added
+
+
+# ─── Per-process cache ────────────────────────────────────────────
+_contexts: "OrderedDict[str, SpatialContext]" = OrderedDict()
+_contexts_lock = threading.Lock()
+
+
+def get_spatial_context(tree_version_id, session: Optional[Session] = None) -> Optional[SpatialContext]:
+    """The context of a TreeVersion, seeded from ``session`` on first use.
+
+    Returns None without a ``tree_version_id``.
+    """
+    if tree_version_id is None:
+        return None
+    key = str(tree_version_id)
+    with _contexts_lock:
+        ctx = _contexts.get(key)
+        if ctx is not None:
+            _contexts.move_to_end(key)
+            return ctx
+        ctx = SpatialContext()
+        _contexts[key] = ctx
+        while len(_contexts) > MAX_CONTEXTS:
+            _contexts.popitem(last=False)
+    if session is not None:
+        try:
+            seeded = ctx.seed_tree_version(session, tree_version_id)
+            if seeded:
+                logger.info("🧭 Spatial context %s seeded with %d events", key, seeded)
+        except Exception:
+            logger.exception("⚠️ Could not seed spatial context for %s", key)
+    return ctx
+
+
+def drop_spatial_context(tree_version_id) -> None:
+    with _contexts_lock:
+        _contexts.pop(str(tree_version_id), None)
+
+
+def reset_spatial_contexts() -> None:
+    with _contexts_lock:
+        _contexts.clear()
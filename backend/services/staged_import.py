@@ -0,0 +1,342 @@
+"""Checkpointed, resumable GEDCOM ingest.
+
+:class:`StagedImport` runs one import as a sequence of durable stages::
+
+    parse → version → places → individuals → families → events → finalize
+
+Each stage works in chunks, and every chunk commits in its own transaction
+together with the updated :attr:`Job.checkpoint` and :attr:`Job.progress`.
+A retried task or a restarted worker reads the checkpoint back and continues
+with the first chunk that has not been committed; nothing is written twice.
+
+The checkpoint is plain JSON::
+
+    {
+      "done": ["parse", "version", "places"],   # completed stages
+      "stage": "individuals", "cursor": 4000,   # items committed in the current stage
+      "content_digest": "…",                    # parse-cache key of the upload
+      "tree_version_id": "…",
+      "incremental": {…},                       # IncrementalImport.snapshot(), re-imports only
+      "place_map": {"Boston, MA": "…", …},      # place → Location.id (or null)
+      "summary": {"people_count": …, "event_count": …, "warnings": […], "errors": […]}
+    }
+
+The parsed data itself is not stored on the job: the parse stage is
+recomputed on resume, which is a cache hit in :mod:`parse_cache` for the same
+upload digest.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from backend.db import SessionLocal
+from backend.models import Job, TreeVersion
+from backend.services.bulk_persist import BulkPersister
+from backend.services.incremental import IncrementalImport, previous_version
+from backend.services.parser import GEDCOMParser
+from backend.services.spatial_context import SpatialContext, get_spatial_context
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("staged_import")
+
+STAGES: Tuple[str, ...] = ("parse", "version", "places", "individuals", "families", "events", "finalize")
+
+# Job.progress range covered by each stage; chunks advance linearly inside it.
+PROGRESS_BANDS: Dict[str, Tuple[int, int]] = {
+    "parse": (0, 10),
+    "version": (10, 15),
+    "places": (15, 40),
+    "individuals": (40, 55),
+    "families": (55, 65),
+    "events": (65, 99),
+    "finalize": (99, 100),
+}
+
+# Records per committed chunk, and places per geocoding chunk (much slower).
+INGEST_CHUNK_SIZE: int = int(os.getenv("MAPEM_INGEST_CHUNK_SIZE", "2000"))
+PLACE_CHUNK_SIZE: int = int(os.getenv("MAPEM_INGEST_PLACE_CHUNK_SIZE", "250"))
+
+
+def _new_summary() -> Dict[str, Any]:
+    return {"people_count": 0, "event_count": 0, "warnings": [], "errors": []}
+
+
+class StagedImport:
+    """Run (or resume) one GEDCOM import with per-chunk commits.
+
+    Parameters
+    ----------
+    parser : GEDCOMParser
+        Parser for the uploaded file; ``content_digest`` should be set so a
+        resumed run is served from the parse cache.
+    uploaded_tree_id : UUID | str
+        Owning :class:`UploadedTree`.
+    job_id : UUID | str | None
+        :class:`Job` that carries the checkpoint.  Without a job the stages
+        still commit chunk by chunk but cannot be resumed.
+    session_factory : sessionmaker
+        Source of sessions; each chunk runs in ``session_factory.begin()``.
+    """
+
+    def __init__(
+        self,
+        parser: GEDCOMParser,
+        *,
+        uploaded_tree_id,
+        job_id=None,
+        session_factory=SessionLocal,
+        chunk_size: int = INGEST_CHUNK_SIZE,
+        place_chunk_size: int = PLACE_CHUNK_SIZE,
+    ) -> None:
+        self.parser = parser
+        self.uploaded_tree_id = UUID(str(uploaded_tree_id))
+        self.job_id = UUID(str(job_id)) if job_id else None
+        self.session_factory = session_factory
+        self.chunk_size = max(1, int(chunk_size))
+        self.place_chunk_size = max(1, int(place_chunk_size))
+
+        self.state: Dict[str, Any] = {"done": [], "stage": None, "cursor": 0, "summary": _new_summary()}
+        self.data: Dict[str, List[Dict[str, Any]]] = {}
+        self._writer: Optional[BulkPersister] = None
+
+    # ─── Public API ───────────────────────────────────────────────
+    def run(self) -> Dict[str, Any]:
+        """Execute every stage not yet recorded as done; return the task result."""
+        result = self._load_checkpoint()
+        if result is not None:
+            logger.info("⏭️ Job %s already finished", self.job_id)
+            return result
+        if self.state["done"]:
+            logger.info(
+                "🔁 Resuming job %s after %s (stage=%s, cursor=%s)",
+                self.job_id, self.state["done"][-1], self.state["stage"], self.state["cursor"],
+            )
+
+        self._stage_parse()
+        for stage in STAGES[1:]:
+            if stage not in self.state["done"]:
+                getattr(self, f"_stage_{stage}")()
+        return self._result()
+
+    @property
+    def tree_version_id(self) -> Optional[UUID]:
+        value = self.state.get("tree_version_id")
+        return UUID(value) if value else None
+
+    # ─── Stages ───────────────────────────────────────────────────
+    def _stage_parse(self) -> None:
+        # Always needed in memory; cheap on resume thanks to the parse cache.
+        self.parser.parse_file()
+        if "parse" in self.state["done"]:
+            return
+        self.state["content_digest"] = self.parser.content_digest
+        with self.session_factory.begin() as session:
+            self._complete(session, "parse")
+
+    def _stage_version(self) -> None:
+        with self.session_factory.begin() as session:
+            previous = previous_version(session, self.uploaded_tree_id)
+            version = TreeVersion(
+                uploaded_tree_id=self.uploaded_tree_id,
+                version_number=(previous.version_number + 1) if previous else 1,
+            )
+            session.add(version)
+            session.flush()
+            self.state["tree_version_id"] = str(version.id)
+            if previous is not None:
+                # Re-import: move unchanged rows now, in the same transaction
+                # that records which records are still pending.
+                plan = IncrementalImport(
+                    session,
+                    self.parser.data,
+                    previous_version_id=previous.id,
+                    tree_version_id=version.id,
+                ).plan()
+                plan.carry_forward()
+                self.state["incremental"] = {"previous_version_id": str(previous.id), **plan.snapshot()}
+            logger.info("🌳 Job %s writes TreeVersion %s", self.job_id, version.id)
+            self._complete(session, "version")
+
+    def _stage_places(self) -> None:
+        places = list(self.parser.distinct_places(self._pending()["events"]).items())
+        self.state.setdefault("place_map", {})
+
+        spatial = self._spatial_context()
+
+        def work(session: Session, chunk: List[Tuple[str, Any]]) -> None:
+            resolved = self.parser.resolve_places(
+                session, self.uploaded_tree_id, places=dict(chunk), spatial=spatial
+            )
+            self.state["place_map"].update(
+                {place: str(loc_id) if loc_id else None for place, loc_id in resolved.items()}
+            )
+
+        self._chunked("places", places, self.place_chunk_size, work)
+
+    def _spatial_context(self) -> SpatialContext:
+        """The TreeVersion's context: carried-forward events plus places resolved before a resume."""
+        with self.session_factory() as session:
+            spatial = get_spatial_context(self.tree_version_id, session)
+            if not spatial.total and self.state.get("place_map"):
+                spatial.seed_locations(session, [UUID(i) for i in self.state["place_map"].values() if i])
+        return spatial
+
+    def _stage_individuals(self) -> None:
+        self._chunked(
+            "individuals",
+            self._pending()["individuals"],
+            self.chunk_size,
+            lambda session, chunk: self._writer_for(session).persist_individuals(chunk),
+        )
+
+    def _stage_families(self) -> None:
+        self._chunked(
+            "families",
+            self._pending()["families"],
+            self.chunk_size,
+            lambda session, chunk: self._writer_for(session).persist_families(chunk),
+        )
+
+    def _stage_events(self) -> None:
+        self._chunked(
+            "events",
+            self._pending()["events"],
+            self.chunk_size,
+            lambda session, chunk: self._writer_for(session).persist_events(chunk),
+        )
+
+    def _stage_finalize(self) -> None:
+        with self.session_factory.begin() as session:
+            summary = self.state["summary"]
+            if self.state.get("incremental"):
+                summary["diff"] = self._incremental(session).finalize()
+            self._complete(session, "finalize")
+            job = self._job(session)
+            if job is not None:
+                job.status = "success"
+                job.result = self._result()
+        logger.info(
+            "✅ Job %s done: %s people, %s events → TreeVersion %s",
+            self.job_id, summary["people_count"], summary["event_count"], self.tree_version_id,
+        )
+
+    # ─── Chunking & checkpoints ───────────────────────────────────
+    def _chunked(
+        self,
+        stage: str,
+        items: List[Any],
+        size: int,
+        work: Callable[[Session, List[Any]], None],
+    ) -> None:
+        start = self.state["cursor"] if self.state["stage"] == stage else 0
+        total = len(items)
+        if start:
+            logger.info("🔁 %s: skipping %d/%d committed items", stage, start, total)
+        while start < total:
+            end = min(start + size, total)
+            with self.session_factory.begin() as session:
+                work(session, items[start:end])
+                self._advance(session, stage, end, total)
+            start = end
+        with self.session_factory.begin() as session:
+            self._complete(session, stage)
+
+    def _advance(self, session: Session, stage: str, cursor: int, total: int) -> None:
+        self.state["stage"] = stage
+        self.state["cursor"] = cursor
+        low, high = PROGRESS_BANDS[stage]
+        self._save(session, low + (high - low) * cursor // max(total, 1))
+
+    def _complete(self, session: Session, stage: str) -> None:
+        self.state["done"].append(stage)
+        self.state["stage"] = None
+        self.state["cursor"] = 0
+        self._save(session, PROGRESS_BANDS[stage][1])
+
+    def _save(self, session: Session, progress: int) -> None:
+        job = self._job(session)
+        if job is None:
+            return
+        # A detached copy, so later in-place changes to self.state never alias it.
+        job.checkpoint = json.loads(json.dumps(self.state))
+        job.progress = progress
+        job.status = "progress"
+        job.error = None
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if self.job_id is None:
+            return None
+        with self.session_factory.begin() as session:
+            job = self._job(session)
+            if job is None:
+                return None
+            if job.checkpoint:
+                self.state = dict(job.checkpoint)
+                self.state["summary"] = dict(self.state.get("summary") or _new_summary())
+                if "finalize" in self.state["done"]:
+                    return job.result
+            job.status = "started"
+        return None
+
+    def _job(self, session: Session) -> Optional[Job]:
+        return session.get(Job, self.job_id) if self.job_id else None
+
+    # ─── Helpers ──────────────────────────────────────────────────
+    def _incremental(self, session: Session) -> IncrementalImport:
+        snapshot = self.state["incremental"]
+        return IncrementalImport.restore(
+            session,
+            self.parser.data,
+            snapshot,
+            previous_version_id=UUID(snapshot["previous_version_id"]),
+            tree_version_id=self.tree_version_id,
+        )
+
+    def _pending(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Parsed records this version still has to write (all of them on a first import)."""
+        if not self.data:
+            if self.state.get("incremental"):
+                # pending() only filters parsed data; no queries are issued.
+                self.data = self._incremental(None).pending()
+            else:
+                self.data = self.parser.data
+        return self.data
+
+    def _writer_for(self, session: Session) -> BulkPersister:
+        if self._writer is None:
+            place_map = {
+                place: UUID(loc_id) if loc_id else None
+                for place, loc_id in self.state.get("place_map", {}).items()
+            }
+            resolved: Dict[tuple, Optional[UUID]] = {}
+
+            def resolve(evt: Dict[str, Any]) -> Optional[UUID]:
+                place = evt.get("location") or evt.get("place")
+                key = (place, (evt.get("date") or "")[:4])
+                if key not in resolved:
+                    resolved[key] = self.parser._location_for(
+                        self._writer.session, evt, self.uploaded_tree_id, place_map
+                    )
+                return resolved[key]
+
+            self._writer = BulkPersister(
+                session,
+                tree_version_id=self.tree_version_id,
+                uploaded_tree_id=self.uploaded_tree_id,
+                resolve_location=resolve,
+                summary=self.state["summary"],
+            )
+        return self._writer.bind(session)
+
+    def _result(self) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "summary": self.state["summary"],
+            "version_id": str(self.tree_version_id),
+        }
@@ -0,0 +1,297 @@
+"""Batched, deduplicated log of places the geocoder could not resolve.
+
+``location_processor`` used to append every new failure to
+``unresolved_locations.json`` by loading, extending and rewriting the whole
+list, and deduplicated with a per-process set that never shrank.  Failures
+now go to the ``unresolved_places`` table (:class:`UnresolvedPlace`), one
+row per ``(place_key, reason)`` with an occurrence counter and first/last
+seen timestamps.
+
+:class:`UnresolvedLog` aggregates occurrences in memory and upserts them in
+one statement when ``UNRESOLVED_FLUSH_BATCH`` distinct places are pending,
+``UNRESOLVED_FLUSH_SECONDS`` after the first pending one, and at exit.
+Memory is bounded by the batch, not by everything ever seen.
+
+Consumers page through the table with :func:`list_unresolved` /
+:func:`iter_unresolved` (keyset pagination on ``id``).
+:func:`import_legacy_json` moves an old JSON log into the table.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.models.unresolved_place import UnresolvedPlace
+from backend.utils.place_parser import parse_place
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("unresolved_log")
+
+FLUSH_BATCH_SIZE: int = int(os.getenv("UNRESOLVED_FLUSH_BATCH", "100"))
+FLUSH_INTERVAL_SECONDS: float = float(os.getenv("UNRESOLVED_FLUSH_SECONDS", "5"))
+PAGE_SIZE = 500
+PENDING_STATUS = "manual_fix_pending"
+
+
+def place_key_for(raw: str) -> str:
+    """Dedupe key for a raw place: the ``normalize_location`` slug, also for one-part names."""
+    return "_".join(parse_place(raw or "").parts) or (raw or "").strip().lower()
+
+
+class UnresolvedLog:
+    """Write-behind aggregator for :class:`UnresolvedPlace` rows.
+
+    Parameters
+    ----------
+    session_factory : callable, optional
+        Returns a new :class:`Session`; defaults to ``backend.db.SessionLocal``.
+        Flushes use their own short transaction so a caller's rollback does
+        not lose the log.
+    batch_size : int, optional
+        Distinct pending places that trigger a flush.
+    flush_interval : float, optional
+        Seconds after the first pending write before a timed flush (0 = none).
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        *,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.batch_size = max(1, FLUSH_BATCH_SIZE if batch_size is None else int(batch_size))
+        self.flush_interval = FLUSH_INTERVAL_SECONDS if flush_interval is None else float(flush_interval)
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from backend.db import SessionLocal
+
+            return SessionLocal()
+        return self._session_factory()
+
+    def record(self, raw: str, reason: str, tree_id: Optional[str] = None, *, when: Optional[datetime] = None) -> None:
+        """Count one unresolved occurrence of ``raw`` (O(1); written on the next flush)."""
+        if not raw:
+            return
+        when = when or datetime.utcnow()
+        key = (place_key_for(raw), reason)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = {
+                    "place_key": key[0],
+                    "reason": reason,
+                    "raw_name": raw,
+                    "tree_id": str(tree_id) if tree_id is not None else None,
+                    "status": PENDING_STATUS,
+                    "occurrences": 1,
+                    "first_seen": when,
+                    "last_seen": when,
+                }
+            else:
+                entry["occurrences"] += 1
+                entry["first_seen"] = min(entry["first_seen"], when)
+                entry["last_seen"] = max(entry["last_seen"], when)
+                if tree_id is not None:
+                    entry["tree_id"] = str(tree_id)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> int:
+        """Upsert pending occurrences in one transaction; return how many places."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            rows = list(pending.values())
+            try:
+                with self._session() as session:
+                    upsert_unresolved(session, rows)
+                    session.commit()
+            except Exception as e:
+                # Keep them for the next flush, merged with anything newer
+                for key, row in pending.items():
+                    newer = self._pending.get(key)
+                    if newer is not None:
+                        newer["occurrences"] += row["occurrences"]
+                        newer["first_seen"] = min(newer["first_seen"], row["first_seen"])
+                    else:
+                        self._pending[key] = row
+                logger.error("❌ Could not flush %d unresolved places: %s", len(rows), e)
+                return 0
+        logger.info("📝 Logged %d unresolved places", len(rows))
+        return len(rows)
+
+    def close(self) -> None:
+        self.flush()
+
+
+def upsert_unresolved(session: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert ``rows`` or add them to the existing ``(place_key, reason)`` rows."""
+    if not rows:
+        return
+    table = UnresolvedPlace.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        module = postgresql if dialect == "postgresql" else sqlite
+        stmt = module.insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["place_key", "reason"],
+            set_={
+                "occurrences": table.c.occurrences + stmt.excluded.occurrences,
+                "last_seen": stmt.excluded.last_seen,
+                # An occurrence without a tree keeps the one already stored
+                "tree_id": func.coalesce(stmt.excluded.tree_id, table.c.tree_id),
+            },
+        )
+        session.execute(stmt)
+        return
+    for row in rows:  # other dialects: row by row
+        existing = session.execute(
+            select(UnresolvedPlace).where(
+                UnresolvedPlace.place_key == row["place_key"], UnresolvedPlace.reason == row["reason"]
+            )
+        ).scalar_one_or_none()
+        if existing is None:
+            session.add(UnresolvedPlace(**row))
+        else:
+            existing.occurrences += row["occurrences"]
+            existing.last_seen = max(existing.last_seen, row["last_seen"])
+            existing.tree_id = row["tree_id"] or existing.tree_id
+
+
+# ─── Queries ──────────────────────────────────────────────────────
+def list_unresolved(
+    session: Session,
+    *,
+    after_id: Optional[int] = None,
+    limit: int = PAGE_SIZE,
+    reason: Optional[str] = None,
+    status: Optional[str] = None,
+    tree_id: Optional[str] = None,
+) -> Tuple[List[UnresolvedPlace], Optional[int]]:
+    """One page of unresolved places in ``id`` order and the cursor for the next page.
+
+    The cursor is ``None`` on the last page.
+    """
+    q = select(UnresolvedPlace).order_by(UnresolvedPlace.id).limit(limit)
+    if after_id is not None:
+        q = q.where(UnresolvedPlace.id > after_id)
+    if reason is not None:
+        q = q.where(UnresolvedPlace.reason == reason)
+    if status is not None:
+        q = q.where(UnresolvedPlace.status == status)
+    if tree_id is not None:
+        q = q.where(UnresolvedPlace.tree_id == str(tree_id))
+    rows = list(session.scalars(q))
+    return rows, (rows[-1].id if len(rows) == limit else None)
+
+
+def iter_unresolved(session: Session, *, page_size: int = PAGE_SIZE, **filters) -> Iterator[UnresolvedPlace]:
+    """Every matching unresolved place, fetched ``page_size`` rows at a time."""
+    after_id = None
+    while True:
+        rows, after_id = list_unresolved(session, after_id=after_id, limit=page_size, **filters)
+        yield from rows
+        if after_id is None:
+            return
+
+
+def unresolved_to_dict(row: UnresolvedPlace) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "raw_name": row.raw_name,
+        "place_key": row.place_key,
+        "reason": row.reason,
+        "status": row.status,
+        "tree_id": row.tree_id,
+        "occurrences": row.occurrences,
+        "first_seen": row.first_seen.isoformat() if row.first_seen else None,
+        "last_seen": row.last_seen.isoformat() if row.last_seen else None,
+    }
+
+
+def import_legacy_json(session: Session, path: Path) -> int:
+    """Fold an old ``unresolved_locations.json`` list into the table; return entries read."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        logger.error("❌ Could not parse %s: %s", path, e)
+        return 0
+    pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for entry in data if isinstance(data, list) else []:
+        raw = entry.get("raw_name") or entry.get("place")
+        if not raw:
+            continue
+        try:
+            when = datetime.fromisoformat(entry["timestamp"]).replace(tzinfo=None)
+        except (KeyError, TypeError, ValueError):
+            when = datetime.utcnow()
+        reason = entry.get("reason") or "unknown"
+        key = (place_key_for(raw), reason)
+        row = pending.get(key)
+        if row is None:
+            pending[key] = {
+                "place_key": key[0], "reason": reason, "raw_name": raw,
+                "tree_id": entry.get("tree_id"), "status": entry.get("status") or PENDING_STATUS,
+                "occurrences": 1, "first_seen": when, "last_seen": when,
+            }
+        else:
+            row["occurrences"] += 1
+            row["first_seen"], row["last_seen"] = min(row["first_seen"], when), max(row["last_seen"], when)
+    rows = list(pending.values())
+    for start in range(0, len(rows), 1000):
+        upsert_unresolved(session, rows[start:start + 1000])
+    logger.info("📥 Imported %d unresolved entries (%d places) from %s", len(data), len(rows), path)
+    return len(data)
+
+
+_log: Optional[UnresolvedLog] = None
+_log_lock = threading.Lock()
+
+
+def get_unresolved_log() -> UnresolvedLog:
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = UnresolvedLog()
+        return _log
+
+
+def record_unresolved(raw: str, reason: str, tree_id: Optional[str] = None) -> None:
+    """Count one unresolved occurrence in the process log."""
+    get_unresolved_log().record(raw, reason, tree_id)
+
+
+@atexit.register
+def _flush_unresolved_log() -> None:
+    if _log is not None:
+        try:
+            _log.close()
+        except Exception:
+            pass
@@ -0,0 +1,215 @@
+"""Scheduled retries of unresolved places, most impactful first.
+
+``upload_tree`` used to run ``scripts/retry_unresolved.py`` in a subprocess
+every fifth upload, inside the request and with the upload's transaction
+still open; the script retried every pending place one by one.
+:func:`run_unresolved_retry` runs from a Celery beat task instead
+(``retry_unresolved_task``, every ``UNRESOLVED_RETRY_INTERVAL`` seconds):
+
+* **Impact order.**  Due places (``status = manual_fix_pending`` and
+  ``next_attempt_at`` passed) are taken by the number of events on
+  locations with that name plus logged occurrences, then most recently seen.
+* **Rate-aware batches.**  A batch holds about ``UNRESOLVED_RETRY_BATCH_SECONDS``
+  worth of requests at the provider rate (``GEOCODE_*_RPS``), capped by
+  ``UNRESOLVED_RETRY_BATCH``.  Each batch goes through
+  :meth:`Geocode.resolve_many`: local tiers first, then concurrent,
+  rate-limited provider calls.  A run stops starting batches after
+  ``UNRESOLVED_RETRY_MAX_SECONDS``.
+* **Backoff per place.**  A failed place waits
+  ``UNRESOLVED_RETRY_BACKOFF · 2^(attempts-1)`` seconds (at most a week);
+  after ``UNRESOLVED_RETRY_MAX_ATTEMPTS`` it becomes ``retry_exhausted``.
+* **Propagation.**  A hit updates the ``locations`` rows of that name
+  (coordinates, status, geometry) and their events' ``geom``, or inserts the
+  location, and marks the place ``resolved``.  The geocode caches are filled by
+  ``resolve_many``, so the next import resolves the place locally.
+
+Every run is a ``unresolved_retry`` :class:`Job` whose result holds the
+throughput metrics.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from backend.models import Event, Job
+from backend.models.location import Location
+from backend.models.unresolved_place import UnresolvedPlace
+from backend.services.geocode_async import rate_limited_batch_size
+from backend.services.location_geometry import apply_location_fix
+from backend.services.unresolved_log import PENDING_STATUS
+from backend.utils.logger import get_file_logger
+
+logger = get_file_logger("unresolved_retry")
+
+RETRY_INTERVAL_SECONDS: float = float(os.getenv("UNRESOLVED_RETRY_INTERVAL", "900"))
+RETRY_MAX_BATCH: int = int(os.getenv("UNRESOLVED_RETRY_BATCH", "100"))
+RETRY_BATCH_SECONDS: float = float(os.getenv("UNRESOLVED_RETRY_BATCH_SECONDS", "30"))
+RETRY_MAX_SECONDS: float = float(os.getenv("UNRESOLVED_RETRY_MAX_SECONDS", "600"))
+RETRY_BACKOFF_SECONDS: float = float(os.getenv("UNRESOLVED_RETRY_BACKOFF", "3600"))
+RETRY_MAX_ATTEMPTS: int = int(os.getenv("UNRESOLVED_RETRY_MAX_ATTEMPTS", "8"))
+MAX_BACKOFF = timedelta(days=7)
+
+JOB_TYPE = "unresolved_retry"
+RESOLVED_STATUS = "resolved"
+EXHAUSTED_STATUS = "retry_exhausted"
+
+
+def rate_aware_batch_size(geocoder=None) -> int:
+    """Places per batch: ``RETRY_BATCH_SECONDS`` of provider calls, capped by ``RETRY_MAX_BATCH``."""
+    return rate_limited_batch_size(RETRY_BATCH_SECONDS, RETRY_MAX_BATCH, api_key=getattr(geocoder, "api_key", None))
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Wait before the next attempt after ``attempts`` failures."""
+    seconds = RETRY_BACKOFF_SECONDS * 2.0 ** min(max(0, attempts - 1), 32)
+    return min(MAX_BACKOFF, timedelta(seconds=min(seconds, MAX_BACKOFF.total_seconds())))
+
+
+def due_places(session: Session, *, now: datetime, limit: int, exclude=()) -> List[UnresolvedPlace]:
+    """Pending places whose backoff has passed, by impact (events + occurrences), then recency."""
+    events = (
+        select(func.count(Event.id))
+        .join(Location, Event.location_id == Location.id)
+        .where(Location.normalized_name == UnresolvedPlace.place_key)
+        .correlate(UnresolvedPlace)
+        .scalar_subquery()
+    )
+    q = (
+        select(UnresolvedPlace)
+        .where(UnresolvedPlace.status == PENDING_STATUS)
+        .where(or_(UnresolvedPlace.next_attempt_at.is_(None), UnresolvedPlace.next_attempt_at <= now))
+        .order_by((events + UnresolvedPlace.occurrences).desc(), UnresolvedPlace.last_seen.desc(), UnresolvedPlace.id)
+        .limit(limit)
+    )
+    if exclude:
+        q = q.where(UnresolvedPlace.id.notin_(list(exclude)))
+    return list(session.scalars(q))
+
+
+def retry_in_progress(session: Session, budget: float) -> bool:
+    """True while another retry run is active (a crashed one stops counting after 2× its budget)."""
+    since = datetime.utcnow() - timedelta(seconds=2 * budget)
+    running = session.scalar(
+        select(func.count(Job.id)).where(
+            Job.job_type == JOB_TYPE, Job.status.in_(("started", "progress")), Job.updated_at >= since
+        )
+    )
+    return bool(running)
+
+
+def _retry_batch(session: Session, geocoder, places: List[UnresolvedPlace], now: datetime) -> Dict[str, int]:
+    results = geocoder.resolve_many(session, [p.raw_name for p in places])
+    counts = {"resolved": 0, "failed": 0, "exhausted": 0, "locations_updated": 0}
+    for place in places:
+        out = results.get(place.raw_name.strip())
+        place.attempts = (place.attempts or 0) + 1
+        place.last_attempt_at = now
+        if getattr(out, "latitude", None) is not None and getattr(out, "longitude", None) is not None:
+            counts["locations_updated"] += apply_location_fix(
+                session, out, normalized_name=place.place_key, raw_name=place.raw_name, geocoded_by=JOB_TYPE
+            )
+            place.status = RESOLVED_STATUS
+            place.next_attempt_at = None
+            counts["resolved"] += 1
+        elif place.attempts >= RETRY_MAX_ATTEMPTS:
+            place.status = EXHAUSTED_STATUS
+            place.next_attempt_at = None
+            counts["exhausted"] += 1
+        else:
+            place.next_attempt_at = now + backoff_delay(place.attempts)
+            counts["failed"] += 1
+    return counts
+
+
+def run_unresolved_retry(
+    *,
+    session_factory=None,
+    geocoder=None,
+    batch_size: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    max_places: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Retry due unresolved places in committed batches; return throughput metrics.
+
+    Parameters
+    ----------
+    session_factory : sessionmaker, optional
+        Defaults to ``backend.db.SessionLocal``.
+    geocoder : Geocode, optional
+        Defaults to the shared ``location_processor.GEOCODER``.
+    batch_size : int, optional
+        Places per batch; defaults to :func:`rate_aware_batch_size`.
+    max_seconds : float, optional
+        No new batch starts after this long (``UNRESOLVED_RETRY_MAX_SECONDS``).
+    max_places : int, optional
+        Stop after this many places (default: no limit).
+    """
+    if session_factory is None:
+        from backend.db import SessionLocal as session_factory
+    if geocoder is None:
+        from backend.services.location_processor import GEOCODER as geocoder
+    size = max(1, batch_size or rate_aware_batch_size(geocoder))
+    budget = RETRY_MAX_SECONDS if max_seconds is None else max_seconds
+
+    with session_factory.begin() as session:
+        if retry_in_progress(session, budget):
+            logger.info("⏭️ unresolved retry already running; skipping this run")
+            return {"skipped": True}
+        job = Job(task_id="", job_type=JOB_TYPE, status="started", progress=0, params={"batch_size": size})
+        session.add(job)
+        session.flush()
+        job_id = job.id
+
+    metrics = {"attempted": 0, "resolved": 0, "failed": 0, "exhausted": 0, "locations_updated": 0, "batches": 0}
+    started = time.monotonic()
+    seen: set = set()
+    try:
+        while time.monotonic() - started < budget:
+            limit = size if max_places is None else min(size, max_places - metrics["attempted"])
+            if limit <= 0:
+                break
+            now = datetime.utcnow()
+            with session_factory.begin() as session:
+                places = due_places(session, now=now, limit=limit, exclude=seen)
+                if not places:
+                    break
+                seen.update(p.id for p in places)
+                counts = _retry_batch(session, geocoder, places, now)
+                for k, v in counts.items():
+                    metrics[k] += v
+                metrics["attempted"] += len(places)
+                metrics["batches"] += 1
+                session.get(Job, job_id).checkpoint = dict(metrics)
+            logger.info(
+                "🔁 retry batch %d: %d places, %d resolved",
+                metrics["batches"], len(places), counts["resolved"],
+            )
+    except Exception as exc:
+        with session_factory.begin() as session:
+            job = session.get(Job, job_id)
+            job.status = "failure"
+            job.error = str(exc)
+            job.result = dict(metrics)
+        raise
+
+    elapsed = time.monotonic() - started
+    metrics["elapsed_seconds"] = round(elapsed, 3)
+    metrics["places_per_second"] = round(metrics["attempted"] / elapsed, 2) if elapsed > 0 else 0.0
+    with session_factory.begin() as session:
+        job = session.get(Job, job_id)
+        job.status = "success"
+        job.progress = 100
+        job.result = dict(metrics, job_id=str(job_id))
+    logger.info(
+        "📊 unresolved retry: %d attempted, %d resolved, %d backing off, %d exhausted, "
+        "%d locations updated in %.1fs (%.2f places/s)",
+        metrics["attempted"], metrics["resolved"], metrics["failed"], metrics["exhausted"],
+        metrics["locations_updated"], elapsed, metrics["places_per_second"],
+    )
+    return dict(metrics, job_id=str(job_id))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import shutil
 from pathlib import Path
@@ -21,6 +22,7 @@ __all__ = [
     "ALLOWED_EXTENSIONS",
     "validate_upload",
     "save_file",
+    "save_file_hashed",
     "cleanup_temp",
 ]
 
@@ -92,6 +94,23 @@ def save_file(file: FileStorage, temp_dir: str = "/tmp") -> str:
     return path
 
 
+def save_file_hashed(file: FileStorage, temp_dir: str = "/tmp") -> Tuple[str, str]:
+    """Like :func:`save_file`, hashing the bytes as they are written.
+
+    Returns ``(path, sha256_hex)``; the digest keys the parse cache.
+    """
+    tmp_name = generate_temp_path(Path(file.filename).suffix or ".ged")
+    path = str(Path(temp_dir) / tmp_name)
+    digest = hashlib.sha256()
+    file.seek(0)
+    with open(path, "wb") as out:
+        while chunk := file.stream.read(1 << 20):
+            digest.update(chunk)
+            out.write(chunk)
+    logger.debug("💾 Saved upload → %s (sha256=%s)", path, digest.hexdigest()[:12])
+    return path, digest.hexdigest()
+
+
 def cleanup_temp(path: str):
     """Remove temp path or directory; swallow errors but log them."""
     try:
@@ -1,16 +1,25 @@
 import logging
 import os
+
+from celery import chord
 from sqlalchemy.orm import sessionmaker
 
 from backend.celery_app import celery_app
 from backend.db import get_engine
 from backend.models.location import Location
-from backend.models import Job
-from sqlalchemy import func
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point
+from backend.models import Event, Job
+from sqlalchemy import func, select
 from backend.services.geocode import Geocode
-from backend.services.location_service import LocationService
+from backend.services.geocode_fanout import (
+    REQUEUE_DELAY_SECONDS,
+    create_fanout_job,
+    fail_fanout,
+    finish_fanout,
+    run_chunk,
+)
+from backend.services.location_geometry import point_fields, run_geometry_backfill
+from backend.services.spatial_context import get_spatial_context
+from backend.services.unresolved_retry import run_unresolved_retry
 
 # Set up SQLAlchemy session factory
 engine = get_engine()
@@ -43,13 +52,18 @@ def geocode_location_task(self, location_id: int, job_id: str | None = None):
                 logger.info(f"[GeocodeTask] id={location_id} already geocoded, skipping.")
                 return
 
-            # 🔍 Attempt resolution with era-aware context (no hints available here yet)
+            # 🔍 Attempt resolution with era-aware context; the tree's resolved
+            # places (if any event here belongs to one) steer disambiguation
+            tree_version_id = session.scalar(
+                select(Event.tree_id).where(Event.location_id == loc.id).limit(1)
+            )
             result = geocoder.get_or_create_location(
                 session,
                 loc.raw_name,
                 event_year=None,
                 admin_hint=None,
                 family_coords=None,
+                spatial=get_spatial_context(tree_version_id, session),
             )
             if result is None:
                 raise ValueError(f"Geocoder returned no data for '{loc.raw_name}'")
@@ -64,10 +78,11 @@ def geocode_location_task(self, location_id: int, job_id: str | None = None):
             loc.geocoded_at      = getattr(result, "geocoded_at", None)
             loc.geocoded_by      = getattr(result, "geocoded_by", None)
 
-            # set PostGIS geom
+            # set PostGIS geom (and the geohash used off PostGIS)
             if result.latitude is not None and result.longitude is not None:
                 try:
-                    loc.geom = from_shape(Point(result.longitude, result.latitude), srid=4326)
+                    fields = point_fields(result.latitude, result.longitude)
+                    loc.geom, loc.geohash = fields["geom"], fields["geohash"]
                 except Exception:
                     logger.warning("[GeocodeTask] Unable to set geom for id=%s", location_id)
             session.commit()
@@ -93,36 +108,130 @@ def geocode_location_task(self, location_id: int, job_id: str | None = None):
 def batch_geocode_task(self, places: list[str]):
     """Batch resolve a list of place strings with rate-limited providers.
 
-    - Deduplicates inputs
-    - Prefers local Gazetteer before external API
-    - Persists new Locations when resolved
+    Deduplicates the places and fans them out as rate-sized chunks (see
+    :mod:`backend.services.geocode_fanout`); returns the ``geocode_fanout``
+    job id, whose ``progress``/``result`` the chunks keep current.
     """
-    with SessionLocal() as session:
+    try:
+        with SessionLocal.begin() as session:
+            job, chunks = create_fanout_job(session, places or [], api_key=API_KEY)
+            job_id = str(job.id)
+        logger.info("[BatchGeocode] queue=%d unique=%d", len(places or []), sum(len(c) for c in chunks))
+        dispatch_fanout(job_id, chunks)
+        return job_id
+    except Exception as err:
+        logger.exception("[BatchGeocode] ❌ error, retrying…")
+        raise self.retry(exc=err)
+
+
+def dispatch_fanout(job_id: str, chunks: list[list[dict]], *, start: int = 0, countdown: int | None = None) -> str | None:
+    """Run the chunks of a fan-out job as a chord: all chunks, then the fan-in.
+
+    ``start`` numbers the chunks (a re-queued round continues after the last
+    one); ``countdown`` delays them.  Returns the chord's task id.
+    """
+    with SessionLocal.begin() as session:
+        job = session.get(Job, job_id)
+        if not chunks:
+            job.status, job.progress = "success", 100
+            return None
+        callback = geocode_fanout_done_task.s(job_id)
+        result = chord(
+            [
+                geocode_fanout_chunk_task.s(job_id, index, chunk).set(countdown=countdown)
+                for index, chunk in enumerate(chunks, start)
+            ]
+        )(callback)
+        job.task_id = result.id
+        if job.status == "queued":
+            job.status = "started"
+    return result.id
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=10, acks_late=True)
+def geocode_fanout_chunk_task(self, job_id: str, index: int, items: list[dict]):
+    """Resolve one chunk of a fan-out job and merge it into the Job atomically.
+
+    Once its retries are used up the chord's fan-in never runs, so the Job
+    is marked ``failure`` here rather than left in ``progress``.
+    """
+    try:
+        return run_chunk(job_id, index, items, session_factory=SessionLocal, geocoder=geocoder)
+    except LookupError:
+        logger.warning("[GeocodeFanout] job %s not found", job_id)
+        return None
+    except Exception as err:
+        if self.request.retries >= self.max_retries:
+            logger.exception("[GeocodeFanout] ❌ job %s chunk %d failed for good", job_id, index)
+            try:
+                fail_fanout(job_id, f"chunk {index}: {err}", session_factory=SessionLocal)
+            except Exception:
+                logger.exception("[GeocodeFanout] could not mark job %s failed", job_id)
+            raise
+        logger.exception("[GeocodeFanout] ❌ job %s chunk %d failed, retrying…", job_id, index)
+        raise self.retry(exc=err)
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=10)
+def geocode_fanout_done_task(self, chunk_results, job_id: str):
+    """Fan-in of a fan-out job: re-queue deferred places, or mark the Job done."""
+    try:
+        summary = finish_fanout(job_id, session_factory=SessionLocal)
+        requeue = summary.pop("requeue", None)
+        if requeue:
+            dispatch_fanout(job_id, [requeue["items"]], start=requeue["index"], countdown=REQUEUE_DELAY_SECONDS)
+        return summary
+    except LookupError:
+        logger.warning("[GeocodeFanout] job %s not found", job_id)
+        return None
+    except Exception as err:
+        logger.exception("[GeocodeFanout] ❌ job %s fan-in failed, retrying…", job_id)
         try:
-            svc = LocationService(api_key=API_KEY, use_cache=True)
-            unique = []
-            seen = set()
-            for p in places or []:
-                p = (p or "").strip()
-                if not p:
-                    continue
-                if p in seen:
-                    continue
-                seen.add(p)
-                unique.append(p)
-
-            logger.info("[BatchGeocode] queue=%d unique=%d", len(places or []), len(unique))
-            saved = 0
-            for raw in unique:
-                try:
-                    out = svc.resolve_location(raw, db_session=session, save=True)
-                    if out and out.latitude is not None and out.longitude is not None:
-                        saved += 1
-                except Exception:
-                    logger.exception("[BatchGeocode] failed: '%s'", raw)
-            session.commit()
-            logger.info("[BatchGeocode] ✅ saved=%d", saved)
-        except Exception as err:
-            session.rollback()
-            logger.exception("[BatchGeocode] ❌ error, retrying…")
-            raise self.retry(exc=err)
+            with SessionLocal.begin() as session:
+                job = session.get(Job, job_id)
+                if job:
+                    job.status = "failure"
+                    job.error = str(err)
+        except Exception:
+            pass
+        raise self.retry(exc=err)
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30, acks_late=True)
+def backfill_location_geometry_task(self, job_id: str):
+    """Fill ``geom``/``geohash`` on legacy locations that only have lat/lng.
+
+    Resumes from the job's checkpoint on retry (see
+    :func:`backend.services.location_geometry.run_geometry_backfill`).
+    """
+    try:
+        return run_geometry_backfill(job_id, session_factory=SessionLocal)
+    except LookupError:
+        logger.warning("[GeomBackfill] job %s not found", job_id)
+        return None
+    except Exception as err:
+        logger.exception("[GeomBackfill] ❌ job %s failed, retrying…", job_id)
+        try:
+            with SessionLocal.begin() as session:
+                job = session.get(Job, job_id)
+                if job:
+                    job.status = "failure"
+                    job.error = str(err)
+        except Exception:
+            pass
+        raise self.retry(exc=err)
+
+
+@celery_app.task(bind=True, ignore_result=False)
+def retry_unresolved_task(self):
+    """Scheduled retry of due unresolved places (beat: ``UNRESOLVED_RETRY_INTERVAL``).
+
+    Replaces the ``retry_unresolved.py`` subprocess ``upload_tree`` used to
+    launch every fifth upload; see :mod:`backend.services.unresolved_retry`.
+    """
+    try:
+        return run_unresolved_retry(session_factory=SessionLocal, geocoder=geocoder)
+    except Exception:
+        # The next scheduled run picks up where this one stopped
+        logger.exception("[UnresolvedRetry] ❌ run failed")
+        return None
@@ -6,68 +6,62 @@ from pathlib import Path
 
 from backend.celery_app import celery_app
 from backend.db import SessionLocal
-from backend.models import TreeVersion, Job
+from backend.models import Job
 from backend.services.location_service import LocationService
+from backend.services.parse_cache import file_digest
 from backend.services.parser import GEDCOMParser
+from backend.services.staged_import import StagedImport
 from backend.services.upload_service import cleanup_temp
 
 logger = logging.getLogger("mapem.upload_tasks")
 
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=10)
-def process_gedcom_task(self, file_path: str, tree_name: str, uploaded_tree_id: str, job_id: str | None = None):
-    """Background GEDCOM processing."""
-    logger.info("📂 [Task] Starting parse %s (tree=%s)", file_path, uploaded_tree_id)
+@celery_app.task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=10,
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def process_gedcom_task(
+    self,
+    file_path: str,
+    tree_name: str,
+    uploaded_tree_id: str,
+    job_id: str | None = None,
+    content_digest: str | None = None,
+):
+    """Background GEDCOM processing.
 
-    # 1️⃣ Sanity: file must exist
-    if not Path(file_path).exists():
+    Runs as checkpointed stages (see :mod:`backend.services.staged_import`):
+    a retry, or a redelivery after a worker died (``acks_late``), resumes
+    from the last committed chunk recorded on the ``Job`` row.
+
+    ``content_digest`` (SHA-256 of the upload) lets an identical file reuse a
+    cached parse; it is computed here when the caller did not pass one.  The
+    temp file is kept until the import succeeds or runs out of retries.
+    """
+    logger.info(
+        "📂 [Task] Starting parse %s (tree=%s, attempt=%d)",
+        file_path, uploaded_tree_id, self.request.retries + 1,
+    )
+
+    # 1️⃣ Sanity: file must exist (or be covered by the parse cache)
+    if not Path(file_path).exists() and not content_digest:
         msg = f"Temp file {file_path} not found."
         logger.error("❌ [Task] %s", msg)
         return {"status": "error", "message": msg}
 
     try:
-        with SessionLocal.begin() as session:
-            if job_id:
-                job = session.get(Job, job_id)
-                if job:
-                    job.status = "started"
-                    job.progress = 5
-            loc = LocationService(api_key=os.getenv("GEOCODE_API_KEY") or "DUMMY_KEY")
-            parser = GEDCOMParser(file_path, loc)
-
-            parsed = parser.parse_file()
-            logger.info(
-                "📑 [Task] Parsed %d people, %d events",
-                len(parsed["individuals"]),
-                len(parsed["events"]),
-            )
-            if job_id and job:
-                job.progress = 40
-
-            version = TreeVersion(
-                uploaded_tree_id=uploaded_tree_id,
-                version_number=1,
-            )
-            session.add(version)
-            session.flush()
-
-            summary = parser.save_to_db(
-                session,
-                uploaded_tree_id=uploaded_tree_id,
-                tree_version_id=version.id,
-            )
-            logger.info(
-                "✅ [Task] Saved tree %s → version %s", uploaded_tree_id, version.id
-            )
-            if job_id and job:
-                job.status = "success"
-                job.progress = 100
-                job.result = {"version_id": str(version.id), "summary": summary}
-            return {"status": "success", "summary": summary, "version_id": str(version.id)}
-
+        loc = LocationService(api_key=os.getenv("GEOCODE_API_KEY") or "DUMMY_KEY")
+        parser = GEDCOMParser(file_path, loc, content_digest=content_digest or file_digest(file_path))
+        result = StagedImport(parser, uploaded_tree_id=uploaded_tree_id, job_id=job_id).run()
+        logger.info(
+            "✅ [Task] Saved tree %s → version %s", uploaded_tree_id, result["version_id"]
+        )
     except Exception as exc:
         logger.exception("❌ [Task] Failure processing tree %s", uploaded_tree_id)
-        # Preserve original traceback
+        # The checkpoint stays on the job so the retry picks up where this run stopped.
         try:
             with SessionLocal.begin() as session:
                 if job_id:
@@ -77,7 +71,9 @@ def process_gedcom_task(self, file_path: str, tree_name: str, uploaded_tree_id:
                         job.error = str(exc)
         except Exception:
             pass
+        if self.request.retries >= self.max_retries:
+            cleanup_temp(file_path)
         raise self.retry(exc=exc) from exc
 
-    finally:
-        cleanup_temp(file_path)
+    cleanup_temp(file_path)
+    return result
@@ -0,0 +1,67 @@
+"""Minimal geohash encoding for index-friendly coordinate lookups.
+
+A geohash names the grid cell a point falls in; equal prefixes mean nearby
+cells.  ``locations.geohash`` stores the :data:`GEOHASH_PRECISION`-character
+hash (cells of about 4.8 m × 4.8 m), so a near-duplicate search becomes an
+indexed ``geohash IN (...)`` over the few cells a tolerance box touches.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Set
+
+GEOHASH_PRECISION = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a WGS84 point."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = value = 0
+    even = True  # bits alternate longitude, latitude
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value = (value << 1) | 1
+                lng_lo = mid
+            else:
+                value <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def point_geohash(lat: Optional[float], lng: Optional[float]) -> Optional[str]:
+    """:func:`encode` at column precision, or None without coordinates."""
+    if lat is None or lng is None:
+        return None
+    return encode(float(lat), float(lng))
+
+
+def covering(lat: float, lng: float, radius: float, precision: int = GEOHASH_PRECISION) -> Set[str]:
+    """Cells touched by the box ``lat ± radius, lng ± radius`` (degrees).
+
+    Exact as long as ``radius`` is smaller than a cell, which holds for the
+    metre-scale tolerances used for duplicate detection.
+    """
+    return {
+        encode(min(max(y, -90.0), 90.0), min(max(x, -180.0), 180.0), precision)
+        for y in (lat - radius, lat + radius)
+        for x in (lng - radius, lng + radius)
+    }
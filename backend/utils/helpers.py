@@ -15,11 +15,12 @@ from pathlib import Path
 from datetime import datetime
 from fuzzywuzzy import fuzz
 from sqlalchemy.orm import sessionmaker
-from dateutil.parser import parse as _date_parse
 
 
 from backend.db import get_engine
+from backend.services.gedcom_dates import parse_gedcom_date
 from backend.config import settings
+from backend.utils.place_parser import parse_place
 
 
 logger = get_logger(__name__)
@@ -34,26 +35,11 @@ except Exception:  # pragma: no cover - optional dependency
 
 
 def normalize_location(raw_name: str) -> Optional[str]:
-    logger.debug("🌍 normalize_location called with: %s", raw_name)
-
+    """Canonical slug of a place (``None`` if vague); see :mod:`backend.utils.place_parser`."""
     if not raw_name or not isinstance(raw_name, str):
         logger.warning("⚠️ normalize_location got bad input: %s", raw_name)
         return None
-
-    parts = [p.strip().lower() for p in raw_name.split(",") if p.strip()]
-    if len(parts) < 2:
-        logger.warning("🟠 Vague or incomplete location: '%s' → parts=%s", raw_name, parts)
-        return None
-
-    clean_parts = []
-    for p in parts:
-        slug = re.sub(r'[^a-z0-9]+', '_', p).strip("_")
-        if slug:
-            clean_parts.append(slug)
-
-    result = "_".join(clean_parts)
-    logger.debug("✅ normalize_location → '%s'", result or "<empty>")
-    return result
+    return parse_place(raw_name).slug
 
 
 def normalize_name(name):
@@ -219,9 +205,10 @@ def phonetic_keys(name: str) -> Tuple[str, str]:
 def parse_date_flexible(value: str):
     """
     Try to parse a GEDCOM date string into a datetime.
+    Uses the shared GEDCOM date engine; qualified dates give their start.
     Returns None on failure.
     """
-    try:
-        return _date_parse(value, fuzzy=True)
-    except Exception:
+    parsed = parse_gedcom_date(value)
+    if not parsed or parsed.value is None:
         return None
+    return datetime.combine(parsed.value, datetime.min.time())
@@ -0,0 +1,152 @@
+"""Parse raw place strings once: canonical slug plus structured components.
+
+``normalize_location`` used to split, lower-case and ``re.sub`` every comma
+part, and to emit log records, on every call.  A single place was normalised
+again by each geocoder plugin it passed through.  :func:`parse_place`
+tokenises a raw string once into a :class:`ParsedPlace`:
+
+* ``slug``: exactly what ``normalize_location`` returns (``None`` for
+  fewer than two parts), so cache keys, ``Location.normalized_name`` and
+  the GEDCOM parse cache stay valid;
+* ``key``: the geocode cache key (``slug`` or the stripped, lower-cased raw);
+* ``locality`` / ``county`` / ``state`` / ``country``: read right to left
+  from the comma parts.  A trailing country (``USA``, ``England``, …) and a
+  US state name or postal code are recognised; a part naming a county,
+  parish or borough, or the part right before the state, is the county.
+
+Results are interned in a bounded LRU table (``PLACE_PARSE_CACHE_SIZE``)
+shared by every caller in the process, so repeated places cost one dict
+lookup.  Warnings for vague places are logged once per distinct string.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PLACE_PARSE_CACHE_SIZE: int = int(os.getenv("PLACE_PARSE_CACHE_SIZE", "65536"))
+
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+_COUNTY = re.compile(r"\b(county|co|parish|borough|township|twp)\b\.?")
+
+US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california",
+    "co": "colorado", "ct": "connecticut", "de": "delaware", "dc": "district of columbia",
+    "fl": "florida", "ga": "georgia", "hi": "hawaii", "id": "idaho", "il": "illinois",
+    "in": "indiana", "ia": "iowa", "ks": "kansas", "ky": "kentucky", "la": "louisiana",
+    "me": "maine", "md": "maryland", "ma": "massachusetts", "mi": "michigan", "mn": "minnesota",
+    "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska", "nv": "nevada",
+    "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico", "ny": "new york",
+    "nc": "north carolina", "nd": "north dakota", "oh": "ohio", "ok": "oklahoma", "or": "oregon",
+    "pa": "pennsylvania", "ri": "rhode island", "sc": "south carolina", "sd": "south dakota",
+    "tn": "tennessee", "tx": "texas", "ut": "utah", "vt": "vermont", "va": "virginia",
+    "wa": "washington", "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming",
+}
+_STATE_NAMES = {name: name for name in US_STATES.values()}
+_STATE_NAMES.update({abbr: name for abbr, name in US_STATES.items()})
+_STATE_NAMES.update({"miss": "mississippi", "tenn": "tennessee", "ala": "alabama", "ark": "arkansas"})
+
+COUNTRIES = {
+    "usa": "united states", "us": "united states", "u s a": "united states",
+    "united states": "united states", "united states of america": "united states", "america": "united states",
+    "canada": "canada", "mexico": "mexico", "england": "england", "scotland": "scotland",
+    "wales": "wales", "ireland": "ireland", "united kingdom": "united kingdom", "uk": "united kingdom",
+    "germany": "germany", "france": "france", "italy": "italy", "africa": "africa", "jamaica": "jamaica",
+}
+
+
+class ParsedPlace(NamedTuple):
+    """A raw place string, tokenised once."""
+
+    raw: str
+    parts: Tuple[str, ...]           # slug of each non-empty comma part, in order
+    slug: Optional[str]              # normalize_location() result
+    key: str                         # geocode cache key
+    locality: Optional[str] = None
+    county: Optional[str] = None
+    state: Optional[str] = None      # full lower-case state name
+    country: Optional[str] = None
+
+    @property
+    def is_vague(self) -> bool:
+        """Fewer than two parts: ``normalize_location`` gives no slug."""
+        return self.slug is None
+
+
+def _bare(part: str) -> str:
+    return " ".join(_NON_SLUG.sub(" ", part).split())
+
+
+def _components(lowered: Tuple[str, ...]) -> Tuple[Optional[str], ...]:
+    bare = [_bare(p) for p in lowered]
+    country = state = county = None
+    end = len(bare)
+    if end and bare[end - 1] in COUNTRIES:
+        country = COUNTRIES[bare[end - 1]]
+        end -= 1
+    if end and bare[end - 1] in _STATE_NAMES and (end > 1 or country or len(bare) == 1):
+        state = _STATE_NAMES[bare[end - 1]]
+        end -= 1
+        if country is None:
+            country = "united states"
+    for i in range(end - 1, -1, -1):
+        if _COUNTY.search(bare[i]):
+            county = _COUNTY.sub("", bare[i]).strip() or None
+            end = i
+            break
+    else:
+        if state and end >= 2:
+            county = bare[end - 1]
+            end -= 1
+    locality = bare[0] if end >= 1 and bare[0] else None
+    return locality, county, state, country
+
+
+def _lowered(raw: str) -> Tuple[str, ...]:
+    return tuple(p for p in (p.strip().lower() for p in raw.split(",")) if p)
+
+
+def _slug_parts(lowered: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(s for s in (_NON_SLUG.sub("_", p).strip("_") for p in lowered) if s)
+
+
+def slug_parts(raw: str) -> Tuple[str, ...]:
+    """:attr:`ParsedPlace.parts` of ``raw`` without interning or logging (for bulk loads)."""
+    return _slug_parts(_lowered(raw or ""))
+
+
+@lru_cache(maxsize=PLACE_PARSE_CACHE_SIZE)
+def _parse(raw: str) -> ParsedPlace:
+    lowered = _lowered(raw)
+    parts = _slug_parts(lowered)
+    if len(lowered) < 2:
+        logger.warning("🟠 Vague or incomplete location: '%s' → parts=%s", raw, list(lowered))
+        slug = None
+    else:
+        slug = "_".join(parts)
+    key = slug.lower() if slug else raw.strip().lower()
+    return ParsedPlace(raw, parts, slug, key, *_components(lowered))
+
+
+def parse_place(raw) -> ParsedPlace:
+    """Interned :class:`ParsedPlace` for ``raw`` (non-strings parse as empty)."""
+    if isinstance(raw, ParsedPlace):
+        return raw
+    if not isinstance(raw, str):
+        raw = ""
+    return _parse(raw)
+
+
+def parse_cache_info():
+    """``functools`` cache statistics of the intern table."""
+    return _parse.cache_info()
+
+
+def clear_parse_cache() -> None:
+    _parse.cache_clear()
@@ -1,6 +1,7 @@
 # backend/utils/tree_helpers.py
 from backend.models import TreeVersion, UploadedTree
-from flask import abort
+from backend.services.incremental import replacement_version
+from flask import abort, jsonify
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -18,7 +19,8 @@ def get_latest_tree_version(db: Session, tree_id) -> TreeVersion:
     # Try direct TreeVersion ID match
     version = db.query(TreeVersion).filter(TreeVersion.id == tree_uuid).first()
     if version:
-        return version
+        # A superseded version's unchanged rows moved to its successor
+        return replacement_version(db, version) or version
 
     # Fall back to assuming it's an UploadedTree ID
     versions = (
@@ -32,3 +34,20 @@ def get_latest_tree_version(db: Session, tree_id) -> TreeVersion:
 
     raise ValueError("Tree not found")
 
+
+def superseded_response(db: Session, *version_ids):
+    """410 naming the latest version if any of ``version_ids`` was superseded by a re-import.
+
+    A superseded version lost its unchanged rows to its successor, so routes
+    that filter on a caller's version id return this instead of partial
+    data.  Ids that are not UUIDs are left to the caller's own handling.
+    """
+    for version_id in version_ids:
+        try:
+            version = db.get(TreeVersion, UUID(str(version_id)))
+        except ValueError:
+            continue
+        if version is not None and (latest := replacement_version(db, version)) is not None:
+            return jsonify({"error": "TreeVersion superseded", "latest_version_id": str(latest.id)}), 410
+    return None
+
@@ -11,6 +11,10 @@ def parse_uuid_arg(name: str, raw: str):
         log.warning(f"⚠️ Invalid UUID for {name}: {raw}")
         raise ValueError(f"{name} must be a valid UUID")
 
+def as_uuid(value) -> UUID:
+    """``value`` as a UUID; Celery hands job ids to services as strings."""
+    return value if isinstance(value, UUID) else UUID(str(value))
+
 def parse_uuid_arg_or_400(name: str, raw: str):
     try:
         return UUID(raw)
@@ -3,11 +3,11 @@ import sys
 import json
 import logging
 import argparse
-from backend.config import DATA_DIR
 from sqlalchemy.orm import sessionmaker
 from backend.db import get_engine
 from backend.models.location import Location, LocationStatusEnum
 from backend.utils.helpers import normalize_location as normalize_location_name
+from backend.services.unresolved_log import iter_unresolved, unresolved_to_dict
 from sqlalchemy import or_
 
 
@@ -22,17 +22,23 @@ def load_locations_from_json(path):
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--file", default=str(DATA_DIR / "unresolved_locations.json"))
+    parser.add_argument("--file", default=None,
+                        help="Legacy unresolved_locations.json (default: the unresolved_places table)")
     parser.add_argument("--dry_run", action="store_true", help="Do not commit changes")
     args = parser.parse_args()
 
-    unresolved = load_locations_from_json(args.file)
-    log.info(f"📦 Loaded {len(unresolved)} unresolved entries from {args.file}")
-
     engine = get_engine()
-    Session = sessionmaker(bind=engine)
+    # Page rows stay readable across the per-insert commits below
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
     session = Session()
 
+    if args.file:
+        unresolved = load_locations_from_json(args.file)
+        log.info(f"📦 Loaded {len(unresolved)} unresolved entries from {args.file}")
+    else:
+        unresolved = (unresolved_to_dict(row) for row in iter_unresolved(session))
+        log.info("📦 Reading unresolved places from the DB, page by page")
+
     inserted = 0
     for entry in unresolved:
         raw = entry.get("raw_name") or entry.get("place")
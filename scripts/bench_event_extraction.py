@@ -0,0 +1,178 @@
+"""Microbenchmark: single-pass event extraction vs the old per-tag scans.
+
+The old extractor called ``sub_tag_value("TAG/DATE")``/``("TAG/PLAC")`` and
+rescanned all sub-records for sources once per ``EVENT_TAGS`` entry, keeping
+only the first occurrence of each tag.  It is reproduced here as the baseline.
+The single-pass extractor also emits repeated tags, so both per-record and
+per-event ratios are printed; the ``walk`` row times record scanning alone,
+without date parsing or event building.
+
+    python scripts/bench_event_extraction.py
+    python scripts/bench_event_extraction.py my_tree.ged --engine stream --repeat 10
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.services.gedcom_core import GedcomCoreParser  # noqa: E402
+from backend.services.gedcom_normalizer import (  # noqa: E402
+    EVENT_TAGS,
+    FAMILY_EVENT_TAGS,
+    _scan_event,
+    extract_events_from_family,
+    extract_events_from_individual,
+    normalize_family,
+    normalize_individual,
+    parse_date_flexible,
+    logger,
+    safe_strip,
+)
+from backend.services.gedcom_stream import GedcomStreamParser  # noqa: E402
+
+DEFAULT_FILES = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "*.ged")
+
+
+def legacy_individual(individual_record, normalized_individual):
+    events = []
+    gid = normalized_individual.get("gedcom_id")
+    for tag, (etype, category) in EVENT_TAGS.items():
+        date_raw = individual_record.sub_tag_value(f"{tag}/DATE")
+        place_raw = individual_record.sub_tag_value(f"{tag}/PLAC")
+        date_obj = parse_date_flexible(str(date_raw)) if date_raw else None
+        place = place_raw or None
+        source_info = []
+        for sub in individual_record.sub_records:
+            if sub.tag == tag:
+                for ss in sub.sub_records:
+                    if ss.tag in ("SOUR", "PAGE", "TITL"):
+                        source_info.append(f"{ss.tag}: {safe_strip(ss.value)}")
+        if date_obj or place:
+            precision = "exact" if date_obj and place else "date_only" if date_obj else "place_only"
+            event = {
+                "event_type": etype,
+                "individual_gedcom_id": gid,
+                "date": date_obj.isoformat() if date_obj else None,
+                "date_precision": precision,
+                "notes": "; ".join(source_info) if source_info else "",
+                "location": place,
+                "source_tag": tag,
+                "category": category,
+            }
+            events.append(event)
+            logger.info(f"📅 INDI {gid} → {etype}@{event['date']} (place='{place}')")
+    return events
+
+
+def legacy_family(family_record, normalized_family):
+    events = []
+    fam_id = normalized_family["gedcom_id"]
+    husb_id = normalized_family.get("husband_id")
+    wife_id = normalized_family.get("wife_id")
+    for tag in FAMILY_EVENT_TAGS:
+        event_type, category = EVENT_TAGS[tag]
+        raw_date = family_record.sub_tag_value(f"{tag}/DATE")
+        raw_place = family_record.sub_tag_value(f"{tag}/PLAC")
+        date = parse_date_flexible(str(raw_date)) if raw_date else None
+        place = raw_place or None
+        if date or place:
+            precision = "exact" if date and place else "date_only" if date else "place_only"
+            event = {
+                "event_type": event_type,
+                "family_gedcom_id": fam_id,
+                "husband_gedcom_id": husb_id,
+                "wife_gedcom_id": wife_id,
+                "date": date.isoformat() if date else None,
+                "date_precision": precision,
+                "location": place,
+                "source_tag": tag,
+                "category": category,
+                "notes": "",
+            }
+            events.append(event)
+            logger.info(f"👪 FAM {fam_id} → {event_type}@{event['date']} (place='{place}')")
+    return events
+
+
+def legacy_walk(record, _normalized):
+    """Only the record scanning of the per-tag extractor (no dates, no dicts)."""
+    found = []
+    for tag in EVENT_TAGS:
+        date_raw = record.sub_tag_value(f"{tag}/DATE")
+        place_raw = record.sub_tag_value(f"{tag}/PLAC")
+        sources = [
+            ss for sub in record.sub_records if sub.tag == tag
+            for ss in sub.sub_records if ss.tag in ("SOUR", "PAGE", "TITL")
+        ]
+        if date_raw or place_raw:
+            found.append((tag, date_raw, place_raw, sources))
+    return found
+
+
+def single_pass_walk(record, _normalized):
+    """Only the record scanning of the single-pass extractor."""
+    found = []
+    for sub in record.sub_records:
+        if sub.tag in EVENT_TAGS:
+            date_raw, place_raw, sources = _scan_event(sub)
+            if date_raw or place_raw:
+                found.append((sub.tag, date_raw, place_raw, sources))
+    return found
+
+
+def timed(fn, items, repeat):
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = sum(len(fn(*item)) for item in items)
+        best = min(best, time.perf_counter() - t0)
+    return best, count
+
+
+def bench_file(path, engine, repeat):
+    raw = GedcomStreamParser(path).parse() if engine == "stream" else GedcomCoreParser(path).parse()
+    people = [(r, normalize_individual(r)) for r in raw["individuals"]]
+    families = [(r, normalize_family(r)) for r in raw["families"]]
+
+    print(f"\n📂 {os.path.basename(path)} ({len(people)} individuals, {len(families)} families, engine={engine})")
+    rows = [
+        ("INDI", people, legacy_individual, extract_events_from_individual),
+        ("FAM", families, legacy_family, extract_events_from_family),
+        ("walk", people, legacy_walk, single_pass_walk),
+    ]
+    for label, items, old_fn, new_fn in rows:
+        if not items:
+            continue
+        old_s, old_n = timed(old_fn, items, repeat)
+        new_s, new_n = timed(new_fn, items, repeat)
+        per_old = old_s / len(items) * 1e6
+        per_new = new_s / len(items) * 1e6
+        print(
+            f"  {label:4} per-tag {per_old:7.1f} µs/record ({old_n} events) │ "
+            f"single-pass {per_new:7.1f} µs/record ({new_n} events) │ {per_old / per_new:4.1f}x per record, "
+            f"{(old_s / max(old_n, 1)) / (new_s / max(new_n, 1)):4.1f}x per event"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GEDCOM event extraction.")
+    parser.add_argument("files", nargs="*", help="GEDCOM files (default: tests/data/*.ged)")
+    parser.add_argument("--engine", choices=("ged4py", "stream"), default="ged4py")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    # Per-event INFO logs would dominate the timings.
+    logging.disable(logging.INFO)
+    for path in args.files or sorted(glob.glob(DEFAULT_FILES)):
+        bench_file(path, args.engine, max(1, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
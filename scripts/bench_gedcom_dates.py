@@ -0,0 +1,118 @@
+"""Benchmark the GEDCOM date engine against the parsers it replaced.
+
+The corpus is every ``DATE`` value in the given GEDCOM files, in file order
+and with repeats, exactly as the import pipeline sees them (ged4py's
+``DateValue`` string form).  For each parser it prints the time per value and
+how many values produced a date.
+
+* ``strptime`` — the old ``gedcom_normalizer.parse_date_flexible`` (10 formats)
+* ``dateutil`` — the old ``helpers.parse_date_flexible`` (``fuzzy=True``)
+* ``engine``   — :func:`parse_gedcom_date`, with a cold and a warm cache
+
+    python scripts/bench_gedcom_dates.py
+    python scripts/bench_gedcom_dates.py my_tree.ged --repeat 5 --show-misses
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dateutil.parser import parse as dateutil_parse  # noqa: E402
+
+from backend.services.gedcom_dates import _parse_cached, date_cache_info, parse_gedcom_date  # noqa: E402
+from backend.services.gedcom_stream import GedcomStreamParser  # noqa: E402
+
+DEFAULT_FILES = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "*.ged")
+
+LEGACY_FORMATS = [
+    "%d %b %Y", "%b %Y", "%Y", "%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y",
+    "%d %B %Y", "%B %Y", "%b. %d, %Y", "%B %d, %Y"
+]
+
+
+def legacy_strptime(date_str):
+    date_str = str(date_str).strip()
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except Exception:
+            continue
+    return None
+
+
+def legacy_dateutil(value):
+    try:
+        return dateutil_parse(value, fuzzy=True)
+    except Exception:
+        return None
+
+
+def collect_dates(paths):
+    values = []
+    for path in paths:
+        for rec in GedcomStreamParser(path).iter_records():
+            todo = list(rec.sub_records)
+            while todo:
+                sub = todo.pop()
+                if sub.tag == "DATE" and sub.value is not None:
+                    values.append(str(sub.value))
+                todo.extend(sub.sub_records)
+    return values
+
+
+def timed(fn, values, repeat, before=None):
+    best = float("inf")
+    parsed = 0
+    for _ in range(repeat):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        parsed = sum(1 for v in values if fn(v))
+        best = min(best, time.perf_counter() - t0)
+    return best, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GEDCOM date parsing.")
+    parser.add_argument("files", nargs="*", help="GEDCOM files (default: tests/data/*.ged)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per parser")
+    parser.add_argument("--show-misses", action="store_true", help="List distinct values the engine rejects")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    values = collect_dates(args.files or sorted(glob.glob(DEFAULT_FILES)))
+    if not values:
+        print("No DATE values found.")
+        return 1
+    distinct = len(set(values))
+    repeat = max(1, args.repeat)
+    print(f"📅 {len(values)} DATE values, {distinct} distinct")
+
+    rows = [
+        ("strptime", legacy_strptime, None),
+        ("dateutil", legacy_dateutil, None),
+        ("engine (cold)", parse_gedcom_date, _parse_cached.cache_clear),
+        ("engine (warm)", parse_gedcom_date, None),
+    ]
+    for label, fn, before in rows:
+        seconds, parsed = timed(fn, values, repeat, before)
+        print(
+            f"  {label:14} {seconds / len(values) * 1e6:7.2f} µs/value │ "
+            f"{parsed:6d}/{len(values)} parsed ({parsed / len(values):6.1%})"
+        )
+    print(f"  cache: {date_cache_info()}")
+
+    if args.show_misses:
+        for value in sorted({v for v in values if not parse_gedcom_date(v)}):
+            print(f"  ❌ {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""Compare the ged4py and stream GEDCOM engines on real files.
+
+Reports wall time (best of ``--repeat``) and peak traced memory for the raw
+read and for the full ``GEDCOMParser.parse_file`` pipeline, and checks that
+both engines produce identical normalised output.
+
+    python scripts/bench_gedcom_engines.py                  # tests/data/*.ged
+    python scripts/bench_gedcom_engines.py my_tree.ged --repeat 5
+    MAPEM_NORMALIZE_SHARD_BYTES=65536 python scripts/bench_gedcom_engines.py --workers 4
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.services.gedcom_core import GedcomCoreParser  # noqa: E402
+from backend.services.gedcom_stream import GedcomStreamParser  # noqa: E402
+from backend.services.parser import GEDCOM_ENGINES, GEDCOMParser  # noqa: E402
+
+DEFAULT_FILES = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "*.ged")
+
+READERS = {
+    "ged4py": lambda path: GedcomCoreParser(path).parse(),
+    "stream": lambda path: GedcomStreamParser(path).parse(),
+}
+
+
+def measure(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def bench_file(path, repeat, workers):
+    print(f"\n📂 {os.path.basename(path)} ({os.path.getsize(path):,} bytes)")
+    outputs = {}
+    for engine in GEDCOM_ENGINES:
+        read_s, read_peak, _ = measure(lambda: READERS[engine](path), repeat)
+        full_s, full_peak, data = measure(lambda: GEDCOMParser(path, None, engine=engine, workers=1).parse_file(), repeat)
+        outputs[engine] = data
+        print(
+            f"  {engine:9} read {read_s * 1000:8.1f} ms  peak {read_peak / 2**20:7.1f} MiB │ "
+            f"parse_file {full_s * 1000:8.1f} ms  peak {full_peak / 2**20:7.1f} MiB │ "
+            f"{len(data['individuals'])} indi, {len(data['families'])} fam, {len(data['events'])} events"
+        )
+    if workers > 1:
+        # Peak memory is only traced in this process, so it is not shown.
+        label = f"stream/{workers}"
+        full_s, _, data = measure(lambda: GEDCOMParser(path, None, engine="stream", workers=workers).parse_file(), repeat)
+        outputs[label] = data
+        print(f"  {label:9} {'':34}│ parse_file {full_s * 1000:8.1f} ms")
+    first, *rest = outputs.values()
+    same = all(other == first for other in rest)
+    print(f"  {'✅ outputs identical' if same else '❌ outputs differ'}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GEDCOM parsing engines.")
+    parser.add_argument("files", nargs="*", help="GEDCOM files (default: tests/data/*.ged)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument("--workers", type=int, default=0, help="Also time the stream engine with N processes")
+    parser.add_argument("--verbose", action="store_true", help="Keep per-record INFO logging on")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # Per-individual INFO logs would dominate the timings.
+        logging.disable(logging.INFO)
+
+    files = args.files or sorted(glob.glob(DEFAULT_FILES))
+    ok = all([bench_file(path, max(1, args.repeat), args.workers) for path in files])
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""Benchmark the geocoding chain offline against recorded provider responses.
+
+Replays the fixture store (``GEOCODE_FIXTURES``, filled by running with
+``MAPEM_GEOCODE_PROVIDER_MODE=record``) through :class:`Geocode` under a
+latency/error profile, once place by place (``get_or_create_location``, the
+ingest path) and once with ``resolve_many`` (concurrent external calls), and
+prints throughput and the replay hit/miss/error counts.  No network is used.
+
+The places default to the recorded queries; ``--places`` reads one place per
+line instead.  Without ``--db`` the gazetteer tier is skipped.
+
+    python scripts/bench_geocode_replay.py --latency 80-400
+    python scripts/bench_geocode_replay.py --latency recorded --error-rate 0.05 --db
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import backend.services.geocode_async as geocode_async  # noqa: E402
+from backend.services.geocode import Geocode  # noqa: E402
+from backend.services.geocode_replay import GEOCODE_FIXTURES, FixtureStore, ReplayTransport  # noqa: E402
+
+
+def recorded_places(store: FixtureStore):
+    seen = []
+    for entry in store.entries():
+        place = entry["params"].get("q") or entry["params"].get("address")
+        if place and place not in seen:
+            seen.append(place)
+    return seen
+
+
+def run(label, geo, fn, places):
+    started = time.perf_counter()
+    resolved = fn(geo, places)
+    elapsed = time.perf_counter() - started
+    stats = geo.provider_transport.stats
+    print(
+        f"  {label:<10} {len(places) / elapsed:8.1f} places/s  {elapsed:7.2f} s  "
+        f"resolved={resolved}  hits={stats['hits']} misses={stats['misses']} errors={stats['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark geocoding against replayed provider responses.")
+    parser.add_argument("--fixtures", default=str(GEOCODE_FIXTURES), help="Fixture store (JSON lines)")
+    parser.add_argument("--places", help="File with one place per line (default: recorded queries)")
+    parser.add_argument("--latency", default="recorded", help="recorded | <ms> | <lo>-<hi>")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--limit", type=int, default=0, help="Use at most this many places")
+    parser.add_argument("--db", action="store_true", help="Include the gazetteer tier (needs the database)")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Ignore provider rate limits")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    store = FixtureStore(args.fixtures)
+    if args.places:
+        with open(args.places, encoding="utf-8") as fh:
+            places = [line.strip() for line in fh if line.strip()]
+    else:
+        places = recorded_places(store)
+    if args.limit:
+        places = places[: args.limit]
+    if not places:
+        print(f"❌ No places: record fixtures into {args.fixtures} first")
+        return 1
+    if args.no_rate_limit:
+        geocode_async.SHARED_RATE_LIMITS = False
+        geocode_async.PROVIDER_RATES = {"google": 1e6, "nominatim": 1e6}
+
+    session = None
+    if args.db:
+        from backend.db import SessionLocal
+
+        session = SessionLocal()
+
+    def geocoder():
+        transport = ReplayTransport(
+            store, latency=args.latency, error_rate=args.error_rate, error_status=args.error_status, seed=args.seed
+        )
+        geo = Geocode(use_cache=False, mock_mode=False, provider_transport=transport)
+        if session is None:
+            geo.plugins = [p for p in geo.plugins if type(p).__name__ != "GazetteerDBGeocoder"]
+        return geo
+
+    def sequential(geo, batch):
+        return sum(1 for p in batch if getattr(geo.get_or_create_location(session, p), "latitude", None) is not None)
+
+    def concurrent(geo, batch):
+        return sum(1 for r in geo.resolve_many(session, batch).values() if getattr(r, "latitude", None) is not None)
+
+    print(f"📼 {len(places)} places, {len(store)} fixtures, latency={args.latency}, error rate={args.error_rate}")
+    run("sequential", geocoder(), sequential, places)
+    run("concurrent", geocoder(), concurrent, places)
+    if session is not None:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
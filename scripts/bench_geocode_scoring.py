@@ -0,0 +1,90 @@
+"""Benchmark batch gazetteer scoring against the per-candidate scorer.
+
+Scores random candidate sets (``--candidates`` each, default 50, the
+GazetteerDBGeocoder limit) against ``--family`` known family coordinates
+with :func:`score_candidate` in a loop and with :func:`score_candidates`,
+checks that both give identical scores and breakdowns, and prints the
+time per set (also for scores alone, ``explain=False``).
+
+    python scripts/bench_geocode_scoring.py
+    python scripts/bench_geocode_scoring.py --candidates 50 --family 500 --sets 200
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.services.gazetteer_index import GazetteerHit  # noqa: E402
+from backend.services.geocode_brain import CandidateBatch, score_candidate, score_candidates  # noqa: E402
+
+ERAS = ["pre_1800", "1800_1890", "1890_1950", "unknown"]
+TOWNS = ["ruleville", "drew", "greenwood", "itta_bena", "moorhead", "indianola", "clarksdale", "sunflower"]
+COUNTIES = ["sunflower", "leflore", "coahoma", "bolivar", "washington"]
+
+
+def random_hit(rng):
+    town, county = rng.choice(TOWNS), rng.choice(COUNTIES)
+    return GazetteerHit(
+        id=uuid.uuid4(),
+        name_norm=f"{town}_{county}_mississippi",
+        admin_norm=rng.choice([f"{county}_mississippi", None]),
+        era_bucket=rng.choice(ERAS),
+        latitude=rng.uniform(30, 35),
+        longitude=rng.uniform(-92, -88),
+        source="geonames",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gazetteer candidate scoring.")
+    parser.add_argument("--candidates", type=int, default=50, help="Candidates per set")
+    parser.add_argument("--family", type=int, default=300, help="Family coordinates per set")
+    parser.add_argument("--sets", type=int, default=100, help="Candidate sets to score")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+    cases = []
+    for _ in range(args.sets):
+        query = f"{rng.choice(TOWNS)}_{rng.choice(COUNTIES)}_mississippi"
+        rows = [random_hit(rng) for _ in range(args.candidates)]
+        family = [(rng.uniform(30, 35), rng.uniform(-92, -88)) for _ in range(args.family)]
+        year = rng.choice([None, 1850, 1920])
+        cases.append((query, "sunflower_mississippi", family, year, rows))
+
+    t0 = time.perf_counter()
+    scalar = [[score_candidate(q, a, f, y, r) for r in rows] for q, a, f, y, rows in cases]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = [score_candidates(q, a, f, y, CandidateBatch.from_rows(rows)) for q, a, f, y, rows in cases]
+    t_batch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for q, a, f, y, rows in cases:
+        score_candidates(q, a, f, y, CandidateBatch.from_rows(rows), explain=False)
+    t_scores = time.perf_counter() - t0
+
+    mismatches = sum(
+        1
+        for old, (scores, details) in zip(scalar, batch)
+        for (s, d), s2, d2 in zip(old, scores, details)
+        if s != float(s2) or d != d2
+    )
+    print(f"🎯 {args.sets} sets × {args.candidates} candidates, {args.family} family coordinates")
+    print(f"  scalar  {t_scalar / args.sets * 1e3:8.3f} ms/set")
+    print(f"  batch   {t_batch / args.sets * 1e3:8.3f} ms/set  ({t_scalar / t_batch:.1f}× faster)")
+    print(f"  scores  {t_scores / args.sets * 1e3:8.3f} ms/set  ({t_scalar / t_scores:.1f}× faster, no breakdown)")
+    print(f"  mismatched candidates: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,14 @@
 from sqlalchemy.orm import sessionmaker
 from backend.db import get_engine
 from backend.models.location import Location
-from backend.tasks.geocode_tasks import geocode_location_task
+from backend.tasks.geocode_tasks import dispatch_fanout
+from backend.services.geocode_fanout import create_fanout_job
 from sqlalchemy import not_
 
 
 # Init session
 engine = get_engine()
 SessionLocal = sessionmaker(bind=engine)
-session = SessionLocal()
 resolved_statuses = [
     "valid",
     "vague_state",
@@ -18,20 +18,19 @@ resolved_statuses = [
 ]
 
 def main():
-    unresolved = (
-        session.query(Location.id)
-        .filter(Location.latitude.is_(None))
-        .filter(not_(Location.status.in_(resolved_statuses)))
-        .all()
-    )
-
-
-    print(f"📦 Queuing {len(unresolved)} unresolved locations...")
-
-    for (loc_id,) in unresolved:
-        print(f"➡️ Queuing ID {loc_id}")
-        geocode_location_task.delay(loc_id)
-
+    with SessionLocal.begin() as session:
+        unresolved = (
+            session.query(Location.raw_name, Location.normalized_name)
+            .filter(Location.latitude.is_(None))
+            .filter(not_(Location.status.in_(resolved_statuses)))
+            .all()
+        )
+        # One fan-out job: rate-sized chunks instead of one task per location
+        job, chunks = create_fanout_job(session, unresolved, source="dispatch_unresolved_locations")
+        job_id = str(job.id)
+
+    print(f"📦 Queuing {len(unresolved)} unresolved locations as {len(chunks)} chunks (job {job_id})...")
+    dispatch_fanout(job_id, chunks)
     print("✅ Done queuing.")
 
 if __name__ == "__main__":
@@ -1,16 +1,14 @@
 #!/usr/bin/env python3
 """
-Load unresolved_locations.json, apply manual fixes or geocode retries,
-and update the database. Supports optional --tree filtering.
+Page through the unresolved_places table, apply manual fixes or geocode
+retries, and update the database. Supports optional --tree filtering.
 """
 
 import sys
 import os
 import json
 import logging
-import shutil
 import argparse
-from datetime import datetime
 from pathlib import Path
 from sqlalchemy.orm import sessionmaker
 
@@ -18,6 +16,7 @@ from backend.db import get_engine
 from backend.models import location_models as models
 from backend.services.geocode import Geocode
 from backend.services.location_processor import log_unresolved_location
+from backend.services.unresolved_log import iter_unresolved, unresolved_to_dict
 from backend.utils.helpers import normalize_location
 from backend.utils.logger import get_file_logger
 from backend.config import DATA_DIR
@@ -28,7 +27,6 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(
 # ─── Paths Config ───────────────────────────────────────────────────────────
 DATA_DIR = Path(DATA_DIR)
 DATA_DIR.mkdir(exist_ok=True, parents=True)
-UNRESOLVED_LOG = DATA_DIR / "unresolved_locations.json"
 DEFAULT_FIXES = DATA_DIR / "manual_place_fixes.json"
 
 # ─── Argparse ───────────────────────────────────────────────────────────────
@@ -39,17 +37,12 @@ parser.add_argument("--tree", type=str,
                     help="Optional: only retry entries from this tree ID")
 args = parser.parse_args()
 
-def load_unresolved():
-    if not UNRESOLVED_LOG.exists():
-        logger.error(f"❌ {UNRESOLVED_LOG} not found.")
-        return []
-    with open(UNRESOLVED_LOG, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ Failed to parse {UNRESOLVED_LOG}: {e}")
-            return []
-    logger.info(f"📄 Loaded {len(data)} unresolved entries from {UNRESOLVED_LOG.name}.")
+def load_unresolved(session, tree_id=None):
+    data = [
+        unresolved_to_dict(row)
+        for row in iter_unresolved(session, status="manual_fix_pending", tree_id=tree_id)
+    ]
+    logger.info(f"📄 Loaded {len(data)} unresolved places from the DB.")
     return data
 
 def load_manual_fixes(path):
@@ -61,29 +54,20 @@ def load_manual_fixes(path):
         return json.load(f)
 
 def apply_manual_fixes():
-    unresolved = load_unresolved()
+    engine = get_engine()
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    with Session() as session:
+        unresolved = load_unresolved(session, tree_id=args.tree)
     fixes = load_manual_fixes(args.manual_fixes)
     if not unresolved:
         logger.info("🟡 No unresolved entries to process.")
         return
-
     if args.tree:
-        before = len(unresolved)
-        unresolved = [e for e in unresolved if e.get("tree_id") == args.tree]
-        logger.info(f"🌳 Tree filter: {args.tree} → {len(unresolved)} entries (of {before})")
-
-    # Backup unresolved log
-    if UNRESOLVED_LOG.exists():
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = UNRESOLVED_LOG.with_name(UNRESOLVED_LOG.name + f".bak.{timestamp}")
-        shutil.copyfile(UNRESOLVED_LOG, backup_path)
-        logger.info(f"📦 Backup of unresolved log saved to: {backup_path}")
+        logger.info(f"🌳 Tree filter: {args.tree} → {len(unresolved)} entries")
 
     logger.info(f"🔧 Applying manual fixes to {len(unresolved)} entries…")
     still_unresolved = []
 
-    engine = get_engine()
-    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
     geocoder = Geocode(api_key=os.getenv("GEOCODE_API_KEY"))
 
     for entry in unresolved:
@@ -178,8 +178,8 @@ launch_flask() {
   fi
   end_timer "Flask boot"
 }
-echo "📣 Launching Celery worker"
-celery -A backend.celery_app.celery_app worker --loglevel=info > celery.log 2>&1 & CELERY_PID=$!
+echo "📣 Launching Celery worker (with beat for scheduled jobs)"
+celery -A backend.celery_app.celery_app worker -B --loglevel=info > celery.log 2>&1 & CELERY_PID=$!
 sleep 2
 if ps -p $CELERY_PID >/dev/null; then
   success "Celery worker started (PID $CELERY_PID)"
@@ -1,6 +1,8 @@
 import re
 import json
 from pathlib import Path
+from backend.db import SessionLocal
+from backend.services.unresolved_log import iter_unresolved
 from backend.utils.helpers import normalize_location
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
@@ -18,7 +20,6 @@ from backend.config import DATA_DIR
 
 PROJECT_ROOT    = Path(__file__).resolve().parents[1]
 FIXES_PATH      = DATA_DIR / "manual_place_fixes.json"
-UNRESOLVED_PATH = DATA_DIR / "unresolved_locations.json"
 
 try:
     with FIXES_PATH.open() as f:
@@ -61,27 +62,16 @@ def classify_location(raw_name: str) -> dict:
 # ─── Main ────────────────────────────────────────────────────────────────────
 
 def main():
-    if not UNRESOLVED_PATH.exists():
-        print(f"❌ unresolved_locations.json not found at {UNRESOLVED_PATH}")
-        return
-
-    with UNRESOLVED_PATH.open() as f:
-        data = json.load(f)
-
-    print(f"🔍 Loaded {len(data)} unresolved entries from {UNRESOLVED_PATH}")
-
-    seen = set()
-    for entry in data:
-        raw = entry.get("raw_name") or entry.get("place")
-        if not raw:
-            continue
-        key = raw.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-
-        result = classify_location(raw)
-        print(json.dumps(result, indent=2))
+    with SessionLocal() as session:
+        count = 0
+        for row in iter_unresolved(session):
+            count += 1
+            result = classify_location(row.raw_name)
+            result["reason"] = row.reason
+            result["occurrences"] = row.occurrences
+            print(json.dumps(result, indent=2))
+
+    print(f"🔍 Audited {count} unresolved places from the unresolved_places table")
 
 if __name__ == "__main__":
     main()
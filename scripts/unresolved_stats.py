@@ -1,55 +1,71 @@
 #!/usr/bin/env python3
-"""Generate simple stats from unresolved_locations.json.
+"""Generate simple stats from the unresolved_places table.
 
 Outputs:
-- Top failing place names
-- Source breakdown by `source_tag`
+- Top failing place names (by occurrences)
+- Reason breakdown
+
+Use ``--import-json`` once to fold a legacy unresolved_locations.json into
+the table before reporting.
 """
 
-import json
-from collections import Counter
+import argparse
+import sys
 from pathlib import Path
 
-DATA_PATH = Path(__file__).resolve().parents[1] / "backend" / "data" / "unresolved_locations.json"
+from sqlalchemy import func, select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.db import SessionLocal  # noqa: E402
+from backend.models.unresolved_place import UnresolvedPlace  # noqa: E402
+from backend.services.unresolved_log import import_legacy_json  # noqa: E402
+
 TOP_N = 10
 
 
 def main():
-    if not DATA_PATH.exists():
-        print(f"❌ File not found: {DATA_PATH}")
-        return
-
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse {DATA_PATH}: {e}")
-            return
-
-    if not isinstance(data, list):
-        print("❌ Unexpected format: expected a list of entries")
-        return
-
-    names = [
-        (e.get("raw_name") or e.get("place") or "").strip()
-        for e in data
-        if (e.get("raw_name") or e.get("place"))
-    ]
-    top_counts = Counter(names).most_common(TOP_N)
-
-    if top_counts:
-        print("\n📊 Top Unresolved Names:")
-        for name, count in top_counts:
-            print(f"{name}\t{count}")
-    else:
-        print("No unresolved names found.")
-
-    sources = [str(e.get("source_tag") or "unknown").strip().lower() for e in data]
-    source_counts = Counter(sources)
-    if source_counts:
-        print("\n📈 Source Breakdown:")
-        for src, count in source_counts.items():
-            print(f"{src}\t{count}")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=TOP_N, help="How many place names to list")
+    parser.add_argument("--tree", default=None, help="Only count this tree_id")
+    parser.add_argument("--import-json", type=Path, default=None,
+                        help="Import a legacy unresolved_locations.json first")
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        if args.import_json:
+            imported = import_legacy_json(session, args.import_json)
+            session.commit()
+            print(f"📥 Imported {imported} legacy entries from {args.import_json}")
+
+        scope = []
+        if args.tree:
+            scope.append(UnresolvedPlace.tree_id == str(args.tree))
+
+        top_counts = session.execute(
+            select(UnresolvedPlace.raw_name, func.sum(UnresolvedPlace.occurrences).label("n"))
+            .where(*scope)
+            .group_by(UnresolvedPlace.place_key, UnresolvedPlace.raw_name)
+            .order_by(func.sum(UnresolvedPlace.occurrences).desc())
+            .limit(args.top)
+        ).all()
+        if top_counts:
+            print("\n📊 Top Unresolved Names:")
+            for name, count in top_counts:
+                print(f"{name}\t{count}")
+        else:
+            print("No unresolved names found.")
+
+        reason_counts = session.execute(
+            select(UnresolvedPlace.reason, func.count(), func.sum(UnresolvedPlace.occurrences))
+            .where(*scope)
+            .group_by(UnresolvedPlace.reason)
+            .order_by(func.sum(UnresolvedPlace.occurrences).desc())
+        ).all()
+        if reason_counts:
+            print("\n📈 Reason Breakdown (places / occurrences):")
+            for reason, places, occurrences in reason_counts:
+                print(f"{reason}\t{places}\t{occurrences}")
 
 
 if __name__ == "__main__":
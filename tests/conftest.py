@@ -39,6 +39,54 @@ def db_engine():
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def parse_cache_dir(tmp_path_factory):
+    """Keep cached GEDCOM parses out of backend/data during tests."""
+    import backend.services.parse_cache as parse_cache
+
+    original = parse_cache.PARSE_CACHE_DIR
+    parse_cache.PARSE_CACHE_DIR = tmp_path_factory.mktemp("parse_cache")
+    yield parse_cache.PARSE_CACHE_DIR
+    parse_cache.PARSE_CACHE_DIR = original
+
+
+@pytest.fixture(scope="session", autouse=True)
+def geocode_cache_db(tmp_path_factory):
+    """Point the shared geocode cache at a throwaway SQLite file."""
+    import backend.services.geocode_store as geocode_store
+
+    original = geocode_store.GEOCODE_CACHE_DB, geocode_store.LEGACY_CACHE_FILE
+    root = tmp_path_factory.mktemp("geocode_cache")
+    geocode_store.GEOCODE_CACHE_DB = root / "geocode_cache.sqlite3"
+    geocode_store.LEGACY_CACHE_FILE = root / "geocode_cache.json"
+    yield geocode_store.GEOCODE_CACHE_DB
+    geocode_store._close_stores()
+    geocode_store.GEOCODE_CACHE_DB, geocode_store.LEGACY_CACHE_FILE = original
+
+
+@pytest.fixture(scope="session", autouse=True)
+def gazetteer_index_path(tmp_path_factory):
+    """Keep a locally built gazetteer index out of the tests."""
+    import backend.services.gazetteer_index as gazetteer_index
+
+    original = gazetteer_index.GAZETTEER_INDEX_PATH
+    gazetteer_index.GAZETTEER_INDEX_PATH = tmp_path_factory.mktemp("gazetteer") / "gazetteer_index"
+    gazetteer_index.reset_gazetteer_index()
+    yield gazetteer_index.GAZETTEER_INDEX_PATH
+    gazetteer_index.GAZETTEER_INDEX_PATH = original
+    gazetteer_index.reset_gazetteer_index()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def unresolved_log(db_engine):
+    """Flush the process unresolved-place log before the test tables go away."""
+    import backend.services.unresolved_log as unresolved_log
+
+    yield
+    unresolved_log._flush_unresolved_log()
+    unresolved_log._log = None
+
+
 @pytest.fixture(scope="session")
 def app():
     app = create_app()
@@ -0,0 +1,97 @@
+import hashlib
+import uuid
+
+import pytest
+
+import backend.routes.upload as upload_mod
+from backend.models import Job, UploadedTree
+from backend.services.chunked_upload import ChunkedUploadStore
+
+GEDCOM = open("tests/data/test_family_events.ged", "rb").read()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ChunkedUploadStore(tmp_path)
+    monkeypatch.setattr(upload_mod, "_chunked_store", store)
+    return store
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    from backend.tasks import upload_tasks
+
+    calls = []
+
+    class FakeResult:
+        id = "task-123"
+
+    def fake_delay(*args, **kwargs):
+        calls.append((args, kwargs))
+        return FakeResult()
+
+    monkeypatch.setattr(upload_tasks.process_gedcom_task, "delay", fake_delay)
+    return calls
+
+
+def _init(client, name, size=len(GEDCOM)):
+    return client.post(
+        "/api/upload/chunked",
+        json={"filename": "big.ged", "total_size": size, "tree_name": name},
+    )
+
+
+def test_chunked_upload_resumes_and_queues_ingest(client, db_session, store, queued):
+    name = f"Chunked-{uuid.uuid4().hex[:6]}"
+    resp = _init(client, name)
+    assert resp.status_code == 201
+    upload_id = resp.get_json()["upload_id"]
+
+    first, rest = GEDCOM[:100], GEDCOM[100:]
+    assert client.put(f"/api/upload/chunked/{upload_id}?offset=0", data=first).status_code == 200
+
+    # A retried chunk at a stale offset is refused with the resume point.
+    stale = client.put(f"/api/upload/chunked/{upload_id}?offset=0", data=first)
+    assert stale.status_code == 409 and stale.get_json()["offset"] == 100
+
+    # Incomplete uploads cannot be completed.
+    assert client.post(f"/api/upload/chunked/{upload_id}/complete").status_code == 409
+
+    bad = client.put(
+        f"/api/upload/chunked/{upload_id}?offset=100", data=rest, headers={"X-Chunk-SHA256": "0" * 64}
+    )
+    assert bad.status_code == 400
+    assert client.get(f"/api/upload/chunked/{upload_id}").get_json()["offset"] == 100
+
+    ok = client.put(
+        f"/api/upload/chunked/{upload_id}?offset=100",
+        data=rest,
+        headers={"X-Chunk-SHA256": hashlib.sha256(rest).hexdigest()},
+    )
+    assert ok.get_json()["offset"] == len(GEDCOM)
+
+    done = client.post(f"/api/upload/chunked/{upload_id}/complete")
+    assert done.status_code == 202, done.get_json()
+    body = done.get_json()
+    (path, tree_name, tree_id, job_id), kwargs = queued[0]
+    assert kwargs["content_digest"] == hashlib.sha256(GEDCOM).hexdigest()
+    assert open(path, "rb").read() == GEDCOM
+    assert (tree_name, tree_id, job_id) == (name, body["uploaded_tree_id"], body["job_id"])
+    assert db_session.get(UploadedTree, uuid.UUID(tree_id)).tree_name == name
+    assert db_session.get(Job, uuid.UUID(job_id)).task_id == "task-123"
+    assert client.get(f"/api/upload/chunked/{upload_id}").status_code == 404
+
+
+def test_chunked_upload_validates_signature_and_size(client, store):
+    resp = _init(client, f"Bad-{uuid.uuid4().hex[:6]}", size=20)
+    upload_id = resp.get_json()["upload_id"]
+    bad = client.put(f"/api/upload/chunked/{upload_id}?offset=0", data=b"not a gedcom file!!")
+    assert bad.status_code == 400
+    assert client.get(f"/api/upload/chunked/{upload_id}").get_json()["offset"] == 0
+
+    too_long = client.put(f"/api/upload/chunked/{upload_id}?offset=0", data=b"0 HEAD\n" * 10)
+    assert too_long.status_code == 413
+
+    assert client.post("/api/upload/chunked", json={"filename": "x.txt", "total_size": 5, "tree_name": "X"}).status_code == 400
+    assert client.delete(f"/api/upload/chunked/{upload_id}").status_code == 200
+    assert client.get(f"/api/upload/chunked/{upload_id}").status_code == 404
@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+
+import backend.db
+import backend.services.geocode_fanout as geocode_fanout
+import backend.services.location_processor as location_processor
+from backend.models import Job
+from backend.models.location_models import LocationOut
+from backend.services.geocode_fanout import InflightLocks, finish_fanout, run_chunk
+
+
+def _hit(place, lat, lng, source):
+    return LocationOut(
+        raw_name=place, normalized_name=place.lower(), latitude=lat, longitude=lng,
+        confidence_score=0.9, status="ok", source=source,
+    )
+
+
+class StubGeocoder:
+    """Local tier knows Drew; the 'provider' knows Itta Bena."""
+
+    external_plugin = object()
+    mock_mode = False
+    cache_enabled = False
+
+    def __init__(self):
+        self.local_calls, self.external_calls = [], []
+
+    def resolve_local(self, session, place, *, event_year=None, admin_hint=None):
+        self.local_calls.append((place, event_year))
+        return _hit(place, 33.8, -90.5, "gazetteer") if place.lower().startswith("drew") else None
+
+    def resolve_many(self, session, places, *, event_year=None, admin_hint=None):
+        self.external_calls.append((list(places), event_year))
+        return {p: _hit(p, 33.5, -90.3, "nominatim") if p.startswith("Itta Bena") else None for p in places}
+
+
+@pytest.fixture
+def geocoder(monkeypatch):
+    stub = StubGeocoder()
+    monkeypatch.setattr(location_processor, "GEOCODER", stub)
+    return stub
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    from backend.tasks import geocode_tasks
+
+    calls = []
+
+    def fake_dispatch(job_id, chunks, **kwargs):
+        calls.append((job_id, chunks))
+        return "batch-task-1"
+
+    monkeypatch.setattr(geocode_tasks, "dispatch_fanout", fake_dispatch)
+    monkeypatch.setattr(geocode_fanout, "chunk_size_for", lambda api_key=None: 2)
+    monkeypatch.setattr(geocode_fanout, "record_unresolved", lambda raw, reason, tree_id=None: None)
+    return calls
+
+
+def test_batch_answers_local_hits_and_queues_misses(client, db_session, geocoder, queued):
+    tag = uuid.uuid4().hex[:6]
+    places = [
+        "Drew, Mississippi",
+        " drew,  mississippi",            # duplicate after normalisation
+        {"place": "Drew, Mississippi", "year": 1910},
+        "Mississippi",                     # vague state centroid, never reaches the geocoder
+        f"Itta Bena {tag}, Mississippi",
+        {"place": f"Itta Bena {tag}, Mississippi", "year": "1880"},
+        f"Atlantis {tag}, Mississippi",
+        "",
+    ]
+    resp = client.post("/api/geocode/batch", json={"places": places, "tree_id": tag})
+    assert resp.status_code == 202
+    body = resp.get_json()
+    rows = body["results"]
+    assert len(rows) == len(places)
+    assert [r["status"] for r in rows] == ["ok", "ok", "ok", "vague", "pending", "pending", "pending", "unresolved"]
+    assert rows[0]["key"] == rows[1]["key"] != rows[2]["key"]
+    assert geocoder.local_calls == [
+        ("Drew, Mississippi", None), ("Drew, Mississippi", 1910),
+        (f"Itta Bena {tag}, Mississippi", None), (f"Itta Bena {tag}, Mississippi", 1880), (f"Atlantis {tag}, Mississippi", None),
+    ]
+    assert body["stats"] == {"total": 8, "unique": 6, "pending": 3, "resolved": 4, "unresolved": 1}
+    assert body["task_id"] == "batch-task-1"
+    [(job_id, chunks)] = queued
+    assert job_id == body["job_id"]
+    assert [[item["key"] for item in chunk] for chunk in chunks] == [[rows[4]["key"], rows[5]["key"]], [rows[6]["key"]]]
+
+    job = db_session.get(Job, uuid.UUID(job_id))
+    assert (job.job_type, job.params["source"], job.params["tree_id"]) == ("geocode_fanout", "geocode_batch", tag)
+
+    locks = InflightLocks(local=True)
+    for index, chunk in enumerate(chunks):
+        run_chunk(job_id, index, chunk, session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    result = finish_fanout(job_id, session_factory=backend.db.SessionLocal)
+    assert (result["resolved"], result["unresolved"]) == (2, 1)
+    # Grouped by year hint inside each chunk
+    assert geocoder.external_calls == [
+        ([f"Itta Bena {tag}, Mississippi"], None), ([f"Itta Bena {tag}, Mississippi"], 1880), ([f"Atlantis {tag}, Mississippi"], None),
+    ]
+    db_session.expire_all()
+    job = db_session.get(Job, uuid.UUID(job_id))
+    assert (job.status, job.progress) == ("success", 100)
+    assert job.result["results"][rows[5]["key"]]["source"] == "nominatim"
+    assert job.result["results"][rows[6]["key"]]["status"] == "unresolved"
+
+
+def test_batch_without_misses_is_synchronous(client, geocoder, queued):
+    resp = client.post("/api/geocode/batch", json={"places": ["Drew, Mississippi", "Tennessee"]})
+    assert resp.status_code == 200
+    assert resp.get_json()["job_id"] is None and queued == []
+
+
+@pytest.mark.parametrize("body", [{}, {"places": "Drew"}, {"places": [3]}, {"places": [{"place": "Drew", "year": "c1900"}]}])
+def test_batch_rejects_bad_bodies(client, body):
+    assert client.post("/api/geocode/batch", json=body).status_code == 400
@@ -109,3 +109,24 @@ def test_visible_counts_empty_payload(client, db_session):
     data = res.get_json()
     assert isinstance(data, dict)
     assert "people" in data or "families" in data
+
+# ─── SUPERSEDED VERSIONS ─────────────────────────────────────────────────────
+@pytest.mark.parametrize("path", [
+    "/api/people/by-version/{old}",
+    "/api/timeline/{old}",
+    "/api/heatmap/?tree_ids={old}",
+    "/api/heatmap/events?tree_id={old}",
+    "/api/analytics/surname-heatmap?tree_id={old}",
+    "/api/analytics/cohort-flow?tree_id={old}",
+    "/api/analytics/outliers?tree_id={old}",
+])
+def test_superseded_version_is_gone(client, db_session, path):
+    tree = _make_uploaded_tree(db_session, "Reimported Tree")
+    old = TreeVersion(uploaded_tree_id=tree.id, version_number=1, status="superseded")
+    new = TreeVersion(uploaded_tree_id=tree.id, version_number=2)
+    db_session.add_all([old, new])
+    db_session.commit()
+
+    res = client.get(path.format(old=old.id))
+    assert res.status_code == 410
+    assert res.get_json()["latest_version_id"] == str(new.id)
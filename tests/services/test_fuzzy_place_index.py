@@ -0,0 +1,121 @@
+import uuid
+
+import pytest
+
+import backend.services.fuzzy_place_index as fpi
+from backend.models import AlternateName, Location
+from backend.services.fuzzy_place_index import FuzzyPlaceIndex
+from backend.services.geocode import FuzzyAliasGeocoder
+
+
+@pytest.fixture
+def fresh_index():
+    fpi.reset_fuzzy_index()
+    yield
+    fpi.reset_fuzzy_index()
+
+
+def test_search_ranks_typos_and_dedupes_locations():
+    index = FuzzyPlaceIndex()
+    index.add(1, "Ruleville, Sunflower County, Mississippi", latitude=33.7, longitude=-90.5)
+    index.add(1, "Rulesville", latitude=33.7, longitude=-90.5)
+    index.add(2, "Drew, Sunflower County, Mississippi", latitude=33.8, longitude=-90.5)
+    index.add(3, "Greenwood, Leflore County, Mississippi")
+    assert not index.add(2, "drew, sunflower county, mississippi ")  # same key again
+
+    hits = index.search("Rulevile, Sunflower County, Mississippi", k=3, min_score=90)
+    assert [h.location_id for h in hits] == [1]
+    assert hits[0].score >= 90
+
+    assert [h.location_id for h in index.search("Greenwod, Leflore County, Mississippi", min_score=90)] == [3]
+    assert index.search("Boston, Massachusetts", min_score=90) == []
+    assert len(index.search("county mississippi", k=2)) == 2  # no threshold: nearest names
+
+
+def test_index_follows_committed_locations(db_session, fresh_index):
+    tag = uuid.uuid4().hex[:6]
+    db_session.add(Location(raw_name=f"Itta Bena {tag}", normalized_name=f"itta_bena_{tag}", latitude=33.5, longitude=-90.3))
+    db_session.commit()
+    index = fpi.get_fuzzy_index(db_session)
+    assert index.search(f"itta_bena_{tag}", k=1)[0].latitude == 33.5
+
+    loc = Location(raw_name=f"Moorhead {tag}", normalized_name=f"moorhead_{tag}", latitude=33.4, longitude=-90.5)
+    db_session.add(loc)
+    db_session.flush()
+    db_session.add(AlternateName(location_id=loc.id, alternate_name=f"Moor Head Station {tag}"))
+    db_session.rollback()
+    assert index.search(f"moorhead_{tag}", min_score=95) == []  # rolled back: not indexed
+
+    loc = Location(raw_name=f"Moorhead {tag}", normalized_name=f"moorhead_{tag}", latitude=33.4, longitude=-90.5)
+    db_session.add(loc)
+    db_session.flush()
+    db_session.add(AlternateName(location_id=loc.id, alternate_name=f"Moor Head Station {tag}"))
+    db_session.commit()
+    hit = index.search(f"Moor Head Statoin {tag}", k=1, min_score=85)[0]
+    assert (hit.location_id, hit.normalized_name) == (loc.id, f"moorhead_{tag}")
+
+
+def test_fuzzy_alias_geocoder_uses_index(db_session, fresh_index):
+    tag = uuid.uuid4().hex[:6]
+    db_session.add(Location(raw_name=f"Sunflower {tag}", normalized_name=f"sunflower_ms_{tag}", latitude=33.5, longitude=-90.5))
+    db_session.commit()
+    out = FuzzyAliasGeocoder().resolve(None, db_session, f"sunflowr_ms_{tag}")
+    assert (out.source, out.normalized_name, out.latitude) == ("db-fuzzy", f"sunflower_ms_{tag}", 33.5)
+
+
+def test_refresh_catches_late_commits_and_coordinate_changes(db_session, fresh_index):
+    from datetime import datetime, timedelta
+
+    tag = uuid.uuid4().hex[:6]
+    db_session.add(Location(raw_name=f"Drew {tag}", normalized_name=f"drew_{tag}", latitude=33.8, longitude=-90.5))
+    db_session.commit()
+    index = fpi.get_fuzzy_index(db_session)
+
+    # Another worker's long import commits a row stamped before our watermark
+    late = Location(raw_name=f"Shaw {tag}", normalized_name=f"shaw_{tag}", latitude=33.6, longitude=-90.8)
+    fpi._index = None  # write it "elsewhere": no in-process notification
+    db_session.add(late)
+    db_session.commit()
+    fpi._index = index
+    late.updated_at = index.watermark - timedelta(minutes=5)
+    db_session.commit()
+    index.watermark = datetime.utcnow()
+    assert index.search(f"shaw_{tag}", min_score=95) == []
+
+    index.refreshed_at = 0.0
+    fpi.get_fuzzy_index(db_session)
+    assert index.search(f"shaw_{tag}", k=1)[0].latitude == 33.6
+
+
+def test_core_writes_reach_the_index(db_session, fresh_index):
+    from backend.models.location_models import LocationOut
+    from backend.services.bulk_persist import upsert_locations
+    from backend.services.location_geometry import apply_location_fix
+
+    index = fpi.get_fuzzy_index(db_session)
+    tag = uuid.uuid4().hex[:6]
+    out = LocationOut(
+        raw_name=f"Sunflower {tag}", normalized_name=f"sunflower_{tag}", latitude=None, longitude=None,
+        confidence_score=0.0, status="unresolved", source="none",
+    )
+    upsert_locations(db_session, [out])
+    db_session.commit()
+    assert index.search(f"sunflower_{tag}", k=1)[0].latitude is None
+
+    fixed = out.model_copy(update={"latitude": 33.5, "longitude": -90.5, "confidence_score": 0.9, "status": "ok"})
+    apply_location_fix(db_session, fixed, normalized_name=f"sunflower_{tag}", geocoded_by="test")
+    db_session.commit()
+    assert index.search(f"sunflower_{tag}", k=1)[0][3:5] == (33.5, -90.5)
+
+
+def test_geocode_chain_falls_back_to_fuzzy_index(db_session, fresh_index):
+    from backend.services.geocode import Geocode
+
+    tag = uuid.uuid4().hex[:6]
+    db_session.add(Location(raw_name=f"Inverness {tag}", normalized_name=f"inverness_ms_{tag}", latitude=33.3, longitude=-90.6))
+    db_session.commit()
+    geocoder = Geocode(use_cache=False, mock_mode=True)
+    assert any(isinstance(p, FuzzyAliasGeocoder) for p in geocoder.plugins)
+
+    out = geocoder.get_or_create_location(db_session, f"inverness_ms_{tag}x")
+    assert (out.source, out.normalized_name, out.latitude) == ("db-fuzzy", f"inverness_ms_{tag}", 33.3)
@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+import backend.services.gazetteer_index as gi
+from backend.models.gazetteer_entry import GazetteerEntry
+from backend.services.gazetteer_index import GazetteerIndex, alt_keys, build_gazetteer_index
+from backend.services.geocode_brain import GazetteerDBGeocoder, GeoContext
+
+
+@pytest.fixture
+def gazetteer(db_session, tmp_path):
+    tag = uuid.uuid4().hex[:6]
+    rows = [
+        GazetteerEntry(name_norm=f"ruleville_{tag}_mississippi", admin_norm=f"{tag}_mississippi",
+                       era_bucket="1890_1950", latitude=33.72, longitude=-90.55, source="geonames",
+                       alt_names=["Rulesville", "Ruleville Station, Sunflower"]),
+        GazetteerEntry(name_norm=f"ruleville_{tag}_mississippi", admin_norm=f"{tag}_mississippi",
+                       era_bucket="pre_1800", latitude=30.0, longitude=-91.0, source="historical"),
+        GazetteerEntry(name_norm=f"drew_{tag}_mississippi", admin_norm=None,
+                       era_bucket="unknown", latitude=33.81, longitude=-90.52, source="geonames",
+                       alt_names="Drew Town,Old Drew"),
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    meta = build_gazetteer_index(db_session, tmp_path / "gazetteer_index")
+    yield tag, rows, GazetteerIndex(tmp_path / "gazetteer_index"), meta
+    for row in rows:
+        db_session.delete(row)
+    db_session.commit()
+
+
+def test_alt_keys_qualify_bare_names():
+    assert alt_keys("x_ms", "sunflower_ms", ["Drew", "Drew, Sunflower, MS", "X, MS"]) == ["drew_sunflower_ms"]
+    assert alt_keys("x", None, "Drew,Old Drew") == []
+
+
+def test_lookup_matches_names_alt_names_and_eras(gazetteer):
+    tag, rows, index, meta = gazetteer
+    assert meta["entries"] >= 3 and len(index) == meta["entries"]
+
+    hits = index.lookup(f"ruleville_{tag}_mississippi")
+    assert {h.id for h in hits} == {rows[0].id, rows[1].id}
+    assert [h.source for h in index.lookup(f"ruleville_{tag}_mississippi", eras={"pre_1800"})] == ["historical"]
+
+    (alt,) = index.lookup(f"rulesville_{tag}_mississippi")
+    assert (alt.id, alt.name_norm, alt.latitude) == (rows[0].id, f"ruleville_{tag}_mississippi", 33.72)
+    assert index.lookup("ruleville_station_sunflower")[0].id == rows[0].id
+    # Without an admin_norm a bare alternate name cannot be qualified
+    assert index.lookup("drew_town") == []
+    assert index.lookup(f"nowhere_{tag}") == []
+
+
+def test_geocoder_prefers_index_and_matches_sql(gazetteer, db_session, monkeypatch):
+    tag, rows, index, _ = gazetteer
+    place = f"Ruleville, {tag}, Mississippi"
+    context = GeoContext(event_year=1920)
+
+    via_sql = GazetteerDBGeocoder().resolve(db_session, place, context=context, debug=False)
+    via_index = GazetteerDBGeocoder(index).resolve(None, place, context=context, debug=False)
+    assert via_index == via_sql
+    assert (via_index.latitude, via_index.source) == (33.72, "gazetteer")
+
+    # Process index is picked up from GAZETTEER_INDEX_PATH once built there
+    monkeypatch.setattr(gi, "GAZETTEER_INDEX_PATH", index.path)
+    gi.reset_gazetteer_index()
+    try:
+        assert gi.get_gazetteer_index().path == index.path
+        out = GazetteerDBGeocoder().resolve(db_session, f"Rulesville, {tag}, Mississippi", debug=False)
+        assert out.normalized_name == f"ruleville_{tag}_mississippi"
+    finally:
+        gi.reset_gazetteer_index()
@@ -0,0 +1,111 @@
+import gzip
+import json
+import zipfile
+
+import pytest
+from sqlalchemy import select
+
+import backend.services.gazetteer_loader as loader
+from backend.models.gazetteer_entry import GazetteerEntry
+from backend.services.gazetteer_loader import iter_source, load_gazetteer_file, normalize_row, progress_table
+
+
+def _geonames_line(gid, name, alts, lat, lng, admin1="MS", cc="US"):
+    cols = [str(gid), name, name, alts, str(lat), str(lng), "P", "PPL", cc, "", admin1, "133",
+            "", "", "1000", "", "40", "America/Chicago", "2020-01-01"]
+    return "\t".join(cols) + "\n"
+
+
+@pytest.fixture
+def geonames_rows(db_session):
+    yield
+    db_session.query(GazetteerEntry).filter(GazetteerEntry.source == "geonames").delete(synchronize_session=False)
+    db_session.commit()
+
+
+def _entries(db_session, source):
+    return {
+        (e.source_id, e.name_norm): e
+        for e in db_session.scalars(select(GazetteerEntry).where(GazetteerEntry.source == source))
+    }
+
+
+def test_normalize_row_formats():
+    geo = dict(zip(loader.GEONAMES_COLUMNS, _geonames_line(1, "Ruleville", "Rulesville", 33.7, -90.5).rstrip("\n").split("\t")))
+    row = normalize_row(geo)
+    assert (row["name_norm"], row["admin_norm"], row["source"], row["source_id"]) == ("ruleville_ms_us", "ms_us", "geonames", "1")
+    assert row["meta"]["feature_code"] == "PPL" and row["era_bucket"] == "unknown"
+
+    row = normalize_row({"name": "Drew, Sunflower, Mississippi", "year": "1920", "lat": "33.8", "lng": "-90.5"})
+    assert (row["name_norm"], row["admin_norm"], row["era_bucket"]) == ("drew_sunflower_mississippi", None, "1890_1950")
+    assert normalize_row({"name": "Drew", "lat": "1", "lng": "2"}) is None  # bare name, no admin
+    assert normalize_row({"name": "Drew, MS", "lat": "x", "lng": "2"}) is None
+
+
+def test_iter_source_streams_archives_and_offsets(tmp_path):
+    lines = [_geonames_line(i, f"Town{i}", "", 30 + i, -90) for i in range(5)]
+    plain = tmp_path / "US.txt"
+    plain.write_text("".join(lines))
+    rows = list(iter_source(plain))
+    assert [r["name"] for r, _ in rows] == [f"Town{i}" for i in range(5)]
+    assert rows[-1][1] == plain.stat().st_size
+    # Resuming from a recorded offset continues with the next record
+    assert [r["name"] for r, _ in iter_source(plain, rows[1][1])] == ["Town2", "Town3", "Town4"]
+
+    archive = tmp_path / "US.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("readme.txt", "GeoNames")
+        zf.writestr("US.txt", "".join(lines))
+    assert [r["name"] for r, _ in iter_source(archive, rows[2][1])] == ["Town3", "Town4"]
+
+    jsonl = tmp_path / "w.jsonl.gz"
+    with gzip.open(jsonl, "wt") as f:
+        f.write('{"name": "A, B", "lat": 1, "lng": 2}\n\n{"name": "C, D", "lat": 3, "lng": 4}\n')
+    assert [r["name"] for r, _ in iter_source(jsonl)] == ["A, B", "C, D"]
+
+    array = tmp_path / "rows.json"
+    array.write_text(json.dumps([{"name": f"P{i}, Q", "lat": i, "lng": i} for i in range(50)]))
+    streamed = [r["name"] for r, _ in loader.iter_source(array)]
+    assert streamed == [f"P{i}, Q" for i in range(50)]
+    assert [r["name"] for r in loader._iter_json_document(array.open("rb"), chunk_size=7)] == streamed
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"x": {"name": "X, Y", "lat": 1, "lng": 1}}))
+    assert [r["name"] for r, _ in iter_source(legacy)] == ["X, Y"]
+
+
+def test_load_resumes_and_upserts(db_session, tmp_path, geonames_rows, monkeypatch):
+    path = tmp_path / "US.txt"
+    path.write_text("".join(_geonames_line(i, f"Town{i}", f"Old Town{i}", 30 + i, -90) for i in range(7)))
+
+    # Crash after two staged batches: the progress row points past them
+    real_copy, calls = loader._copy_rows, []
+
+    def flaky_copy(session, rows):
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        calls.append(len(rows))
+        real_copy(session, rows)
+
+    monkeypatch.setattr(loader, "_copy_rows", flaky_copy)
+    with pytest.raises(RuntimeError):
+        load_gazetteer_file(db_session, path, workers=0, batch_size=3, build_index=False)
+    db_session.rollback()
+    progress = db_session.execute(select(progress_table)).first()
+    assert progress.rows == 6 and progress.byte_offset == len("".join(
+        _geonames_line(i, f"Town{i}", f"Old Town{i}", 30 + i, -90) for i in range(6)).encode())
+
+    monkeypatch.setattr(loader, "_copy_rows", real_copy)
+    result = load_gazetteer_file(db_session, path, workers=0, batch_size=3, build_index=False)
+    assert (result["read"], result["staged"], result["inserted"], result["updated"]) == (7, 1, 7, 0)
+    entries = _entries(db_session, "geonames")
+    assert len(entries) == 7 and entries[("6", "town6_ms_us")].latitude == 36.0
+    assert db_session.execute(select(progress_table)).first() is None
+
+    # Reloading a corrected dump updates rows in place by (source, source_id)
+    path.write_text("".join(_geonames_line(i, f"Town{i}", "", 40 + i, -91) for i in range(7)) + _geonames_line(6, "Town6", "", 50, -92))
+    result = load_gazetteer_file(db_session, path, workers=2, batch_size=2, build_index=False)
+    assert (result["inserted"], result["updated"]) == (0, 7)
+    db_session.expire_all()
+    entries = _entries(db_session, "geonames")
+    assert len(entries) == 7 and entries[("6", "town6_ms_us")].latitude == 50.0  # last duplicate wins
+    assert entries[("0", "town0_ms_us")].alt_names is None
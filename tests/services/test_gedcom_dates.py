@@ -0,0 +1,50 @@
+# tests/services/test_gedcom_dates.py
+from datetime import date, datetime
+
+import pytest
+from ged4py.date import DateValue
+
+from backend.services.gedcom_dates import GedcomDate, parse_gedcom_date
+from backend.utils.helpers import parse_date_flexible
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("28 FEB 1891", GedcomDate(date(1891, 2, 28), date(1891, 2, 28), "day")),
+    ("MAY 1910", GedcomDate(date(1910, 5, 1), date(1910, 5, 31), "month")),
+    ("1640", GedcomDate(date(1640, 1, 1), date(1640, 12, 31), "year")),
+    ("ABT 1770", GedcomDate(date(1770, 1, 1), date(1770, 12, 31), "about")),
+    ("Abt. 1700", GedcomDate(date(1700, 1, 1), date(1700, 12, 31), "about")),
+    ("c.1910", GedcomDate(date(1910, 1, 1), date(1910, 12, 31), "about")),
+    ("BEF MAY 1910", GedcomDate(None, date(1910, 5, 1), "before")),
+    ("AFT 1900", GedcomDate(date(1900, 12, 31), None, "after")),
+    ("EST 1900 - 1910", GedcomDate(date(1900, 1, 1), date(1910, 12, 31), "estimated")),
+    ("BET 1900 AND 1910", GedcomDate(date(1900, 1, 1), date(1910, 12, 31), "range")),
+    ("FROM 1 JAN 1900 TO 1905", GedcomDate(date(1900, 1, 1), date(1905, 12, 31), "period")),
+    ("FROM 1900", GedcomDate(date(1900, 1, 1), None, "period")),
+    ("1750/51", GedcomDate(date(1751, 1, 1), date(1751, 12, 31), "year")),
+    ("1895-6", GedcomDate(date(1895, 1, 1), date(1896, 12, 31), "range")),
+    ("April 22, 1959", GedcomDate(date(1959, 4, 22), date(1959, 4, 22), "day")),
+    ("04/26/2001", GedcomDate(date(2001, 4, 26), date(2001, 4, 26), "day")),
+    ("2008-05-16", GedcomDate(date(2008, 5, 16), date(2008, 5, 16), "day")),
+    ("02may2003", GedcomDate(date(2003, 5, 2), date(2003, 5, 2), "day")),
+    ("1950's", GedcomDate(date(1950, 1, 1), date(1959, 12, 31), "decade")),
+    ("@#DGREGORIAN@ 5 JUL 1800", GedcomDate(date(1800, 7, 5), date(1800, 7, 5), "day")),
+])
+def test_parse_gedcom_date(text, expected):
+    assert parse_gedcom_date(text) == expected
+
+
+@pytest.mark.parametrize("raw", ["abt 16 Sep 1906", "01 April 1846", "Before 13 Dec 1788", "Dec 21 1862"])
+def test_ged4py_string_form_matches_raw(raw):
+    # The import pipeline sees str(DateValue), e.g. "(01 April 1846)".
+    assert parse_gedcom_date(str(DateValue.parse(raw))) == parse_gedcom_date(raw)
+
+
+@pytest.mark.parametrize("text", ["", None, "15 Jul", "World War II", "31 FEB 1900", "BET 1910 AND 1900"])
+def test_unparseable_dates(text):
+    assert parse_gedcom_date(text) is None
+
+
+def test_helpers_wrapper_returns_datetime():
+    assert parse_date_flexible("ABT 1900") == datetime(1900, 1, 1)
+    assert parse_date_flexible("nonsense") is None
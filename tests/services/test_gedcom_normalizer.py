@@ -103,3 +103,20 @@ def test_normalize_family_and_events():
     assert events[0]["event_type"] == "marriage"
     assert events[1]["event_type"] == "divorce"
     assert events[2]["event_type"] == "separation"
+
+def test_extract_events_keeps_every_occurrence():
+    sub_records = [
+        SubRecord("RESI", None, [SubRecord("DATE", "1900"), SubRecord("PLAC", "Canton"),
+                                 SubRecord("SOUR", "@S1@")]),
+        SubRecord("BIRT", None, [SubRecord("PLAC", "Jackson")]),
+        SubRecord("RESI", None, [SubRecord("DATE", "1910"), SubRecord("PLAC", "Chicago")]),
+    ]
+    dummy = DummyRecord(xref_id="I5", name=DummyName("Ann", "Lee"), sub_records=sub_records)
+    events = extract_events_from_individual(dummy, normalize_individual(dummy))
+    assert [(e["source_tag"], e["date"], e["location"]) for e in events] == [
+        ("RESI", "1900-01-01", "Canton"),
+        ("BIRT", None, "Jackson"),
+        ("RESI", "1910-01-01", "Chicago"),
+    ]
+    assert events[0]["notes"] == "SOUR: @S1@"
+    assert events[2]["notes"] == ""
@@ -0,0 +1,60 @@
+# tests/services/test_gedcom_stream.py
+import glob
+
+import pytest
+
+from backend.services.gedcom_stream import GedcomParseError, GedcomStreamParser
+from backend.services.parser import GEDCOMParser
+
+GEDCOM_FILES = sorted(glob.glob("tests/data/*.ged"))
+
+
+@pytest.mark.parametrize("path", GEDCOM_FILES)
+def test_stream_engine_matches_ged4py(path):
+    legacy = GEDCOMParser(path, None, engine="ged4py").parse_file()
+    stream = GEDCOMParser(path, None, engine="stream").parse_file()
+    assert stream == legacy
+
+
+def test_cont_conc_names_and_offsets(tmp_path):
+    ged = tmp_path / "t.ged"
+    ged.write_bytes(
+        b"0 HEAD\r\n1 CHAR UTF-8\r\n"
+        b"0 @I1@ INDI\r\n"
+        b"1 NAME Ann Marie /Lee/ Jr\r\n2 TYPE aka\r\n"
+        b"1 NAME Annie /Lee/\r\n"
+        b"1 NOTE first\r\n2 CONC  line\r\n2 CONT second\r\n"
+        b"1 BIRT\r\n2 PLAC K\xc3\xb6ln\r\n"
+        b"0 TRLR\r\n"
+    )
+    records = list(GedcomStreamParser(str(ged)).iter_records())
+    assert [r.tag for r in records] == ["HEAD", "INDI", "TRLR"]
+
+    indi = records[1]
+    assert indi.xref_id == "@I1@"
+    assert (indi.name.given, indi.name.surname) == ("Annie", "Lee")
+    assert indi.sub_tag_value("NOTE") == "first line\nsecond"
+    assert indi.sub_tag_value("BIRT/PLAC") == "Köln"
+    assert [s.tag for s in indi.sub_records] == ["NAME", "NAME", "NOTE", "BIRT"]
+
+    # Byte ranges let a caller resume on any record boundary.
+    tail = list(GedcomStreamParser(str(ged)).iter_records(start=indi.offset, end=indi.end))
+    assert [r.xref_id for r in tail] == ["@I1@"]
+
+
+def test_invalid_line_raises(tmp_path):
+    ged = tmp_path / "bad.ged"
+    ged.write_bytes(b"0 HEAD\n1 CHAR UTF-8\n0 @I1@ INDI\nnot a gedcom line\n")
+    with pytest.raises(GedcomParseError):
+        list(GedcomStreamParser(str(ged)).iter_records())
+
+
+def test_parallel_normalisation_matches_serial(monkeypatch):
+    import backend.services.parser as parser_mod
+
+    monkeypatch.setattr(parser_mod, "NORMALIZE_SHARD_BYTES", 64 * 1024)
+    path = "tests/data/EIchelberger Tree-3.ged"
+    serial = GEDCOMParser(path, None, engine="stream", workers=1).parse_file()
+    parallel_parser = GEDCOMParser(path, None, engine="stream", workers=2)
+    assert len(parallel_parser._shard_spans()) > 2
+    assert parallel_parser.parse_file() == serial
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import backend.services.geocode_async as geocode_async
+from backend.services.geocode import Geocode, GeocodeError
+from backend.services.geocode_async import AsyncGeocodeClient, LocalTokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fast_buckets(monkeypatch):
+    """Per-test local buckets; no waiting between requests."""
+    monkeypatch.setattr(geocode_async, "_buckets", {})
+    monkeypatch.setattr(geocode_async, "SHARED_RATE_LIMITS", False)
+    monkeypatch.setattr(geocode_async, "PROVIDER_RATES", {"google": 1000.0, "nominatim": 1000.0})
+    monkeypatch.setattr(geocode_async, "RETRY_BACKOFF", 0.0)
+
+
+def nominatim_transport(calls, delay=0.05, fail_first=()):
+    failed = set()
+
+    async def handler(request):
+        q = request.url.params["q"]
+        calls.append(q)
+        await asyncio.sleep(delay)
+        if q in fail_first and q not in failed:
+            failed.add(q)
+            return httpx.Response(503)
+        if "nowhere" in q.lower():
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=[{"lat": "33.7", "lon": "-90.5", "display_name": f"{q}, USA"}])
+
+    return httpx.MockTransport(handler)
+
+
+def test_resolve_many_runs_concurrently_and_coalesces():
+    calls = []
+    http = httpx.AsyncClient(transport=nominatim_transport(calls))
+    client = AsyncGeocodeClient(http=http, concurrency=8, normalize=lambda p: p.lower().replace(",", ""))
+    places = [f"Town {i}" for i in range(8)] + ["town 3", "Town, 3", "Nowhere"]
+
+    started = time.perf_counter()
+    out = asyncio.run(client.resolve_many(places))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3  # 9 distinct lookups of 50 ms each, in parallel
+    assert sorted(calls) == sorted([f"Town {i}" for i in range(8)] + ["Nowhere"])
+    assert out["town 3"] == out["Town 3"] and out["Town 3"][4] == "nominatim"
+    assert out["Nowhere"] is None
+
+
+def test_transient_errors_are_retried():
+    calls = []
+    http = httpx.AsyncClient(transport=nominatim_transport(calls, delay=0, fail_first={"Drew"}))
+    out = asyncio.run(AsyncGeocodeClient(http=http).resolve_many(["Drew"]))
+    assert out["Drew"][:2] == (33.7, -90.5)
+    assert calls == ["Drew", "Drew"]
+
+
+def test_local_token_bucket_spaces_requests():
+    bucket = LocalTokenBucket(rate=10.0, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[0] == waits[1] == 0.0
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+
+
+def test_shared_bucket_does_not_block_the_event_loop(monkeypatch):
+    class SlowRedis:
+        def register_script(self, script):
+            def run(keys, args):
+                time.sleep(0.05)  # one blocking round trip
+                return 0
+            return run
+
+    bucket = geocode_async.RedisTokenBucket(SlowRedis(), "test:ratelimit:nominatim", rate=1000.0)
+    monkeypatch.setitem(geocode_async._buckets, "nominatim", bucket)
+    calls = []
+    http = httpx.AsyncClient(transport=nominatim_transport(calls, delay=0))
+    client = AsyncGeocodeClient(http=http, concurrency=8)
+
+    started = time.perf_counter()
+    asyncio.run(client.resolve_many([f"Town {i}" for i in range(8)]))
+    assert time.perf_counter() - started < 0.3  # 8 reservations of 50 ms overlap
+
+
+def test_geocode_resolve_many_sends_only_cache_misses(monkeypatch):
+    geo = Geocode(use_cache=False, mock_mode=False)
+    geo.plugins = [p for p in geo.plugins if type(p).__name__ != "GazetteerDBGeocoder"]
+    geo.cache_enabled = True
+    geo.cache = {geo._normalize_key("Ruleville"): {"latitude": 1.0, "longitude": 2.0, "source": "cache"}}
+    sent = []
+
+    async def fake_resolve_many(self, places):
+        sent.extend(places)
+        return {p: (33.7, -90.5, p, 0.8, "nominatim") for p in places if p != "Nowhere"}
+
+    monkeypatch.setattr(AsyncGeocodeClient, "resolve_many", fake_resolve_many)
+    out = geo.resolve_many(None, ["Ruleville", "Drew", "Canton", "Drew", "Nowhere"])
+
+    assert sorted(sent) == ["Canton", "Drew", "Nowhere"]
+    assert out["Ruleville"].latitude == 1.0
+    assert out["Drew"].source == "nominatim"
+    assert isinstance(out["Nowhere"], GeocodeError)
+    assert geo.cache[geo._normalize_key("Canton")]["latitude"] == 33.7
+    assert geo.cache[geo._normalize_key("Nowhere")]["latitude"] is None
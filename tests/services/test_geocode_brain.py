@@ -0,0 +1,45 @@
+import random
+import uuid
+
+import numpy as np
+import pytest
+
+from backend.services.gazetteer_index import GazetteerHit
+from backend.services.geocode_brain import CandidateBatch, score_candidate, score_candidates
+
+
+def _hit(name, admin, era, lat, lng):
+    return GazetteerHit(uuid.uuid4(), name, admin, era, lat, lng, "geonames")
+
+
+@pytest.mark.parametrize("year", [None, 1850, 1925])
+@pytest.mark.parametrize("family", [None, [], [(33.7, -90.5)], [(33.7, -90.5), (31.0, -89.0), (40.0, -75.0)]])
+def test_batch_scores_match_scalar(year, family):
+    rng = random.Random(year or 0)
+    rows = [
+        _hit("ruleville_sunflower_mississippi", "sunflower_mississippi", "1890_1950", 33.72, -90.55),
+        _hit("Ruleville_Sunflower_Mississippi ", "  ", "unknown", 30.1, -91.2),
+        _hit("drew_sunflower_mississippi", None, "1800_1890", 33.81, -90.52),
+        _hit("ruleville", "sunflower_ms", "pre_1800", 60.0, 10.0),
+    ] + [
+        _hit(f"town{rng.randint(0, 99)}_ms", rng.choice([None, "ms", "leflore_ms"]),
+             rng.choice(["pre_1800", "1800_1890", "1890_1950", "unknown"]),
+             rng.uniform(30, 35), rng.uniform(-92, -88))
+        for _ in range(40)
+    ]
+    for admin_hint in ("", "Sunflower_Mississippi"):
+        expected = [score_candidate("ruleville_sunflower_mississippi", admin_hint, family, year, r) for r in rows]
+        scores, details = score_candidates(
+            "ruleville_sunflower_mississippi", admin_hint, family, year, CandidateBatch.from_rows(rows)
+        )
+        assert scores.tolist() == [s for s, _ in expected]
+        assert details == [d for _, d in expected]
+
+
+def test_batch_without_breakdown_and_empty_set():
+    rows = [_hit("a_b", None, "unknown", 0.0, 0.0)]
+    scores, details = score_candidates("a_b", None, [(0.0, 0.0)], None, CandidateBatch.from_rows(rows), explain=False)
+    assert details == [] and scores.tolist() == pytest.approx([0.5 + 0.2 * 0.3 + 0.1])
+
+    scores, details = score_candidates("a_b", "x", [(1.0, 1.0)], 1900, CandidateBatch.from_rows([]))
+    assert isinstance(scores, np.ndarray) and scores.size == 0 and details == []
@@ -0,0 +1,153 @@
+import uuid
+
+import pytest
+
+import backend.db
+import backend.services.geocode_fanout as geocode_fanout
+from backend.models import Job, Location
+from backend.models.location_models import LocationOut
+from backend.services.geocode_fanout import InflightLocks, create_fanout_job, finish_fanout, run_chunk
+
+
+class StubGeocoder:
+    """Knows every place whose name starts with 'Fixed'; remembers each provider batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def _out(self, place):
+        return LocationOut(
+            raw_name=place, normalized_name=place.lower(), latitude=33.5, longitude=-90.3,
+            confidence_score=0.8, status="ok", source="nominatim",
+        )
+
+    def resolve_many(self, session, places, **kwargs):
+        self.batches.append(list(places))
+        return {p: self._out(p) if p.startswith("Fixed") else None for p in places}
+
+
+@pytest.fixture(autouse=True)
+def quiet_unresolved_log(monkeypatch):
+    monkeypatch.setattr(geocode_fanout, "record_unresolved", lambda raw, reason, tree_id=None: None)
+
+
+def _job(places, chunk_size):
+    with backend.db.SessionLocal.begin() as session:
+        job, chunks = create_fanout_job(session, places, chunk_size=chunk_size)
+        return str(job.id), chunks
+
+
+def _load(db_session, job_id):
+    db_session.expire_all()
+    return db_session.get(Job, uuid.UUID(job_id))
+
+
+def test_chunks_are_rate_sized_and_deduplicated(monkeypatch):
+    monkeypatch.setattr(geocode_fanout, "rate_limited_batch_size", lambda seconds, cap, api_key=None: 2)
+    tag = uuid.uuid4().hex[:6]
+    places = [f"Fixed A{tag}, Mississippi", f"Fixed  A{tag} , Mississippi", f"Fixed B{tag}, Mississippi", f"C{tag}, Mississippi", ""]
+    job_id, chunks = _job(places, None)
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[0][0] == {"place": places[0], "key": chunks[0][0]["key"]}
+
+
+def test_chunks_merge_atomically_and_retries_are_idempotent(db_session):
+    tag = uuid.uuid4().hex[:6]
+    job_id, chunks = _job([(f"Fixed Drew {tag}, Mississippi", f"drew_{tag}"), f"Atlantis {tag}"], 1)
+    stale = Location(raw_name=f"Fixed Drew {tag}, Mississippi", normalized_name=f"drew_{tag}", status="unresolved")
+    db_session.add(stale)
+    db_session.commit()
+    geocoder, locks = StubGeocoder(), InflightLocks(local=True)
+
+    run_chunk(job_id, 0, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    job = _load(db_session, job_id)
+    assert (job.status, job.progress, job.result["done"], job.result["chunks_done"]) == ("progress", 50, 1, [0])
+
+    # A redelivered chunk is not counted twice
+    assert run_chunk(job_id, 0, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks) == {"skipped": 1}
+    run_chunk(job_id, 1, chunks[1], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    summary = finish_fanout(job_id, session_factory=backend.db.SessionLocal)
+
+    assert {k: summary[k] for k in ("done", "resolved", "unresolved", "locations_updated")} == {
+        "done": 2, "resolved": 1, "unresolved": 1, "locations_updated": 1,
+    }
+    job = _load(db_session, job_id)
+    assert (job.status, job.progress) == ("success", 100)
+    assert job.result["results"][f"drew_{tag}"]["latitude"] == 33.5
+    stale = db_session.get(Location, stale.id)
+    assert (stale.latitude, stale.geocoded_by) == (33.5, "geocode_fanout")
+
+
+def test_redelivered_chunk_makes_no_provider_calls(db_session, monkeypatch):
+    tag = uuid.uuid4().hex[:6]
+    job_id, chunks = _job([f"Atlantis {tag}"], 1)
+    geocoder, locks, logged = StubGeocoder(), InflightLocks(local=True), []
+    monkeypatch.setattr(geocode_fanout, "record_unresolved", lambda raw, reason, tree_id=None: logged.append(raw))
+
+    run_chunk(job_id, 0, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    assert run_chunk(job_id, 0, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks) == {"skipped": 1}
+    assert geocoder.batches == [[f"Atlantis {tag}"]]
+    assert logged == [f"Atlantis {tag}"]
+
+
+def test_inflight_places_are_deferred_then_requeued(db_session):
+    tag = uuid.uuid4().hex[:6]
+    place = f"Fixed Ruleville {tag}, Mississippi"
+    job_id, chunks = _job([place], 1)
+    geocoder, locks = StubGeocoder(), InflightLocks(local=True)
+
+    # Another worker is resolving the same place right now
+    assert locks.acquire(chunks[0][0]["key"], "other-worker")
+    run_chunk(job_id, 0, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    assert geocoder.batches == []
+    assert _load(db_session, job_id).result["deferred"] == chunks[0]
+
+    # The fan-in sends it round again as chunk 1; a retried fan-in re-sends the same round
+    summary = finish_fanout(job_id, session_factory=backend.db.SessionLocal)
+    assert summary["requeue"] == {"index": 1, "items": chunks[0]}
+    assert finish_fanout(job_id, session_factory=backend.db.SessionLocal)["requeue"] == summary["requeue"]
+    assert _load(db_session, job_id).status == "progress"
+
+    # ...by which time the other worker has finished
+    locks.release(chunks[0][0]["key"], "other-worker")
+    run_chunk(job_id, 1, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    summary = finish_fanout(job_id, session_factory=backend.db.SessionLocal)
+    assert "requeue" not in summary
+    assert (summary["done"], summary["resolved"], summary["deferred"]) == (1, 1, [])
+    assert _load(db_session, job_id).status == "success"
+
+
+def test_places_deferred_every_round_end_unresolved(db_session, monkeypatch):
+    monkeypatch.setattr(geocode_fanout, "DEFER_ROUNDS", 1)
+    tag = uuid.uuid4().hex[:6]
+    job_id, chunks = _job([f"Fixed Shaw {tag}, Mississippi"], 1)
+    geocoder, locks = StubGeocoder(), InflightLocks(local=True)
+    assert locks.acquire(chunks[0][0]["key"], "other-worker")
+
+    run_chunk(job_id, 0, chunks[0], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    requeue = finish_fanout(job_id, session_factory=backend.db.SessionLocal)["requeue"]
+    run_chunk(job_id, requeue["index"], requeue["items"], session_factory=backend.db.SessionLocal, geocoder=geocoder, locks=locks)
+    summary = finish_fanout(job_id, session_factory=backend.db.SessionLocal)
+    assert (summary["done"], summary["resolved"], summary["unresolved"], summary["deferred"]) == (1, 0, 1, [])
+    assert geocoder.batches == []
+
+
+def test_chunk_failing_for_good_fails_the_job(db_session, monkeypatch):
+    from backend.tasks import geocode_tasks
+
+    tag = uuid.uuid4().hex[:6]
+    job_id, chunks = _job([f"Fixed Moorhead {tag}, Mississippi"], 1)
+    attempts = []
+
+    def broken(*args, **kwargs):
+        attempts.append(args)
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(geocode_tasks, "run_chunk", broken)
+    monkeypatch.setattr(geocode_tasks, "SessionLocal", backend.db.SessionLocal)
+    result = geocode_tasks.geocode_fanout_chunk_task.apply(args=(job_id, 0, chunks[0]))
+
+    assert result.failed()
+    assert len(attempts) == geocode_tasks.geocode_fanout_chunk_task.max_retries + 1
+    job = _load(db_session, job_id)
+    assert (job.status, job.error) == ("failure", "chunk 0: provider down")
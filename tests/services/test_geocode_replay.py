@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+import requests
+
+import backend.services.geocode_async as geocode_async
+from backend.services.geocode import Geocode, GeocodeError
+from backend.services.geocode_async import AsyncGeocodeClient
+from backend.services.geocode_replay import FixtureStore, RecordingTransport, ReplayTransport
+
+
+@pytest.fixture(autouse=True)
+def fast_buckets(monkeypatch):
+    monkeypatch.setattr(geocode_async, "_buckets", {})
+    monkeypatch.setattr(geocode_async, "SHARED_RATE_LIMITS", False)
+    monkeypatch.setattr(geocode_async, "PROVIDER_RATES", {"google": 1000.0, "nominatim": 1000.0})
+    monkeypatch.setattr(geocode_async, "RETRY_BACKOFF", 0.0)
+
+
+def _geocoder(transport, api_key=None):
+    geo = Geocode(api_key=api_key, use_cache=False, mock_mode=False, provider_transport=transport)
+    geo.plugins = [p for p in geo.plugins if type(p).__name__ != "GazetteerDBGeocoder"]
+    return geo
+
+
+def _nominatim(place):
+    return [{"lat": "33.8", "lon": "-90.5", "display_name": f"{place}, USA"}]
+
+
+def test_recording_captures_exchanges_without_api_key(tmp_path, monkeypatch):
+    def fake_get(url, params=None, **kwargs):
+        if "googleapis" in url:
+            return httpx.Response(200, json={"status": "ZERO_RESULTS", "results": []})
+        return httpx.Response(200, json=_nominatim(params["q"]))
+
+    monkeypatch.setattr(requests, "get", fake_get)
+    store = FixtureStore(tmp_path / "fixtures.jsonl")
+    out = _geocoder(RecordingTransport(store), api_key="secret").get_or_create_location(None, "Drew, Mississippi")
+    assert (out.latitude, out.source) == (33.8, "nominatim")
+
+    lines = [json.loads(line) for line in (tmp_path / "fixtures.jsonl").read_text().splitlines()]
+    assert [e["provider"] for e in lines] == ["google", "nominatim"]
+    assert lines[0]["params"] == {"address": "Drew, Mississippi"}
+    assert "secret" not in (tmp_path / "fixtures.jsonl").read_text()
+    assert len(FixtureStore(tmp_path / "fixtures.jsonl")) == 2
+
+    # The concurrent path records through its httpx transport
+    live = httpx.MockTransport(lambda request: httpx.Response(200, json=_nominatim(request.url.params["q"])))
+    http = httpx.AsyncClient(transport=RecordingTransport(store).async_transport(inner=live))
+    out = asyncio.run(AsyncGeocodeClient(http=http).resolve_many(["Ruleville, Mississippi"]))
+    assert out["Ruleville, Mississippi"][:2] == (33.8, -90.5)
+    assert store.get("nominatim", {"q": "Ruleville, Mississippi", "format": "json", "limit": "1"})["status"] == 200
+
+
+def test_replay_serves_both_paths_offline_with_latency(tmp_path, monkeypatch):
+    monkeypatch.setattr(requests, "get", lambda *a, **k: pytest.fail("network used during replay"))
+    store = FixtureStore(tmp_path / "fixtures.jsonl")
+    places = [f"Town {i}, Mississippi" for i in range(8)]
+    for place in places:
+        store.put("nominatim", {"q": place, "format": "json", "limit": "1"}, 200, _nominatim(place), 40.0)
+
+    replay = ReplayTransport(store, latency="recorded")
+    geo = _geocoder(replay)
+    assert geo.get_or_create_location(None, places[0]).latitude == 33.8
+
+    started = time.perf_counter()
+    out = geo.resolve_many(None, places[1:] + ["Atlantis, Mississippi"])
+    assert time.perf_counter() - started < 0.25  # 8 lookups of 40 ms, concurrently
+    assert all(out[p].source == "nominatim" for p in places[1:])
+    assert isinstance(out["Atlantis, Mississippi"], GeocodeError)
+    assert replay.stats == {"hits": 8, "misses": 1, "errors": 0}
+
+
+def test_replay_error_injection(tmp_path):
+    store = FixtureStore(tmp_path / "fixtures.jsonl")
+    store.put("nominatim", {"q": "Drew, Mississippi", "format": "json", "limit": "1"}, 200, _nominatim("Drew"), 5.0)
+    failing = ReplayTransport(store, latency="1-2", error_rate=1.0, seed=1)
+
+    assert isinstance(_geocoder(failing).get_or_create_location(None, "Drew, Mississippi"), GeocodeError)
+    # The async client retries 503s: 1 + MAX_RETRIES attempts
+    out = _geocoder(failing).resolve_many(None, ["Drew, Mississippi"])
+    assert isinstance(out["Drew, Mississippi"], GeocodeError)
+    assert failing.stats["errors"] == 2 + geocode_async.MAX_RETRIES
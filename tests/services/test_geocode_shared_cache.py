@@ -0,0 +1,100 @@
+import time
+
+from backend.services.geocode import Geocode, GeocodeError
+from backend.services.geocode_shared_cache import SharedGeocodeCache
+
+
+class FakeRedis:
+    """The handful of Redis commands the shared cache uses, in memory."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    def hdel(self, name, key):
+        self.hashes.get(name, {}).pop(key, None)
+
+    def get(self, key):
+        value, expires_at = self.strings.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            self.strings.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.strings[key] = (value, time.time() + ex if ex else None)
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        return fail
+
+
+HIT = {"latitude": 33.7, "longitude": -90.5, "normalized": "ruleville_ms", "confidence": 0.9, "source": "google"}
+
+
+def test_result_resolved_in_one_worker_is_served_to_another():
+    redis = FakeRedis()
+    worker_a = SharedGeocodeCache(redis, lru_size=2)
+    worker_b = SharedGeocodeCache(redis, lru_size=2)
+
+    worker_a.put("ruleville", HIT)
+    assert worker_b.get("ruleville")["source"] == "google"  # from Redis
+    assert worker_b.get("ruleville")["latitude"] == 33.7  # from the LRU
+    stats = worker_b.stats()
+    assert (stats["shared_hits"], stats["local_hits"], stats["misses"]) == (1, 1, 0)
+
+    for key in ("a", "b", "c"):
+        worker_b.put(key, HIT)
+    assert len(worker_b.local) == 2  # bounded
+
+
+def test_negative_results_expire():
+    redis = FakeRedis()
+    cache = SharedGeocodeCache(redis, miss_ttl=60)
+    cache.put("nowhere", {"latitude": None, "longitude": None})
+    other = SharedGeocodeCache(redis, miss_ttl=60)
+    assert other.get("nowhere")["status"] == "unresolved"
+    assert other.stats()["negative_hits"] == 1
+
+    redis.strings[cache.miss_prefix + "nowhere"] = (redis.strings[cache.miss_prefix + "nowhere"][0], time.time() - 1)
+    assert SharedGeocodeCache(redis).get("nowhere") is None
+
+    cache.put("nowhere", HIT)  # a later success replaces the miss
+    assert SharedGeocodeCache(redis).get("nowhere")["latitude"] == 33.7
+
+
+def test_redis_outage_falls_back_to_lru():
+    cache = SharedGeocodeCache(DownRedis())
+    cache.put("ruleville", HIT)
+    assert cache.get("ruleville")["latitude"] == 33.7
+    assert cache.get("drew") is None
+    stats = cache.stats()
+    assert stats["errors"] == 1 and stats["redis_available"] is False
+
+
+def test_geocode_chain_uses_and_fills_shared_tier(monkeypatch):
+    redis = FakeRedis()
+    first = Geocode(use_cache=False, shared_cache=SharedGeocodeCache(redis), mock_mode=True)
+    second = Geocode(use_cache=False, shared_cache=SharedGeocodeCache(redis), mock_mode=True)
+
+    miss = first.get_or_create_location(None, "Nowhere Town")
+    assert isinstance(miss, GeocodeError) and miss.reason == "geocoder-miss"
+    cached = second.get_or_create_location(None, "Nowhere Town")
+    assert isinstance(cached, GeocodeError) and cached.reason == "cached-miss"
+
+    second.shared_cache.put(second._normalize_key("Ruleville"), HIT)
+    out = first.get_or_create_location(None, "Ruleville")
+    assert (out.latitude, out.source) == (33.7, "google")
@@ -0,0 +1,73 @@
+import json
+import time
+
+from backend.services.geocode import Geocode, PermanentCacheGeocoder
+from backend.services.geocode_store import GeocodeStore, coerce_record
+
+HIT = {
+    "latitude": 33.7,
+    "longitude": -90.5,
+    "normalized": "ruleville_ms",
+    "confidence": 0.9,
+    "source": "nominatim",
+    "status": "ok",
+    "label": "nominatim",
+}
+
+
+def test_writes_are_batched_and_visible_before_flush(tmp_path):
+    store = GeocodeStore(tmp_path / "cache.sqlite3", batch_size=3, flush_interval=0)
+    store["ruleville"] = HIT
+    store["drew"] = {**HIT, "normalized": "drew_ms"}
+    assert store.get("ruleville")["normalized"] == "ruleville_ms"
+
+    reopened = GeocodeStore(tmp_path / "cache.sqlite3")
+    assert reopened.get("ruleville") is None  # still pending in the first store
+
+    store["canton"] = {**HIT, "normalized": "canton_ms"}  # batch size reached → flush
+    assert reopened.get("drew")["normalized"] == "drew_ms"
+    assert len(reopened) == 3
+
+
+def test_misses_expire_and_are_purged(tmp_path):
+    store = GeocodeStore(tmp_path / "cache.sqlite3", miss_ttl=60, flush_interval=0)
+    stale = time.time() - 120
+    store["nowhere"] = {"latitude": None, "longitude": None, "timestamp": stale}
+    store["somewhere"] = {"latitude": None, "longitude": None}
+    store.flush()
+    assert store.get("nowhere") is None
+    assert store.get("somewhere")["status"] == "unresolved"
+    assert store.purge_expired() == 1
+    assert list(store.keys()) == ["somewhere"]
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / "geocode_cache.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "old_list": [32.1, -90.1, "Old List", 0.8],
+                "six": [32.2, -90.2, "Six", 0.7, "google", 1.0],
+                "dict": HIT,
+                "broken": [1, 2],
+            }
+        )
+    )
+    store = GeocodeStore(tmp_path / "cache.sqlite3", legacy_json=legacy)
+    assert sorted(store.keys()) == ["dict", "old_list", "six"]
+    assert store.get("six")["source"] == "google"
+
+    store.delete("six")
+    store.close()
+    reopened = GeocodeStore(tmp_path / "cache.sqlite3", legacy_json=legacy)
+    assert "six" not in reopened  # not re-imported
+
+
+def test_permanent_cache_geocoder_reads_dict_and_list_entries(tmp_path):
+    geo = Geocode(cache_file=tmp_path / "geo.json")
+    geo.cache["ruleville"] = HIT
+    out = PermanentCacheGeocoder().resolve(geo, None, "Ruleville")
+    assert (out.latitude, out.source) == (33.7, "nominatim")
+
+    assert coerce_record([1.0, 2.0, "x", 0.5, "cache", "ok", "cache", 3.0])["timestamp"] == 3.0
+    assert coerce_record({"latitude": 1.0}) is None
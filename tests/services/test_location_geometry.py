@@ -0,0 +1,72 @@
+import random
+import uuid
+
+import backend.db
+from backend.models import Job, Location
+from backend.models.location_models import LocationOut
+from backend.services.location_geometry import (
+    EPSILON,
+    create_backfill_job,
+    find_near_duplicate,
+    run_geometry_backfill,
+)
+from backend.services.location_service import LocationService
+from backend.utils.geohash import covering, encode
+
+
+def _legacy(lat, lng):
+    """A row written before geom/geohash were filled on insert."""
+    return Location(raw_name="Legacy", normalized_name=f"legacy_{uuid.uuid4().hex[:8]}", latitude=lat, longitude=lng)
+
+
+def test_geohash_encoding_and_covering():
+    assert encode(42.6, -5.6, 5) == "ezs42"
+    assert encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    rng = random.Random(3)
+    for _ in range(500):
+        lat, lng = rng.uniform(-80, 80), rng.uniform(-170, 170)
+        dlat, dlng = rng.uniform(-EPSILON, EPSILON), rng.uniform(-EPSILON, EPSILON)
+        assert encode(lat + dlat, lng + dlng) in covering(lat, lng, EPSILON)
+
+
+def test_insert_reuses_coordinate_duplicate_via_geohash(db_session):
+    svc = LocationService(use_cache=False)
+    lat, lng = 33.812345, -90.561234
+    first = svc._insert_location(db_session, LocationOut(
+        raw_name="Drew, MS", normalized_name=f"drew_ms_{uuid.uuid4().hex[:6]}", latitude=lat, longitude=lng,
+        confidence_score=0.9, status="ok", source="test",
+    ))
+    row = db_session.query(Location).filter_by(normalized_name=first.normalized_name).one()
+    assert row.geohash == encode(lat, lng) and row.geom is not None
+
+    again = svc._insert_location(db_session, LocationOut(
+        raw_name="Drew, Sunflower, MS", normalized_name=f"drew_sunflower_{uuid.uuid4().hex[:6]}",
+        latitude=lat + 4e-6, longitude=lng - 4e-6, confidence_score=0.9, status="ok", source="test",
+    ))
+    assert again.normalized_name == first.normalized_name
+    assert find_near_duplicate(db_session, lat + 1e-3, lng) is None
+
+
+def test_backfill_job_covers_legacy_rows(db_session):
+    legacy = [_legacy(31.0 + i / 10, -89.0) for i in range(3)]
+    db_session.add_all(legacy + [_legacy(None, None)])
+    db_session.commit()
+    assert find_near_duplicate(db_session, 31.1, -89.0) is None  # not indexed yet
+
+    job = create_backfill_job(db_session)
+    db_session.commit()
+    assert job.params["pending"] >= 3
+
+    result = run_geometry_backfill(job.id, session_factory=backend.db.SessionLocal, batch_size=2)
+    assert result["updated"] >= 3
+    db_session.expire_all()
+    assert find_near_duplicate(db_session, 31.1, -89.0).id == legacy[1].id
+    job = db_session.get(Job, job.id)
+    assert (job.status, job.progress, job.result) == ("success", 100, {"updated": result["updated"]})
+    assert job.checkpoint["updated"] == result["updated"]
+
+    # Nothing left: a second run is a no-op
+    again = create_backfill_job(db_session)
+    db_session.commit()
+    assert again.params["pending"] == 0
+    assert run_geometry_backfill(again.id, session_factory=backend.db.SessionLocal)["updated"] == 0
@@ -0,0 +1,64 @@
+# tests/services/test_parse_cache.py
+import io
+import os
+
+from werkzeug.datastructures import FileStorage
+
+from backend.services.parse_cache import ParseCache, file_digest
+from backend.services.parser import GEDCOMParser
+from backend.services.upload_service import save_file_hashed
+
+GEDCOM = "tests/data/test_family_events.ged"
+
+
+def _digest(n):
+    return f"{n:064x}"
+
+
+def test_roundtrip_and_stale_header(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=1 << 20)
+    data = {"individuals": [{"name": "Zoë"}], "families": [], "events": [{"date": "1900-01-01"}]}
+    assert cache.get(_digest(1)) is None
+    cache.put(_digest(1), data)
+    assert cache.get(_digest(1)) == data
+
+    # Entries written by another format version are ignored.
+    path = tmp_path / f"{_digest(1)}.mpc"
+    path.write_bytes(b"MAPEMPC\x00" + path.read_bytes()[8:])
+    assert cache.get(_digest(1)) is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    entry = {"individuals": [{"blob": os.urandom(2048).hex()}], "families": [], "events": []}
+    cache = ParseCache(tmp_path, max_bytes=1 << 20)
+    cache.put(_digest(1), entry)
+    size = (tmp_path / f"{_digest(1)}.mpc").stat().st_size
+
+    cache.max_bytes = 2 * size + size // 2
+    cache.put(_digest(2), entry)
+    os.utime(tmp_path / f"{_digest(1)}.mpc", (1, 1))
+    os.utime(tmp_path / f"{_digest(2)}.mpc", (2, 2))
+    assert cache.get(_digest(1)) is not None  # read refreshes entry 1
+    cache.put(_digest(3), entry)
+
+    assert sorted(p.name[:64] for p in tmp_path.glob("*.mpc")) == [_digest(1), _digest(3)]
+
+
+def test_identical_upload_skips_parsing(tmp_path, monkeypatch):
+    with open(GEDCOM, "rb") as fh:
+        upload = FileStorage(stream=io.BytesIO(fh.read()), filename="tree.ged")
+    path, digest = save_file_hashed(upload, temp_dir=str(tmp_path))
+    assert digest == file_digest(GEDCOM) == file_digest(path)
+
+    cache = ParseCache(tmp_path / "cache", max_bytes=1 << 20)
+    first = GEDCOMParser(path, None, content_digest=digest, parse_cache=cache).parse_file()
+
+    import backend.services.parser as parser_mod
+
+    def boom(*_args, **_kwargs):
+        raise AssertionError("GEDCOM was parsed again")
+
+    monkeypatch.setattr(parser_mod, "GedcomCoreParser", boom)
+    monkeypatch.setattr(parser_mod, "GedcomStreamParser", boom)
+    again = GEDCOMParser(path, None, content_digest=digest, parse_cache=cache).parse_file()
+    assert again == first
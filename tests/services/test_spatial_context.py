@@ -0,0 +1,98 @@
+import random
+import uuid
+from datetime import date
+
+import numpy as np
+import pytest
+
+from backend.models import Event, Location, TreeVersion, UploadedTree
+from backend.services.gazetteer_index import GazetteerHit
+from backend.services.geocode_brain import (
+    REGIONAL_PRIOR_WEIGHT,
+    CandidateBatch,
+    GazetteerDBGeocoder,
+    GeoContext,
+    score_candidates,
+)
+from backend.services.spatial_context import SpatialContext, get_spatial_context, reset_spatial_contexts
+
+
+def _hit(name, admin, lat, lng):
+    return GazetteerHit(uuid.uuid4(), name, admin, "1890_1950", lat, lng, "geonames")
+
+
+@pytest.fixture(autouse=True)
+def fresh_contexts():
+    reset_spatial_contexts()
+    yield
+    reset_spatial_contexts()
+
+
+def test_grid_nearest_matches_brute_force():
+    rng = random.Random(7)
+    points = [(rng.uniform(25, 45), rng.uniform(-100, -75)) for _ in range(300)]
+    ctx = SpatialContext()
+    ctx.add_many(points)
+    ctx.add(None, -90.0)  # unresolved: ignored
+    assert ctx.total == 300
+
+    for _ in range(200):
+        lat, lng = rng.uniform(20, 50), rng.uniform(-110, -65)
+        brute = min((plat - lat) ** 2 + (0.6 * (plng - lng)) ** 2 for plat, plng in points)
+        expected = brute if brute < 100 else float("inf")
+        assert ctx.nearest_d2(lat, lng) == pytest.approx(expected)
+
+
+def test_spatial_proximity_equals_family_coords_and_adds_prior():
+    family = [(33.75, -90.7), (33.5, -90.2), (32.3, -90.2)]
+    rows = [
+        _hit("jackson", "mississippi", 32.3, -90.18),
+        _hit("jackson", "tennessee", 35.61, -88.81),
+        _hit("jackson", "michigan", 42.25, -84.4),
+    ]
+    batch = CandidateBatch.from_rows(rows)
+    ctx = SpatialContext()
+    ctx.add_many(family)
+
+    listed, _ = score_candidates("jackson", "", family, 1900, batch)
+    spatial, details = score_candidates("jackson", "", None, 1900, batch, spatial=ctx)
+    prior = np.array([d["regional_prior"] for d in details])
+    assert prior.tolist() == [1.0, 0.0, 0.0]
+    assert spatial == pytest.approx(listed + REGIONAL_PRIOR_WEIGHT * prior, abs=1e-3)
+    assert [d["proximity"] for d in details][0] > 0.9
+
+    # Same text, admin and era: the tree's region decides
+    best = GazetteerDBGeocoder(index=_Index(rows)).resolve(
+        None, "Jackson, Hinds, Mississippi", context=GeoContext(event_year=1900, spatial=ctx), debug=False
+    )
+    assert best.latitude == 32.3
+
+
+class _Index:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def lookup(self, key, eras, limit=50):
+        return self.rows
+
+
+def test_context_is_seeded_from_tree_version_events(db_session):
+    tree = UploadedTree(tree_name=f"spatial-{uuid.uuid4().hex[:6]}")
+    db_session.add(tree)
+    db_session.flush()
+    version = TreeVersion(uploaded_tree_id=tree.id, version_number=1)
+    drew = Location(raw_name="Drew", normalized_name=f"drew_{uuid.uuid4().hex[:6]}", latitude=33.8, longitude=-90.5)
+    nowhere = Location(raw_name="Nowhere", normalized_name=f"nowhere_{uuid.uuid4().hex[:6]}")
+    db_session.add_all([version, drew, nowhere])
+    db_session.flush()
+    db_session.add_all([
+        Event(tree_id=version.id, event_type="birth", date=date(1880, 1, 1), location_id=drew.id),
+        Event(tree_id=version.id, event_type="death", date=date(1950, 1, 1), location_id=drew.id),
+        Event(tree_id=version.id, event_type="residence", location_id=nowhere.id),
+    ])
+    db_session.commit()
+
+    ctx = get_spatial_context(version.id, db_session)
+    assert (ctx.total, len(ctx)) == (2, 1)
+    assert get_spatial_context(str(version.id)) is ctx
+    assert get_spatial_context(None) is None
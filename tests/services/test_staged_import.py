@@ -0,0 +1,112 @@
+# tests/services/test_staged_import.py
+import uuid
+
+import pytest
+
+import backend.db
+from backend.models import Event, Individual, Job, Location, UploadedTree
+from backend.services.bulk_persist import BulkPersister
+from backend.services.parser import GEDCOMParser
+from backend.services.staged_import import StagedImport
+
+GEDCOM = "tests/data/test_family_events.ged"
+
+
+@pytest.fixture
+def gedcom_with_places(tmp_path):
+    text = open(GEDCOM).read()
+    text = text.replace("2 DATE 1 JAN 1900", "2 DATE 1 JAN 1900\n2 PLAC Ruleville")
+    text = text.replace("2 DATE 2 FEB 1901", "2 DATE 2 FEB 1901\n2 PLAC Canton")
+    text = text.replace("2 DATE 10 JUN 1920", "2 DATE 10 JUN 1920\n2 PLAC Drew")
+    path = tmp_path / "places.ged"
+    path.write_text(text)
+    return str(path)
+
+
+class PlaceLocSvc:
+    """Resolves every place to its own Location row."""
+
+    def __init__(self):
+        self.calls = []
+
+    def resolve_location(self, raw_place, **_kw):
+        self.calls.append(raw_place)
+
+        class Out:
+            raw_name = raw_place
+            normalized_name = raw_place.lower().replace(" ", "_")
+            latitude = None
+            longitude = None
+            confidence_score = 1.0
+            status = "ok"
+            source = "dummy"
+
+        return Out()
+
+
+def _new_job(db_session):
+    tree = UploadedTree(id=uuid.uuid4(), tree_name=f"staged-{uuid.uuid4().hex[:6]}")
+    job = Job(task_id="t", job_type="gedcom_import", status="queued", progress=0)
+    db_session.add_all([tree, job])
+    db_session.commit()
+    return tree.id, job.id
+
+
+def _run(tree_id, job_id, svc, path=GEDCOM):
+    parser = GEDCOMParser(path, svc)
+    return StagedImport(
+        parser,
+        uploaded_tree_id=tree_id,
+        job_id=job_id,
+        session_factory=backend.db.SessionLocal,
+        chunk_size=1,
+        place_chunk_size=1,
+    ).run()
+
+
+def test_staged_import_commits_per_chunk_and_reports_progress(db_session):
+    tree_id, job_id = _new_job(db_session)
+    result = _run(tree_id, job_id, PlaceLocSvc())
+
+    db_session.expire_all()
+    job = db_session.get(Job, job_id)
+    assert (job.status, job.progress) == ("success", 100)
+    assert job.checkpoint["done"][-1] == "finalize"
+    assert job.result["version_id"] == result["version_id"]
+    version_id = uuid.UUID(result["version_id"])
+    assert db_session.query(Individual).filter_by(tree_id=version_id).count() == 2
+    assert db_session.query(Event).filter_by(tree_id=version_id).count() == result["summary"]["event_count"]
+
+
+def test_staged_import_resumes_after_failure(db_session, monkeypatch, gedcom_with_places):
+    tree_id, job_id = _new_job(db_session)
+    original = BulkPersister.persist_events
+    calls = {"n": 0}
+
+    def flaky(self, events):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("worker lost")
+        return original(self, events)
+
+    monkeypatch.setattr(BulkPersister, "persist_events", flaky)
+    svc = PlaceLocSvc()
+    with pytest.raises(RuntimeError):
+        _run(tree_id, job_id, svc, gedcom_with_places)
+
+    db_session.expire_all()
+    job = db_session.get(Job, job_id)
+    assert job.checkpoint["stage"] == "events" and job.checkpoint["cursor"] == 1
+    assert 65 <= job.progress < 99
+    assert sorted(svc.calls) == ["Canton", "Drew", "Ruleville"]
+
+    result = _run(tree_id, job_id, svc, gedcom_with_places)
+    assert len(svc.calls) == 3  # places were not geocoded again
+
+    version_id = uuid.UUID(result["version_id"])
+    parsed = GEDCOMParser(gedcom_with_places, None).parse_file()
+    events = db_session.query(Event).filter_by(tree_id=version_id).all()
+    assert len(events) == result["summary"]["event_count"] == len(parsed["events"])
+    assert db_session.query(Individual).filter_by(tree_id=version_id).count() == 2
+    located = {db_session.get(Location, e.location_id).normalized_name for e in events}
+    assert located == {"ruleville", "canton", "drew"}
@@ -0,0 +1,87 @@
+import json
+import uuid
+from datetime import datetime
+
+import backend.db
+from backend.models.unresolved_place import UnresolvedPlace
+from backend.services.unresolved_log import (
+    UnresolvedLog,
+    import_legacy_json,
+    iter_unresolved,
+    list_unresolved,
+    place_key_for,
+)
+
+
+def _rows(session, tree_id):
+    return {
+        (r.raw_name, r.reason): r
+        for r in session.query(UnresolvedPlace).filter(UnresolvedPlace.tree_id == tree_id)
+    }
+
+
+def test_log_aggregates_and_upserts_in_batches(db_session):
+    tree = uuid.uuid4().hex[:8]
+    log = UnresolvedLog(backend.db.SessionLocal, batch_size=2, flush_interval=0)
+
+    log.record(f"Drew {tree}, Mississippi", "api_failed", tree, when=datetime(2024, 1, 1))
+    log.record(f"drew {tree},  mississippi", "api_failed", tree, when=datetime(2024, 1, 3))
+    assert _rows(db_session, tree) == {}  # one distinct place pending: nothing written yet
+
+    log.record(f"Nowhere {tree}", "empty_after_normalise", tree)  # second place → flush
+    rows = _rows(db_session, tree)
+    assert len(rows) == 2
+    drew = rows[(f"Drew {tree}, Mississippi", "api_failed")]
+    assert drew.occurrences == 2
+    assert drew.place_key == place_key_for(f"Drew {tree}, Mississippi")
+    assert (drew.first_seen, drew.last_seen) == (datetime(2024, 1, 1), datetime(2024, 1, 3))
+
+    log.record(f"DREW {tree}, Mississippi", "api_failed", tree, when=datetime(2024, 2, 1))
+    assert log.flush() == 1
+    db_session.expire_all()
+    drew = _rows(db_session, tree)[(f"Drew {tree}, Mississippi", "api_failed")]
+    assert drew.occurrences == 3
+    assert (drew.first_seen, drew.last_seen) == (datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+    # A later occurrence without a tree (e.g. a fan-out job) keeps the stored tree
+    log.record(f"Drew {tree}, Mississippi", "api_failed", None, when=datetime(2024, 3, 1))
+    assert log.flush() == 1
+    db_session.expire_all()
+    assert _rows(db_session, tree)[(f"Drew {tree}, Mississippi", "api_failed")].occurrences == 4
+
+
+def test_pagination_and_filters(db_session):
+    tree = uuid.uuid4().hex[:8]
+    log = UnresolvedLog(backend.db.SessionLocal, batch_size=100, flush_interval=0)
+    for i in range(7):
+        log.record(f"Place {i} {tree}", "api_failed" if i % 2 else "empty_after_normalise", tree)
+    log.close()
+
+    page, cursor = list_unresolved(db_session, limit=3, tree_id=tree)
+    assert len(page) == 3 and cursor == page[-1].id
+    names = [r.raw_name for r in iter_unresolved(db_session, page_size=3, tree_id=tree)]
+    assert names == [f"Place {i} {tree}" for i in range(7)]
+    failed = list(iter_unresolved(db_session, page_size=2, tree_id=tree, reason="api_failed"))
+    assert [r.raw_name for r in failed] == [f"Place {i} {tree}" for i in (1, 3, 5)]
+
+
+def test_import_legacy_json(db_session, tmp_path):
+    tree = uuid.uuid4().hex[:8]
+    legacy = tmp_path / "unresolved_locations.json"
+    legacy.write_text(json.dumps([
+        {"raw_name": f"Itta Bena {tree}", "reason": "api_failed", "tree_id": tree,
+         "timestamp": "2023-05-01T10:00:00+00:00"},
+        {"raw_name": f"Itta Bena {tree}", "reason": "api_failed", "tree_id": tree,
+         "timestamp": "2023-06-01T10:00:00+00:00"},
+        {"place": f"Moorhead {tree}", "tree_id": tree},
+        {"reason": "api_failed"},
+    ]))
+    assert import_legacy_json(db_session, legacy) == 4
+    db_session.commit()
+
+    rows = _rows(db_session, tree)
+    itta = rows[(f"Itta Bena {tree}", "api_failed")]
+    assert itta.occurrences == 2
+    assert itta.last_seen == datetime(2023, 6, 1, 10)
+    assert rows[(f"Moorhead {tree}", "unknown")].status == "manual_fix_pending"
+    assert import_legacy_json(db_session, tmp_path / "missing.json") == 0
@@ -0,0 +1,122 @@
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import backend.db
+from backend.models import Event, Job, Location, TreeVersion, UploadedTree
+from backend.models.location_models import LocationOut
+from backend.models.unresolved_place import UnresolvedPlace
+from backend.services.unresolved_retry import (
+    EXHAUSTED_STATUS,
+    RETRY_MAX_ATTEMPTS,
+    backoff_delay,
+    due_places,
+    run_unresolved_retry,
+)
+
+
+class StubGeocoder:
+    """Knows every place whose name starts with 'Fixed'."""
+
+    api_key = None
+
+    def __init__(self):
+        self.batches = []
+
+    def resolve_many(self, session, places, **kwargs):
+        self.batches.append(list(places))
+        return {
+            p: LocationOut(
+                raw_name=p, normalized_name=p.lower(), latitude=33.5, longitude=-90.3,
+                confidence_score=0.8, status="ok", source="nominatim",
+            ) if p.startswith("Fixed") else None
+            for p in places
+        }
+
+
+def _place(db_session, raw, *, occurrences=1, last_seen=None, **kw):
+    row = UnresolvedPlace(
+        place_key=raw.lower().replace(" ", "_").replace(",", "") + uuid.uuid4().hex[:4],
+        reason="api_failed", raw_name=raw, occurrences=occurrences,
+        last_seen=last_seen or datetime.utcnow(), **kw,
+    )
+    db_session.add(row)
+    return row
+
+
+@pytest.fixture
+def clean_places(db_session):
+    db_session.query(UnresolvedPlace).delete()
+    db_session.query(Job).filter(Job.job_type == "unresolved_retry").delete()
+    db_session.commit()
+    yield
+    db_session.rollback()
+
+
+def test_due_places_by_impact_then_recency(db_session, clean_places):
+    old, recent = datetime.utcnow() - timedelta(days=30), datetime.utcnow()
+    quiet = _place(db_session, "Quiet, Mississippi", last_seen=old)
+    fresh = _place(db_session, "Fresh, Mississippi", last_seen=recent)
+    busy = _place(db_session, "Busy, Mississippi", occurrences=2, last_seen=old)
+    waiting = _place(db_session, "Waiting, Mississippi", occurrences=9, next_attempt_at=recent + timedelta(hours=1))
+    linked = _place(db_session, "Linked, Mississippi", last_seen=old)
+    db_session.flush()
+
+    # Three events on a location of that name outweigh two log occurrences
+    tree = UploadedTree(tree_name=f"retry-{uuid.uuid4().hex[:6]}")
+    db_session.add(tree)
+    db_session.flush()
+    version = TreeVersion(uploaded_tree_id=tree.id, version_number=1)
+    loc = Location(raw_name="Linked, Mississippi", normalized_name=linked.place_key, status="unresolved")
+    db_session.add_all([version, loc])
+    db_session.flush()
+    db_session.add_all(
+        Event(tree_id=version.id, event_type="birth", date=date(1900 + i, 1, 1), location_id=loc.id) for i in range(3)
+    )
+    db_session.commit()
+
+    due = due_places(db_session, now=datetime.utcnow(), limit=10)
+    assert [p.id for p in due] == [linked.id, busy.id, fresh.id, quiet.id]
+    assert waiting.id not in [p.id for p in due]
+
+
+def test_run_propagates_fixes_and_backs_off_failures(db_session, clean_places):
+    existing = _place(db_session, "Fixed Drew, Mississippi")
+    new = _place(db_session, "Fixed Moorhead, Mississippi")
+    miss = _place(db_session, "Atlantis, Mississippi")
+    last_try = _place(db_session, "Lemuria, Mississippi", attempts=RETRY_MAX_ATTEMPTS - 1)
+    db_session.flush()
+    stale = Location(raw_name="Fixed Drew, Mississippi", normalized_name=existing.place_key, status="unresolved")
+    db_session.add(stale)
+    db_session.commit()
+
+    geocoder = StubGeocoder()
+    metrics = run_unresolved_retry(session_factory=backend.db.SessionLocal, geocoder=geocoder, batch_size=2)
+
+    assert [len(b) for b in geocoder.batches] == [2, 2]
+    assert {k: metrics[k] for k in ("attempted", "resolved", "failed", "exhausted", "locations_updated", "batches")} == {
+        "attempted": 4, "resolved": 2, "failed": 1, "exhausted": 1, "locations_updated": 2, "batches": 2,
+    }
+    assert metrics["places_per_second"] > 0
+
+    db_session.expire_all()
+    stale = db_session.get(Location, stale.id)
+    assert (stale.latitude, stale.status.value, stale.geocoded_by) == (33.5, "ok", "unresolved_retry")
+    assert db_session.query(Location).filter_by(normalized_name=new.place_key).one().longitude == -90.3
+    assert db_session.get(UnresolvedPlace, existing.id).status == "resolved"
+    miss = db_session.get(UnresolvedPlace, miss.id)
+    assert miss.attempts == 1 and miss.next_attempt_at >= miss.last_attempt_at + backoff_delay(1)
+    assert db_session.get(UnresolvedPlace, last_try.id).status == EXHAUSTED_STATUS
+
+    job = db_session.get(Job, uuid.UUID(metrics["job_id"]))
+    assert (job.job_type, job.status, job.result["resolved"]) == ("unresolved_retry", "success", 2)
+
+    # Nothing is due any more
+    again = run_unresolved_retry(session_factory=backend.db.SessionLocal, geocoder=StubGeocoder())
+    assert again["attempted"] == 0
+
+
+def test_backoff_grows_and_is_capped():
+    assert backoff_delay(2) == 2 * backoff_delay(1)
+    assert backoff_delay(50) == timedelta(days=7)
@@ -51,3 +51,178 @@ def test_unresolved_location_skipped(db_session):
     evt = db_session.query(Event).first()
     assert evt and evt.location_id is None
 
+
+def test_bulk_and_row_paths_agree(db_session):
+    counts = {}
+    for bulk in (True, False):
+        tree_id = create_tree(db_session)
+        parser = GEDCOMParser("tests/data/test_family_events.ged", DummyLocSvc())
+        parser.parse_file()
+        summary = parser.save_to_db(db_session, tree_id=tree_id, bulk=bulk)
+        db_session.commit()
+        counts[bulk] = (
+            summary["people_count"],
+            summary["event_count"],
+            db_session.query(Event).filter_by(tree_id=tree_id).count(),
+        )
+    assert counts[True] == counts[False]
+
+
+def test_bulk_and_row_paths_drop_repeated_events(db_session):
+    repeated = {"event_type": "residence", "location": "Ruleville", "date": "1920"}
+    counts = {}
+    for bulk in (True, False):
+        tree_id = create_tree(db_session)
+        parser = GEDCOMParser(file_path="", location_service=DummyLocSvc())
+        parser.data = {"individuals": [], "families": [], "events": [dict(repeated), dict(repeated)]}
+        summary = parser.save_to_db(db_session, tree_id=tree_id, bulk=bulk)
+        db_session.commit()
+        counts[bulk] = (summary["event_count"], db_session.query(Event).filter_by(tree_id=tree_id).count())
+    assert counts[True] == counts[False] == (1, 1)
+
+
+def test_resolve_places_once_per_distinct_place(db_session):
+    class CountingLocSvc(DummyLocSvc):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def resolve_location(self, **kw):
+            self.calls.append((kw["raw_place"], kw["event_year"]))
+            return super().resolve_location(**kw)
+
+    tree_id = create_tree(db_session)
+    svc = CountingLocSvc()
+    parser = GEDCOMParser(file_path="", location_service=svc)
+    parser.data = {
+        "individuals": [],
+        "families": [],
+        "events": [
+            {"event_type": "residence", "location": "Ruleville", "date": "1920"},
+            {"event_type": "birth", "location": "Ruleville", "date": "1 JAN 1900"},
+            {"event_type": "census", "location": "Ruleville", "date": None},
+        ],
+    }
+    place_map = parser.resolve_places(db_session)
+    assert svc.calls == [("Ruleville", 1900)]
+    loc_id = db_session.query(Location.id).filter_by(normalized_name="place_x").scalar()
+    assert place_map == {"Ruleville": loc_id}
+
+    parser.save_to_db(db_session, tree_id=tree_id, place_map=place_map)
+    assert len(svc.calls) == 1
+    assert {e.location_id for e in db_session.query(Event).filter_by(tree_id=tree_id)} == {loc_id}
+
+
+def test_incremental_reimport_moves_unchanged_rows(db_session, tmp_path):
+    from backend.models import Individual, TreeVersion
+
+    v1 = create_tree(db_session)
+    first = GEDCOMParser("tests/data/test_family_events.ged", DummyLocSvc())
+    first.parse_file()
+    first.save_to_db(db_session, tree_id=v1)
+    db_session.commit()
+    john_id = db_session.query(Individual.id).filter_by(tree_id=v1, gedcom_id="@I1@").scalar()
+
+    edited = tmp_path / "edited.ged"
+    text = open("tests/data/test_family_events.ged").read()
+    text = text.replace("2 DATE 2 FEB 1901", "2 DATE 3 FEB 1901")
+    text = text.replace("0 @F1@ FAM", "0 @I3@ INDI\n1 NAME Sam /Doe/\n1 RESI\n2 PLAC Canton\n0 @F1@ FAM")
+    edited.write_text(text)
+
+    v1_row = db_session.get(TreeVersion, v1)
+    v2_row = TreeVersion(uploaded_tree_id=v1_row.uploaded_tree_id, version_number=2)
+    db_session.add(v2_row)
+    db_session.flush()
+    second = GEDCOMParser(str(edited), DummyLocSvc())
+    second.parse_file()
+    summary = second.save_to_db(db_session, tree_id=v2_row.id, previous_version_id=v1)
+    db_session.commit()
+
+    diff = summary["diff"]
+    assert diff["individuals"] == {"added": 1, "changed": 1, "unchanged": 1, "removed": 0}
+    assert diff["families"] == {"added": 0, "changed": 0, "unchanged": 1, "removed": 0}
+    assert diff["carried_forward"]["individuals"] == 1
+
+    # John was moved, not copied; the new version is complete.
+    assert db_session.get(Individual, john_id).tree_id == v2_row.id
+    assert db_session.query(Individual).filter_by(tree_id=v2_row.id).count() == 3
+    assert db_session.query(Event).filter_by(tree_id=v2_row.id).count() == len(second.data["events"])
+    assert db_session.get(TreeVersion, v1).status == "superseded"
+
+
+FAMILY_WITH_CHILDREN = """0 HEAD
+1 GEDC
+2 VERS 5.5.1
+0 @I1@ INDI
+1 NAME John /Doe/
+1 FAMS @F1@
+0 @I2@ INDI
+1 NAME Jane /Smith/
+1 FAMS @F1@
+0 @I3@ INDI
+1 NAME Ann /Doe/
+1 BIRT
+2 DATE 1 MAR 1925
+1 FAMC @F1@
+0 @I4@ INDI
+1 NAME Tom /Doe/
+1 BIRT
+2 DATE 5 MAY 1927
+1 FAMC @F1@
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+1 CHIL @I3@
+1 CHIL @I4@
+0 TRLR
+"""
+
+
+def test_incremental_reimport_rebuilds_changed_child_relationships(db_session, tmp_path):
+    from backend.models import Individual, TreeRelationship, TreeVersion
+    from backend.services.incremental import replacement_version
+
+    def relationships(uploaded_tree_id):
+        names = {i.id: i.first_name for i in db_session.query(Individual)}
+        return sorted(
+            (names[r.person_id], names[r.related_person_id], r.relationship_type, r.related_person_id)
+            for r in db_session.query(TreeRelationship).filter_by(tree_id=uploaded_tree_id)
+        )
+
+    original = tmp_path / "v1.ged"
+    original.write_text(FAMILY_WITH_CHILDREN)
+    v1 = create_tree(db_session)
+    first = GEDCOMParser(str(original), DummyLocSvc())
+    first.parse_file()
+    first.save_to_db(db_session, tree_id=v1)
+    db_session.commit()
+    uploaded_tree_id = db_session.get(TreeVersion, v1).uploaded_tree_id
+    assert [r[:3] for r in relationships(uploaded_tree_id)] == [
+        ("Jane", "Ann", "mother"), ("Jane", "Tom", "mother"), ("John", "Ann", "father"), ("John", "Tom", "father"),
+    ]
+
+    # Only Tom's record changes; the family record itself is identical
+    edited = tmp_path / "v2.ged"
+    edited.write_text(FAMILY_WITH_CHILDREN.replace("2 DATE 5 MAY 1927", "2 DATE 6 MAY 1927"))
+    v2 = TreeVersion(uploaded_tree_id=uploaded_tree_id, version_number=2)
+    db_session.add(v2)
+    db_session.flush()
+    second = GEDCOMParser(str(edited), DummyLocSvc())
+    second.parse_file()
+    summary = second.save_to_db(db_session, tree_id=v2.id, previous_version_id=v1)
+    db_session.commit()
+
+    assert summary["diff"]["families"]["unchanged"] == 1
+    assert summary["diff"]["carried_forward"]["families"] == 0  # rewritten for its changed child
+    people = {i.first_name: i.id for i in db_session.query(Individual).filter_by(tree_id=v2.id)}
+    assert db_session.query(Individual).filter_by(tree_id=v2.id).count() == 4
+    assert relationships(uploaded_tree_id) == sorted([
+        ("Jane", "Ann", "mother", people["Ann"]), ("Jane", "Tom", "mother", people["Tom"]),
+        ("John", "Ann", "father", people["Ann"]), ("John", "Tom", "father", people["Tom"]),
+    ])
+
+    # The superseded remainder is never served
+    old = db_session.get(TreeVersion, v1)
+    assert old.status == "superseded"
+    assert replacement_version(db_session, old).id == v2.id
+    assert replacement_version(db_session, db_session.get(TreeVersion, v2.id)) is None
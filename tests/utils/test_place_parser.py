@@ -0,0 +1,65 @@
+import re
+
+import pytest
+
+from backend.services.geocode import Geocode, HistoricalGeocoder, ManualOverrideGeocoder
+from backend.utils.helpers import normalize_location
+from backend.utils.place_parser import ParsedPlace, clear_parse_cache, parse_cache_info, parse_place
+
+
+def _legacy_normalize(raw):
+    parts = [p.strip().lower() for p in raw.split(",") if p.strip()]
+    if len(parts) < 2:
+        return None
+    return "_".join(s for s in (re.sub(r"[^a-z0-9]+", "_", p).strip("_") for p in parts) if s)
+
+
+@pytest.mark.parametrize("raw", [
+    "Drew, MS", " drew ,  Sunflower County , Mississippi, USA ", "Mississippi", "!!, ??",
+    "St. Louis, Missouri", "Ruleville,,Sunflower", ",", "Greenwood, Leflore, Mississippi",
+])
+def test_slug_and_key_match_previous_normalisation(raw):
+    parsed = parse_place(raw)
+    assert parsed.slug == _legacy_normalize(raw) == normalize_location(raw)
+    norm = _legacy_normalize(raw.strip())
+    assert parsed.key == Geocode._normalize_key(raw) == (norm.lower() if norm else raw.strip().lower())
+
+
+@pytest.mark.parametrize("raw, components", [
+    ("Jackson, Hinds, Mississippi, USA", ("jackson", "hinds", "mississippi", "united states")),
+    ("Sunflower County, Mississippi", (None, "sunflower", "mississippi", "united states")),
+    ("Ruleville, Sunflower Co., Miss.", ("ruleville", "sunflower", "mississippi", "united states")),
+    ("Boston, MA", ("boston", None, "massachusetts", "united states")),
+    ("London, England", ("london", None, None, "england")),
+    ("Tennessee", (None, None, "tennessee", "united states")),
+])
+def test_components(raw, components):
+    parsed = parse_place(raw)
+    assert (parsed.locality, parsed.county, parsed.state, parsed.country) == components
+
+
+def test_interned_and_passed_through_plugins():
+    clear_parse_cache()
+    first = parse_place("Itta Bena, Leflore, Mississippi")
+    assert parse_place("Itta Bena, Leflore, Mississippi") is first
+    assert parse_place(first) is first
+    assert parse_cache_info().hits == 1
+    assert parse_place(None) == parse_place("") and parse_place("").slug is None
+
+    fixes = {"itta bena, leflore, mississippi": {"lat": 33.5, "lng": -90.3, "normalized_name": "itta_bena"}}
+    geocode = Geocode(use_cache=False)
+    for plugin in (ManualOverrideGeocoder(fixes), HistoricalGeocoder(fixes)):
+        hit = plugin.resolve(geocode, None, first)
+        assert (hit.raw_name, hit.latitude) == ("Itta Bena, Leflore, Mississippi", 33.5)
+        assert plugin.resolve(geocode, None, "Itta Bena, Leflore, Mississippi") == hit
+    assert isinstance(first, ParsedPlace)
+
+
+def test_gazetteer_and_unresolved_keys_share_the_parser_slug():
+    from backend.services.gazetteer_index import place_slug
+    from backend.services.unresolved_log import place_key_for
+
+    for raw in ["Ruleville,  Sunflower Co., MS", "St. Louis, Missouri, USA", "Itta Bena"]:
+        parts = parse_place(raw).parts
+        assert place_slug(raw) == place_key_for(raw) == "_".join(parts)
+    assert place_key_for("Drew, Mississippi") == normalize_location("Drew, Mississippi")